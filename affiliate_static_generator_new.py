@@ -10,6 +10,8 @@ from datetime import datetime
 from pathlib import Path
 from jinja2 import Environment, FileSystemLoader, select_autoescape
 
+from src.infrastructure.data_snapshot import load_snapshot
+
 class AffiliateStaticGeneratorNew:
     def __init__(self):
         self.output_dir = Path("static_site_new")
@@ -31,8 +33,7 @@ class AffiliateStaticGeneratorNew:
     def load_data(self):
         """データファイルを読み込み"""
         try:
-            with open('data/mountains_japan_expanded.json', 'r', encoding='utf-8') as f:
-                self.mountains_data = json.load(f)
+            self.mountains_data = load_snapshot(Path('data/mountains_japan_expanded.json'))
             
             with open('data/article_metadata.json', 'r', encoding='utf-8') as f:
                 self.article_metadata = json.load(f)
@@ -189,6 +189,14 @@ def log_function_call(logger: logging.Logger = None):
     return decorator
 
 
+def _cache_stats_suffix(args) -> str:
+    """APIクライアントがレスポンスキャッシュを持つ場合、その統計をログ用に整形"""
+    cache = getattr(args[0], 'response_cache', None) if args else None
+    if cache is None:
+        return ""
+    return f" [{cache.format_stats()}]"
+
+
 def log_api_call(api_name: str, logger: logging.Logger = None):
     """
     API呼び出しをログに記録するデコレータ
@@ -208,10 +216,10 @@ def log_api_call(api_name: str, logger: logging.Logger = None):
             
             try:
                 result = func(*args, **kwargs)
-                log.info(f"API call completed: {api_name}")
+                log.info(f"API call completed: {api_name}{_cache_stats_suffix(args)}")
                 return result
             except Exception as e:
-                log.error(f"API call failed: {api_name} - {e}", exc_info=True)
+                log.error(f"API call failed: {api_name}{_cache_stats_suffix(args)} - {e}", exc_info=True)
                 raise
         
         return wrapper
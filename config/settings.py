@@ -58,7 +58,32 @@ class Settings(BaseSettings):
         default=0.7,
         description="Claude API 温度パラメータ"
     )
-    
+
+    CLAUDE_CACHE_ENABLED: bool = Field(
+        default=True,
+        description="Claude API レスポンスのディスクキャッシュの有効/無効"
+    )
+
+    CLAUDE_CACHE_DIR: str = Field(
+        default="./cache/claude",
+        description="Claude API レスポンスキャッシュのディレクトリ"
+    )
+
+    CLAUDE_CACHE_TTL: int = Field(
+        default=30 * 24 * 60 * 60,
+        description="Claude API レスポンスキャッシュの有効期限（秒、0で無期限）"
+    )
+
+    CLAUDE_CACHE_MAX_MB: int = Field(
+        default=200,
+        description="Claude API レスポンスキャッシュの最大サイズ（MB、0で無制限）"
+    )
+
+    SEARCH_INDEX_PATH: str = Field(
+        default="./cache/search_index.json",
+        description="山・記事の全文検索インデックスの保存先"
+    )
+
     # === Application Settings ===
     LOG_LEVEL: str = Field(
         default="INFO",
@@ -95,6 +120,47 @@ class Settings(BaseSettings):
         default=30,
         description="API タイムアウト（秒）"
     )
+
+    MAX_RETRY_DELAY: int = Field(
+        default=60,
+        description="リトライ間隔の上限（秒）"
+    )
+
+    CLAUDE_API_TIMEOUT: int = Field(
+        default=180,
+        description="Claude API タイムアウト（秒、記事生成は応答に時間がかかるため別設定）"
+    )
+
+    # === Rate Limit Settings ===
+    CLAUDE_RATE_PER_SEC: float = Field(
+        default=0.8,
+        description="Claude API の毎秒リクエスト数上限（0で無制限）"
+    )
+
+    CLAUDE_MAX_CONCURRENCY: int = Field(
+        default=4,
+        description="Claude API の同時リクエスト数上限"
+    )
+
+    RAKUTEN_RATE_PER_SEC: float = Field(
+        default=1.0,
+        description="楽天 API の毎秒リクエスト数上限（0で無制限）"
+    )
+
+    RAKUTEN_MAX_CONCURRENCY: int = Field(
+        default=2,
+        description="楽天 API の同時リクエスト数上限"
+    )
+
+    WP_RATE_PER_SEC: float = Field(
+        default=5.0,
+        description="WordPress API の毎秒リクエスト数上限（0で無制限）"
+    )
+
+    WP_MAX_CONCURRENCY: int = Field(
+        default=4,
+        description="WordPress API の同時リクエスト数上限"
+    )
     
     # === Article Generation Settings ===
     ARTICLE_MIN_LENGTH: int = Field(
@@ -106,7 +172,38 @@ class Settings(BaseSettings):
         default=2500,
         description="記事の最大文字数"
     )
-    
+
+    BATCH_MAX_WORKERS: int = Field(
+        default=4,
+        description="一括生成時の同時実行数"
+    )
+
+    JOB_JOURNAL_DIR: str = Field(
+        default="./cache/jobs",
+        description="中断した一括生成ジョブを再開するためのジャーナルの保存先"
+    )
+
+    # === Web UI Settings ===
+    WEB_JOB_WORKERS: int = Field(
+        default=2,
+        description="Web UI の記事生成ジョブの同時実行数"
+    )
+
+    WEB_JOB_MAX_PENDING: int = Field(
+        default=20,
+        description="Web UI で実行待ちにできる記事生成ジョブの上限（超えると429を返す）"
+    )
+
+    WEB_JOB_DB_PATH: str = Field(
+        default="./cache/web_jobs.sqlite3",
+        description="Web UI の記事生成ジョブの状態と結果を保存するデータベースファイル"
+    )
+
+    WEB_JOB_RETENTION_HOURS: float = Field(
+        default=24 * 7,
+        description="完了した記事生成ジョブ（生成した記事）を保存しておく時間"
+    )
+
     # === Image Settings ===
     FEATURED_IMAGE_WIDTH: int = Field(
         default=1024,
@@ -148,6 +245,36 @@ class Settings(BaseSettings):
         default=50000,
         description="商品の最高価格"
     )
+
+    PRODUCT_CACHE_ENABLED: bool = Field(
+        default=True,
+        description="楽天商品検索結果の永続キャッシュの有効/無効"
+    )
+
+    PRODUCT_CACHE_PATH: str = Field(
+        default="./cache/rakuten_products.sqlite3",
+        description="楽天商品キャッシュのデータベースファイル"
+    )
+
+    PRODUCT_CACHE_FRESH_HOURS: float = Field(
+        default=24,
+        description="商品情報（価格）を最新とみなす時間。超えたものはバックグラウンドで再取得"
+    )
+
+    PRODUCT_CACHE_MAX_STALE_HOURS: float = Field(
+        default=24 * 14,
+        description="古い商品情報をそのまま返してよい最大時間。超えたものは同期的に再取得"
+    )
+
+    RAKUTEN_OFFLINE: bool = Field(
+        default=False,
+        description="オフラインモード（楽天APIを呼ばず商品キャッシュのみを使用）"
+    )
+
+    PRODUCT_CACHE_BLOCK_ON_MISS: bool = Field(
+        default=True,
+        description="キャッシュにない・期限切れの商品を楽天APIから取得し終えるまで待つか（Falseでは空・古い値を返し、バックグラウンドで取得）"
+    )
     
     # === WordPress Settings ===
     WP_DEFAULT_STATUS: str = Field(
@@ -212,7 +339,17 @@ class Settings(BaseSettings):
         # 価格範囲の検証
         if self.PRODUCT_PRICE_MIN >= self.PRODUCT_PRICE_MAX:
             raise ValueError("PRODUCT_PRICE_MIN must be less than PRODUCT_PRICE_MAX")
-        
+
+        # 商品キャッシュ期間の検証
+        if self.PRODUCT_CACHE_FRESH_HOURS > self.PRODUCT_CACHE_MAX_STALE_HOURS:
+            raise ValueError("PRODUCT_CACHE_FRESH_HOURS must not exceed PRODUCT_CACHE_MAX_STALE_HOURS")
+
+        # 同時実行数の検証
+        if self.BATCH_MAX_WORKERS < 1:
+            raise ValueError("BATCH_MAX_WORKERS must be at least 1")
+        if self.WEB_JOB_WORKERS < 1:
+            raise ValueError("WEB_JOB_WORKERS must be at least 1")
+
         # WordPress ステータスの検証
         valid_statuses = ["draft", "publish", "private"]
         if self.WP_DEFAULT_STATUS not in valid_statuses:
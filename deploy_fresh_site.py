@@ -2,10 +2,11 @@
 """
 フレッシュサイトをFTPデプロイ（static_site_newを上書き）
 """
+import argparse
 import ftplib
-import os
 from pathlib import Path
-import mimetypes
+
+from src.infrastructure.ftp_sync import FTPDeltaSync, FTPSyncError
 
 # FTP設定
 FTP_HOST = 'ftp.lolipop.jp'
@@ -21,90 +22,14 @@ class FreshSiteFTPDeployer:
         self.ftp_pass = FTP_PASS
         self.remote_dir = REMOTE_DIR
         self.local_dir = LOCAL_DIR
-        self.ftp = None
-        
-    def connect(self):
-        """FTP接続"""
-        try:
-            self.ftp = ftplib.FTP(self.ftp_host)
-            self.ftp.login(self.ftp_user, self.ftp_pass)
-            print(f"✅ FTP接続成功: {self.ftp_host}")
-            return True
-        except Exception as e:
-            print(f"❌ FTP接続失敗: {e}")
-            return False
-        
-    def disconnect(self):
-        """FTP切断"""
-        if self.ftp:
-            self.ftp.quit()
-            print("🔌 FTP接続を切断しました")
-    
-    def create_remote_directory(self, remote_path):
-        """リモートディレクトリを作成"""
-        try:
-            self.ftp.mkd(remote_path)
-            print(f"📁 ディレクトリ作成: {remote_path}")
-        except ftplib.error_perm:
-            # ディレクトリが既に存在する場合は無視
-            pass
-    
-    def upload_file(self, local_file, remote_file):
-        """ファイルをアップロード"""
-        try:
-            # 全てバイナリモードでアップロード（UTF-8のテキストファイルも含む）
-            with open(local_file, 'rb') as f:
-                self.ftp.storbinary(f'STOR {remote_file}', f)
-            
-            print(f"⬆️  {local_file} → {remote_file}")
-            return True
-        except Exception as e:
-            print(f"❌ アップロード失敗 {local_file}: {e}")
-            return False
-    
-    def upload_directory(self, local_path, remote_path=""):
-        """ディレクトリを再帰的にアップロード"""
-        if not local_path.exists():
-            print(f"❌ ローカルディレクトリが存在しません: {local_path}")
-            return False
         
-        # リモートディレクトリに移動
-        if remote_path:
-            try:
-                self.ftp.cwd(f"{self.remote_dir}/{remote_path}")
-            except ftplib.error_perm:
-                # ディレクトリが存在しない場合は作成
-                self.create_remote_directory(f"{self.remote_dir}/{remote_path}")
-                self.ftp.cwd(f"{self.remote_dir}/{remote_path}")
-        else:
-            self.ftp.cwd(self.remote_dir)
-        
-        uploaded_count = 0
-        failed_count = 0
-        
-        for item in local_path.iterdir():
-            if item.is_file():
-                # ファイルをアップロード
-                remote_file_path = item.name
-                if self.upload_file(item, remote_file_path):
-                    uploaded_count += 1
-                else:
-                    failed_count += 1
-                    
-            elif item.is_dir():
-                # ディレクトリを再帰的にアップロード
-                remote_subdir = f"{remote_path}/{item.name}" if remote_path else item.name
-                self.create_remote_directory(f"{self.remote_dir}/{remote_subdir}")
-                
-                # サブディレクトリを処理
-                sub_uploaded, sub_failed = self.upload_directory(item, remote_subdir)
-                uploaded_count += sub_uploaded
-                failed_count += sub_failed
-        
-        return uploaded_count, failed_count
-    
-    def deploy(self):
-        """デプロイメイン処理"""
+    def deploy(self, connections=4, atomic=False, dry_run=False):
+        """
+        デプロイメイン処理
+
+        前回デプロイ時からの変更ファイルだけを並列接続でアップロードし、
+        ローカルで削除されたファイルはサーバーからも削除する。
+        """
         print("🚀 フレッシュサイトのデプロイを開始...")
         print(f"📂 ローカル: {self.local_dir}")
         print(f"🌐 リモート: {self.ftp_host}{self.remote_dir}")
@@ -113,45 +38,38 @@ class FreshSiteFTPDeployer:
             print(f"❌ ローカルサイトディレクトリが存在しません: {self.local_dir}")
             return False
         
-        if not self.connect():
-            return False
-        
+        sync = FTPDeltaSync(
+            self.ftp_host, self.ftp_user, self.ftp_pass, self.remote_dir,
+            connections=connections
+        )
         try:
-            # リモートディレクトリに移動
-            self.ftp.cwd(self.remote_dir)
-            
-            # 重要：メインのindex.htmlを直接上書き
-            main_index = self.local_dir / 'index.html'
-            if main_index.exists():
-                if self.upload_file(main_index, 'index.html'):
-                    print("🎯 メインページ (index.html) を上書きしました")
-                else:
-                    print("❌ メインページの上書きに失敗")
-                    return False
-            
-            uploaded_count, failed_count = self.upload_directory(self.local_dir)
-            
-            print(f"\n📊 デプロイ結果:")
-            print(f"✅ 成功: {uploaded_count}ファイル")
-            print(f"❌ 失敗: {failed_count}ファイル")
-            
-            if failed_count == 0:
-                print(f"\n🎉 フレッシュサイトデプロイ完了！")
-                print(f"🌐 サイトURL: https://teizan.omasse.com/")
-                return True
-            else:
-                print(f"\n⚠️  一部ファイルのアップロードに失敗しました")
-                return False
-                
-        except Exception as e:
+            result = sync.sync(self.local_dir, atomic=atomic, dry_run=dry_run)
+        except (FTPSyncError, *ftplib.all_errors) as e:
             print(f"❌ デプロイ中にエラーが発生: {e}")
             return False
-        finally:
-            self.disconnect()
+        
+        print(f"\n📊 デプロイ結果: {result.format_summary()}")
+        for relative_path, error in result.failed.items():
+            print(f"❌ {relative_path}: {error}")
+        
+        if result.success:
+            print(f"\n🎉 フレッシュサイトデプロイ完了！")
+            print(f"🌐 サイトURL: https://teizan.omasse.com/")
+            return True
+        else:
+            print(f"\n⚠️  一部ファイルのアップロードに失敗しました")
+            return False
 
 def main():
+    parser = argparse.ArgumentParser(description="フレッシュサイトをFTPデプロイ（差分同期）")
+    parser.add_argument("--connections", type=int, default=4, help="並列FTP接続数")
+    parser.add_argument("--atomic", action="store_true",
+                        help="ステージングへ全てアップロードしてから一括で公開する")
+    parser.add_argument("--dry-run", action="store_true", help="同期計画の表示のみ行う")
+    args = parser.parse_args()
+    
     deployer = FreshSiteFTPDeployer()
-    success = deployer.deploy()
+    success = deployer.deploy(connections=args.connections, atomic=args.atomic, dry_run=args.dry_run)
     
     if success:
         print("\n✅ フレッシュサイトデプロイが正常に完了しました！")
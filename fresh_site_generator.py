@@ -4,33 +4,71 @@
 Template Party継承を完全破棄した独自アフィリエイト特化サイト生成
 """
 
+import argparse
+import hashlib
 import json
 import os
+import re
 from pathlib import Path
 from datetime import datetime
 import shutil
-from jinja2 import Environment, FileSystemLoader, select_autoescape
+from functools import partial
+from jinja2 import (
+    ChoiceLoader, Environment, FileSystemBytecodeCache, FileSystemLoader, ModuleLoader, select_autoescape
+)
+
+from src.infrastructure.asset_fingerprint import AssetManifest
+from src.infrastructure.asset_pipeline import optimize_site
+from src.infrastructure.build_manifest import (
+    BuildManifest, digest_of, template_chain_digest, template_chain_sources
+)
+from src.infrastructure.data_snapshot import load_snapshot
+from src.infrastructure.parallel_render import render_pages, resolve_jobs
+
+# テンプレート中の静的ファイルの参照: {{ asset_url('static_fresh/css/...') }}
+ASSET_URL_CALL = re.compile(r"asset_url\(\s*['\"]([^'\"]+)['\"]\s*\)")
 
 class FreshSiteGenerator:
-    def __init__(self):
+    # 生成処理（フィルター・コンテキストの組み立て等）を変更したら上げる（全ページ再生成）
+    BUILD_VERSION = 2
+
+    def __init__(self, incremental=True, jobs=1, precompiled=None):
         self.base_dir = Path(__file__).parent
         self.templates_dir = self.base_dir / 'templates_fresh'
         self.static_dir = self.base_dir / 'static_fresh'
         self.output_dir = self.base_dir / 'site_fresh'
         self.data_dir = self.base_dir / 'data'
         
-        # Jinja2環境設定
-        self.env = Environment(
-            loader=FileSystemLoader(str(self.templates_dir)),
-            autoescape=select_autoescape(['html', 'xml']),
-            trim_blocks=True,
-            lstrip_blocks=True
+        # 差分ビルド: 入力が変わっていないページは再生成しない
+        self.incremental = incremental
+        self.manifest = BuildManifest(
+            self.output_dir,
+            self.base_dir / 'cache' / 'site_fresh_manifest.json',
+            reset=not incremental
         )
+        self._template_digests = {}
+        self._template_assets = {}
+        
+        # CSS / JS はファイル名に内容のハッシュを付けて出力し、テンプレートからは asset_url() で参照する
+        self.assets, self.static_files = AssetManifest.from_directory(self.static_dir, 'static_fresh')
+        
+        # 山個別ページの並列生成数
+        self.jobs = resolve_jobs(jobs)
+        
+        # テンプレートのコンパイル結果はビルド間で使い回す
+        self.bytecode_cache_dir = self.base_dir / 'cache' / 'jinja_templates_fresh'
+        
+        # 事前コンパイル済みテンプレート（ソースと一致する場合のみ使用）
+        self.precompiled = None
+        if precompiled is not None:
+            if precompiled_templates_are_current(self.templates_dir, precompiled):
+                self.precompiled = Path(precompiled)
+                print(f"📦 事前コンパイル済みテンプレートを使用: {precompiled}")
+            else:
+                print(f"⚠️ 事前コンパイル済みテンプレートがソースと一致しないため使用しません: {precompiled}")
         
-        # カスタムフィルター追加
-        self.env.filters['format_price'] = self.format_price
-        self.env.filters['format_date'] = self.format_date
-        self.env.filters['truncate_words'] = self.truncate_words
+        # Jinja2環境設定（並列生成のワーカーも同じ設定で作成する）
+        self.env = create_environment(self.templates_dir, self.bytecode_cache_dir, self.precompiled, self.assets)
         
         # 山データとメタデータ読み込み
         self.load_data()
@@ -46,8 +84,9 @@ class FreshSiteGenerator:
             # 山データベース読み込み
             mountains_file = self.data_dir / 'mountains_japan_expanded.json'
             if mountains_file.exists():
-                with open(mountains_file, 'r', encoding='utf-8') as f:
-                    self.mountains_data = json.load(f)
+                data = load_snapshot(mountains_file)
+                # データファイルは {"mountains": [...]} 形式
+                self.mountains_data = data.get('mountains', []) if isinstance(data, dict) else data
                 print(f"✅ 山データベース読み込み完了: {len(self.mountains_data)}山")
             else:
                 print("❌ 山データベースが見つかりません")
@@ -172,11 +211,13 @@ class FreshSiteGenerator:
             ]
         }
 
-    def format_price(self, price):
+    @staticmethod
+    def format_price(price):
         """価格をフォーマット"""
         return f"{price:,}"
     
-    def format_date(self, date_str):
+    @staticmethod
+    def format_date(date_str):
         """日付をフォーマット"""
         if isinstance(date_str, str):
             try:
@@ -186,7 +227,8 @@ class FreshSiteGenerator:
                 return date_str
         return str(date_str)
     
-    def truncate_words(self, text, length=100):
+    @staticmethod
+    def truncate_words(text, length=100):
         """テキストを指定文字数で切り詰め"""
         if len(text) <= length:
             return text
@@ -223,12 +265,18 @@ class FreshSiteGenerator:
         # サイトマップ生成
         self.generate_sitemap()
         
+        # 今回生成対象にならなかった出力を削除
+        self.manifest.remove_orphans()
+        self.manifest.save()
+        
+        print(f"📊 {self.manifest.format_stats()}")
         print(f"✅ フレッシュサイト生成完了: {self.output_dir}")
         return True
 
     def prepare_output_directory(self):
         """出力ディレクトリを準備"""
-        if self.output_dir.exists():
+        if self.output_dir.exists() and not self.manifest.exists:
+            # 差分ビルドの記録がない場合は既存の出力を信用できないため作り直す
             shutil.rmtree(self.output_dir)
         
         # 必要なディレクトリを作成
@@ -247,9 +295,10 @@ class FreshSiteGenerator:
         print(f"📁 出力ディレクトリ準備完了: {self.output_dir}")
 
     def copy_static_files(self):
-        """静的ファイルをコピー"""
+        """静的ファイルをコピー（CSS / JS はハッシュ付きの名前。古い名前のファイルは孤立ファイルとして削除される）"""
         if self.static_dir.exists():
-            shutil.copytree(self.static_dir, self.output_dir / 'static_fresh', dirs_exist_ok=True)
+            for relative_path, content in self.static_files:
+                self.manifest.build(relative_path, digest_of(content), lambda: content)
             print("📄 静的ファイルコピー完了")
         else:
             print("⚠️ 静的ファイルディレクトリが見つかりません")
@@ -257,8 +306,6 @@ class FreshSiteGenerator:
     def generate_homepage(self):
         """トップページ生成"""
         try:
-            template = self.env.get_template('index.html')
-            
             context = {
                 'featured_equipment': self.affiliate_products['featured_equipment'],
                 'mountain_sets': self.affiliate_products['mountain_sets'],
@@ -267,11 +314,7 @@ class FreshSiteGenerator:
                 'stats': self.get_site_stats()
             }
             
-            html = template.render(**context)
-            
-            output_file = self.output_dir / 'index.html'
-            with open(output_file, 'w', encoding='utf-8') as f:
-                f.write(html)
+            self.render_page('index.html', 'index.html', context)
             
             print("✅ トップページ生成完了")
             
@@ -281,68 +324,18 @@ class FreshSiteGenerator:
     def generate_mountain_pages(self):
         """山個別ページ生成"""
         try:
-            # 山詳細テンプレートを作成（簡易版）
-            mountain_template = """{% extends "base.html" %}
-
-{% block title %}{{ mountain.name }}（{{ mountain.prefecture }}）- 登山ガイド | 低山マスター{% endblock %}
-
-{% block description %}{{ mountain.name }}の登山ガイド。標高{{ mountain.elevation }}m、{{ mountain.prefecture }}の低山。初心者向けコース情報と必要装備を詳しく解説。{% endblock %}
-
-{% block content %}
-<article class="mountain-article">
-    <header class="article-header">
-        <div class="container">
-            <h1>{{ mountain.name }}</h1>
-            <div class="mountain-meta">
-                <span>📍 {{ mountain.prefecture }}</span>
-                <span>⛰️ 標高{{ mountain.elevation }}m</span>
-                <span>👨‍👩‍👧‍👦 初心者・ファミリー向け</span>
-            </div>
-        </div>
-    </header>
-    
-    <div class="container">
-        <section class="mountain-info">
-            <h2>山の概要</h2>
-            <p>{{ mountain.description or '' }}</p>
-        </section>
-        
-        <section class="recommended-equipment">
-            <h2>🎒 推奨装備</h2>
-            <div class="equipment-grid">
-                {% for product in recommended_products %}
-                <div class="equipment-item">
-                    <h4>{{ product.name }}</h4>
-                    <p>{{ product.description }}</p>
-                    <div class="price">¥{{ product.price | format_price }}</div>
-                    <a href="{{ product.affiliate_url }}" class="cta-button primary" target="_blank" rel="nofollow">詳細を見る</a>
-                </div>
-                {% endfor %}
-            </div>
-        </section>
-        
-        <section class="affiliate-notice">
-            <p><small>※当ページではアフィリエイト広告を利用しています</small></p>
-        </section>
-    </div>
-</article>
-{% endblock %}"""
-            
-            # 山詳細テンプレートを保存
-            mountain_template_path = self.templates_dir / 'mountain_detail.html'
-            with open(mountain_template_path, 'w', encoding='utf-8') as f:
-                f.write(mountain_template)
-            
-            # テンプレートを読み込み
-            template = self.env.get_template('mountain_detail.html')
+            # 同名の山は出力先が同じになるため、全ページ生成時と同じく後のデータを採用する
+            pages = {}
+            for mountain in self.mountains_data:
+                if mountain.get('name') in pages:
+                    print(f"⚠️ 同名の山があります（後のデータを使用）: {mountain['name']}")
+                pages[mountain.get('name')] = mountain
             
             generated_count = 0
-            for mountain in self.mountains_data:
+            skipped_count = 0
+            pending = []
+            for mountain in pages.values():
                 try:
-                    # 山名でディレクトリ作成
-                    mountain_dir = self.output_dir / 'mountains' / mountain['name']
-                    mountain_dir.mkdir(parents=True, exist_ok=True)
-                    
                     # 推奨装備を選択（山の特徴に基づく）
                     recommended_products = self.get_recommended_equipment(mountain)
                     
@@ -351,18 +344,33 @@ class FreshSiteGenerator:
                         'recommended_products': recommended_products
                     }
                     
-                    html = template.render(**context)
-                    
-                    output_file = mountain_dir / 'index.html'
-                    with open(output_file, 'w', encoding='utf-8') as f:
-                        f.write(html)
-                    
-                    generated_count += 1
+                    # 山名でディレクトリを分ける
+                    relative_path = f"mountains/{mountain['name']}/index.html"
+                    digest = self.page_digest('mountain_detail.html', context)
+                    if self.manifest.skip_if_current(relative_path, digest):
+                        skipped_count += 1
+                    else:
+                        pending.append((mountain['name'], relative_path, digest, ('mountain_detail.html', context)))
                     
                 except Exception as e:
                     print(f"❌ {mountain['name']}ページ生成エラー: {e}")
             
-            print(f"✅ 山個別ページ生成完了: {generated_count}ページ")
+            # 変更のあったページだけを並列に描画し、書き込みは入力順に行う
+            results = render_pages(
+                [job for _, _, _, job in pending],
+                render_template_job,
+                partial(create_environment, self.templates_dir, self.bytecode_cache_dir, self.precompiled, self.assets),
+                jobs=self.jobs,
+                local_state=self.env
+            )
+            for (name, relative_path, digest, _), result in zip(pending, results):
+                if result.error is not None:
+                    print(f"❌ {name}ページ生成エラー: {result.error}")
+                    continue
+                self.manifest.write(relative_path, digest, result.content)
+                generated_count += 1
+            
+            print(f"✅ 山個別ページ生成完了: {generated_count}ページ（変更なし {skipped_count}ページ）")
             
         except Exception as e:
             print(f"❌ 山ページ生成エラー: {e}")
@@ -370,69 +378,11 @@ class FreshSiteGenerator:
     def generate_equipment_pages(self):
         """装備ページ生成"""
         try:
-            # 装備一覧テンプレート（簡易版）
-            equipment_template = """{% extends "base.html" %}
-
-{% block title %}登山装備ガイド - 初心者向け装備選び | 低山マスター{% endblock %}
-
-{% block content %}
-<div class="container">
-    <header class="page-header">
-        <h1>🎒 登山装備ガイド</h1>
-        <p>初心者向け装備選びから上級者向けギアまで、専門家が厳選した装備をご紹介</p>
-    </header>
-    
-    <section class="featured-equipment">
-        <h2>おすすめ装備</h2>
-        <div class="equipment-grid">
-            {% for product in products %}
-            <article class="equipment-card">
-                <div class="card-image">
-                    <div class="image-placeholder">
-                        <span class="placeholder-icon">{{ product.icon }}</span>
-                    </div>
-                </div>
-                <div class="card-content">
-                    <h3>{{ product.name }}</h3>
-                    <p>{{ product.description }}</p>
-                    <div class="price-display">
-                        <span class="price-current">¥{{ product.price | format_price }}</span>
-                        {% if product.original_price %}
-                        <span class="price-original">¥{{ product.original_price | format_price }}</span>
-                        {% endif %}
-                    </div>
-                    <a href="{{ product.affiliate_url }}" class="cta-button primary" target="_blank" rel="nofollow">
-                        詳細・購入はこちら
-                    </a>
-                </div>
-            </article>
-            {% endfor %}
-        </div>
-    </section>
-    
-    <section class="affiliate-notice">
-        <p><small>※当ページではアフィリエイト広告を利用しています</small></p>
-    </section>
-</div>
-{% endblock %}"""
-            
-            # テンプレートを保存
-            equipment_template_path = self.templates_dir / 'equipment_list.html'
-            with open(equipment_template_path, 'w', encoding='utf-8') as f:
-                f.write(equipment_template)
-            
-            # テンプレートを読み込み
-            template = self.env.get_template('equipment_list.html')
-            
             context = {
                 'products': self.affiliate_products['featured_equipment']
             }
             
-            html = template.render(**context)
-            
-            output_file = self.output_dir / 'equipment' / 'index.html'
-            with open(output_file, 'w', encoding='utf-8') as f:
-                f.write(html)
+            self.render_page('equipment/index.html', 'equipment_list.html', context)
             
             print("✅ 装備ページ生成完了")
             
@@ -442,49 +392,6 @@ class FreshSiteGenerator:
     def generate_ranking_pages(self):
         """ランキングページ生成"""
         try:
-            # ランキングテンプレート（簡易版）
-            ranking_template = """{% extends "base.html" %}
-
-{% block title %}人気の山ランキング | 低山マスター{% endblock %}
-
-{% block content %}
-<div class="container">
-    <header class="page-header">
-        <h1>🏆 人気の山ランキング</h1>
-        <p>初心者に人気の低山ランキング。アクセス・難易度・景色を総合評価</p>
-    </header>
-    
-    <section class="mountain-ranking">
-        <div class="ranking-list">
-            {% for mountain in mountains %}
-            <article class="ranking-item">
-                <div class="rank-number">{{ loop.index }}</div>
-                <div class="mountain-info">
-                    <h3>{{ mountain.name }}（{{ mountain.prefecture }}）</h3>
-                    <p>標高{{ mountain.elevation }}m</p>
-                    <div class="mountain-features">
-                        <span class="feature">初心者向け</span>
-                        <span class="feature">ファミリー向け</span>
-                    </div>
-                </div>
-                <div class="mountain-action">
-                    <a href="/mountains/{{ mountain.name }}/" class="cta-button secondary">詳細を見る</a>
-                </div>
-            </article>
-            {% endfor %}
-        </div>
-    </section>
-</div>
-{% endblock %}"""
-            
-            # テンプレートを保存
-            ranking_template_path = self.templates_dir / 'ranking.html'
-            with open(ranking_template_path, 'w', encoding='utf-8') as f:
-                f.write(ranking_template)
-            
-            # テンプレートを読み込み
-            template = self.env.get_template('ranking.html')
-            
             # 人気順に並べ替え（簡易的に標高の低い順）
             sorted_mountains = sorted(self.mountains_data[:10], key=lambda x: x.get('elevation', 0))
             
@@ -492,11 +399,7 @@ class FreshSiteGenerator:
                 'mountains': sorted_mountains
             }
             
-            html = template.render(**context)
-            
-            output_file = self.output_dir / 'ranking' / 'index.html'
-            with open(output_file, 'w', encoding='utf-8') as f:
-                f.write(html)
+            self.render_page('ranking/index.html', 'ranking.html', context)
             
             print("✅ ランキングページ生成完了")
             
@@ -507,9 +410,7 @@ class FreshSiteGenerator:
         """地域別ページ生成"""
         # 簡易実装: 空のindex.htmlを作成
         try:
-            output_file = self.output_dir / 'regions' / 'index.html'
-            with open(output_file, 'w', encoding='utf-8') as f:
-                f.write("""<!DOCTYPE html>
+            self.write_page('regions/index.html', """<!DOCTYPE html>
 <html lang="ja">
 <head>
     <meta charset="UTF-8">
@@ -528,9 +429,7 @@ class FreshSiteGenerator:
         """初心者ガイドページ生成"""
         # 簡易実装: 空のindex.htmlを作成
         try:
-            output_file = self.output_dir / 'beginner' / 'index.html'
-            with open(output_file, 'w', encoding='utf-8') as f:
-                f.write("""<!DOCTYPE html>
+            self.write_page('beginner/index.html', """<!DOCTYPE html>
 <html lang="ja">
 <head>
     <meta charset="UTF-8">
@@ -573,15 +472,41 @@ class FreshSiteGenerator:
             
             sitemap_xml += '</urlset>'
             
-            output_file = self.output_dir / 'sitemap.xml'
-            with open(output_file, 'w', encoding='utf-8') as f:
-                f.write(sitemap_xml)
+            self.write_page('sitemap.xml', sitemap_xml)
             
             print("✅ サイトマップ生成完了")
             
         except Exception as e:
             print(f"❌ サイトマップ生成エラー: {e}")
 
+    def page_digest(self, template_name, context):
+        """テンプレートから生成するページの入力ハッシュ（参照する静的ファイルのハッシュを含む）"""
+        if template_name not in self._template_digests:
+            loader = FileSystemLoader(str(self.templates_dir))
+            self._template_digests[template_name] = template_chain_digest(self.env, template_name, loader=loader)
+            sources = template_chain_sources(self.env, template_name, loader=loader)
+            self._template_assets[template_name] = {
+                path for source in sources.values() for path in ASSET_URL_CALL.findall(source)
+            }
+        return digest_of(
+            self.BUILD_VERSION,
+            self._template_digests[template_name],
+            self.assets.subset(self._template_assets[template_name]),
+            context
+        )
+
+    def render_page(self, relative_path, template_name, context):
+        """テンプレートからページを生成（テンプレートとコンテキストが前回と同じならスキップ）"""
+        return self.manifest.build(
+            relative_path,
+            self.page_digest(template_name, context),
+            lambda: self.env.get_template(template_name).render(**context)
+        )
+
+    def write_page(self, relative_path, content):
+        """生成済みの内容をページとして出力（内容が前回と同じならスキップ）"""
+        return self.manifest.build(relative_path, digest_of(content), lambda: content)
+
     def get_recommended_equipment(self, mountain):
         """山に応じた推奨装備を取得"""
         # 簡易実装: 標高に基づいて装備を選択
@@ -614,13 +539,103 @@ class FreshSiteGenerator:
             'satisfaction': 98
         }
 
+def create_environment(templates_dir, bytecode_cache_dir=None, precompiled=None, assets=None):
+    """
+    Jinja2環境を作成
+    
+    Args:
+        bytecode_cache_dir: コンパイル結果の保存先（ソースが変わったテンプレートだけ再コンパイルする）
+        precompiled: compile_templates で作成したzip（含まれないテンプレートはソースから読み込む）
+        assets: 静的ファイルのハッシュ付きの名前の対応表（テンプレートの asset_url() で参照する）
+    """
+    loader = FileSystemLoader(str(templates_dir))
+    if precompiled is not None:
+        loader = ChoiceLoader([ModuleLoader(str(precompiled)), loader])
+    
+    bytecode_cache = None
+    if bytecode_cache_dir is not None:
+        Path(bytecode_cache_dir).mkdir(parents=True, exist_ok=True)
+        bytecode_cache = FileSystemBytecodeCache(str(bytecode_cache_dir))
+    
+    env = Environment(
+        loader=loader,
+        bytecode_cache=bytecode_cache,
+        autoescape=select_autoescape(['html', 'xml']),
+        trim_blocks=True,
+        lstrip_blocks=True
+    )
+    
+    # カスタムフィルター追加
+    env.filters['format_price'] = FreshSiteGenerator.format_price
+    env.filters['format_date'] = FreshSiteGenerator.format_date
+    env.filters['truncate_words'] = FreshSiteGenerator.truncate_words
+    env.globals['asset_url'] = (assets if assets is not None else AssetManifest()).url
+    return env
+
+def template_source_digests(templates_dir):
+    """テンプレートごとのソースのハッシュ値"""
+    loader = FileSystemLoader(str(templates_dir))
+    digests = {}
+    for name in loader.list_templates():
+        source, _, _ = loader.get_source(None, name)
+        digests[name] = hashlib.sha256(source.encode('utf-8')).hexdigest()
+    return digests
+
+def compile_templates(templates_dir, zip_path):
+    """
+    テンプレートを事前コンパイルしてzipに保存（CI向け）
+    
+    zipと同じ場所にソースのハッシュ値を保存し、読み込み時にソースと一致するか確認する。
+    """
+    zip_path = Path(zip_path)
+    zip_path.parent.mkdir(parents=True, exist_ok=True)
+    env = create_environment(templates_dir)
+    env.compile_templates(str(zip_path), zip='deflated', ignore_errors=False)
+    
+    digests = template_source_digests(templates_dir)
+    with open(zip_path.with_suffix('.json'), 'w', encoding='utf-8') as f:
+        json.dump(digests, f, ensure_ascii=False, indent=2, sort_keys=True)
+    return len(digests)
+
+def precompiled_templates_are_current(templates_dir, zip_path):
+    """事前コンパイル済みテンプレートが現在のソースから作られたものか"""
+    zip_path = Path(zip_path)
+    try:
+        with open(zip_path.with_suffix('.json'), 'r', encoding='utf-8') as f:
+            compiled_digests = json.load(f)
+    except (FileNotFoundError, json.JSONDecodeError):
+        return False
+    return zip_path.exists() and compiled_digests == template_source_digests(templates_dir)
+
+def render_template_job(env, job):
+    """並列生成のワーカーでテンプレートを描画（job は (テンプレート名, コンテキスト)）"""
+    template_name, context = job
+    return env.get_template(template_name).render(**context)
+
 def main():
     """メイン実行関数"""
     print("🏔️ フレッシュサイトジェネレーター開始")
     
-    generator = FreshSiteGenerator()
+    parser = argparse.ArgumentParser(description="フレッシュサイト生成")
+    parser.add_argument('--clean', action='store_true', help='差分ビルドせず全ページを作り直す')
+    parser.add_argument('--jobs', type=int, default=1, help='ページ生成の並列数（0でCPU数）')
+    parser.add_argument('--compile-templates', metavar='ZIP', help='テンプレートを事前コンパイルしてzipに保存し終了する')
+    parser.add_argument('--precompiled', metavar='ZIP', help='事前コンパイル済みテンプレートを使用する')
+    parser.add_argument('--optimize', action='store_true',
+                        help='生成後にHTML/CSS/JSを縮小し、.gz/.br と .htaccess を作成する')
+    args = parser.parse_args()
+    
+    if args.compile_templates:
+        count = compile_templates(Path(__file__).parent / 'templates_fresh', args.compile_templates)
+        print(f"📦 テンプレート事前コンパイル完了: {count}件 → {args.compile_templates}")
+        return True
+    
+    generator = FreshSiteGenerator(incremental=not args.clean, jobs=args.jobs, precompiled=args.precompiled)
     
     if generator.generate_site():
+        if args.optimize:
+            print("🗜️ 縮小・事前圧縮中...")
+            print(optimize_site(generator.output_dir).format_report())
         print("✅ サイト生成が正常に完了しました！")
         print(f"📂 出力先: {generator.output_dir}")
         print("🌐 ローカル確認: python3 -m http.server 8000 --directory site_fresh")
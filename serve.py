@@ -1,19 +1,99 @@
 #!/usr/bin/env python3
+"""
+生成済み静的サイトのローカル配信サーバー（プレビュー・ステージング・負荷試験用）
+
+既定では StaticSiteServer（マルチスレッド・ETag / 304・圧縮済みファイル・メモリキャッシュ・
+sendfile・処理時間の集計）で配信する。--simple で従来の単純なサーバーに切り替える。
+
+使い方:
+    python serve.py                              # static_site を http://localhost:8888 で配信
+    python serve.py site_minimal --port 8080     # 任意の生成済みサイトを配信
+    python serve.py --quiet --stats-interval 10  # アクセスログを出さず、10秒ごとに集計を表示
+"""
+import argparse
 import http.server
 import socketserver
-import os
+import sys
+import threading
+from pathlib import Path
+
+# プロジェクトルートをパスに追加
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+from src.infrastructure.static_server import (
+    DEFAULT_CACHE_BYTES, DEFAULT_MAX_AGE, DEFAULT_MAX_CACHED_FILE_BYTES, StaticSiteServer
+)
 
 PORT = 8888
 DIRECTORY = "static_site"
 
-class MyHTTPRequestHandler(http.server.SimpleHTTPRequestHandler):
-    def __init__(self, *args, **kwargs):
-        super().__init__(*args, directory=DIRECTORY, **kwargs)
-
-with socketserver.TCPServer(("", PORT), MyHTTPRequestHandler) as httpd:
-    print(f"サーバーを起動しました: http://localhost:{PORT}")
-    print("停止するには Ctrl+C を押してください")
-    try:
-        httpd.serve_forever()
-    except KeyboardInterrupt:
-        print("\nサーバーを停止しました")
\ No newline at end of file
+
+def serve_simple(directory: str, host: str, port: int):
+    """従来の単純なサーバー（シングルスレッド・キャッシュ関連ヘッダーなし）"""
+    class MyHTTPRequestHandler(http.server.SimpleHTTPRequestHandler):
+        def __init__(self, *args, **kwargs):
+            super().__init__(*args, directory=directory, **kwargs)
+
+    with socketserver.TCPServer((host, port), MyHTTPRequestHandler) as httpd:
+        print(f"サーバーを起動しました: http://localhost:{port}")
+        print("停止するには Ctrl+C を押してください")
+        try:
+            httpd.serve_forever()
+        except KeyboardInterrupt:
+            print("\nサーバーを停止しました")
+
+
+def report_periodically(server: StaticSiteServer, interval: float, stop: threading.Event):
+    """一定間隔で処理時間の集計を表示"""
+    while not stop.wait(interval):
+        print(f"\n📊 処理時間（起動から）\n{server.format_stats()}", flush=True)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="生成済み静的サイトのローカル配信サーバー")
+    parser.add_argument("directory", nargs="?", default=DIRECTORY, help=f"配信するディレクトリ（デフォルト: {DIRECTORY}）")
+    parser.add_argument("--host", default="", help="待ち受けるアドレス（デフォルト: すべて）")
+    parser.add_argument("--port", type=int, default=PORT, help=f"ポート番号（デフォルト: {PORT}）")
+    parser.add_argument("--simple", action="store_true", help="従来の単純なサーバーで配信する")
+    parser.add_argument("--cache-mb", type=float, default=DEFAULT_CACHE_BYTES / 1024 / 1024,
+                        help="メモリにキャッシュする合計サイズ（MB、0で無効）")
+    parser.add_argument("--max-cached-kb", type=float, default=DEFAULT_MAX_CACHED_FILE_BYTES / 1024,
+                        help="メモリにキャッシュするファイルの上限（KB、超えるファイルは sendfile で送る）")
+    parser.add_argument("--max-age", type=int, default=DEFAULT_MAX_AGE,
+                        help="HTML・ハッシュ付きCSS/JS以外のファイルの Cache-Control max-age（秒）")
+    parser.add_argument("--quiet", action="store_true", help="アクセスログを出力しない")
+    parser.add_argument("--stats-interval", type=float, default=0,
+                        help="処理時間の集計を表示する間隔（秒、0で停止時のみ）")
+    args = parser.parse_args()
+
+    if not Path(args.directory).is_dir():
+        parser.error(f"ディレクトリが見つかりません: {args.directory}")
+
+    if args.simple:
+        serve_simple(args.directory, args.host, args.port)
+        return
+
+    server = StaticSiteServer(
+        (args.host, args.port),
+        args.directory,
+        cache_bytes=int(args.cache_mb * 1024 * 1024),
+        max_cached_file_bytes=int(args.max_cached_kb * 1024),
+        max_age=args.max_age,
+        access_log=not args.quiet
+    )
+    stop = threading.Event()
+    if args.stats_interval > 0:
+        threading.Thread(target=report_periodically, args=(server, args.stats_interval, stop), daemon=True).start()
+
+    with server:
+        print(f"サーバーを起動しました: http://localhost:{args.port}（{server.directory}）")
+        print("停止するには Ctrl+C を押してください")
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            stop.set()
+            print(f"\nサーバーを停止しました\n📊 処理時間\n{server.format_stats()}")
+
+
+if __name__ == "__main__":
+    main()
@@ -51,10 +51,15 @@ setup(
             "flake8>=6.1.0",
             "mypy>=1.7.0",
             "isort>=5.13.0",
+            "pyftpdlib>=1.5.9",
         ],
         "scheduler": [
             "schedule>=1.2.0",
         ],
+        "optimize": [
+            "brotli>=1.1.0",
+            "orjson>=3.9.0",
+        ],
     },
     entry_points={
         "console_scripts": [
@@ -7,106 +7,127 @@ import json
 import urllib.request
 import urllib.parse
 import urllib.error
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Optional
+
+from src.infrastructure.product_cache import ProductCache
 
 class SimpleRakutenClient:
     """シンプルな楽天APIクライアント"""
     
-    def __init__(self):
+    def __init__(self, cache: Optional[ProductCache] = None, block_on_miss: bool = True):
         # .envファイルから設定を読み込み
         self.app_id = "1099421053709374278"
         self.affiliate_id = "139b96cc.29d2cd62.139b96cd.e6b1673a"
         self.base_url = "https://app.rakuten.co.jp/services/api"
+        # 検索結果のキャッシュ（Noneの場合は毎回APIを呼び出す）
+        self.cache = cache
+        # Falseの場合、キャッシュにない検索結果は空で返して取得はバックグラウンドで行う（サイト生成向け）
+        self.block_on_miss = block_on_miss
+        if self.cache is not None:
+            self.cache.on_error = lambda keyword, e: print(f"    ⚠️ キャッシュ更新エラー（{keyword}）: {e}")
     
     def search_products(self, keyword: str, max_results: int = 3) -> List[Dict[str, Any]]:
         """商品を検索"""
-        try:
-            params = {
-                'applicationId': self.app_id,
-                'affiliateId': self.affiliate_id,
-                'keyword': keyword,
-                'hits': max_results,
-                'minPrice': 1000,
-                'maxPrice': 50000,
-                'sort': 'standard',
-                'format': 'json'
-            }
-            
-            url = f"{self.base_url}/IchibaItem/Search/20170706"
-            query_string = urllib.parse.urlencode(params)
-            full_url = f"{url}?{query_string}"
-            
-            print(f"  🔍 楽天API呼び出し: {keyword}")
-            
-            with urllib.request.urlopen(full_url, timeout=10) as response:
-                data = json.loads(response.read().decode('utf-8'))
-            
-            products = []
-            for item in data.get('Items', []):
-                item_data = item['Item']
-                
-                product = {
-                    'name': item_data['itemName'],
-                    'price': int(item_data['itemPrice']),
-                    'url': item_data['affiliateUrl'],
-                    'image_url': item_data['mediumImageUrls'][0]['imageUrl'] if item_data.get('mediumImageUrls') else '',
-                    'description': item_data.get('itemCaption', '')[:150],
-                    'shop_name': item_data.get('shopName', '')
-                }
-                products.append(product)
-            
-            print(f"    ✅ {len(products)}件の商品を取得")
-            return products
-            
-        except Exception as e:
-            print(f"    ⚠️ 楽天API呼び出しエラー: {e}")
-            return []
+        return self._cached_search("products", keyword, max_results, self._fetch_products, "楽天API呼び出しエラー")
     
     def search_hotels(self, station_name: str, max_results: int = 3) -> List[Dict[str, Any]]:
         """最寄り駅名で宿泊施設を検索"""
+        return self._cached_search("hotels", station_name, max_results, self._fetch_hotels, "楽天トラベル検索エラー")
+    
+    def _cached_search(self, kind, keyword, max_results, fetch, error_label) -> List[Dict[str, Any]]:
+        """キャッシュを経由して検索（エラー時は空のリスト）"""
         try:
-            params = {
-                'applicationId': self.app_id,
-                'affiliateId': self.affiliate_id,
-                'keyword': f"{station_name} ホテル",
-                'hits': max_results,
-                'sort': 'standard',
-                'format': 'json'
-            }
-            
-            url = f"{self.base_url}/Travel/SimpleHotelSearch/20170426"
-            query_string = urllib.parse.urlencode(params)
-            full_url = f"{url}?{query_string}"
+            if self.cache is None:
+                return fetch(keyword, max_results)
             
-            print(f"  🏨 楽天トラベル検索: {station_name}")
-            
-            with urllib.request.urlopen(full_url, timeout=10) as response:
-                data = json.loads(response.read().decode('utf-8'))
-            
-            hotels = []
-            for item in data.get('hotels', []):
-                hotel_data = item[0]['hotel'][0]
-                
-                # 直接予約URLを生成（楽天トラベルの実際の予約ページ）
-                hotel_no = hotel_data.get('hotelNo', '')
-                booking_url = f"https://travel.rakuten.co.jp/HOTEL/{hotel_no}/{hotel_no}.html?f_tn=1&f_camp_id={self.affiliate_id}"
-                
-                hotel = {
-                    'name': hotel_data['hotelName'],
-                    'url': booking_url,  # 直接予約URLに変更
-                    'image_url': hotel_data.get('hotelThumbnailUrl', ''),
-                    'description': hotel_data.get('hotelSpecial', '')[:100],
-                    'location': hotel_data.get('address1', '') + hotel_data.get('address2', ''),
-                    'min_charge': hotel_data.get('hotelMinCharge', 0)
-                }
-                hotels.append(hotel)
-            
-            print(f"    ✅ {len(hotels)}件のホテルを取得")
-            return hotels
+            key = ProductCache.make_key(kind, keyword, max_results=max_results)
+            results = self.cache.get(key, keyword, lambda kw: fetch(kw, max_results),
+                                     block_on_miss=self.block_on_miss)
+            return results or []
             
         except Exception as e:
-            print(f"    ⚠️ 楽天トラベル検索エラー: {e}")
+            print(f"    ⚠️ {error_label}: {e}")
             return []
+    
+    def _fetch_products(self, keyword: str, max_results: int) -> List[Dict[str, Any]]:
+        """楽天商品APIから商品を取得"""
+        params = {
+            'applicationId': self.app_id,
+            'affiliateId': self.affiliate_id,
+            'keyword': keyword,
+            'hits': max_results,
+            'minPrice': 1000,
+            'maxPrice': 50000,
+            'sort': 'standard',
+            'format': 'json'
+        }
+
+        url = f"{self.base_url}/IchibaItem/Search/20170706"
+        query_string = urllib.parse.urlencode(params)
+        full_url = f"{url}?{query_string}"
+
+        print(f"  🔍 楽天API呼び出し: {keyword}")
+
+        with urllib.request.urlopen(full_url, timeout=10) as response:
+            data = json.loads(response.read().decode('utf-8'))
+
+        products = []
+        for item in data.get('Items', []):
+            item_data = item['Item']
+
+            product = {
+                'name': item_data['itemName'],
+                'price': int(item_data['itemPrice']),
+                'url': item_data['affiliateUrl'],
+                'image_url': item_data['mediumImageUrls'][0]['imageUrl'] if item_data.get('mediumImageUrls') else '',
+                'description': item_data.get('itemCaption', '')[:150],
+                'shop_name': item_data.get('shopName', '')
+            }
+            products.append(product)
+
+        print(f"    ✅ {len(products)}件の商品を取得")
+        return products
+    
+    def _fetch_hotels(self, station_name: str, max_results: int) -> List[Dict[str, Any]]:
+        """楽天トラベルAPIから宿泊施設を取得"""
+        params = {
+            'applicationId': self.app_id,
+            'affiliateId': self.affiliate_id,
+            'keyword': f"{station_name} ホテル",
+            'hits': max_results,
+            'sort': 'standard',
+            'format': 'json'
+        }
+
+        url = f"{self.base_url}/Travel/SimpleHotelSearch/20170426"
+        query_string = urllib.parse.urlencode(params)
+        full_url = f"{url}?{query_string}"
+
+        print(f"  🏨 楽天トラベル検索: {station_name}")
+
+        with urllib.request.urlopen(full_url, timeout=10) as response:
+            data = json.loads(response.read().decode('utf-8'))
+
+        hotels = []
+        for item in data.get('hotels', []):
+            hotel_data = item[0]['hotel'][0]
+
+            # 直接予約URLを生成（楽天トラベルの実際の予約ページ）
+            hotel_no = hotel_data.get('hotelNo', '')
+            booking_url = f"https://travel.rakuten.co.jp/HOTEL/{hotel_no}/{hotel_no}.html?f_tn=1&f_camp_id={self.affiliate_id}"
+
+            hotel = {
+                'name': hotel_data['hotelName'],
+                'url': booking_url,  # 直接予約URLに変更
+                'image_url': hotel_data.get('hotelThumbnailUrl', ''),
+                'description': hotel_data.get('hotelSpecial', '')[:100],
+                'location': hotel_data.get('address1', '') + hotel_data.get('address2', ''),
+                'min_charge': hotel_data.get('hotelMinCharge', 0)
+            }
+            hotels.append(hotel)
+
+        print(f"    ✅ {len(hotels)}件のホテルを取得")
+        return hotels
 
 def get_fallback_products():
     """フォールバック用の固定商品データ（実際の楽天商品リンク）"""
@@ -2,37 +2,100 @@
 """
 サイト品質チェックスクリプト
 リンク切れ、HTML構文、アクセシビリティ等を総合的に検証
+
+各HTMLファイルは1回だけ読み込んで全チェック分の検査をまとめて行い（ファイル単位で並列）、
+各チェックはその結果を共有する。リンク先の存在確認はリンク先のパスごとにメモ化する。
+
+使い方:
+    python check_site.py                 # サイト内のチェック
+    python check_site.py --external      # 外部リンクも検証（結果は cache/ に保存して再利用）
+    python check_site.py --jobs 4
 """
 
-import os
+import argparse
 import re
+import sys
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
 from pathlib import Path
-from urllib.parse import urljoin, urlparse
-import json
+from typing import Dict, List, Optional, Tuple
+
+# プロジェクトルートをパスに追加
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from src.infrastructure.link_checker import ExternalLinkChecker, LocalLinkResolver, is_external_link
+from src.infrastructure.parallel_render import resolve_jobs
+
+# 外部リンクの検証結果キャッシュ
+EXTERNAL_LINK_CACHE = Path(__file__).resolve().parent.parent / "cache" / "external_links.json"
+
+# 検査に使う正規表現（全ページで共有）
+HREF_PATTERN = re.compile(r'href=["\']([^"\']+)["\']')
+SRC_PATTERN = re.compile(r'src=["\']([^"\']+)["\']')
+STRUCTURE_CHECKS = [
+    (re.compile(r'<!DOCTYPE html>', re.IGNORECASE), "DOCTYPE宣言"),
+    (re.compile(r'<html[^>]*lang=["\']ja["\']', re.IGNORECASE), "lang属性"),
+    (re.compile(r'<meta[^>]*charset=["\']UTF-8["\']', re.IGNORECASE), "文字エンコーディング"),
+    (re.compile(r'<meta[^>]*viewport[^>]*>', re.IGNORECASE), "viewport設定"),
+    (re.compile(r'<title>', re.IGNORECASE), "titleタグ"),
+    (re.compile(r'<meta[^>]*description[^>]*>', re.IGNORECASE), "description meta"),
+]
+HEADING_PATTERN = re.compile(r'<(h[1-6])', re.IGNORECASE)
+IMG_TAG_PATTERN = re.compile(r'<img[^>]*>', re.IGNORECASE)
+ICON_LINK_PATTERN = re.compile(r'<a[^>]*>[\s]*<span[^>]*>[🏔️🎒👟🧥📚🛡️👨‍👩‍👧‍👦🗼🏯♨️]</span>[\s]*</a>')
+CSS_LINK_PATTERN = re.compile(r'<link[^>]*href=["\']([^"\']*\.css)["\']')
+JS_SRC_PATTERN = re.compile(r'<script[^>]*src=["\']([^"\']*\.js)["\']')
+IMG_SRC_PATTERN = re.compile(r'<img[^>]*src=["\']([^"\']*)["\']')
+TITLE_PATTERN = re.compile(r'<title>([^<]+)</title>', re.IGNORECASE)
+DESCRIPTION_PATTERN = re.compile(
+    r'<meta[^>]*name=["\']description["\'][^>]*content=["\']([^"\']+)["\']', re.IGNORECASE
+)
+
+Finding = Tuple[str, str, str]  # (level, category, message)
+
+
+@dataclass
+class PageScan:
+    """1ページ分の検査結果（チェックごとの指摘をまとめて持つ）"""
+    path: Path
+    title: Optional[str] = None
+    link_count: int = 0
+    external_links: List[str] = field(default_factory=list)
+    findings: Dict[str, List[Finding]] = field(default_factory=dict)
+    error: Optional[str] = None
+
+    def add(self, check: str, level: str, category: str, message: str):
+        self.findings.setdefault(check, []).append((level, category, message))
+
 
 class SiteQualityChecker:
-    def __init__(self):
-        self.base_dir = Path(__file__).parent
+    def __init__(self, base_dir=None, jobs=None, external=False, external_cache=EXTERNAL_LINK_CACHE):
+        self.base_dir = Path(base_dir) if base_dir else Path(__file__).parent
+        self.jobs = resolve_jobs(jobs)
+        self.external = external
+        self.external_cache = external_cache
+        self.resolver = LocalLinkResolver(self.base_dir)
         self.issues = []
         self.warnings = []
         self.successes = []
-        
+        self._pages = None
+
     def log_issue(self, level, category, message, file_path=None):
         """問題をログに記録"""
         entry = {
             "level": level,
-            "category": category, 
+            "category": category,
             "message": message,
             "file": str(file_path) if file_path else None
         }
-        
+
         if level == "error":
             self.issues.append(entry)
         elif level == "warning":
             self.warnings.append(entry)
         else:
             self.successes.append(entry)
-    
+
     def find_all_html_files(self):
         """すべてのHTMLファイルを見つける"""
         html_files = []
@@ -40,300 +103,216 @@ class SiteQualityChecker:
             if "templates" not in str(html_file):  # テンプレートは除外
                 html_files.append(html_file)
         return html_files
-    
-    def extract_links_from_html(self, file_path):
-        """HTMLファイルからリンクを抽出"""
+
+    def check_link_exists(self, link, base_file_path):
+        """リンク先ファイルが存在するかチェック（外部リンク・アンカーリンクはスキップ）"""
+        return self.resolver.exists(link, base_file_path)
+
+    def scan_pages(self):
+        """全HTMLファイルを1回ずつ読み込んで検査（結果は各チェックで共有）"""
+        if self._pages is None:
+            html_files = self.find_all_html_files()
+            with ThreadPoolExecutor(max_workers=self.jobs) as executor:
+                self._pages = list(executor.map(self._scan_page, html_files))
+            for page in self._pages:
+                if page.error:
+                    self.log_issue("error", "file_access", f"ファイル読み込みエラー: {page.error}", page.path)
+        return self._pages
+
+    def _scan_page(self, html_file):
+        """1ページ分の全チェックの検査"""
+        page = PageScan(html_file)
         try:
-            with open(file_path, 'r', encoding='utf-8') as f:
+            with open(html_file, 'r', encoding='utf-8') as f:
                 content = f.read()
-            
-            # hrefリンクを抽出
-            href_pattern = r'href=["\']([^"\']+)["\']'
-            links = re.findall(href_pattern, content)
-            
-            # srcリンクも抽出（画像、JS、CSS）
-            src_pattern = r'src=["\']([^"\']+)["\']'
-            src_links = re.findall(src_pattern, content)
-            
-            return links, src_links
-            
         except Exception as e:
-            self.log_issue("error", "file_access", f"ファイル読み込みエラー: {e}", file_path)
-            return [], []
-    
-    def check_link_exists(self, link, base_file_path):
-        """リンク先ファイルが存在するかチェック"""
-        # 外部リンクはスキップ
-        if link.startswith(('http://', 'https://', 'mailto:', 'tel:')):
-            return True
-        
-        # アンカーリンクはスキップ
-        if link.startswith('#'):
-            return True
-        
-        # 相対パスを絶対パスに変換
-        if link.startswith('/'):
-            # ルート相対パス
-            target_path = self.base_dir / link.lstrip('/')
-        else:
-            # 現在のファイルからの相対パス
-            target_path = base_file_path.parent / link
-        
-        # ディレクトリの場合はindex.htmlを確認
-        if target_path.is_dir():
-            target_path = target_path / "index.html"
-        
-        # 拡張子がない場合もindex.htmlを確認
-        if not target_path.suffix and not target_path.exists():
-            target_path = target_path / "index.html"
-        
-        return target_path.exists()
-    
+            page.error = str(e)
+            return page
+
+        title_match = TITLE_PATTERN.search(content)
+        page.title = title_match.group(1) if title_match else None
+
+        # リンク（href と src）
+        links = HREF_PATTERN.findall(content) + SRC_PATTERN.findall(content)
+        page.link_count = len(links)
+        for link in links:
+            if is_external_link(link):
+                page.external_links.append(link)
+            elif not self.check_link_exists(link, html_file):
+                page.add("links", "error", "broken_link", f"リンク切れ: {link}")
+
+        # 基本的なHTML構造
+        for pattern, description in STRUCTURE_CHECKS:
+            if not pattern.search(content):
+                page.add("html_structure", "warning", "html_structure", f"{description}が見つかりません")
+
+        # 見出しの階層（h1があるか）
+        headings = HEADING_PATTERN.findall(content)
+        if headings and 'h1' not in [h.lower() for h in headings]:
+            page.add("html_structure", "warning", "accessibility", "h1タグが見つかりません")
+
+        # 画像のalt属性
+        for img_tag in IMG_TAG_PATTERN.findall(content):
+            if 'alt=' not in img_tag:
+                page.add("accessibility", "warning", "accessibility", f"alt属性がない画像: {img_tag[:50]}...")
+
+        # リンクのaria-label（アイコンのみの場合）
+        for link in ICON_LINK_PATTERN.findall(content):
+            if 'aria-label=' not in link:
+                page.add("accessibility", "warning", "accessibility", "アイコンリンクにaria-labelがありません")
+
+        # スキップリンクの存在
+        if 'skip-link' not in content and 'main-content' in content:
+            page.add("accessibility", "warning", "accessibility", "スキップリンクが見つかりません")
+
+        # CSS・JavaScript・画像の参照
+        for css_link in CSS_LINK_PATTERN.findall(content):
+            if not self.check_link_exists(css_link, html_file):
+                page.add("css", "error", "css", f"CSSファイルが見つかりません: {css_link}")
+        for js_link in JS_SRC_PATTERN.findall(content):
+            if not self.check_link_exists(js_link, html_file):
+                page.add("javascript", "error", "javascript", f"JavaScriptファイルが見つかりません: {js_link}")
+        for img_src in IMG_SRC_PATTERN.findall(content):
+            if not self.check_link_exists(img_src, html_file):
+                page.add("images", "error", "images", f"画像ファイルが見つかりません: {img_src}")
+
+        # viewportの設定
+        if 'viewport' not in content:
+            page.add("responsive", "error", "responsive", "viewport meta tagが設定されていません")
+
+        # titleタグの長さ
+        if page.title is not None:
+            title_length = len(page.title)
+            if title_length > 60:
+                page.add("seo", "warning", "seo", f"titleが長すぎます ({title_length}文字)")
+            elif title_length < 10:
+                page.add("seo", "warning", "seo", f"titleが短すぎます ({title_length}文字)")
+
+        # descriptionの長さ
+        desc_match = DESCRIPTION_PATTERN.search(content)
+        if desc_match:
+            desc_length = len(desc_match.group(1))
+            if desc_length > 160:
+                page.add("seo", "warning", "seo", f"descriptionが長すぎます ({desc_length}文字)")
+            elif desc_length < 50:
+                page.add("seo", "warning", "seo", f"descriptionが短すぎます ({desc_length}文字)")
+
+        # 構造化データ
+        if 'application/ld+json' not in content:
+            page.add("seo", "warning", "seo", "構造化データが設定されていません")
+
+        return page
+
+    def _log_findings(self, check):
+        """全ページの指定チェックの指摘を記録して件数を返す"""
+        count = 0
+        for page in self.scan_pages():
+            for level, category, message in page.findings.get(check, ()):
+                self.log_issue(level, category, message, page.path)
+                count += 1
+        return count
+
     def check_broken_links(self):
         """リンク切れをチェック"""
         print("🔗 リンク切れチェック中...")
-        
-        html_files = self.find_all_html_files()
-        total_links = 0
-        broken_links = 0
-        
-        for html_file in html_files:
-            links, src_links = self.extract_links_from_html(html_file)
-            all_links = links + src_links
-            
-            for link in all_links:
-                total_links += 1
-                
-                if not self.check_link_exists(link, html_file):
-                    broken_links += 1
-                    self.log_issue("error", "broken_link", 
-                                 f"リンク切れ: {link}", html_file)
-        
+
+        pages = self.scan_pages()
+        total_links = sum(page.link_count for page in pages)
+        broken_links = self._log_findings("links")
+
         if broken_links == 0:
             self.log_issue("success", "links", f"✅ すべてのリンクが正常 ({total_links}個)")
         else:
             self.log_issue("error", "links", f"❌ {broken_links}/{total_links}個のリンクが切れています")
-    
+
+    def check_external_links(self):
+        """外部リンクを並列に検証（同じURLは1回だけ確認し、結果はキャッシュする）"""
+        print("🌐 外部リンクチェック中...")
+
+        pages = self.scan_pages()
+        checker = ExternalLinkChecker(self.external_cache, max_workers=max(self.jobs, 8))
+        results = checker.check(url for page in pages for url in page.external_links)
+
+        broken = set()
+        for page in pages:
+            for url in dict.fromkeys(page.external_links):
+                result = results[url]
+                if result.ok:
+                    continue
+                broken.add(url)
+                # 4xx は確実なリンク切れ、それ以外（接続エラー・5xx）は一時的な可能性があるため警告
+                level = "error" if result.status is not None and 400 <= result.status < 500 else "warning"
+                self.log_issue(level, "external_link", f"外部リンク切れ: {url} ({result.error})", page.path)
+
+        summary = f"{checker.fetched + checker.cache_hits}個のURL（確認 {checker.fetched}件・キャッシュ {checker.cache_hits}件）"
+        if not broken:
+            self.log_issue("success", "external_links", f"✅ すべての外部リンクが正常 ({summary})")
+        else:
+            self.log_issue("warning", "external_links", f"⚠️ {len(broken)}個の外部リンクに問題があります ({summary})")
+
     def check_html_structure(self):
         """HTML構造をチェック"""
         print("📄 HTML構造チェック中...")
-        
-        html_files = self.find_all_html_files()
-        
-        for html_file in html_files:
-            try:
-                with open(html_file, 'r', encoding='utf-8') as f:
-                    content = f.read()
-                
-                # 基本的なHTML構造チェック
-                checks = [
-                    (r'<!DOCTYPE html>', "DOCTYPE宣言"),
-                    (r'<html[^>]*lang=["\']ja["\']', "lang属性"),
-                    (r'<meta[^>]*charset=["\']UTF-8["\']', "文字エンコーディング"),
-                    (r'<meta[^>]*viewport[^>]*>', "viewport設定"),
-                    (r'<title>', "titleタグ"),
-                    (r'<meta[^>]*description[^>]*>', "description meta"),
-                ]
-                
-                for pattern, description in checks:
-                    if not re.search(pattern, content, re.IGNORECASE):
-                        self.log_issue("warning", "html_structure", 
-                                     f"{description}が見つかりません", html_file)
-                
-                # 見出しの階層チェック
-                headings = re.findall(r'<(h[1-6])', content, re.IGNORECASE)
-                if headings:
-                    # h1があるかチェック
-                    if 'h1' not in [h.lower() for h in headings]:
-                        self.log_issue("warning", "accessibility", 
-                                     "h1タグが見つかりません", html_file)
-                
-            except Exception as e:
-                self.log_issue("error", "file_access", 
-                             f"HTMLファイル解析エラー: {e}", html_file)
-    
+        self._log_findings("html_structure")
+
     def check_accessibility(self):
         """アクセシビリティをチェック"""
         print("♿ アクセシビリティチェック中...")
-        
-        html_files = self.find_all_html_files()
-        
-        for html_file in html_files:
-            try:
-                with open(html_file, 'r', encoding='utf-8') as f:
-                    content = f.read()
-                
-                # 画像のalt属性チェック
-                img_tags = re.findall(r'<img[^>]*>', content, re.IGNORECASE)
-                for img_tag in img_tags:
-                    if 'alt=' not in img_tag:
-                        self.log_issue("warning", "accessibility",
-                                     f"alt属性がない画像: {img_tag[:50]}...", html_file)
-                
-                # リンクのaria-labelチェック（アイコンのみの場合）
-                icon_links = re.findall(r'<a[^>]*>[\s]*<span[^>]*>[🏔️🎒👟🧥📚🛡️👨‍👩‍👧‍👦🗼🏯♨️]</span>[\s]*</a>', content)
-                for link in icon_links:
-                    if 'aria-label=' not in link:
-                        self.log_issue("warning", "accessibility",
-                                     "アイコンリンクにaria-labelがありません", html_file)
-                
-                # スキップリンクの存在チェック
-                if 'skip-link' not in content and 'main-content' in content:
-                    self.log_issue("warning", "accessibility",
-                                 "スキップリンクが見つかりません", html_file)
-                
-            except Exception as e:
-                self.log_issue("error", "file_access", 
-                             f"アクセシビリティチェックエラー: {e}", html_file)
-    
+        self._log_findings("accessibility")
+
     def check_css_references(self):
         """CSS参照をチェック"""
         print("🎨 CSS参照チェック中...")
-        
-        html_files = self.find_all_html_files()
-        
-        for html_file in html_files:
-            try:
-                with open(html_file, 'r', encoding='utf-8') as f:
-                    content = f.read()
-                
-                # CSSファイルの参照をチェック
-                css_links = re.findall(r'<link[^>]*href=["\']([^"\']*\.css)["\']', content)
-                for css_link in css_links:
-                    if not self.check_link_exists(css_link, html_file):
-                        self.log_issue("error", "css", 
-                                     f"CSSファイルが見つかりません: {css_link}", html_file)
-                
-            except Exception as e:
-                self.log_issue("error", "file_access", 
-                             f"CSS参照チェックエラー: {e}", html_file)
-    
+        self._log_findings("css")
+
     def check_js_references(self):
         """JavaScript参照をチェック"""
         print("⚡ JavaScript参照チェック中...")
-        
-        html_files = self.find_all_html_files()
-        
-        for html_file in html_files:
-            try:
-                with open(html_file, 'r', encoding='utf-8') as f:
-                    content = f.read()
-                
-                # JSファイルの参照をチェック
-                js_links = re.findall(r'<script[^>]*src=["\']([^"\']*\.js)["\']', content)
-                for js_link in js_links:
-                    if not self.check_link_exists(js_link, html_file):
-                        self.log_issue("error", "javascript", 
-                                     f"JavaScriptファイルが見つかりません: {js_link}", html_file)
-                
-            except Exception as e:
-                self.log_issue("error", "file_access", 
-                             f"JavaScript参照チェックエラー: {e}", html_file)
-    
+        self._log_findings("javascript")
+
     def check_image_references(self):
         """画像参照をチェック"""
         print("🖼️ 画像参照チェック中...")
-        
-        html_files = self.find_all_html_files()
-        
-        for html_file in html_files:
-            try:
-                with open(html_file, 'r', encoding='utf-8') as f:
-                    content = f.read()
-                
-                # 画像ファイルの参照をチェック
-                img_srcs = re.findall(r'<img[^>]*src=["\']([^"\']*)["\']', content)
-                for img_src in img_srcs:
-                    if not self.check_link_exists(img_src, html_file):
-                        self.log_issue("error", "images", 
-                                     f"画像ファイルが見つかりません: {img_src}", html_file)
-                
-            except Exception as e:
-                self.log_issue("error", "file_access", 
-                             f"画像参照チェックエラー: {e}", html_file)
-    
+        self._log_findings("images")
+
     def check_responsive_design(self):
         """レスポンシブデザインをチェック"""
         print("📱 レスポンシブデザインチェック中...")
-        
+
         css_file = self.base_dir / "css" / "minimal_design.css"
-        
+
         if css_file.exists():
             try:
                 with open(css_file, 'r', encoding='utf-8') as f:
                     css_content = f.read()
-                
+
                 # メディアクエリの存在チェック
                 media_queries = re.findall(r'@media[^{]+\{', css_content)
                 if len(media_queries) < 3:
-                    self.log_issue("warning", "responsive", 
+                    self.log_issue("warning", "responsive",
                                  f"メディアクエリが少ない可能性があります ({len(media_queries)}個)")
                 else:
-                    self.log_issue("success", "responsive", 
+                    self.log_issue("success", "responsive",
                                  f"✅ 適切なメディアクエリが設定されています ({len(media_queries)}個)")
-                
+
                 # viewportの設定確認
-                html_files = self.find_all_html_files()
-                for html_file in html_files:
-                    with open(html_file, 'r', encoding='utf-8') as f:
-                        content = f.read()
-                    
-                    if 'viewport' not in content:
-                        self.log_issue("error", "responsive", 
-                                     "viewport meta tagが設定されていません", html_file)
-                        
+                self._log_findings("responsive")
+
             except Exception as e:
-                self.log_issue("error", "file_access", 
+                self.log_issue("error", "file_access",
                              f"レスポンシブデザインチェックエラー: {e}")
         else:
             self.log_issue("error", "css", "CSSファイルが見つかりません")
-    
+
     def check_seo_basics(self):
         """基本的なSEOをチェック"""
         print("🔍 SEO基本チェック中...")
-        
-        html_files = self.find_all_html_files()
-        
-        for html_file in html_files:
-            try:
-                with open(html_file, 'r', encoding='utf-8') as f:
-                    content = f.read()
-                
-                # titleタグの長さチェック
-                title_match = re.search(r'<title>([^<]+)</title>', content, re.IGNORECASE)
-                if title_match:
-                    title_length = len(title_match.group(1))
-                    if title_length > 60:
-                        self.log_issue("warning", "seo", 
-                                     f"titleが長すぎます ({title_length}文字)", html_file)
-                    elif title_length < 10:
-                        self.log_issue("warning", "seo", 
-                                     f"titleが短すぎます ({title_length}文字)", html_file)
-                
-                # descriptionの長さチェック
-                desc_match = re.search(r'<meta[^>]*name=["\']description["\'][^>]*content=["\']([^"\']+)["\']', content, re.IGNORECASE)
-                if desc_match:
-                    desc_length = len(desc_match.group(1))
-                    if desc_length > 160:
-                        self.log_issue("warning", "seo", 
-                                     f"descriptionが長すぎます ({desc_length}文字)", html_file)
-                    elif desc_length < 50:
-                        self.log_issue("warning", "seo", 
-                                     f"descriptionが短すぎます ({desc_length}文字)", html_file)
-                
-                # 構造化データのチェック
-                if 'application/ld+json' not in content:
-                    self.log_issue("warning", "seo", 
-                                 "構造化データが設定されていません", html_file)
-                
-            except Exception as e:
-                self.log_issue("error", "file_access", 
-                             f"SEOチェックエラー: {e}", html_file)
-    
+        self._log_findings("seo")
+
     def check_file_structure(self):
         """ファイル構造をチェック"""
         print("📂 ファイル構造チェック中...")
-        
+
         # 必須ディレクトリの存在チェック
         required_dirs = ['css', 'js', 'images', 'mountains', 'equipment', 'beginner']
         for dir_name in required_dirs:
@@ -342,7 +321,7 @@ class SiteQualityChecker:
                 self.log_issue("error", "structure", f"必須ディレクトリが見つかりません: {dir_name}")
             else:
                 self.log_issue("success", "structure", f"✅ {dir_name}ディレクトリ確認")
-        
+
         # 必須ファイルの存在チェック
         required_files = [
             'index.html',
@@ -355,17 +334,16 @@ class SiteQualityChecker:
                 self.log_issue("error", "structure", f"必須ファイルが見つかりません: {file_path}")
             else:
                 self.log_issue("success", "structure", f"✅ {file_path}確認")
-    
+
     def generate_site_map(self):
         """サイトマップを生成"""
         print("🗺️ サイトマップ生成中...")
-        
-        html_files = self.find_all_html_files()
+
         site_map = {}
-        
-        for html_file in html_files:
-            relative_path = html_file.relative_to(self.base_dir)
-            
+
+        for page in self.scan_pages():
+            relative_path = page.path.relative_to(self.base_dir)
+
             # URLパスに変換
             if relative_path.name == 'index.html':
                 if relative_path.parent == Path('.'):
@@ -374,37 +352,31 @@ class SiteQualityChecker:
                     url_path = f"/{relative_path.parent}/"
             else:
                 url_path = f"/{relative_path}"
-            
-            # タイトルを抽出
-            try:
-                with open(html_file, 'r', encoding='utf-8') as f:
-                    content = f.read()
-                
-                title_match = re.search(r'<title>([^<]+)</title>', content, re.IGNORECASE)
-                title = title_match.group(1) if title_match else str(relative_path)
-                
-                site_map[url_path] = {
-                    "title": title,
-                    "file": str(relative_path)
-                }
-                
-            except Exception as e:
+
+            if page.error:
                 site_map[url_path] = {
                     "title": "エラー",
                     "file": str(relative_path),
-                    "error": str(e)
+                    "error": page.error
                 }
-        
+            else:
+                site_map[url_path] = {
+                    "title": page.title or str(relative_path),
+                    "file": str(relative_path)
+                }
+
         return site_map
-    
+
     def run_all_checks(self):
         """すべてのチェックを実行"""
         print("🔍 サイト品質チェック開始")
         print("=" * 50)
-        
+
         # 各種チェック実行
         self.check_file_structure()
         self.check_broken_links()
+        if self.external:
+            self.check_external_links()
         self.check_html_structure()
         self.check_accessibility()
         self.check_css_references()
@@ -412,15 +384,15 @@ class SiteQualityChecker:
         self.check_image_references()
         self.check_responsive_design()
         self.check_seo_basics()
-        
+
         # サイトマップ生成
         site_map = self.generate_site_map()
-        
+
         # 結果レポート出力
         self.print_results(site_map)
-        
+
         return len(self.issues) == 0
-    
+
     def print_results(self, site_map):
         """結果を表示"""
         print("\n" + "=" * 50)
@@ -477,16 +449,24 @@ class SiteQualityChecker:
         print(f"総合評価: {grade}")
         print(f"エラー: {len(self.issues)}個 | 警告: {len(self.warnings)}個 | 成功: {len(self.successes)}個")
 
+
 def main():
-    checker = SiteQualityChecker()
+    parser = argparse.ArgumentParser(description="サイト品質チェック")
+    parser.add_argument("--jobs", "-j", type=int, default=0, help="並列数（0はCPU数）")
+    parser.add_argument("--external", action="store_true", help="外部リンクも検証する")
+    parser.add_argument("--external-cache", default=str(EXTERNAL_LINK_CACHE),
+                        help="外部リンクの検証結果キャッシュ")
+    args = parser.parse_args()
+
+    checker = SiteQualityChecker(jobs=args.jobs, external=args.external, external_cache=args.external_cache)
     is_perfect = checker.run_all_checks()
-    
+
     if is_perfect:
         print("\n🚀 サイトは公開準備完了です！")
     else:
         print("\n🔧 問題を修正してから公開してください")
-    
+
     return 0 if is_perfect else 1
 
 if __name__ == "__main__":
-    exit(main())
\ No newline at end of file
+    exit(main())
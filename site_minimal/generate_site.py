@@ -4,11 +4,24 @@
 全ページを生成してリンク切れを防ぐ
 """
 
-import json
+import argparse
 import os
+import sys
 from pathlib import Path
 from datetime import datetime
 
+# プロジェクトルートをパスに追加
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from src.infrastructure.asset_fingerprint import fingerprint_site
+from src.infrastructure.asset_pipeline import optimize_site
+from src.infrastructure.data_snapshot import load_snapshot
+from src.infrastructure.parallel_render import render_pages
+from src.infrastructure.string_template import TemplateCache
+
+# ファイル名に内容のハッシュを付けて参照する静的ファイル（サイトのルートからの相対パス）
+FINGERPRINTED_ASSETS = ("css/minimal_design.css", "js/minimal.js")
+
 class SiteGenerator:
     def __init__(self):
         self.base_dir = Path(__file__).parent
@@ -18,27 +31,31 @@ class SiteGenerator:
         # 山データを読み込み
         self.mountains_data = self.load_mountains_data()
         
+        # テンプレートはページごとに読み込み・解析し直さない
+        self._template_sources = {}
+        self._template_cache = TemplateCache()
+        
     def load_mountains_data(self):
         """山データを読み込み"""
         try:
-            with open(self.data_dir / "mountains_japan_expanded.json", 'r', encoding='utf-8') as f:
-                data = json.load(f)
-                return data.get('mountains', [])
+            # 解析済みのスナップショットがあればJSONの解析を省略する
+            data = load_snapshot(self.data_dir / "mountains_japan_expanded.json")
+            return data.get('mountains', [])
         except Exception as e:
             print(f"⚠️ 山データの読み込みに失敗: {e}")
             return []
     
     def load_template(self, template_name):
-        """テンプレートを読み込み"""
-        template_path = self.templates_dir / template_name
-        with open(template_path, 'r', encoding='utf-8') as f:
-            return f.read()
+        """テンプレートを読み込み（2回目以降は読み込み済みの内容を返す）"""
+        if template_name not in self._template_sources:
+            template_path = self.templates_dir / template_name
+            with open(template_path, 'r', encoding='utf-8') as f:
+                self._template_sources[template_name] = f.read()
+        return self._template_sources[template_name]
     
     def render_template(self, template_content, variables):
-        """テンプレート変数を置換"""
-        for key, value in variables.items():
-            template_content = template_content.replace(f"{{{{{key}}}}}", str(value))
-        return template_content
+        """テンプレート変数を置換（テンプレートは初回に解析して使い回す）"""
+        return self._template_cache.render(template_content, variables)
     
     def ensure_directory(self, path):
         """ディレクトリが存在しない場合は作成"""
@@ -54,15 +71,32 @@ class SiteGenerator:
     
     def generate_mountain_detail_page(self, mountain):
         """山の詳細ページを生成"""
-        mountain_id = mountain.get('id', 'unknown')
+        self.save_mountain_detail_page(mountain, self.render_mountain_detail_page(mountain))
+    
+    def save_mountain_detail_page(self, mountain, rendered_html):
+        """生成済みの山の詳細ページを保存"""
         mountain_name = mountain.get('name', '不明な山')
-        prefecture = mountain.get('prefecture', '不明')
-        elevation = mountain.get('elevation', 0)
         
         # ディレクトリ作成
         mountain_dir = self.base_dir / "mountains" / mountain_name
         self.ensure_directory(mountain_dir)
         
+        # ファイル保存
+        if isinstance(rendered_html, bytes):
+            (mountain_dir / "index.html").write_bytes(rendered_html)
+        else:
+            with open(mountain_dir / "index.html", 'w', encoding='utf-8') as f:
+                f.write(rendered_html)
+        
+        print(f"✅ 山詳細ページ作成: {mountain_name}")
+    
+    def render_mountain_detail_page(self, mountain):
+        """山の詳細ページのHTMLを生成（ファイルには保存しない）"""
+        mountain_id = mountain.get('id', 'unknown')
+        mountain_name = mountain.get('name', '不明な山')
+        prefecture = mountain.get('prefecture', '不明')
+        elevation = mountain.get('elevation', 0)
+        
         # パス計算
         current_path = Path("mountains") / mountain_name
         root_path, css_path, js_path = self.calculate_paths(current_path)
@@ -177,13 +211,7 @@ class SiteGenerator:
             "content": content
         }
         
-        rendered_html = self.render_template(base_template, variables)
-        
-        # ファイル保存
-        with open(mountain_dir / "index.html", 'w', encoding='utf-8') as f:
-            f.write(rendered_html)
-        
-        print(f"✅ 山詳細ページ作成: {mountain_name}")
+        return self.render_template(base_template, variables)
     
     def generate_feature_tags(self, features):
         """特徴タグのHTMLを生成"""
@@ -1441,14 +1469,24 @@ class SiteGenerator:
     margin-bottom: var(--spacing-md);
 }'''
         
+        # 追記済みの場合は何もしない（CSSの内容が変わるとハッシュ付きの名前も変わるため）
+        if breadcrumb_css.strip() in css_file.read_text(encoding='utf-8'):
+            print("✅ CSS拡張済み: パンくずナビ・詳細ページスタイル")
+            return
+        
         # CSSファイルに追記
         with open(css_file, 'a', encoding='utf-8') as f:
             f.write(breadcrumb_css)
         
         print("✅ CSS拡張完了: パンくずナビ・詳細ページスタイル追加")
     
-    def generate_all_pages(self):
-        """すべてのページを生成"""
+    def generate_all_pages(self, jobs=1):
+        """
+        すべてのページを生成
+        
+        Args:
+            jobs: 山詳細ページの並列生成数（0でCPU数）
+        """
         print("🏗️ 低山旅行サイト全ページ生成開始")
         print("=" * 50)
         
@@ -1461,8 +1499,13 @@ class SiteGenerator:
         
         # 代表的な山の詳細ページを生成
         representative_mountains = self.mountains_data[:10]  # 最初の10山
-        for mountain in representative_mountains:
-            self.generate_mountain_detail_page(mountain)
+        # 描画はワーカーに分散し、保存は入力順に行う
+        for result in render_pages(representative_mountains, render_mountain_detail_job, SiteGenerator,
+                                   jobs=jobs, local_state=self):
+            if result.error is not None:
+                print(f"❌ 山詳細ページ作成エラー: {result.item.get('name', '不明な山')}: {result.error}")
+                continue
+            self.save_mountain_detail_page(result.item, result.content)
         
         # 装備ページ
         print("\n🎒 装備ページ生成中...")
@@ -1476,10 +1519,20 @@ class SiteGenerator:
         print("\n📄 静的ページ生成中...")
         self.generate_static_pages()
         
+        # CSS / JS の参照をハッシュ付きの名前に書き換え
+        self.fingerprint_assets()
+        
         print("\n" + "=" * 50)
         print("🎉 全ページ生成完了！")
         self.print_site_structure()
     
+    def fingerprint_assets(self):
+        """CSS / JS にハッシュ付きの名前の複製を作り、全ページの参照を書き換え"""
+        assets, updated = fingerprint_site(self.base_dir, FINGERPRINTED_ASSETS)
+        for path, output_path in assets.mapping.items():
+            print(f"🔖 {path} → {output_path}")
+        print(f"✅ 参照を更新したページ: {len(updated)}件")
+    
     def print_site_structure(self):
         """生成されたサイト構造を表示"""
         print("\n📁 生成されたサイト構造:")
@@ -1506,13 +1559,27 @@ class SiteGenerator:
         total_pages = len(structure) + len(self.mountains_data[:10]) + 3 + 3
         print(f"\n📊 総ページ数: {total_pages}ページ")
 
+def render_mountain_detail_job(generator, mountain):
+    """並列生成のワーカーで山の詳細ページを生成"""
+    return generator.render_mountain_detail_page(mountain)
+
 def main():
+    parser = argparse.ArgumentParser(description="低山旅行ミニマルサイト生成")
+    parser.add_argument('--jobs', type=int, default=1, help='ページ生成の並列数（0でCPU数）')
+    parser.add_argument('--optimize', action='store_true',
+                        help='生成後にHTML/CSS/JSを縮小し、.gz/.br と .htaccess を作成する')
+    args = parser.parse_args()
+    
     print("🏔️ 低山旅行ミニマルサイト生成ツール")
     print("リンク切れのない完全なサイトを構築します")
     print()
     
     generator = SiteGenerator()
-    generator.generate_all_pages()
+    generator.generate_all_pages(jobs=args.jobs)
+    
+    if args.optimize:
+        print("\n🗜️ 縮小・事前圧縮中...")
+        print(optimize_site(generator.base_dir).format_report())
     
     print("\n🚀 次のステップ:")
     print("1. python3 serve.py でローカルサーバー起動")
@@ -6,11 +6,21 @@
 - 地域別ページの完成
 """
 
-import json
+import argparse
 import os
+import sys
 from pathlib import Path
 from datetime import datetime
 
+# プロジェクトルートをパスに追加
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from src.infrastructure.asset_fingerprint import fingerprint_site
+from src.infrastructure.data_snapshot import load_snapshot
+from src.infrastructure.parallel_render import render_pages
+
+from generate_site import FINGERPRINTED_ASSETS
+
 class ContentImprover:
     def __init__(self):
         self.base_dir = Path(__file__).parent
@@ -22,9 +32,9 @@ class ContentImprover:
     def load_mountains_data(self):
         """山データを読み込み"""
         try:
-            with open(self.data_dir / "mountains_japan_expanded.json", 'r', encoding='utf-8') as f:
-                data = json.load(f)
-                return data.get('mountains', [])
+            # 解析済みのスナップショットがあればJSONの解析を省略する
+            data = load_snapshot(self.data_dir / "mountains_japan_expanded.json")
+            return data.get('mountains', [])
         except Exception as e:
             print(f"⚠️ 山データの読み込みに失敗: {e}")
             return []
@@ -39,29 +49,50 @@ class ContentImprover:
         root_path = "../" * depth if depth > 0 else ""
         return root_path
     
-    def create_all_mountain_pages(self):
-        """47山すべてのページを作成"""
+    def create_all_mountain_pages(self, jobs=1):
+        """
+        47山すべてのページを作成
+        
+        Args:
+            jobs: ページ生成の並列数（0でCPU数）
+        """
         print("⛰️ 全山ページ作成中...")
         
         created_count = 0
-        for mountain in self.mountains_data:
-            mountain_name = mountain.get('name', '不明な山')
-            prefecture = mountain.get('prefecture', '不明')
-            elevation = mountain.get('elevation', 0)
-            difficulty = mountain.get('difficulty', {})
-            location = mountain.get('location', {})
-            features = mountain.get('features', [])
-            seasons = mountain.get('seasons', {})
+        # 描画はワーカーに分散し、保存は入力順に行う
+        for result in render_pages(self.mountains_data, render_mountain_page_job, ContentImprover,
+                                   jobs=jobs, local_state=self):
+            mountain_name = result.item.get('name', '不明な山')
+            if result.error is not None:
+                print(f"❌ {mountain_name}のページ作成に失敗: {result.error}")
+                continue
             
             # ディレクトリ作成
             mountain_dir = self.base_dir / "mountains" / mountain_name
             self.ensure_directory(mountain_dir)
             
-            # 詳細なブログ記事コンテンツを生成
-            detailed_content = self.generate_mountain_blog_content(mountain)
+            # ファイル保存
+            (mountain_dir / "index.html").write_bytes(result.content)
             
-            # HTMLテンプレート
-            html_content = f'''<!DOCTYPE html>
+            created_count += 1
+        
+        print(f"✅ {created_count}山のページを作成完了")
+    
+    def render_mountain_page(self, mountain):
+        """山のページのHTMLを生成（ファイルには保存しない）"""
+        mountain_name = mountain.get('name', '不明な山')
+        prefecture = mountain.get('prefecture', '不明')
+        elevation = mountain.get('elevation', 0)
+        difficulty = mountain.get('difficulty', {})
+        location = mountain.get('location', {})
+        features = mountain.get('features', [])
+        seasons = mountain.get('seasons', {})
+        
+        # 詳細なブログ記事コンテンツを生成
+        detailed_content = self.generate_mountain_blog_content(mountain)
+        
+        # HTMLテンプレート
+        html_content = f'''<!DOCTYPE html>
 <html lang="ja">
 <head>
     <meta charset="UTF-8">
@@ -206,14 +237,8 @@ class ContentImprover:
     <script src="../../js/minimal.js"></script>
 </body>
 </html>'''
-            
-            # ファイル保存
-            with open(mountain_dir / "index.html", 'w', encoding='utf-8') as f:
-                f.write(html_content)
-            
-            created_count += 1
         
-        print(f"✅ {created_count}山のページを作成完了")
+        return html_content
     
     def generate_mountain_blog_content(self, mountain):
         """山のブログ記事コンテンツを生成"""
@@ -2016,13 +2041,13 @@ class ContentImprover:
         }
         return features.get(region_name, ["自然豊かな環境", "地域の文化", "美しい景色", "アクセス良好"])
     
-    def run_all_improvements(self):
+    def run_all_improvements(self, jobs=1):
         """すべての改善を実行"""
         print("🔧 サイトコンテンツ充実化開始")
         print("=" * 50)
         
         # 47山すべてのページ作成
-        self.create_all_mountain_pages()
+        self.create_all_mountain_pages(jobs=jobs)
         
         # 山一覧ページ更新
         self.update_mountains_index()
@@ -2033,13 +2058,25 @@ class ContentImprover:
         # 地域別ページ完成
         self.improve_regions_page()
         
+        # CSS / JS の参照をハッシュ付きの名前に書き換え
+        _, updated = fingerprint_site(self.base_dir, FINGERPRINTED_ASSETS)
+        print(f"🔖 CSS / JS の参照を更新したページ: {len(updated)}件")
+        
         print("=" * 50)
         print("🎉 サイトコンテンツ充実化完了！")
         print(f"📊 作成されたページ: {len(self.mountains_data)}山 + 改善されたページ")
 
+def render_mountain_page_job(improver, mountain):
+    """並列生成のワーカーで山のページを生成"""
+    return improver.render_mountain_page(mountain)
+
 def main():
+    parser = argparse.ArgumentParser(description="サイトコンテンツ充実化")
+    parser.add_argument('--jobs', type=int, default=1, help='山ページ生成の並列数（0でCPU数）')
+    args = parser.parse_args()
+    
     improver = ContentImprover()
-    improver.run_all_improvements()
+    improver.run_all_improvements(jobs=args.jobs)
     
     print("\n🚀 次のステップ:")
     print("1. サーバーを再起動して変更を確認")
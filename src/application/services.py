@@ -1,19 +1,23 @@
 """
 アプリケーションサービス実装
 """
+import math
 import time
-from typing import Dict, List, Optional, Any
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Callable, Dict, List, Optional, Any
 from datetime import datetime
 
 from config.settings import get_settings
 from config.logging_config import LoggerMixin
 from src.domain.entities import (
     Mountain, Article, ArticleContent, ArticleFactory, ImageInfo,
-    GenerationRequest, GenerationResult, AffiliateProduct, AffiliateHotel
+    GenerationRequest, GenerationResult, AffiliateProduct, AffiliateHotel,
+    BatchGenerationResult, BatchGenerationSummary, CacheMode, GenerationStage
 )
 from src.infrastructure.api_clients import (
-    APIClientFactory, APIClientError
+    APIClientFactory, APIClientError, RequestCancelledError
 )
+from src.infrastructure.job_journal import JobJournal, JobProgress
 from src.infrastructure.repositories import (
     RepositoryFactory, RepositoryError
 )
@@ -24,6 +28,32 @@ class ServiceError(Exception):
     pass
 
 
+class GenerationCancelled(ServiceError):
+    """記事生成が呼び出し元によって中断された"""
+    pass
+
+
+class GenerationListener:
+    """
+    記事生成の進捗を受け取るコールバック
+    
+    必要なメソッドだけをオーバーライドする。いずれも生成処理のスレッドから呼ばれるため、
+    GUI等で画面を更新する場合はメインスレッドへ受け渡すこと。
+    """
+    
+    def on_stage(self, stage: GenerationStage, detail: Dict[str, Any]):
+        """ワークフローの段階が進んだ"""
+        pass
+    
+    def on_text(self, delta: str):
+        """Claude API が生成したテキストの断片（届いた順）"""
+        pass
+    
+    def is_cancelled(self) -> bool:
+        """True を返すと生成を中断する（本文の生成中・各段階の間で確認する）"""
+        return False
+
+
 class ArticleGenerationService(LoggerMixin):
     """記事生成サービス"""
     
@@ -32,8 +62,12 @@ class ArticleGenerationService(LoggerMixin):
         self.claude_client = APIClientFactory.create_claude_client()
         self.mountain_repo = RepositoryFactory.get_mountain_repository()
     
-    def generate_article(self, request: GenerationRequest) -> GenerationResult:
-        """記事を生成"""
+    def generate_article(
+        self,
+        request: GenerationRequest,
+        listener: Optional[GenerationListener] = None
+    ) -> GenerationResult:
+        """記事を生成（listener を指定した場合は本文をストリーミングで受け取りながら生成）"""
         start_time = time.time()
         
         try:
@@ -52,10 +86,16 @@ class ArticleGenerationService(LoggerMixin):
                 print(f"📝 THEME: {request.theme}")
                 print(f"📏 TARGET LENGTH: {request.target_length}")
             
+            if listener is not None:
+                listener.on_stage(GenerationStage.STARTED, {"mountain": mountain.name})
+            
             title, content, excerpt, tags = self.claude_client.generate_article(
                 mountain_dict,
                 request.theme,
-                request.target_length
+                request.target_length,
+                cache_mode=request.cache_mode,
+                on_text=listener.on_text if listener is not None else None,
+                should_cancel=listener.is_cancelled if listener is not None else None
             )
             
             if os.getenv('DEBUG_CLAUDE', '').lower() in ['true', '1', 'yes']:
@@ -78,6 +118,11 @@ class ArticleGenerationService(LoggerMixin):
             generation_time = time.time() - start_time
             
             self.log_info(f"Article generation completed in {generation_time:.2f}s")
+            if listener is not None:
+                listener.on_stage(GenerationStage.GENERATED, {
+                    "title": title,
+                    "word_count": article.content.get_word_count()
+                })
             
             return GenerationResult(
                 success=True,
@@ -85,6 +130,13 @@ class ArticleGenerationService(LoggerMixin):
                 generation_time=generation_time
             )
             
+        except RequestCancelledError as e:
+            self.log_info(f"Article generation cancelled: {request.mountain_id}")
+            return GenerationResult(
+                success=False,
+                error_message=str(e),
+                generation_time=time.time() - start_time
+            )
         except (APIClientError, RepositoryError, ServiceError) as e:
             self.log_error("Article generation failed", e)
             return GenerationResult(
@@ -184,9 +236,17 @@ class ImageService(LoggerMixin):
 class AffiliateService(LoggerMixin):
     """アフィリエイトサービス"""
     
-    def __init__(self):
+    def __init__(self, block_on_miss: Optional[bool] = None):
+        """
+        Args:
+            block_on_miss: キャッシュにない商品を楽天APIから取得し終えるまで待つか
+                （Noneの場合は設定の PRODUCT_CACHE_BLOCK_ON_MISS に従う）
+        """
         self.settings = get_settings()
-        self.rakuten_client = APIClientFactory.create_rakuten_client()
+        if block_on_miss is None:
+            block_on_miss = self.settings.PRODUCT_CACHE_BLOCK_ON_MISS
+        self.rakuten_client = APIClientFactory.create_rakuten_client(block_on_miss=block_on_miss)
+        self.mountain_repo = RepositoryFactory.get_mountain_repository()
         self.area_repo = RepositoryFactory.get_area_code_repository()
     
     def get_hiking_products(self, mountain: Mountain) -> List[AffiliateProduct]:
@@ -197,15 +257,14 @@ class AffiliateService(LoggerMixin):
             # 山の特徴に応じたキーワード
             keywords = self._get_product_keywords(mountain)
             
-            all_products = []
-            for keyword in keywords[:2]:  # 最大2つのキーワードで検索
-                products = self.rakuten_client.search_products(
-                    keyword=keyword,
-                    max_results=3,
-                    min_price=self.settings.PRODUCT_PRICE_MIN,
-                    max_price=self.settings.PRODUCT_PRICE_MAX
-                )
-                all_products.extend(products)
+            # 最大2つのキーワードを同時に検索
+            results = self.rakuten_client.search_products_many(
+                keywords=keywords[:2],
+                max_results=3,
+                min_price=self.settings.PRODUCT_PRICE_MIN,
+                max_price=self.settings.PRODUCT_PRICE_MAX
+            )
+            all_products = [product for products in results for product in products]
             
             # 重複を除去し、価格でソート
             unique_products = []
@@ -244,65 +303,8 @@ class AffiliateService(LoggerMixin):
             return []
     
     def _get_product_keywords(self, mountain: Mountain) -> List[str]:
-        """山の特徴に応じた商品キーワードを生成"""
-        keywords = []
-        
-        # 山の名前をハッシュして、山ごとに異なる商品を選択
-        import hashlib
-        mountain_hash = int(hashlib.md5(mountain.name.encode()).hexdigest(), 16) % 100
-        
-        # 基本キーワードプール
-        basic_keywords = [
-            ["登山靴", "トレッキングシューズ"],
-            ["ハイキング ウェア", "アウトドア ジャケット", "登山 パンツ"],
-            ["リュック", "バックパック", "デイパック"],
-            ["水筒", "ボトル", "ハイドレーション"],
-            ["レインウェア", "雨具", "ポンチョ"],
-            ["帽子", "キャップ", "ハット"],
-            ["グローブ", "手袋", "軍手"],
-            ["タオル", "手ぬぐい", "バンダナ"]
-        ]
-        
-        # 山のハッシュ値を使って異なる組み合わせを選択
-        selected_basic = basic_keywords[mountain_hash % len(basic_keywords)]
-        keywords.extend(selected_basic[:2])  # 各カテゴリから2つ選択
-        
-        # 追加で別のカテゴリからも選択
-        second_category = basic_keywords[(mountain_hash + 1) % len(basic_keywords)]
-        keywords.extend(second_category[:1])
-        
-        # 難易度に応じたキーワード
-        if mountain.is_beginner_friendly():
-            beginner_keywords = ["初心者 登山", "ハイキング", "軽登山", "散策"]
-            keywords.append(beginner_keywords[mountain_hash % len(beginner_keywords)])
-        else:
-            advanced_keywords = ["登山 装備", "トレッキング ポール", "本格登山", "山岳装備"]
-            keywords.append(advanced_keywords[mountain_hash % len(advanced_keywords)])
-        
-        # 標高に応じたキーワード
-        if mountain.elevation > 1500:
-            high_altitude_keywords = ["高山 装備", "アルパイン", "高地 対応"]
-            keywords.append(high_altitude_keywords[mountain_hash % len(high_altitude_keywords)])
-        elif mountain.elevation < 500:
-            low_mountain_keywords = ["低山 ハイキング", "里山 散策", "ウォーキング"]
-            keywords.append(low_mountain_keywords[mountain_hash % len(low_mountain_keywords)])
-        
-        # 地域特性を考慮
-        if "北海道" in mountain.prefecture:
-            keywords.append("防寒")
-        elif "沖縄" in mountain.prefecture:
-            keywords.append("日焼け対策")
-        elif "関東" in mountain.prefecture or "東京" in mountain.prefecture:
-            keywords.append("都市近郊 ハイキング")
-        
-        # 重複を除去してシャッフル
-        unique_keywords = list(set(keywords))
-        # 山ごとに固定だが異なる順序で返す
-        import random
-        random.seed(mountain_hash)  # 山ごとに固定のシード
-        random.shuffle(unique_keywords)
-        
-        return unique_keywords[:5]  # 最大5つのキーワード
+        """山の特徴に応じた商品キーワードを取得（リポジトリで事前計算済み）"""
+        return list(self.mountain_repo.get_product_keywords(mountain))
 
 
 class PublishingService(LoggerMixin):
@@ -314,7 +316,7 @@ class PublishingService(LoggerMixin):
         self.image_service = ImageService()
         self.affiliate_service = AffiliateService()
     
-    def enhance_article(self, article: Article) -> Article:
+    def enhance_article(self, article: Article, listener: Optional[GenerationListener] = None) -> Article:
         """記事に画像とアフィリエイトリンクを追加"""
         try:
             self.log_info(f"Enhancing article: {article.content.title}")
@@ -330,6 +332,12 @@ class PublishingService(LoggerMixin):
                 inline_images = self.image_service.get_inline_images(article.mountain, 2)
                 article.content.inline_images = inline_images
             
+            if listener is not None:
+                listener.on_stage(GenerationStage.IMAGES, {
+                    "featured_image": article.content.featured_image is not None,
+                    "inline_images": len(article.content.inline_images)
+                })
+            
             # アフィリエイト商品を取得
             if not article.content.affiliate_products:
                 products = self.affiliate_service.get_hiking_products(article.mountain)
@@ -340,6 +348,12 @@ class PublishingService(LoggerMixin):
                 hotels = self.affiliate_service.get_nearby_hotels(article.mountain)
                 article.content.affiliate_hotels = hotels
             
+            if listener is not None:
+                listener.on_stage(GenerationStage.AFFILIATES, {
+                    "products": len(article.content.affiliate_products),
+                    "hotels": len(article.content.affiliate_hotels)
+                })
+            
             # コンテンツにアフィリエイト情報を埋め込み
             enhanced_content = self._embed_affiliates_in_content(
                 article.content.content,
@@ -432,32 +446,53 @@ class MountainArticleService(LoggerMixin):
         self,
         mountain_id: str,
         theme: Optional[str] = None,
-        publish: bool = False
+        publish: bool = False,
+        target_length: int = 2000,
+        cache_mode: CacheMode = CacheMode.USE,
+        listener: Optional[GenerationListener] = None
+    ) -> GenerationResult:
+        """記事作成から公開までの一連の処理（listener で進捗を受け取り、中断できる）"""
+        request = GenerationRequest(
+            mountain_id=mountain_id,
+            theme=theme,
+            target_length=target_length,
+            include_affiliates=True,
+            cache_mode=cache_mode
+        )
+        return self.process_request(request, publish=publish, listener=listener)
+    
+    def process_request(
+        self,
+        request: GenerationRequest,
+        publish: bool = False,
+        listener: Optional[GenerationListener] = None
     ) -> GenerationResult:
-        """記事作成から公開までの一連の処理"""
+        """生成リクエスト1件分のワークフローを実行"""
+        def check_cancelled():
+            if listener is not None and listener.is_cancelled():
+                raise GenerationCancelled("記事生成がキャンセルされました")
+        
         try:
-            self.log_info(f"Starting full article workflow for: {mountain_id}")
+            self.log_info(f"Starting full article workflow for: {request.mountain_id}")
             
             # 記事生成
-            request = GenerationRequest(
-                mountain_id=mountain_id,
-                theme=theme,
-                include_affiliates=True
-            )
-            
-            result = self.generation_service.generate_article(request)
+            result = self.generation_service.generate_article(request, listener=listener)
             
             if not result.success or not result.article:
                 return result
             
             # 記事を拡張（画像・アフィリエイト追加）
-            enhanced_article = self.publishing_service.enhance_article(result.article)
+            check_cancelled()
+            enhanced_article = self.publishing_service.enhance_article(result.article, listener=listener)
             
             # 公開処理
             if publish:
+                check_cancelled()
                 try:
                     wordpress_id = self.publishing_service.publish_to_wordpress(enhanced_article)
                     self.log_info(f"Article published successfully with ID: {wordpress_id}")
+                    if listener is not None:
+                        listener.on_stage(GenerationStage.PUBLISHED, {"wordpress_id": wordpress_id})
                 except ServiceError as e:
                     self.log_error("Publishing failed", e)
                     result.error_message = str(e)
@@ -466,6 +501,12 @@ class MountainArticleService(LoggerMixin):
             result.article = enhanced_article
             return result
             
+        except GenerationCancelled as e:
+            self.log_info(f"Article workflow cancelled: {request.mountain_id}")
+            return GenerationResult(
+                success=False,
+                error_message=str(e)
+            )
         except Exception as e:
             self.log_error("Full article workflow failed", e)
             return GenerationResult(
@@ -473,6 +514,194 @@ class MountainArticleService(LoggerMixin):
                 error_message=str(e)
             )
     
+    def create_and_publish_articles(
+        self,
+        requests: List[GenerationRequest],
+        publish: bool = False,
+        max_workers: Optional[int] = None,
+        on_result: Optional[Callable[[int, GenerationResult], None]] = None
+    ) -> BatchGenerationResult:
+        """
+        複数の記事を並列に生成
+        
+        Claude API の応答待ちが処理時間の大半を占めるため、
+        スレッドプールで最大 max_workers 件を同時に処理する。
+        
+        Args:
+            requests: 生成リクエストのリスト
+            publish: 生成後にWordPressへ公開するか
+            max_workers: 同時実行数（Noneの場合は設定値 BATCH_MAX_WORKERS）
+            on_result: 1件完了するごとに (入力インデックス, 結果) で呼ばれるコールバック
+            
+        Returns:
+            入力順に並んだ結果と集計情報
+        """
+        settings = get_settings()
+        workers = max(1, min(max_workers or settings.BATCH_MAX_WORKERS, len(requests) or 1))
+        
+        # ワーカースレッドから遅延読み込みが競合しないよう先に読み込んでおく
+        self.mountain_repo.get_all()
+        
+        self.log_info(f"Starting batch generation: {len(requests)} articles, {workers} workers")
+        
+        results: List[Optional[GenerationResult]] = [None] * len(requests)
+        latencies: List[float] = []
+        batch_start = time.perf_counter()
+        
+        def run(request: GenerationRequest) -> tuple:
+            item_start = time.perf_counter()
+            result = self.process_request(request, publish=publish)
+            return result, time.perf_counter() - item_start
+        
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="article-batch") as executor:
+            futures = {
+                executor.submit(run, request): index
+                for index, request in enumerate(requests)
+            }
+            
+            def collect(future):
+                index = futures.pop(future)
+                try:
+                    result, latency = future.result()
+                except Exception as e:
+                    self.log_error(f"Batch item failed: {requests[index].mountain_id}", e)
+                    result, latency = GenerationResult(success=False, error_message=str(e)), 0.0
+                
+                results[index] = result
+                latencies.append(latency)
+                
+                if on_result:
+                    on_result(index, result)
+            
+            try:
+                for future in as_completed(list(futures)):
+                    collect(future)
+            except BaseException:
+                # Ctrl-C 等で中断した場合は未着手の記事を生成せず（APIの利用料を使わない）、
+                # 生成中だった記事は完了を待って結果を通知してから中断する
+                self.log_warning(f"Batch generation interrupted: {len(futures)} articles not collected")
+                executor.shutdown(wait=True, cancel_futures=True)
+                for future in list(futures):
+                    if future.cancelled():
+                        continue
+                    error = future.exception()
+                    if error is None or isinstance(error, Exception):
+                        collect(future)
+                raise
+        
+        wall_time = time.perf_counter() - batch_start
+        summary = self._summarize_batch(results, latencies, workers, wall_time)
+        
+        self.log_info(
+            f"Batch generation completed: {summary.succeeded}/{summary.total} succeeded "
+            f"in {wall_time:.2f}s ({summary.throughput_per_minute:.1f} articles/min)"
+        )
+        
+        return BatchGenerationResult(results=results, summary=summary)
+    
+    def create_articles_resumable(
+        self,
+        requests: List[GenerationRequest],
+        job_name: str,
+        serialize: Callable[[GenerationResult], Dict[str, Any]],
+        publish: bool = False,
+        max_workers: Optional[int] = None,
+        resume: bool = True,
+        on_record: Optional[Callable[[int, Dict[str, Any]], None]] = None,
+        on_result: Optional[Callable[[int, GenerationResult, JobProgress], None]] = None
+    ) -> BatchGenerationResult:
+        """
+        ジャーナルに記録しながら複数の記事を並列に生成
+        
+        生成に成功した記事は serialize で変換してジャーナル（JOB_JOURNAL_DIR）へ1件ずつ記録する。
+        エラーや Ctrl-C で中断した後に同じリクエストで再実行すると、記録済みの記事は
+        生成せずにジャーナルから復元し、残りの記事だけを生成する。
+        
+        Args:
+            requests: 生成リクエストのリスト
+            job_name: ジョブ名（ジャーナルのファイル名に使う）
+            serialize: 生成結果 → ジャーナルに記録するデータ（JSONに変換できる辞書）
+            publish: 生成後にWordPressへ公開するか
+            max_workers: 同時実行数（Noneの場合は設定値 BATCH_MAX_WORKERS）
+            resume: Falseの場合は記録済みの記事も含めて最初から生成する
+            on_record: 記録済みの記事ごとに (入力インデックス, 記録データ) で呼ばれるコールバック
+                （復元した記事は生成前に入力順で、今回生成した記事は生成し終えた順に呼ばれる）
+            on_result: 今回生成した記事ごとに (入力インデックス, 結果, 進捗) で呼ばれるコールバック
+            
+        Returns:
+            今回生成した記事の結果と集計情報（summary.resumed は復元した件数）
+        """
+        settings = get_settings()
+        keys = [f"{index}:{request.mountain_id}" for index, request in enumerate(requests)]
+        params = [
+            request.model_dump(exclude={"cache_mode"}, mode="json") for request in requests
+        ]
+        journal = JobJournal.for_job(settings.JOB_JOURNAL_DIR, job_name, {"publish": publish, "requests": params})
+        journal.open(total=len(requests), resume=resume)
+        
+        with journal:
+            pending = [index for index, key in enumerate(keys) if key not in journal.completed]
+            progress = JobProgress(total=len(requests), resumed=len(requests) - len(pending))
+            
+            if progress.resumed:
+                self.log_info(f"Resuming {job_name}: {progress.resumed}/{len(requests)} already completed")
+            if on_record:
+                for index, key in enumerate(keys):
+                    if key in journal.completed:
+                        on_record(index, journal.completed[key])
+            
+            def handle(position: int, result: GenerationResult):
+                index = pending[position]
+                if result.success:
+                    record = serialize(result)
+                    journal.record_success(keys[index], record)
+                    progress.record(True)
+                    if on_record:
+                        on_record(index, record)
+                else:
+                    journal.record_failure(keys[index], result.error_message)
+                    progress.record(False)
+                if on_result:
+                    on_result(index, result, progress)
+            
+            batch = self.create_and_publish_articles(
+                [requests[index] for index in pending],
+                publish=publish,
+                max_workers=max_workers,
+                on_result=handle
+            )
+            
+            if progress.done == len(requests):
+                journal.finish()
+        
+        batch.summary.resumed = progress.resumed
+        batch.journal_path = str(journal.path)
+        return batch
+    
+    def _summarize_batch(
+        self,
+        results: List[GenerationResult],
+        latencies: List[float],
+        workers: int,
+        wall_time: float
+    ) -> BatchGenerationSummary:
+        """一括生成の集計を作成"""
+        succeeded = sum(1 for result in results if result.success)
+        ordered = sorted(latencies)
+        
+        return BatchGenerationSummary(
+            total=len(results),
+            succeeded=succeeded,
+            failed=len(results) - succeeded,
+            max_workers=workers,
+            wall_time=wall_time,
+            throughput_per_minute=(len(results) / wall_time * 60) if wall_time > 0 else 0.0,
+            latency_avg=(sum(ordered) / len(ordered)) if ordered else 0.0,
+            latency_p50=_percentile(ordered, 50),
+            latency_p95=_percentile(ordered, 95),
+            latency_max=ordered[-1] if ordered else 0.0
+        )
+    
     def get_mountain_suggestions(self, count: int = 5) -> List[Mountain]:
         """記事作成におすすめの山を取得"""
         try:
@@ -499,4 +728,12 @@ class MountainArticleService(LoggerMixin):
             
         except RepositoryError as e:
             self.log_error("Failed to get mountain suggestions", e)
-            return []
\ No newline at end of file
+            return []
+
+
+def _percentile(sorted_values: List[float], percent: float) -> float:
+    """ソート済みの値から最近接順位法でパーセンタイルを求める"""
+    if not sorted_values:
+        return 0.0
+    rank = max(1, math.ceil(len(sorted_values) * percent / 100))
+    return sorted_values[rank - 1]
\ No newline at end of file
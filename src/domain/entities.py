@@ -1,10 +1,14 @@
 """
 ドメインエンティティ定義
 """
+import hashlib
+import random
+import re
+import sys
 from dataclasses import dataclass, field
 from datetime import datetime
 from enum import Enum
-from typing import Dict, List, Optional, Any
+from typing import Dict, List, Optional, Any, Tuple
 from pydantic import BaseModel, Field
 
 
@@ -23,7 +27,55 @@ class ArticleStatus(str, Enum):
     PRIVATE = "private"
 
 
-@dataclass
+class CacheMode(str, Enum):
+    """APIレスポンスキャッシュの利用方法"""
+    USE = "use"          # キャッシュがあれば使用し、なければ保存
+    REFRESH = "refresh"  # キャッシュを参照せずに再取得して上書き保存
+    BYPASS = "bypass"    # キャッシュを一切使用しない
+
+
+class GenerationStage(str, Enum):
+    """記事生成ワークフローの段階（進捗通知用）"""
+    STARTED = "started"        # Claude API で本文の生成を開始
+    GENERATED = "generated"    # 本文の生成が完了
+    IMAGES = "images"          # 画像を取得
+    AFFILIATES = "affiliates"  # アフィリエイト商品・宿泊施設を取得
+    PUBLISHED = "published"    # WordPress に投稿
+
+
+# dataclass の slots 指定は Python 3.10 以降のみ対応（3.9 では通常の属性辞書を使う）
+_SLOTS: Dict[str, bool] = {"slots": True} if sys.version_info >= (3, 10) else {}
+
+# 「約1-2時間」「約30分」「2時間30分」などの表記（範囲は下限を採用）
+_HOURS_PATTERN = re.compile(r'(\d+(?:\.\d+)?)(?:\s*[-〜~]\s*\d+(?:\.\d+)?)?\s*時間')
+_MINUTES_PATTERN = re.compile(r'(\d+)(?:\s*[-〜~]\s*\d+)?\s*分')
+_NUMBER_PATTERN = re.compile(r'(\d+(?:\.\d+)?)')
+# 「約300m」「約1,200m」などの表記
+_METERS_PATTERN = re.compile(r'(\d{1,3}(?:,\d{3})+|\d+)\s*m')
+
+# 登山時間が読み取れない場合の既定値（時間）
+DEFAULT_HIKING_HOURS = 3.0
+
+
+def parse_hiking_hours(text: str) -> float:
+    """登山時間の表記を時間単位の数値に変換（読み取れない場合は既定値）"""
+    hours = _HOURS_PATTERN.search(text or "")
+    minutes = _MINUTES_PATTERN.search(text or "")
+    if hours or minutes:
+        return (float(hours.group(1)) if hours else 0.0) + (int(minutes.group(1)) / 60 if minutes else 0.0)
+    
+    # 単位のない表記は時間とみなす
+    number = _NUMBER_PATTERN.search(text or "")
+    return float(number.group(1)) if number else DEFAULT_HIKING_HOURS
+
+
+def parse_elevation_gain(text: str) -> Optional[int]:
+    """標高差の表記をメートル単位の整数に変換（読み取れない場合はNone）"""
+    match = _METERS_PATTERN.search(text or "")
+    return int(match.group(1).replace(",", "")) if match else None
+
+
+@dataclass(frozen=True, **_SLOTS)
 class Location:
     """位置情報"""
     latitude: float
@@ -32,16 +84,29 @@ class Location:
     access_time: str
 
 
-@dataclass
+@dataclass(frozen=True, **_SLOTS)
 class Difficulty:
-    """登山難易度情報"""
+    """
+    登山難易度情報
+    
+    hiking_hours と elevation_gain_m は省略時に表示用の文字列から生成時に一度だけ解析する。
+    """
     level: DifficultyLevel
     hiking_time: str
     distance: str
     elevation_gain: str
+    hiking_hours: Optional[float] = None
+    elevation_gain_m: Optional[int] = None
+    
+    def __post_init__(self):
+        # frozen のため object.__setattr__ で解析結果を設定する
+        if self.hiking_hours is None:
+            object.__setattr__(self, "hiking_hours", parse_hiking_hours(self.hiking_time))
+        if self.elevation_gain_m is None:
+            object.__setattr__(self, "elevation_gain_m", parse_elevation_gain(self.elevation_gain))
 
 
-@dataclass
+@dataclass(frozen=True, **_SLOTS)
 class Trail:
     """登山コース"""
     name: str
@@ -49,7 +114,7 @@ class Trail:
     time: str
 
 
-@dataclass
+@dataclass(frozen=True, **_SLOTS)
 class Seasons:
     """季節情報"""
     best: List[str]
@@ -57,7 +122,7 @@ class Seasons:
     autumn_leaves: Optional[str] = None
 
 
-@dataclass
+@dataclass(frozen=True, **_SLOTS)
 class Facilities:
     """施設情報"""
     restrooms: bool = False
@@ -67,7 +132,7 @@ class Facilities:
     visitor_center: bool = False
 
 
-@dataclass
+@dataclass(**_SLOTS)
 class Mountain:
     """山エンティティ"""
     id: str
@@ -96,10 +161,7 @@ class Mountain:
     
     def get_hiking_hours(self) -> float:
         """登山時間を時間単位で取得（概算）"""
-        import re
-        time_str = self.difficulty.hiking_time
-        match = re.search(r'(\d+)', time_str)
-        return float(match.group(1)) if match else 3.0
+        return self.difficulty.hiking_hours
 
 
 @dataclass
@@ -124,7 +186,7 @@ class ImageInfo:
         }
 
 
-@dataclass
+@dataclass(**_SLOTS)
 class AffiliateProduct:
     """アフィリエイト商品"""
     name: str
@@ -163,7 +225,7 @@ class AffiliateHotel:
         return f"¥{self.price:,}/泊"
 
 
-@dataclass
+@dataclass(**_SLOTS)
 class ArticleContent:
     """記事コンテンツ"""
     title: str
@@ -233,6 +295,7 @@ class GenerationRequest(BaseModel):
     include_affiliates: bool = Field(True, description="アフィリエイトリンクを含むか")
     max_products: int = Field(5, description="最大商品数")
     max_hotels: int = Field(3, description="最大宿泊施設数")
+    cache_mode: CacheMode = Field(CacheMode.USE, description="レスポンスキャッシュの利用方法")
     
     class Config:
         use_enum_values = True
@@ -249,32 +312,66 @@ class GenerationResult(BaseModel):
         arbitrary_types_allowed = True
 
 
+class BatchGenerationSummary(BaseModel):
+    """一括生成のスループット・レイテンシ集計"""
+    total: int = Field(0, description="処理件数")
+    succeeded: int = Field(0, description="成功件数")
+    failed: int = Field(0, description="失敗件数")
+    max_workers: int = Field(1, description="同時実行数")
+    wall_time: float = Field(0.0, description="全体の経過時間（秒）")
+    throughput_per_minute: float = Field(0.0, description="1分あたりの処理件数")
+    latency_avg: float = Field(0.0, description="1件あたりの平均処理時間（秒）")
+    latency_p50: float = Field(0.0, description="処理時間の中央値（秒）")
+    latency_p95: float = Field(0.0, description="処理時間の95パーセンタイル（秒）")
+    latency_max: float = Field(0.0, description="最大処理時間（秒）")
+    resumed: int = Field(0, description="ジャーナルから復元した前回までの完了件数")
+
+
+class BatchGenerationResult(BaseModel):
+    """記事一括生成結果（results は入力順）"""
+    results: List[GenerationResult] = Field(default_factory=list)
+    summary: BatchGenerationSummary = Field(default_factory=BatchGenerationSummary)
+    journal_path: Optional[str] = Field(None, description="再開可能なジョブのジャーナル")
+
+    class Config:
+        arbitrary_types_allowed = True
+
+
 # ファクトリークラス
 class MountainFactory:
     """山エンティティのファクトリークラス"""
     
     @staticmethod
     def from_dict(data: Dict[str, Any]) -> Mountain:
-        """辞書データから山エンティティを生成"""
+        """
+        辞書データから山エンティティを生成
+        
+        県名・地域名・特徴などの繰り返し現れる文字列はインターンし、
+        山の数が増えても同じ文字列を1つだけ保持するようにする。
+        """
+        def intern(value):
+            # 最寄り駅のない山など null の項目があるため、文字列以外はそのまま返す
+            return sys.intern(value) if isinstance(value, str) else value
+
         location = Location(
             latitude=data['location']['latitude'],
             longitude=data['location']['longitude'],
-            nearest_station=data['location']['nearest_station'],
-            access_time=data['location']['access_time']
+            nearest_station=intern(data['location']['nearest_station']),
+            access_time=intern(data['location']['access_time'])
         )
         
         difficulty = Difficulty(
             level=DifficultyLevel(data['difficulty']['level']),
-            hiking_time=data['difficulty']['hiking_time'],
-            distance=data['difficulty']['distance'],
-            elevation_gain=data['difficulty']['elevation_gain']
+            hiking_time=intern(data['difficulty']['hiking_time']),
+            distance=intern(data['difficulty']['distance']),
+            elevation_gain=intern(data['difficulty']['elevation_gain'])
         )
         
         trails = [
             Trail(
                 name=trail['name'],
                 description=trail['description'],
-                time=trail['time']
+                time=intern(trail['time'])
             )
             for trail in data.get('trails', [])
         ]
@@ -282,7 +379,7 @@ class MountainFactory:
         seasons = None
         if 'seasons' in data:
             seasons = Seasons(
-                best=data['seasons']['best'],
+                best=[intern(season) for season in data['seasons']['best']],
                 cherry_blossom=data['seasons'].get('cherry_blossom'),
                 autumn_leaves=data['seasons'].get('autumn_leaves')
             )
@@ -301,21 +398,88 @@ class MountainFactory:
             id=data['id'],
             name=data['name'],
             name_en=data['name_en'],
-            prefecture=data['prefecture'],
-            region=data['region'],
+            prefecture=intern(data['prefecture']),
+            region=intern(data['region']),
             elevation=data['elevation'],
             location=location,
             difficulty=difficulty,
-            features=data['features'],
+            features=[intern(feature) for feature in data['features']],
             trails=trails,
             seasons=seasons,
             facilities=facilities,
-            nearby_attractions=data.get('nearby_attractions', []),
-            keywords=data.get('keywords', []),
-            article_themes=data.get('article_themes', [])
+            nearby_attractions=[intern(name) for name in data.get('nearby_attractions', [])],
+            keywords=[intern(keyword) for keyword in data.get('keywords', [])],
+            article_themes=[intern(theme) for theme in data.get('article_themes', [])]
         )
 
 
+class ProductKeywordPlanner:
+    """
+    山ごとのアフィリエイト商品キーワードを決定するクラス
+
+    山の名前のハッシュから山ごとに固定の組み合わせ・順序を決める。
+    順序の決定には山ごとに独立した乱数生成器を使い、グローバルな random の状態は変更しない。
+    """
+    
+    # 基本キーワードプール
+    BASIC_KEYWORDS: Tuple[Tuple[str, ...], ...] = (
+        ("登山靴", "トレッキングシューズ"),
+        ("ハイキング ウェア", "アウトドア ジャケット", "登山 パンツ"),
+        ("リュック", "バックパック", "デイパック"),
+        ("水筒", "ボトル", "ハイドレーション"),
+        ("レインウェア", "雨具", "ポンチョ"),
+        ("帽子", "キャップ", "ハット"),
+        ("グローブ", "手袋", "軍手"),
+        ("タオル", "手ぬぐい", "バンダナ"),
+    )
+    BEGINNER_KEYWORDS = ("初心者 登山", "ハイキング", "軽登山", "散策")
+    ADVANCED_KEYWORDS = ("登山 装備", "トレッキング ポール", "本格登山", "山岳装備")
+    HIGH_ALTITUDE_KEYWORDS = ("高山 装備", "アルパイン", "高地 対応")
+    LOW_MOUNTAIN_KEYWORDS = ("低山 ハイキング", "里山 散策", "ウォーキング")
+    MAX_KEYWORDS = 5
+    
+    @classmethod
+    def plan(cls, mountain: Mountain) -> Tuple[str, ...]:
+        """山の特徴に応じた商品キーワードを生成（最大5つ）"""
+        mountain_hash = int(hashlib.md5(mountain.name.encode()).hexdigest(), 16) % 100
+        keywords: List[str] = []
+        
+        # 山のハッシュ値を使って異なる組み合わせを選択
+        selected_basic = cls.BASIC_KEYWORDS[mountain_hash % len(cls.BASIC_KEYWORDS)]
+        keywords.extend(selected_basic[:2])  # 各カテゴリから2つ選択
+        
+        # 追加で別のカテゴリからも選択
+        second_category = cls.BASIC_KEYWORDS[(mountain_hash + 1) % len(cls.BASIC_KEYWORDS)]
+        keywords.extend(second_category[:1])
+        
+        # 難易度に応じたキーワード
+        if mountain.is_beginner_friendly():
+            keywords.append(cls.BEGINNER_KEYWORDS[mountain_hash % len(cls.BEGINNER_KEYWORDS)])
+        else:
+            keywords.append(cls.ADVANCED_KEYWORDS[mountain_hash % len(cls.ADVANCED_KEYWORDS)])
+        
+        # 標高に応じたキーワード
+        if mountain.elevation > 1500:
+            keywords.append(cls.HIGH_ALTITUDE_KEYWORDS[mountain_hash % len(cls.HIGH_ALTITUDE_KEYWORDS)])
+        elif mountain.elevation < 500:
+            keywords.append(cls.LOW_MOUNTAIN_KEYWORDS[mountain_hash % len(cls.LOW_MOUNTAIN_KEYWORDS)])
+        
+        # 地域特性を考慮
+        if "北海道" in mountain.prefecture:
+            keywords.append("防寒")
+        elif "沖縄" in mountain.prefecture:
+            keywords.append("日焼け対策")
+        elif "関東" in mountain.prefecture or "東京" in mountain.prefecture:
+            keywords.append("都市近郊 ハイキング")
+        
+        # 重複を除去してシャッフル（set はプロセスごとに順序が変わるため挿入順を保つ）
+        unique_keywords = list(dict.fromkeys(keywords))
+        # 山ごとに固定だが異なる順序で返す
+        random.Random(mountain_hash).shuffle(unique_keywords)
+        
+        return tuple(unique_keywords[:cls.MAX_KEYWORDS])
+
+
 class ArticleFactory:
     """記事エンティティのファクトリークラス"""
     
@@ -2,18 +2,25 @@
 外部API クライアント実装
 """
 import asyncio
+import atexit
 import aiohttp
 import requests
 import json
+import threading
 import time
-from typing import Dict, List, Optional, Any, Tuple
+import weakref
+from dataclasses import asdict
+from typing import Callable, Dict, List, Optional, Any, Tuple, Union
 from urllib.parse import urlencode, quote
 import base64
 
 from anthropic import Anthropic
 from config.settings import get_settings
 from config.logging_config import LoggerMixin, log_api_call
-from src.domain.entities import AffiliateProduct, AffiliateHotel, ImageInfo
+from src.domain.entities import AffiliateProduct, AffiliateHotel, ImageInfo, CacheMode
+from src.infrastructure.product_cache import ProductCache
+from src.infrastructure.request_scheduler import get_request_scheduler, host_of
+from src.infrastructure.response_cache import ResponseCache
 
 
 class APIClientError(Exception):
@@ -21,30 +28,87 @@ class APIClientError(Exception):
     pass
 
 
+class RequestCancelledError(APIClientError):
+    """呼び出し元の要求で処理を中断した"""
+    pass
+
+
 class ClaudeAPIClient(LoggerMixin):
     """Claude API クライアント"""
     
     def __init__(self):
         self.settings = get_settings()
-        self.client = Anthropic(api_key=self.settings.ANTHROPIC_API_KEY)
+        # 再試行はスケジューラーで行うため、SDK側の自動リトライは無効化する
+        self.client = Anthropic(
+            api_key=self.settings.ANTHROPIC_API_KEY,
+            timeout=self.settings.CLAUDE_API_TIMEOUT,
+            max_retries=0
+        )
+        self.scheduler = get_request_scheduler()
+        self.api_host = host_of(self.client.base_url)
+        self.scheduler.configure_host(
+            self.api_host,
+            rate_per_sec=self.settings.CLAUDE_RATE_PER_SEC,
+            max_concurrency=self.settings.CLAUDE_MAX_CONCURRENCY
+        )
+        self.response_cache: Optional[ResponseCache] = None
+        if self.settings.CLAUDE_CACHE_ENABLED:
+            self.response_cache = ResponseCache(
+                cache_dir=self.settings.CLAUDE_CACHE_DIR,
+                ttl_seconds=self.settings.CLAUDE_CACHE_TTL,
+                max_bytes=self.settings.CLAUDE_CACHE_MAX_MB * 1024 * 1024
+            )
     
     @log_api_call("Claude API")
     def generate_article(
         self,
         mountain_data: Dict[str, Any],
         theme: Optional[str] = None,
-        target_length: int = 2000
+        target_length: int = 2000,
+        cache_mode: CacheMode = CacheMode.USE,
+        on_text: Optional[Callable[[str], None]] = None,
+        should_cancel: Optional[Callable[[], bool]] = None
     ) -> Tuple[str, str, str, List[str]]:
         """
         記事を生成
         
+        同じプロンプト・モデル・パラメータの組み合わせはディスクキャッシュから返す。
+        
+        Args:
+            cache_mode: use=キャッシュ利用, refresh=再生成して上書き, bypass=キャッシュ不使用
+            on_text: 指定した場合はストリーミングAPIを使い、生成されたテキストを届いた順に渡す
+                （キャッシュから返す場合は全文を1回で渡す）
+            should_cancel: ストリーミング中に True を返すと生成を中断する（RequestCancelledError）
+        
         Returns:
             Tuple[title, content, excerpt, tags]
         """
         try:
+            cache_mode = CacheMode(cache_mode)
             prompt = self._build_article_prompt(mountain_data, theme, target_length)
             
-            message = self.client.messages.create(
+            cache_key = None
+            if self.response_cache is not None:
+                if cache_mode == CacheMode.BYPASS:
+                    self.response_cache.record_skip(cache_mode.value)
+                else:
+                    cache_key = ResponseCache.make_key(
+                        prompt=prompt,
+                        model=self.settings.CLAUDE_MODEL,
+                        temperature=self.settings.CLAUDE_TEMPERATURE,
+                        max_tokens=self.settings.CLAUDE_MAX_TOKENS
+                    )
+                    if cache_mode == CacheMode.USE:
+                        cached_text = self.response_cache.get(cache_key)
+                        if cached_text is not None:
+                            self.log_info(f"Claude API cache hit: {mountain_data['name']}")
+                            if on_text is not None:
+                                on_text(cached_text)
+                            return self._parse_article_response(cached_text)
+                    else:
+                        self.response_cache.record_skip(cache_mode.value)
+            
+            params = dict(
                 model=self.settings.CLAUDE_MODEL,
                 max_tokens=self.settings.CLAUDE_MAX_TOKENS,
                 temperature=self.settings.CLAUDE_TEMPERATURE,
@@ -53,14 +117,59 @@ class ClaudeAPIClient(LoggerMixin):
                     "content": prompt
                 }]
             )
+            if on_text is not None:
+                response_text = self.scheduler.call(
+                    self.api_host, self._stream_message, on_text, should_cancel, **params
+                )
+            else:
+                message = self.scheduler.call(self.api_host, self.client.messages.create, **params)
+                response_text = message.content[0].text
+            
+            if cache_key is not None:
+                self.response_cache.put(cache_key, response_text, metadata={
+                    "mountain": mountain_data['name'],
+                    "mountain_id": mountain_data.get('id'),
+                    "theme": theme,
+                    "model": self.settings.CLAUDE_MODEL
+                })
             
-            response_text = message.content[0].text
             return self._parse_article_response(response_text)
             
+        except RequestCancelledError:
+            self.log_info(f"Claude API article generation cancelled: {mountain_data['name']}")
+            raise
         except Exception as e:
             self.log_error("Claude API article generation failed", e)
             raise APIClientError(f"Claude API エラー: {str(e)}")
     
+    def _stream_message(
+        self,
+        on_text: Callable[[str], None],
+        should_cancel: Optional[Callable[[], bool]],
+        **params: Any
+    ) -> str:
+        """
+        ストリーミングAPIで生成し、テキストを届いた順に on_text へ渡して全文を返す
+        
+        テキストを渡し始めた後の通信エラーは再試行しない（呼び出し元が受け取ったテキストと
+        食い違うため）。中断時はストリームを閉じ、以降の生成を止める。
+        """
+        chunks: List[str] = []
+        with self.client.messages.stream(**params) as stream:
+            try:
+                for text in stream.text_stream:
+                    if should_cancel is not None and should_cancel():
+                        raise RequestCancelledError("記事生成がキャンセルされました")
+                    chunks.append(text)
+                    on_text(text)
+            except RequestCancelledError:
+                raise
+            except Exception as e:
+                if chunks:
+                    raise APIClientError(f"ストリーミング中に接続が切れました: {e}") from e
+                raise
+        return "".join(chunks)
+    
     def _build_article_prompt(
         self,
         mountain_data: Dict[str, Any],
@@ -213,6 +322,33 @@ class WordPressAPIClient(LoggerMixin):
         self.settings = get_settings()
         self.base_url = f"{self.settings.WP_URL}/wp-json/wp/v2"
         self.auth = self._get_auth_header()
+        self.scheduler = get_request_scheduler()
+        self.api_host = host_of(self.settings.WP_URL)
+        self.scheduler.configure_host(
+            self.api_host,
+            rate_per_sec=self.settings.WP_RATE_PER_SEC,
+            max_concurrency=self.settings.WP_MAX_CONCURRENCY
+        )
+    
+    def _request(
+        self,
+        method: str,
+        path: str,
+        idempotent: bool = True,
+        **kwargs: Any
+    ) -> requests.Response:
+        """スケジューラー経由でリクエストを送信（エラー応答は例外として送出）"""
+        def send() -> requests.Response:
+            response = requests.request(
+                method,
+                f"{self.base_url}{path}",
+                timeout=self.settings.API_TIMEOUT,
+                **kwargs
+            )
+            response.raise_for_status()
+            return response
+        
+        return self.scheduler.call(self.api_host, send, idempotent=idempotent)
     
     def _get_auth_header(self) -> str:
         """認証ヘッダーを生成"""
@@ -233,13 +369,12 @@ class WordPressAPIClient(LoggerMixin):
         for tag_name in tag_names:
             try:
                 # 既存のタグを検索
-                search_response = requests.get(
-                    f"{self.base_url}/tags",
+                search_response = self._request(
+                    "GET",
+                    "/tags",
                     params={"search": tag_name},
-                    headers=headers,
-                    timeout=30
+                    headers=headers
                 )
-                search_response.raise_for_status()
                 existing_tags = search_response.json()
                 
                 if existing_tags:
@@ -247,13 +382,13 @@ class WordPressAPIClient(LoggerMixin):
                     tag_ids.append(existing_tags[0]['id'])
                 else:
                     # 新しいタグを作成
-                    create_response = requests.post(
-                        f"{self.base_url}/tags",
+                    create_response = self._request(
+                        "POST",
+                        "/tags",
+                        idempotent=False,
                         json={"name": tag_name},
-                        headers=headers,
-                        timeout=30
+                        headers=headers
                     )
-                    create_response.raise_for_status()
                     new_tag = create_response.json()
                     tag_ids.append(new_tag['id'])
                     
@@ -279,14 +414,13 @@ class WordPressAPIClient(LoggerMixin):
                     tag_ids = self._get_or_create_tags(post_data['tags'])
                     post_data['tags'] = tag_ids
             
-            response = requests.post(
-                f"{self.base_url}/posts",
+            response = self._request(
+                "POST",
+                "/posts",
+                idempotent=False,
                 json=post_data,
-                headers=headers,
-                timeout=60
+                headers=headers
             )
-            
-            response.raise_for_status()
             result = response.json()
             
             post_id = result['id']
@@ -346,17 +480,115 @@ class WordPressAPIClient(LoggerMixin):
             raise APIClientError(f"WordPress メディアアップロード エラー: {str(e)}")
 
 
-class RakutenAPIClient(LoggerMixin):
-    """楽天 API クライアント"""
+class _BackgroundEventLoop:
+    """
+    同期コードから非同期クライアントを利用するためのイベントループスレッド
+    
+    aiohttp のセッションは生成したイベントループに紐づくため、
+    プロセス内で1つのループを常駐させてセッション（コネクションプール）を使い回す。
+    """
+    
+    _instance: Optional["_BackgroundEventLoop"] = None
+    _instance_lock = threading.Lock()
     
     def __init__(self):
+        self.loop = asyncio.new_event_loop()
+        self._clients: "weakref.WeakSet[AsyncRakutenAPIClient]" = weakref.WeakSet()
+        self._thread = threading.Thread(
+            target=self.loop.run_forever,
+            name="api-client-event-loop",
+            daemon=True
+        )
+        self._thread.start()
+        atexit.register(self.shutdown)
+    
+    @classmethod
+    def get(cls) -> "_BackgroundEventLoop":
+        """共有インスタンスを取得"""
+        with cls._instance_lock:
+            if cls._instance is None:
+                cls._instance = cls()
+            return cls._instance
+    
+    def register(self, client: "AsyncRakutenAPIClient"):
+        """終了時にセッションを閉じるクライアントを登録"""
+        self._clients.add(client)
+    
+    def run(self, coro):
+        """コルーチンをループ上で実行し、結果を待つ"""
+        return asyncio.run_coroutine_threadsafe(coro, self.loop).result()
+    
+    def shutdown(self):
+        """全セッションを閉じてループを停止"""
+        if not self.loop.is_running():
+            return
+        for client in list(self._clients):
+            try:
+                self.run(client.close())
+            except Exception:
+                pass
+        self.loop.call_soon_threadsafe(self.loop.stop)
+        self._thread.join(timeout=5)
+
+
+def _parse_rakuten_items(data: Dict[str, Any]) -> List[AffiliateProduct]:
+    """楽天商品検索APIのレスポンスを商品エンティティに変換"""
+    products = []
+    for item in data.get('Items', []):
+        item_data = item['Item']
+        
+        product = AffiliateProduct(
+            name=item_data['itemName'],
+            price=int(item_data['itemPrice']),
+            url=item_data['affiliateUrl'],
+            image_url=item_data['mediumImageUrls'][0]['imageUrl'] if item_data.get('mediumImageUrls') else '',
+            description=item_data.get('itemCaption', '')[:200],
+            category=item_data.get('genreId', ''),
+            rating=float(item_data.get('reviewAverage', 0)),
+            review_count=int(item_data.get('reviewCount', 0)),
+            shop_name=item_data.get('shopName', '')
+        )
+        products.append(product)
+    return products
+
+
+class AsyncRakutenAPIClient(LoggerMixin):
+    """
+    楽天 API 非同期クライアント
+    
+    1つの aiohttp セッションを共有し、接続を使い回しながら
+    複数キーワードの検索を同時に実行する。
+    """
+    
+    def __init__(self, max_connections: int = 10):
         self.settings = get_settings()
         self.app_id = self.settings.RAKUTEN_APP_ID
         self.affiliate_id = self.settings.RAKUTEN_AFFILIATE_ID
         self.base_url = "https://app.rakuten.co.jp/services/api"
+        self.max_connections = max_connections
+        self._session: Optional[aiohttp.ClientSession] = None
+        self.scheduler = get_request_scheduler()
+        self.scheduler.configure_host(
+            host_of(self.base_url),
+            rate_per_sec=self.settings.RAKUTEN_RATE_PER_SEC,
+            max_concurrency=self.settings.RAKUTEN_MAX_CONCURRENCY
+        )
     
-    @log_api_call("Rakuten API")
-    def search_products(
+    async def _get_session(self) -> aiohttp.ClientSession:
+        """共有セッションを取得（初回のみ生成）"""
+        if self._session is None or self._session.closed:
+            connector = aiohttp.TCPConnector(
+                limit=self.max_connections,
+                ttl_dns_cache=300,
+                keepalive_timeout=30
+            )
+            self._session = aiohttp.ClientSession(
+                connector=connector,
+                timeout=aiohttp.ClientTimeout(total=self.settings.API_TIMEOUT)
+            )
+        return self._session
+    
+    async def search_products(
         self,
         keyword: str,
         max_results: int = 5,
@@ -364,50 +596,111 @@ class RakutenAPIClient(LoggerMixin):
         max_price: int = 50000
     ) -> List[AffiliateProduct]:
         """商品を検索"""
-        try:
-            params = {
-                'applicationId': self.app_id,
-                'affiliateId': self.affiliate_id,
-                'keyword': keyword,
-                'hits': max_results,
-                'minPrice': min_price,
-                'maxPrice': max_price,
-                'sort': 'standard',
-                'format': 'json'
-            }
-            
-            response = requests.get(
+        params = {
+            'applicationId': self.app_id,
+            'affiliateId': self.affiliate_id,
+            'keyword': keyword,
+            'hits': max_results,
+            'minPrice': min_price,
+            'maxPrice': max_price,
+            'sort': 'standard',
+            'format': 'json'
+        }
+        
+        async def fetch() -> Dict[str, Any]:
+            session = await self._get_session()
+            async with session.get(
                 f"{self.base_url}/IchibaItem/Search/20170706",
-                params=params,
-                timeout=self.settings.API_TIMEOUT
-            )
-            
-            response.raise_for_status()
-            data = response.json()
-            
-            products = []
-            for item in data.get('Items', []):
-                item_data = item['Item']
-                
-                product = AffiliateProduct(
-                    name=item_data['itemName'],
-                    price=int(item_data['itemPrice']),
-                    url=item_data['affiliateUrl'],
-                    image_url=item_data['mediumImageUrls'][0]['imageUrl'] if item_data.get('mediumImageUrls') else '',
-                    description=item_data.get('itemCaption', '')[:200],
-                    category=item_data.get('genreId', ''),
-                    rating=float(item_data.get('reviewAverage', 0)),
-                    review_count=int(item_data.get('reviewCount', 0)),
-                    shop_name=item_data.get('shopName', '')
-                )
-                products.append(product)
-            
-            self.log_info(f"Found {len(products)} products for keyword: {keyword}")
-            return products
+                params=params
+            ) as response:
+                response.raise_for_status()
+                return await response.json(content_type=None)
+        
+        try:
+            data = await self.scheduler.call_async(host_of(self.base_url), fetch)
             
-        except requests.RequestException as e:
+        except (aiohttp.ClientError, asyncio.TimeoutError) as e:
             self.log_error("Rakuten product search failed", e)
             raise APIClientError(f"楽天商品検索 エラー: {str(e)}")
+        
+        products = _parse_rakuten_items(data)
+        self.log_info(f"Found {len(products)} products for keyword: {keyword}")
+        return products
+    
+    async def search_products_many(
+        self,
+        keywords: List[str],
+        max_results: int = 5,
+        min_price: int = 1000,
+        max_price: int = 50000
+    ) -> List[List[AffiliateProduct]]:
+        """複数キーワードを同時に検索（結果はキーワード順）"""
+        return list(await asyncio.gather(*[
+            self.search_products(keyword, max_results, min_price, max_price)
+            for keyword in keywords
+        ]))
+    
+    async def close(self):
+        """セッションを閉じる"""
+        if self._session is not None and not self._session.closed:
+            await self._session.close()
+        self._session = None
+
+
+class RakutenAPIClient(LoggerMixin):
+    """
+    楽天 API クライアント
+    
+    AsyncRakutenAPIClient の同期ファサード。呼び出し側は従来どおり同期メソッドを使い、
+    通信は共有イベントループ上のコネクションプールを通して行われる。
+    """
+    
+    def __init__(self):
+        self.settings = get_settings()
+        self.app_id = self.settings.RAKUTEN_APP_ID
+        self.affiliate_id = self.settings.RAKUTEN_AFFILIATE_ID
+        self.async_client = AsyncRakutenAPIClient()
+        self._event_loop = _BackgroundEventLoop.get()
+        self._event_loop.register(self.async_client)
+    
+    @property
+    def base_url(self) -> str:
+        """APIのベースURL"""
+        return self.async_client.base_url
+    
+    @base_url.setter
+    def base_url(self, value: str):
+        self.async_client.base_url = value
+    
+    @log_api_call("Rakuten API")
+    def search_products(
+        self,
+        keyword: str,
+        max_results: int = 5,
+        min_price: int = 1000,
+        max_price: int = 50000
+    ) -> List[AffiliateProduct]:
+        """商品を検索"""
+        return self._event_loop.run(
+            self.async_client.search_products(keyword, max_results, min_price, max_price)
+        )
+    
+    @log_api_call("Rakuten API")
+    def search_products_many(
+        self,
+        keywords: List[str],
+        max_results: int = 5,
+        min_price: int = 1000,
+        max_price: int = 50000
+    ) -> List[List[AffiliateProduct]]:
+        """複数キーワードを同時に検索（結果はキーワード順）"""
+        return self._event_loop.run(
+            self.async_client.search_products_many(keywords, max_results, min_price, max_price)
+        )
+    
+    def close(self):
+        """コネクションプールを解放"""
+        self._event_loop.run(self.async_client.close())
     
     @log_api_call("Rakuten API")
     def search_hotels(
@@ -454,6 +747,91 @@ class RakutenAPIClient(LoggerMixin):
             raise APIClientError(f"楽天宿泊検索 エラー: {str(e)}")
 
 
+class CachedRakutenAPIClient(LoggerMixin):
+    """
+    商品キャッシュ付きの楽天 API クライアント
+
+    RakutenAPIClient と同じインターフェースで、商品検索の結果を ProductCache に保存する。
+    block_on_miss=False の場合は楽天APIの応答を一切待たない（サイト生成向け）。
+    """
+    
+    def __init__(
+        self,
+        client: RakutenAPIClient,
+        cache: ProductCache,
+        block_on_miss: bool = True
+    ):
+        self.client = client
+        self.cache = cache
+        self.block_on_miss = block_on_miss
+        self.cache.on_error = self._on_refresh_error
+    
+    @property
+    def base_url(self) -> str:
+        """APIのベースURL"""
+        return self.client.base_url
+    
+    @base_url.setter
+    def base_url(self, value: str):
+        self.client.base_url = value
+    
+    def search_products(
+        self,
+        keyword: str,
+        max_results: int = 5,
+        min_price: int = 1000,
+        max_price: int = 50000
+    ) -> List[AffiliateProduct]:
+        """商品を検索（キャッシュ優先）"""
+        return self.search_products_many([keyword], max_results, min_price, max_price)[0]
+    
+    def search_products_many(
+        self,
+        keywords: List[str],
+        max_results: int = 5,
+        min_price: int = 1000,
+        max_price: int = 50000
+    ) -> List[List[AffiliateProduct]]:
+        """複数キーワードを検索（キャッシュ優先、結果はキーワード順）"""
+        entries = [
+            (ProductCache.make_key(
+                "products", keyword,
+                max_results=max_results, min_price=min_price, max_price=max_price
+            ), keyword)
+            for keyword in keywords
+        ]
+        
+        def fetch_many(pending: List[str]) -> List[List[Dict[str, Any]]]:
+            results = self.client.search_products_many(pending, max_results, min_price, max_price)
+            return [[asdict(product) for product in products] for products in results]
+        
+        payloads = self.cache.get_many(entries, fetch_many, block_on_miss=self.block_on_miss)
+        self.log_debug(f"Product cache: {self.cache.format_stats()}")
+        
+        return [
+            [AffiliateProduct(**item) for item in payload] if payload else []
+            for payload in payloads
+        ]
+    
+    def search_hotels(
+        self,
+        area_code: str = "01",
+        max_results: int = 3
+    ) -> List[AffiliateHotel]:
+        """宿泊施設を検索"""
+        if self.cache.offline:
+            return []
+        return self.client.search_hotels(area_code, max_results)
+    
+    def close(self):
+        """コネクションプールを解放"""
+        self.client.close()
+    
+    def _on_refresh_error(self, keyword: str, error: Exception):
+        """バックグラウンド再取得の失敗を記録（古い値は保持される）"""
+        self.log_warning(f"Product cache refresh failed for '{keyword}': {error}")
+
+
 class UnsplashAPIClient(LoggerMixin):
     """Unsplash API クライアント（無料版）"""
     
@@ -592,9 +970,34 @@ class APIClientFactory:
         return WordPressAPIClient()
     
     @staticmethod
-    def create_rakuten_client() -> RakutenAPIClient:
-        """楽天 API クライアントを作成"""
-        return RakutenAPIClient()
+    def create_rakuten_client(
+        block_on_miss: bool = True
+    ) -> Union[RakutenAPIClient, "CachedRakutenAPIClient"]:
+        """
+        楽天 API クライアントを作成
+        
+        商品キャッシュが有効な場合は CachedRakutenAPIClient を返す。
+        block_on_miss=False にすると、キャッシュにない商品は空で返し
+        楽天APIの応答を待たない（取得はバックグラウンドで行う）。
+        """
+        settings = get_settings()
+        client = RakutenAPIClient()
+        if not settings.PRODUCT_CACHE_ENABLED:
+            return client
+        
+        cache = APIClientFactory.create_product_cache()
+        return CachedRakutenAPIClient(client, cache, block_on_miss=block_on_miss)
+    
+    @staticmethod
+    def create_product_cache() -> ProductCache:
+        """設定に基づいて楽天商品キャッシュを作成"""
+        settings = get_settings()
+        return ProductCache(
+            db_path=settings.PRODUCT_CACHE_PATH,
+            fresh_seconds=settings.PRODUCT_CACHE_FRESH_HOURS * 3600,
+            max_stale_seconds=settings.PRODUCT_CACHE_MAX_STALE_HOURS * 3600,
+            offline=settings.RAKUTEN_OFFLINE
+        )
     
     @staticmethod
     def create_unsplash_client() -> UnsplashAPIClient:
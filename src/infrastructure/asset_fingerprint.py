@@ -0,0 +1,178 @@
+"""
+静的ファイル（CSS / JS）のファイル名に内容のハッシュを付ける実装
+
+"css/style.css" を "css/style.<ハッシュ>.css" として出力し、ページからはハッシュ付きの名前で参照する。
+内容が変わらない限り名前も変わらないため、ブラウザに長期間キャッシュさせても古い内容が残らない。
+更新日時のクエリ（?v=YYYYmmddHHMM）と異なり、CSS / JS が変わっていなければページも変わらない
+（差分ビルド・差分デプロイで再生成・再アップロードされない）。
+
+  - AssetManifest: 元のパス → ハッシュ付きのパスの対応表（テンプレートの描画時に参照する）
+  - fingerprint_site: 出力ディレクトリ内の CSS / JS にハッシュ付きの複製を作り、
+    生成済みHTMLの参照を書き換える（CSS / JS が出力ディレクトリに同居しているサイト用）
+
+標準ライブラリのみで実装しているため、設定（pydantic）を読み込まない
+サイト生成スクリプトからも利用できる。
+"""
+import hashlib
+import os
+import posixpath
+import re
+from pathlib import Path
+from typing import Dict, Iterable, List, Mapping, Optional, Tuple
+
+# ファイル名に付けるハッシュの桁数
+FINGERPRINT_LENGTH = 10
+
+# ハッシュを付ける拡張子（画像等はCSSから相対パスで参照されるため対象外）
+FINGERPRINT_EXTENSIONS = (".css", ".js")
+
+# ハッシュ付きのファイル名（.htaccess の長期キャッシュ設定と共通）
+FINGERPRINTED_NAME_PATTERN = r"\.[0-9a-f]{%d}\.(css|js)" % FINGERPRINT_LENGTH
+
+# パス中のハッシュ部分（以前のハッシュ付きの名前から元のパスを求める用）
+_FINGERPRINT_IN_NAME = re.compile(r"\.[0-9a-f]{%d}(?=\.[^./]+$)" % FINGERPRINT_LENGTH)
+
+# 出力ディレクトリ内で参照を書き換えないディレクトリ
+EXCLUDED_DIRS = {"__pycache__", ".git", ".snapshots", "templates"}
+
+
+def content_fingerprint(content: bytes) -> str:
+    """ファイル内容のハッシュ（ファイル名用に短縮）"""
+    return hashlib.sha256(content).hexdigest()[:FINGERPRINT_LENGTH]
+
+
+def fingerprinted_path(relative_path: str, content: bytes) -> str:
+    """"css/style.css" → "css/style.<ハッシュ>.css\""""
+    stem, ext = posixpath.splitext(relative_path)
+    return f"{stem}.{content_fingerprint(content)}{ext}"
+
+
+class AssetManifest:
+    """
+    元のパス → ハッシュ付きのパスの対応表
+
+    使い方:
+        assets = AssetManifest()
+        output_path = assets.add("static_fresh/css/site.css", content)
+        assets.url("static_fresh/css/site.css")  # → "/static_fresh/css/site.<ハッシュ>.css"
+    """
+
+    def __init__(self, mapping: Optional[Mapping[str, str]] = None):
+        self.mapping: Dict[str, str] = dict(mapping or {})
+
+    @classmethod
+    def from_directory(cls, source_dir: Path, url_prefix: str = "") -> Tuple["AssetManifest", List[Tuple[str, bytes]]]:
+        """
+        ディレクトリ内の静的ファイルから対応表を作成
+
+        Returns:
+            (対応表, [(出力先の相対パス, 内容), ...])。CSS / JS 以外のファイルは元の名前のまま
+        """
+        assets = cls()
+        files = []
+        source_dir = Path(source_dir)
+        for source in sorted(source_dir.rglob("*")):
+            if not source.is_file():
+                continue
+            relative_path = posixpath.join(url_prefix, source.relative_to(source_dir).as_posix())
+            content = source.read_bytes()
+            files.append((assets.add(relative_path, content), content))
+        return assets, files
+
+    def add(self, relative_path: str, content: bytes) -> str:
+        """ファイルを登録して出力先の相対パスを返す"""
+        if not relative_path.endswith(FINGERPRINT_EXTENSIONS):
+            return relative_path
+        output_path = fingerprinted_path(relative_path, content)
+        self.mapping[relative_path] = output_path
+        return output_path
+
+    def url(self, relative_path: str) -> str:
+        """テンプレートで使うURL（登録されていないファイルは元のパスのまま）"""
+        relative_path = relative_path.lstrip("/")
+        return "/" + self.mapping.get(relative_path, relative_path)
+
+    def subset(self, relative_paths: Iterable[str]) -> Dict[str, str]:
+        """指定したファイルの対応（ページの入力ハッシュに含める用）"""
+        return {path: self.mapping.get(path.lstrip("/"), path) for path in sorted(set(relative_paths))}
+
+
+def fingerprint_site(site_dir: Path, asset_paths: Iterable[str]) -> Tuple[AssetManifest, List[Path]]:
+    """
+    出力ディレクトリ内の CSS / JS にハッシュ付きの複製を作り、HTMLの参照を書き換える
+
+    参照は "/css/style.css" "../../css/style.css" "css/style.css?v=..." のいずれの形式も、
+    以前のハッシュ付きの名前も書き換える。内容の変わらないHTMLは書き込まない。
+
+    Args:
+        site_dir: 出力ディレクトリ
+        asset_paths: 出力ディレクトリからの相対パス（"css/style.css" 等）
+
+    Returns:
+        (対応表, 書き換えたHTMLファイル)
+    """
+    site_dir = Path(site_dir)
+    assets = AssetManifest()
+    for relative_path in asset_paths:
+        source = site_dir / relative_path
+        if not source.is_file():
+            continue
+        content = source.read_bytes()
+        output_path = assets.add(relative_path, content)
+        target = site_dir / output_path
+        if not target.exists():
+            target.write_bytes(content)
+        _remove_stale_copies(source, target)
+
+    updated = []
+    pattern = reference_pattern(assets.mapping)
+    if pattern is None:
+        return assets, updated
+    for root, dirs, files in os.walk(site_dir):
+        dirs[:] = sorted(d for d in dirs if d not in EXCLUDED_DIRS)
+        for name in sorted(files):
+            if not name.endswith(".html"):
+                continue
+            path = Path(root) / name
+            html = path.read_text(encoding="utf-8")
+            rewritten = rewrite_references(html, assets.mapping, pattern)
+            if rewritten != html:
+                path.write_text(rewritten, encoding="utf-8")
+                updated.append(path)
+    return assets, updated
+
+
+def reference_pattern(mapping: Mapping[str, str]) -> Optional["re.Pattern[str]"]:
+    """HTML属性内の参照（以前のハッシュ・クエリ付きを含む）に一致する正規表現"""
+    if not mapping:
+        return None
+    alternatives = []
+    for relative_path in sorted(mapping, key=len, reverse=True):
+        stem, ext = posixpath.splitext(relative_path)
+        alternatives.append(f"{re.escape(stem)}(?:\\.[0-9a-f]{{{FINGERPRINT_LENGTH}}})?{re.escape(ext)}")
+    return re.compile(
+        r"(?P<quote>[\"'])(?P<prefix>/|(?:\.\./)*)(?P<path>" + "|".join(alternatives) + r")(?:\?[^\"'#]*)?(?=[\"'#])"
+    )
+
+
+def rewrite_references(html: str, mapping: Mapping[str, str], pattern: Optional["re.Pattern[str]"] = None) -> str:
+    """HTML内の参照をハッシュ付きの名前に書き換える"""
+    pattern = pattern if pattern is not None else reference_pattern(mapping)
+    if pattern is None:
+        return html
+
+    def replace(match: "re.Match[str]") -> str:
+        # 以前のハッシュ付きの名前は元のパスに戻してから対応表を引く
+        original = _FINGERPRINT_IN_NAME.sub("", match.group("path"))
+        return match.group("quote") + match.group("prefix") + mapping[original]
+
+    return pattern.sub(replace, html)
+
+
+def _remove_stale_copies(source: Path, current: Path):
+    """同じファイルの古いハッシュ付きの複製を削除"""
+    stem, ext = os.path.splitext(source.name)
+    stale = re.compile(re.escape(stem) + r"\.[0-9a-f]{%d}" % FINGERPRINT_LENGTH + re.escape(ext) + r"$")
+    for sibling in source.parent.iterdir():
+        if sibling != current and stale.match(sibling.name):
+            sibling.unlink()
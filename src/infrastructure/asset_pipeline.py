@@ -0,0 +1,672 @@
+"""
+生成済み静的サイトの後処理（縮小・事前圧縮）の実装
+
+サイト生成後の出力ディレクトリに対して次の処理を行う。
+
+  - HTML / CSS / JS の縮小（コメントと不要な空白の削除。表示と動作は変えない）
+  - テキスト系ファイルごとに .gz（gzip）と .br（Brotli）の圧縮済みファイルを併置
+  - 圧縮済みファイルをブラウザの Accept-Encoding に応じて返す .htaccess（Apache / LiteSpeed 用）
+
+サーバー側でリクエストごとに圧縮する必要がなくなり、最高圧縮率で作成したファイルをそのまま返せる。
+前回から変更のないファイルは圧縮し直さないため、差分ビルド後に毎回実行してよい。
+
+標準ライブラリのみで実装しているため、設定（pydantic）を読み込まない
+サイト生成スクリプトからも利用できる（Brotli は brotli パッケージがある場合のみ作成する）。
+"""
+import gzip
+import json
+import os
+import re
+import unicodedata
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Callable, Dict, Iterator, List, Tuple
+
+try:
+    import brotli
+except ImportError:  # pragma: no cover - brotli は任意の依存関係
+    brotli = None
+
+from src.infrastructure.asset_fingerprint import FINGERPRINTED_NAME_PATTERN
+
+# 圧縮対象の拡張子と Content-Type
+TEXT_ASSET_TYPES: Dict[str, str] = {
+    "html": "text/html; charset=utf-8",
+    "css": "text/css; charset=utf-8",
+    "js": "text/javascript; charset=utf-8",
+    "svg": "image/svg+xml",
+    "json": "application/json; charset=utf-8",
+    "xml": "application/xml; charset=utf-8",
+    "txt": "text/plain; charset=utf-8",
+}
+
+# 圧縮してもほとんど小さくならないため圧縮済みファイルを作らない大きさ（バイト）
+MIN_COMPRESS_SIZE = 256
+
+# .htaccess 内で本処理が管理する範囲の目印（範囲外の記述は変更しない）
+HTACCESS_BEGIN = "# BEGIN PrecompressedAssets"
+HTACCESS_END = "# END PrecompressedAssets"
+
+# 出力ディレクトリ内で処理しないディレクトリ（ミニマルサイトは生成スクリプト・テンプレートと同居している）
+EXCLUDED_DIRS = {"__pycache__", ".git", ".snapshots", "templates"}
+
+
+# ---- CSS ----
+
+_CSS_TOKEN = re.compile(
+    r'(?P<string>"(?:\\.|[^"\\])*"|\'(?:\\.|[^\'\\])*\')'
+    r"|(?P<comment>/\*.*?\*/)"
+    r"|(?P<url>url\(\s*[^)'\"\s][^)]*\))",
+    re.DOTALL | re.IGNORECASE,
+)
+
+
+def minify_css(source: str) -> str:
+    """
+    CSSを縮小
+
+    文字列と url(...) の中身には触れず、それ以外の部分のコメントと空白を削除する。
+    /*! で始まるコメント（ライセンス表記）は残す。
+    """
+    out: List[str] = []
+    code: List[str] = []
+    position = 0
+    for match in _CSS_TOKEN.finditer(source):
+        code.append(source[position:match.start()])
+        position = match.end()
+        token = match.group(0)
+        if match.group("comment") is not None and not token.startswith("/*!"):
+            # コメントの前後のコードはまとめて詰める（何度縮小しても同じ結果にする）
+            code.append(" ")
+            continue
+        out.append(_squeeze_css("".join(code)))
+        out.append(token)
+        code = []
+    code.append(source[position:])
+    out.append(_squeeze_css("".join(code)))
+    return re.sub(r";+}", "}", "".join(out)).strip()
+
+
+def _squeeze_css(chunk: str) -> str:
+    """文字列・コメント以外の部分の空白を詰める"""
+    chunk = re.sub(r"\s+", " ", chunk)
+    # セレクタの子孫結合子（".a :hover"）を壊さないよう、":" は後ろの空白だけを削除する
+    chunk = re.sub(r" ?([{};,>]) ?", r"\1", chunk)
+    return re.sub(r": ", ":", chunk)
+
+
+# ---- JavaScript ----
+
+# この文字の直後の "/" は除算ではなく正規表現リテラルの開始
+_REGEX_PRECEDERS = set("(,=:[!&|?{};+-*%<>~^")
+_REGEX_KEYWORDS = ("return", "typeof", "instanceof", "in", "of", "new", "delete", "void", "throw", "case", "do", "else")
+
+
+class _UnterminatedLiteral(ValueError):
+    """文字列・コメント・正規表現が閉じていない（縮小を諦めて元のまま返す）"""
+
+
+def minify_js(source: str) -> str:
+    """
+    JavaScriptを縮小
+
+    コメント・行頭のインデント・空行・連続する空白を削除する。
+    改行は自動セミコロン挿入の挙動を変えないよう残す。字句を解析できない場合は元のまま返す。
+    """
+    try:
+        parts = list(_scan_js(source))
+    except _UnterminatedLiteral:
+        return source
+    return "".join(parts).strip()
+
+
+def _scan_js(source: str) -> Iterator[str]:
+    """コードを走査し、リテラルはそのまま・コードは空白を詰めて返す"""
+    code: List[str] = []  # 次のリテラルまでのコード（コメントは空白に置き換える）
+    code_start = 0
+    i = 0
+    last_significant = ""
+
+    def flush(until: int) -> str:
+        chunk = "".join(code) + source[code_start:until]
+        code.clear()
+        chunk = re.sub(r"[ \t]*\n\s*", "\n", chunk)
+        return re.sub(r"[ \t]+", " ", chunk)
+
+    while i < len(source):
+        char = source[i]
+        if char in "\"'`" or (char == "/" and not source.startswith(("//", "/*"), i)
+                              and _regex_allowed(source, code_start, i, last_significant)):
+            yield flush(i)
+            if char == "`":
+                literal_end = _skip_template(source, i)
+            elif char == "/":
+                literal_end = _skip_regex(source, i)
+            else:
+                literal_end = _skip_string(source, i, char)
+            yield source[i:literal_end]
+            i = code_start = literal_end
+            last_significant = char
+            continue
+        if source.startswith("//", i):
+            code.append(source[code_start:i])
+            newline = source.find("\n", i)
+            i = code_start = len(source) if newline == -1 else newline
+            continue
+        if source.startswith("/*", i):
+            code.append(source[code_start:i])
+            close = source.find("*/", i + 2)
+            if close == -1:
+                raise _UnterminatedLiteral("comment")
+            # 改行を含むコメントは改行に置き換える（自動セミコロン挿入の位置を保つ）
+            code.append("\n" if "\n" in source[i:close] else " ")
+            i = code_start = close + 2
+            continue
+        if not char.isspace():
+            last_significant = char
+        i += 1
+    yield flush(len(source))
+
+
+def _regex_allowed(source: str, code_start: int, index: int, last_significant: str) -> bool:
+    """index の "/" が正規表現リテラルの開始か（直前の字句から判定）"""
+    before = source[code_start:index].rstrip()
+    if not before:
+        # 直前がリテラルかコメントの場合
+        return last_significant == "" or last_significant in _REGEX_PRECEDERS
+    word = re.search(r"[\w$]+$", before)
+    if word is not None:
+        # 識別子・数値の後は除算（return /x/ のようなキーワードの後は正規表現）
+        return word.group(0) in _REGEX_KEYWORDS
+    return before[-1] in _REGEX_PRECEDERS
+
+
+def _skip_string(source: str, start: int, quote: str) -> int:
+    """文字列リテラルの終端の次の位置"""
+    i = start + 1
+    while i < len(source):
+        char = source[i]
+        if char == "\\":
+            i += 2
+            continue
+        if char == quote:
+            return i + 1
+        if char == "\n":
+            break
+        i += 1
+    raise _UnterminatedLiteral("string")
+
+
+def _skip_template(source: str, start: int) -> int:
+    """テンプレートリテラルの終端の次の位置（${...} 内のコードも解析する）"""
+    i = start + 1
+    while i < len(source):
+        char = source[i]
+        if char == "\\":
+            i += 2
+            continue
+        if char == "`":
+            return i + 1
+        if source.startswith("${", i):
+            # 式の中身は縮小せず、対応する "}" まで読み飛ばす
+            i = _matching_brace(source, i + 2) + 1
+            continue
+        i += 1
+    raise _UnterminatedLiteral("template")
+
+
+def _matching_brace(source: str, start: int) -> int:
+    """start から始まる式を閉じる "}" の位置（文字列・テンプレートは読み飛ばす）"""
+    depth = 0
+    i = start
+    while i < len(source):
+        char = source[i]
+        if char in "\"'":
+            i = _skip_string(source, i, char)
+            continue
+        if char == "`":
+            i = _skip_template(source, i)
+            continue
+        if char == "{":
+            depth += 1
+        elif char == "}":
+            if depth == 0:
+                return i
+            depth -= 1
+        i += 1
+    raise _UnterminatedLiteral("template expression")
+
+
+def _skip_regex(source: str, start: int) -> int:
+    """正規表現リテラルの終端（フラグを含む）の次の位置"""
+    i = start + 1
+    in_class = False
+    while i < len(source):
+        char = source[i]
+        if char == "\\":
+            i += 2
+            continue
+        if char == "\n":
+            break
+        if char == "[":
+            in_class = True
+        elif char == "]":
+            in_class = False
+        elif char == "/" and not in_class:
+            i += 1
+            while i < len(source) and (source[i].isalnum() or source[i] in "_$"):
+                i += 1
+            return i
+        i += 1
+    raise _UnterminatedLiteral("regex")
+
+
+# ---- HTML ----
+
+# 空白を削除しても表示が変わらない（ブロックレベル・非表示）要素
+_BLOCK_TAGS = {
+    "html", "head", "body", "title", "meta", "link", "script", "style", "noscript", "base",
+    "header", "footer", "main", "nav", "section", "article", "aside", "div", "p", "br", "hr",
+    "h1", "h2", "h3", "h4", "h5", "h6", "ul", "ol", "li", "dl", "dt", "dd", "table", "thead",
+    "tbody", "tfoot", "tr", "th", "td", "caption", "form", "fieldset", "legend", "figure",
+    "figcaption", "blockquote", "address", "details", "summary", "option", "optgroup", "iframe",
+    "picture", "source", "template", "pre", "!doctype",
+}
+
+# 中身をそのまま残す要素
+_RAW_TAGS = ("pre", "textarea", "script", "style")
+
+_HTML_TOKEN = re.compile(
+    r"(?P<raw><(?P<raw_tag>pre|textarea|script|style)\b(?:[^>\"']|\"[^\"]*\"|'[^']*')*>.*?</(?P=raw_tag)\s*>)"
+    r"|(?P<comment><!--.*?-->)"
+    r"|(?P<tag></?[A-Za-z!][^\s/>]*(?:[^>\"']|\"[^\"]*\"|'[^']*')*>)",
+    re.DOTALL | re.IGNORECASE,
+)
+
+_SCRIPT_TYPE = re.compile(r"\btype\s*=\s*[\"']?([^\"'\s>]+)", re.IGNORECASE)
+
+
+def minify_html(source: str) -> str:
+    """
+    HTMLを縮小
+
+    コメント（条件付きコメントを除く）を削除し、テキスト中の連続する空白を1つにまとめる。
+    ブロックレベル要素の前後の空白は削除する。pre / textarea の中身はそのまま残し、
+    script / style の中身はそれぞれ JS / CSS として縮小する。
+    """
+    tokens: List[Tuple[str, str]] = []  # (種類, 内容)。種類は "text" / "tag" / "raw"
+
+    def add_text(text: str):
+        # 削除したコメントの前後のテキストは1つにまとめる
+        if tokens and tokens[-1][0] == "text":
+            tokens[-1] = ("text", tokens[-1][1] + text)
+        else:
+            tokens.append(("text", text))
+
+    position = 0
+    for match in _HTML_TOKEN.finditer(source):
+        if match.start() > position:
+            add_text(source[position:match.start()])
+        position = match.end()
+        if match.group("comment") is not None:
+            comment = match.group("comment")
+            if comment.startswith(("<!--[if", "<!--<![endif]", "<!--<!")):
+                tokens.append(("raw", comment))
+            continue
+        if match.group("raw") is not None:
+            tokens.append(("raw", _minify_raw_element(match.group("raw"), match.group("raw_tag").lower())))
+        else:
+            tokens.append(("tag", match.group("tag")))
+    if position < len(source):
+        add_text(source[position:])
+
+    out: List[str] = []
+    for index, (kind, content) in enumerate(tokens):
+        if kind != "text":
+            out.append(content)
+            continue
+        text = re.sub(r"\s+", " ", content)
+        if text.startswith(" ") and _is_block_boundary(tokens, index - 1):
+            text = text[1:]
+        if text.endswith(" ") and _is_block_boundary(tokens, index + 1):
+            text = text[:-1]
+        out.append(text)
+    return "".join(out).strip()
+
+
+def _is_block_boundary(tokens: List[Tuple[str, str]], index: int) -> bool:
+    """隣接するトークンがブロックレベル要素のタグ（または文書の端）か"""
+    if index < 0 or index >= len(tokens):
+        return True
+    kind, content = tokens[index]
+    if kind == "text":
+        return False
+    name = re.match(r"</?\s*([A-Za-z!][^\s/>]*)", content)
+    return name is not None and name.group(1).lower() in _BLOCK_TAGS
+
+
+def _minify_raw_element(element: str, tag: str) -> str:
+    """pre / textarea / script / style 要素（中身を要素の種類に応じて縮小）"""
+    open_end = re.match(r"<(?:[^>\"']|\"[^\"]*\"|'[^']*')*>", element).end()
+    close_start = element.lower().rindex("</" + tag)
+    open_tag, body, close_tag = element[:open_end], element[open_end:close_start], element[close_start:]
+
+    if tag == "style":
+        body = minify_css(body)
+    elif tag == "script" and body.strip():
+        script_type = _SCRIPT_TYPE.search(open_tag)
+        script_type = script_type.group(1).lower() if script_type else "text/javascript"
+        if script_type in ("text/javascript", "application/javascript", "module"):
+            body = minify_js(body)
+        elif script_type.endswith("json"):
+            try:
+                # "</" を含む値がスクリプト要素を閉じないよう "<" をエスケープする
+                body = json.dumps(json.loads(body), ensure_ascii=False, separators=(",", ":")).replace("<", "\\u003c")
+            except ValueError:
+                pass
+    return open_tag + body + close_tag
+
+
+MINIFIERS: Dict[str, Callable[[str], str]] = {
+    "html": minify_html,
+    "css": minify_css,
+    "js": minify_js,
+}
+
+
+# ---- 事前圧縮・.htaccess ----
+
+@dataclass
+class AssetStats:
+    """拡張子ごとの集計（バイト数）"""
+    files: int = 0
+    original: int = 0
+    minified: int = 0
+    gzip: int = 0
+    brotli: int = 0
+
+
+@dataclass
+class PipelineReport:
+    """後処理の結果"""
+    stats: Dict[str, AssetStats] = field(default_factory=dict)
+    minified_files: int = 0
+    compressed_files: int = 0
+    up_to_date_files: int = 0
+    removed_siblings: int = 0
+    brotli_available: bool = brotli is not None
+
+    def format_report(self) -> str:
+        """拡張子ごとの削減量の表"""
+        lines = ["".join(
+            _pad(title, width, left=index == 0)
+            for index, (title, width) in enumerate(zip(_REPORT_COLUMNS, _REPORT_WIDTHS))
+        )]
+        total = AssetStats()
+        for ext in sorted(self.stats):
+            stats = self.stats[ext]
+            lines.append(self._format_row(ext, stats))
+            for name in ("files", "original", "minified", "gzip", "brotli"):
+                setattr(total, name, getattr(total, name) + getattr(stats, name))
+        lines.append(self._format_row("合計", total))
+        lines.append(
+            f"縮小 {self.minified_files}件 / 圧縮 {self.compressed_files}件 / "
+            f"変更なし {self.up_to_date_files}件 / 古い圧縮ファイルの削除 {self.removed_siblings}件"
+        )
+        if not self.brotli_available:
+            lines.append("⚠️ brotli パッケージがないため .br は作成していません（pip install brotli）")
+        return "\n".join(lines)
+
+    def _format_row(self, label: str, stats: AssetStats) -> str:
+        # 転送量はブラウザが受け取るうち最小のもの（Brotli 非対応の環境では gzip）
+        transferred = stats.brotli if self.brotli_available and stats.brotli else stats.gzip
+        saved = 1 - transferred / stats.original if stats.original else 0.0
+        values = [label, str(stats.files), _kb(stats.original), _kb(stats.minified),
+                  _kb(stats.gzip), _kb(stats.brotli), f"{saved:.0%}"]
+        return "".join(
+            _pad(value, width, left=index == 0) for index, (value, width) in enumerate(zip(values, _REPORT_WIDTHS))
+        )
+
+
+_REPORT_COLUMNS = ("種類", "件数", "元サイズ", "縮小後", "gzip", "brotli", "削減率")
+_REPORT_WIDTHS = (6, 6, 12, 12, 12, 12, 8)
+
+
+def _kb(size: int) -> str:
+    return f"{size / 1024:.1f}KB"
+
+
+def _pad(text: str, width: int, left: bool = False) -> str:
+    """全角文字を2桁として幅を揃える"""
+    padding = " " * max(0, width - sum(2 if unicodedata.east_asian_width(c) in "WF" else 1 for c in text))
+    return text + padding if left else padding + text
+
+
+class AssetPipeline:
+    """
+    出力ディレクトリの縮小・事前圧縮・.htaccess 作成
+
+    使い方:
+        report = AssetPipeline(Path("site_fresh")).run()
+        print(report.format_report())
+    """
+
+    def __init__(
+        self,
+        output_dir: Path,
+        minify: bool = True,
+        precompress: bool = True,
+        htaccess: bool = True,
+    ):
+        self.output_dir = Path(output_dir)
+        self.minify = minify
+        self.precompress = precompress
+        self.htaccess = htaccess
+
+    def run(self) -> PipelineReport:
+        """後処理を実行"""
+        report = PipelineReport()
+        report.removed_siblings = self.remove_stale_siblings()
+        for path, ext in self.iter_assets():
+            stats = report.stats.setdefault(ext, AssetStats())
+            self._process(path, ext, stats, report)
+        if self.htaccess and self.precompress:
+            write_htaccess(self.output_dir)
+        return report
+
+    def iter_assets(self) -> Iterator[Tuple[Path, str]]:
+        """処理対象のファイルと拡張子"""
+        for root, dirs, files in os.walk(self.output_dir):
+            dirs[:] = sorted(d for d in dirs if d not in EXCLUDED_DIRS)
+            for name in sorted(files):
+                ext = name.rsplit(".", 1)[-1].lower() if "." in name else ""
+                if ext in TEXT_ASSET_TYPES:
+                    yield Path(root) / name, ext
+
+    def remove_stale_siblings(self) -> int:
+        """元のファイルが削除された .gz / .br を削除して削除件数を返す"""
+        removed = 0
+        for root, dirs, files in os.walk(self.output_dir):
+            dirs[:] = [d for d in dirs if d not in EXCLUDED_DIRS]
+            for name in files:
+                base, _, suffix = name.rpartition(".")
+                if suffix in ("gz", "br") and base.rsplit(".", 1)[-1].lower() in TEXT_ASSET_TYPES:
+                    if base not in files:
+                        os.remove(os.path.join(root, name))
+                        removed += 1
+        return removed
+
+    def _process(self, path: Path, ext: str, stats: AssetStats, report: PipelineReport):
+        """1ファイルを縮小・圧縮して集計"""
+        stats.files += 1
+        if self.precompress and self._is_current(path):
+            # 前回の処理以降に変更されていない（縮小・圧縮済み）
+            size = path.stat().st_size
+            stats.original += size
+            stats.minified += size
+            gz_path, br_path = self._siblings(path)
+            stats.gzip += gz_path.stat().st_size
+            stats.brotli += br_path.stat().st_size if brotli is not None else size
+            report.up_to_date_files += 1
+            return
+
+        data = path.read_bytes()
+        # 縮小済みのファイルは縮小後のサイズが元サイズになる（差分ビルドで再生成されたページのみ縮小前）
+        stats.original += len(data)
+
+        minifier = MINIFIERS.get(ext) if self.minify else None
+        if minifier is not None:
+            try:
+                minified = minifier(data.decode("utf-8")).encode("utf-8")
+            except UnicodeDecodeError:
+                minified = data
+            if len(minified) < len(data):
+                data = minified
+                path.write_bytes(data)
+                report.minified_files += 1
+        stats.minified += len(data)
+
+        if not self.precompress or len(data) < MIN_COMPRESS_SIZE:
+            # 圧縮済みファイルを作らない場合は、以前の内容から作った圧縮済みファイルを残さない
+            for sibling in self._siblings(path):
+                if sibling.exists():
+                    sibling.unlink()
+            stats.gzip += len(data)
+            stats.brotli += len(data)
+            return
+
+        for sibling, compress in self._compressors(path):
+            size = _write_sibling(sibling, compress(data), path)
+            if sibling.suffix == ".gz":
+                stats.gzip += size
+            else:
+                stats.brotli += size
+        if brotli is None:
+            stats.brotli += len(data)
+        report.compressed_files += 1
+
+    def _is_current(self, path: Path) -> bool:
+        """圧縮済みファイルがすべて現在の内容から作成されたものか"""
+        source_mtime = path.stat().st_mtime_ns
+        return all(_sibling_is_current(sibling, source_mtime) for sibling, _ in self._compressors(path))
+
+    @staticmethod
+    def _siblings(path: Path) -> List[Path]:
+        return [path.with_name(path.name + ".gz"), path.with_name(path.name + ".br")]
+
+    def _compressors(self, path: Path) -> List[Tuple[Path, Callable[[bytes], bytes]]]:
+        gz_path, br_path = self._siblings(path)
+        compressors = [(gz_path, _gzip)]
+        if brotli is not None:
+            compressors.append((br_path, _brotli))
+        return compressors
+
+
+def _gzip(data: bytes) -> bytes:
+    # mtime=0 で毎回同じバイト列にする（差分デプロイで無駄にアップロードしない）
+    return gzip.compress(data, compresslevel=9, mtime=0)
+
+
+def _brotli(data: bytes) -> bytes:
+    return brotli.compress(data, quality=11, mode=brotli.MODE_TEXT)
+
+
+def _sibling_is_current(sibling: Path, source_mtime: int) -> bool:
+    """圧縮済みファイルが現在の元ファイルから作成されたものか（更新時刻を揃えて記録している）"""
+    try:
+        return sibling.stat().st_mtime_ns == source_mtime
+    except FileNotFoundError:
+        return False
+
+
+def _write_sibling(sibling: Path, data: bytes, source: Path) -> int:
+    """圧縮済みファイルを書き込み、更新時刻を元ファイルに揃える"""
+    tmp_path = sibling.with_name(f".{sibling.name}.{os.getpid()}.tmp")
+    tmp_path.write_bytes(data)
+    source_stat = source.stat()
+    os.utime(tmp_path, ns=(source_stat.st_atime_ns, source_stat.st_mtime_ns))
+    os.replace(tmp_path, sibling)
+    return len(data)
+
+
+def build_htaccess_block() -> str:
+    """圧縮済みファイルを返すための .htaccess の記述"""
+    extensions = "|".join(TEXT_ASSET_TYPES)
+    lines = [
+        HTACCESS_BEGIN,
+        "# サイト生成時に作成した .br / .gz をそのまま返す（asset_pipeline.py が自動生成）",
+        "<IfModule mod_rewrite.c>",
+        "    RewriteEngine On",
+        "",
+    ]
+    for suffix, encoding in (("br", "br"), ("gz", "gzip")):
+        lines += [
+            f"    # {encoding} に対応したブラウザには .{suffix} を返す",
+            f'    RewriteCond "%{{HTTP:Accept-Encoding}}" "{encoding}"',
+            f'    RewriteCond "%{{REQUEST_FILENAME}}\\.{suffix}" "-s"',
+            f'    RewriteRule "^(.*)\\.({extensions})$" "$1.$2.{suffix}" [QSA,L]',
+            f'    RewriteCond "%{{HTTP:Accept-Encoding}}" "{encoding}"',
+            f'    RewriteCond "%{{REQUEST_FILENAME}}index.html\\.{suffix}" "-s"',
+            f'    RewriteRule "^(.*/)?$" "$1index.html.{suffix}" [QSA,L]',
+            "",
+        ]
+    lines.append("    # 正しい Content-Type を返し、サーバー側で再圧縮しない")
+    for ext, content_type in TEXT_ASSET_TYPES.items():
+        lines.append(
+            f'    RewriteRule "\\.{ext}\\.(br|gz)$" "-" [T={content_type.split(";")[0]},E=no-gzip:1,E=no-brotli:1]'
+        )
+    lines += [
+        "</IfModule>",
+        "",
+        "<IfModule mod_headers.c>",
+        '    <FilesMatch "\\.(' + extensions + ')\\.br$">',
+        "        Header set Content-Encoding br",
+        "        Header append Vary Accept-Encoding",
+        "    </FilesMatch>",
+        '    <FilesMatch "\\.(' + extensions + ')\\.gz$">',
+        "        Header set Content-Encoding gzip",
+        "        Header append Vary Accept-Encoding",
+        "    </FilesMatch>",
+        '    <FilesMatch "\\.(' + extensions + ')$">',
+        "        Header append Vary Accept-Encoding",
+        "    </FilesMatch>",
+        "    # ファイル名に内容のハッシュを含む CSS / JS は内容が変わらないため長期間キャッシュさせる",
+        f'    <FilesMatch "{FINGERPRINTED_NAME_PATTERN}(\\.(br|gz))?$">',
+        '        Header set Cache-Control "public, max-age=31536000, immutable"',
+        "    </FilesMatch>",
+        "</IfModule>",
+        "",
+        "<IfModule mod_mime.c>",
+        "    # .gz を application/gzip として返さない",
+        "    RemoveType .gz .br",
+        "    RemoveEncoding .gz .br",
+        "    AddCharset utf-8 .html .css .js .json .xml .txt",
+        "</IfModule>",
+        HTACCESS_END,
+    ]
+    return "\n".join(lines) + "\n"
+
+
+def write_htaccess(output_dir: Path) -> Path:
+    """出力ディレクトリの .htaccess に記述を追加・更新（目印の範囲外の記述はそのまま残す）"""
+    path = Path(output_dir) / ".htaccess"
+    block = build_htaccess_block()
+    try:
+        existing = path.read_text(encoding="utf-8")
+    except FileNotFoundError:
+        existing = ""
+
+    pattern = re.compile(re.escape(HTACCESS_BEGIN) + r".*?" + re.escape(HTACCESS_END) + r"\n?", re.DOTALL)
+    if pattern.search(existing):
+        updated = pattern.sub(lambda _: block, existing, count=1)
+    else:
+        updated = block + ("\n" + existing if existing else "")
+
+    if updated != existing:
+        path.write_text(updated, encoding="utf-8")
+    return path
+
+
+def optimize_site(output_dir: Path, minify: bool = True, precompress: bool = True) -> PipelineReport:
+    """出力ディレクトリの後処理を実行して結果を返す"""
+    return AssetPipeline(output_dir, minify=minify, precompress=precompress).run()
@@ -0,0 +1,199 @@
+"""
+静的サイトの差分ビルド用マニフェスト実装
+
+出力ファイルごとに「入力（テンプレート・データ等）のハッシュ」を記録し、
+次回のビルドで入力が変わっていないページは再生成せずにスキップする。
+今回のビルドで生成対象にならなかった出力（削除された山のページ等）は孤立ファイルとして削除する。
+
+設定（pydantic）を読み込まないサイト生成スクリプトからも利用できるよう、
+標準ライブラリのみで実装している（jinja2 はテンプレートのハッシュ計算時のみ読み込む）。
+"""
+import hashlib
+import json
+import os
+from pathlib import Path
+from typing import Any, Callable, Dict, Set, Union
+
+# マニフェストの形式バージョン（構造を変えたら上げる。不一致の場合は全ページ再生成）
+MANIFEST_VERSION = 1
+
+Content = Union[str, bytes]
+
+
+def digest_of(*parts: Any) -> str:
+    """入力のハッシュ値（JSONに変換できる値を順番込みでハッシュ化）"""
+    hasher = hashlib.sha256()
+    for part in parts:
+        if isinstance(part, bytes):
+            hasher.update(part)
+        else:
+            hasher.update(json.dumps(part, ensure_ascii=False, sort_keys=True, default=str).encode("utf-8"))
+        # 区切りを入れて ("ab", "c") と ("a", "bc") を区別する
+        hasher.update(b"\0")
+    return hasher.hexdigest()
+
+
+class BuildManifest:
+    """
+    出力ファイルと入力ハッシュの対応表
+
+    使い方:
+        manifest = BuildManifest(output_dir, manifest_path)
+        manifest.build("index.html", digest_of(template_hash, context), lambda: template.render(**context))
+        ...
+        manifest.remove_orphans()
+        manifest.save()
+    """
+
+    def __init__(self, output_dir: Path, manifest_path: Path, reset: bool = False):
+        """
+        Args:
+            reset: Trueの場合は前回の記録を無視して全ページを生成する
+        """
+        self.output_dir = Path(output_dir)
+        self.manifest_path = Path(manifest_path)
+
+        self.rebuilt = 0
+        self.skipped = 0
+        self.removed = 0
+
+        self._previous: Dict[str, str] = {} if reset else self._load()
+        self._current: Dict[str, str] = {}
+
+    @property
+    def exists(self) -> bool:
+        """前回のビルド結果が記録されているか"""
+        return bool(self._previous)
+
+    def build(self, relative_path: str, digest: str, produce: Callable[[], Content]) -> bool:
+        """
+        出力ファイルを必要な場合だけ生成
+
+        Args:
+            relative_path: 出力ディレクトリからの相対パス
+            digest: このファイルの入力のハッシュ値（digest_of で作成）
+            produce: ファイル内容を生成する関数（スキップ時は呼ばれない）
+
+        Returns:
+            生成した場合はTrue、スキップした場合はFalse
+        """
+        if self.skip_if_current(relative_path, digest):
+            return False
+        self.write(relative_path, digest, produce())
+        return True
+
+    def skip_if_current(self, relative_path: str, digest: str) -> bool:
+        """入力が前回と同じで出力も残っている場合はスキップとして記録してTrueを返す"""
+        if self._previous.get(relative_path) == digest and (self.output_dir / relative_path).exists():
+            self._current[relative_path] = digest
+            self.skipped += 1
+            return True
+        return False
+
+    def write(self, relative_path: str, digest: str, content: Content):
+        """生成した内容を書き込んで記録（並列生成した結果の書き込み用）"""
+        output_file = self.output_dir / relative_path
+        output_file.parent.mkdir(parents=True, exist_ok=True)
+        if isinstance(content, str):
+            output_file.write_text(content, encoding="utf-8")
+        else:
+            output_file.write_bytes(content)
+
+        self._current[relative_path] = digest
+        self.rebuilt += 1
+
+    def remove_orphans(self) -> int:
+        """前回は生成したが今回は生成対象外だった出力を削除して削除件数を返す"""
+        for relative_path in sorted(set(self._previous) - set(self._current)):
+            output_file = self.output_dir / relative_path
+            try:
+                output_file.unlink()
+            except FileNotFoundError:
+                continue
+            self.removed += 1
+            self._prune_empty_dirs(output_file.parent)
+        return self.removed
+
+    def save(self):
+        """今回のビルド結果を保存"""
+        self.manifest_path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.manifest_path.with_suffix(f".{os.getpid()}.tmp")
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump({"version": MANIFEST_VERSION, "outputs": self._current}, f, ensure_ascii=False, indent=1)
+        os.replace(tmp_path, self.manifest_path)
+        self._previous = dict(self._current)
+
+    def format_stats(self) -> str:
+        """ログ出力用の統計文字列"""
+        return f"再生成 {self.rebuilt}件 / スキップ {self.skipped}件 / 削除 {self.removed}件"
+
+    def _load(self) -> Dict[str, str]:
+        """前回のマニフェストを読み込み（存在しない・壊れている場合は空）"""
+        try:
+            with open(self.manifest_path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            return {}
+        if not isinstance(data, dict) or data.get("version") != MANIFEST_VERSION:
+            return {}
+        return dict(data.get("outputs", {}))
+
+    def _prune_empty_dirs(self, directory: Path):
+        """削除で空になったディレクトリを出力ディレクトリの手前まで削除"""
+        output_dir = self.output_dir.resolve()
+        directory = directory.resolve()
+        while directory != output_dir and output_dir in directory.parents:
+            try:
+                directory.rmdir()
+            except OSError:
+                break
+            directory = directory.parent
+
+
+def template_chain_digest(env: Any, name: str, loader: Any = None, _seen: Set[str] = None) -> str:
+    """
+    Jinja2テンプレートと、extends/include/import で参照するテンプレートすべてのハッシュ値
+
+    Args:
+        env: jinja2.Environment
+        name: テンプレート名
+        loader: ソースを読み込むローダー（省略時は env.loader。事前コンパイル済みの
+            テンプレートを読むローダーはソースを返せないため、その場合に指定する）
+    """
+    from jinja2 import meta
+
+    seen = _seen if _seen is not None else set()
+    if name in seen:
+        return ""
+    seen.add(name)
+
+    loader = loader if loader is not None else env.loader
+    source, _, _ = loader.get_source(env, name)
+    parts = [name, source]
+    for referenced in sorted(r for r in meta.find_referenced_templates(env.parse(source)) if r):
+        parts.append(template_chain_digest(env, referenced, loader, seen))
+    return digest_of(*parts)
+
+
+def template_chain_sources(env: Any, name: str, loader: Any = None) -> Dict[str, str]:
+    """
+    Jinja2テンプレートと、extends/include/import で参照するテンプレートすべてのソース
+
+    Args:
+        env: jinja2.Environment
+        name: テンプレート名
+        loader: ソースを読み込むローダー（省略時は env.loader）
+    """
+    from jinja2 import meta
+
+    loader = loader if loader is not None else env.loader
+    sources: Dict[str, str] = {}
+    pending = [name]
+    while pending:
+        current = pending.pop()
+        if current in sources:
+            continue
+        source, _, _ = loader.get_source(env, current)
+        sources[current] = source
+        pending.extend(r for r in meta.find_referenced_templates(env.parse(source)) if r)
+    return sources
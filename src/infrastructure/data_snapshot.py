@@ -0,0 +1,180 @@
+"""
+データファイルのバイナリスナップショット実装
+
+JSONデータファイルの解析結果（と、そこから組み立てたオブジェクト）を pickle で保存し、
+次回以降のプロセス起動時は解析を省略して読み込む。スナップショットは元ファイルの
+更新時刻・サイズ・SHA-256 に紐づき、元ファイルが変わると自動的に作り直す。
+壊れたスナップショット（本体のハッシュが一致しない・復元できない）も作り直す。
+
+標準ライブラリのみで実装しているため、設定（pydantic）を読み込まない
+サイト生成スクリプトからも利用できる。
+
+セキュリティ上の注意（信頼境界）:
+    スナップショットは pickle で読み込むため、ファイルを書き換えられると読み込んだ
+    プロセスで任意のコードが実行される。保存先はデータディレクトリ配下の .snapshots/ なので、
+    データディレクトリに書き込める利用者は、スナップショットを読む全スクリプトの実行権限を
+    持つのと同じになる。データディレクトリは信頼できる利用者だけが書き込めるようにすること。
+    多少の防御として、スナップショットは所有者のみ読み書きできる権限で作成し、POSIX 環境では
+    実行中のユーザー以外が所有するファイルやグループ・他者が書き込めるファイルは読み込まずに作り直す。
+"""
+import hashlib
+import json
+import os
+import pickle
+import stat as stat_module
+import threading
+import warnings
+from pathlib import Path
+from typing import Any, Callable, Dict, Optional
+
+# スナップショットの保存先（元ファイルと同じディレクトリ配下）
+SNAPSHOT_DIR_NAME = ".snapshots"
+
+# ファイル形式のバージョン（ヘッダー構造を変えたら上げる）
+FORMAT_VERSION = 2
+
+# ヘッダーに必要な項目（payload_digest は本体の pickle のハッシュで、壊れた本体を読み込まないために使う）
+_HEADER_KEYS = frozenset({"format", "kind", "version", "mtime_ns", "size", "sha256", "payload_digest"})
+
+
+def load_snapshot(
+    source: Path,
+    build: Optional[Callable[[Any], Any]] = None,
+    kind: str = "json",
+    version: int = 1
+) -> Any:
+    """
+    JSONファイルをスナップショット経由で読み込む
+
+    Args:
+        source: 元のJSONファイル
+        build: 解析済みJSONから保存対象のオブジェクトを組み立てる関数（省略時はJSONそのもの）
+        kind: スナップショットの種類（同じ元ファイルから複数の形式を保存する場合に区別する）
+        version: build の結果の形式のバージョン（組み立て方を変えたら上げる）
+
+    Returns:
+        build の結果（build 省略時は解析済みのJSON）
+    """
+    source = Path(source)
+    stat = source.stat()
+    snapshot_path = _snapshot_path(source, kind)
+
+    header = _read_header(snapshot_path)
+    if header is not None and header.get("kind") == kind and header.get("version") == version:
+        if header["mtime_ns"] == stat.st_mtime_ns and header["size"] == stat.st_size:
+            payload = _read_payload(snapshot_path)
+            if payload is not None:
+                return payload[0]
+
+        # 更新時刻だけ変わった場合（チェックアウト・コピー等）は内容のハッシュで判定する
+        raw = source.read_bytes()
+        if header["size"] == len(raw) and header["sha256"] == hashlib.sha256(raw).hexdigest():
+            payload = _read_payload(snapshot_path)
+            if payload is not None:
+                _write(snapshot_path, _header(kind, version, stat, raw), payload[0])
+                return payload[0]
+    else:
+        raw = source.read_bytes()
+
+    data = json.loads(raw.decode("utf-8"))
+    result = build(data) if build is not None else data
+    _write(snapshot_path, _header(kind, version, stat, raw), result)
+    return result
+
+
+def clear_snapshots(source: Path) -> int:
+    """元ファイルに対応するスナップショットをすべて削除して削除件数を返す"""
+    source = Path(source)
+    snapshot_dir = source.parent / SNAPSHOT_DIR_NAME
+    removed = 0
+    for path in snapshot_dir.glob(f"{source.stem}.*.pickle"):
+        try:
+            path.unlink()
+            removed += 1
+        except OSError:
+            continue
+    return removed
+
+
+def _snapshot_path(source: Path, kind: str) -> Path:
+    """スナップショットファイルのパス"""
+    return source.parent / SNAPSHOT_DIR_NAME / f"{source.stem}.{kind}.pickle"
+
+
+def _header(kind: str, version: int, stat: os.stat_result, raw: bytes) -> Dict[str, Any]:
+    """スナップショットのヘッダー"""
+    return {
+        "format": FORMAT_VERSION,
+        "kind": kind,
+        "version": version,
+        "mtime_ns": stat.st_mtime_ns,
+        "size": stat.st_size,
+        "sha256": hashlib.sha256(raw).hexdigest(),
+    }
+
+
+def _is_trusted(f) -> bool:
+    """開いたスナップショットが実行中のユーザーだけが書き込めるファイルかどうか（POSIX のみ判定）"""
+    if not hasattr(os, "getuid"):
+        return True
+    info = os.fstat(f.fileno())
+    return info.st_uid == os.getuid() and not info.st_mode & (stat_module.S_IWGRP | stat_module.S_IWOTH)
+
+
+def _read_header(path: Path) -> Optional[Dict[str, Any]]:
+    """ヘッダーだけを読み込む（本体は読まない）"""
+    try:
+        with open(path, "rb") as f:
+            if not _is_trusted(f):
+                return None
+            header = pickle.load(f)
+    except FileNotFoundError:
+        return None
+    except PermissionError as e:
+        warnings.warn(f"スナップショットを読み込めません（元ファイルを解析します）: {e}", RuntimeWarning)
+        return None
+    except Exception:
+        # 壊れたファイル・別バージョンのPythonで作られたファイルは作り直す
+        # （壊れ方によって OverflowError・TypeError・MemoryError なども起こりうる）
+        return None
+
+    if not isinstance(header, dict) or not _HEADER_KEYS <= header.keys() or header["format"] != FORMAT_VERSION:
+        return None
+    return header
+
+
+def _read_payload(path: Path) -> Optional[tuple]:
+    """本体を読み込む（読めない場合はNone、読めた場合は1要素のタプル）"""
+    try:
+        with open(path, "rb") as f:
+            if not _is_trusted(f):
+                return None
+            header = pickle.load(f)
+            data = f.read()
+        if hashlib.blake2b(data).hexdigest() != header["payload_digest"]:
+            return None
+        return (pickle.loads(data),)
+    except Exception:
+        # クラス定義の変更などで復元できない場合は作り直す
+        return None
+
+
+def _write(path: Path, header: Dict[str, Any], payload: Any):
+    """ヘッダーと本体を続けて書き込む（書き込みに失敗しても読み込み自体は成功させる）"""
+    tmp_path = path.with_suffix(f".{os.getpid()}.{threading.get_ident()}.tmp")
+    try:
+        data = pickle.dumps(payload, protocol=pickle.HIGHEST_PROTOCOL)
+        header = {**header, "payload_digest": hashlib.blake2b(data).hexdigest()}
+        path.parent.mkdir(mode=0o700, parents=True, exist_ok=True)
+        # 所有者のみ読み書きできる権限で作成する
+        fd = os.open(tmp_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC | getattr(os, "O_BINARY", 0), 0o600)
+        with os.fdopen(fd, "wb") as f:
+            pickle.dump(header, f, protocol=pickle.HIGHEST_PROTOCOL)
+            f.write(data)
+        os.replace(tmp_path, path)
+    except Exception:
+        # 保存できないオブジェクト（TypeError・AttributeError など）でも読み込み自体は成功させる
+        try:
+            tmp_path.unlink()
+        except OSError:
+            pass
@@ -0,0 +1,503 @@
+"""
+FTPサーバーへの差分同期デプロイ実装
+
+ローカルの公開ディレクトリとサーバー上のディレクトリを、ファイル内容のハッシュで比較して
+変更のあったファイルだけをアップロードする。
+
+  - ローカルマニフェスト: ファイルごとの (サイズ, 更新時刻, SHA-256)。内容の変わっていない
+    ファイルはハッシュを計算し直さない
+  - リモートマニフェスト: サーバー上に置く (相対パス → SHA-256) の一覧。前回デプロイした
+    内容との差分を、サーバーのファイル一覧を取得せずに求める
+  - ディレクトリは親から順に1回だけ作成する
+  - アップロードは複数のFTP接続で並列に行う
+  - アトミックモードでは変更ファイルをステージングディレクトリへアップロードし終えてから
+    本来の場所へまとめてリネームする（公開中のサイトが中途半端な状態になる時間を短くする）
+
+標準ライブラリのみで実装しているため、設定（pydantic）を読み込まない
+デプロイスクリプトからも利用できる。
+"""
+import ftplib
+import hashlib
+import io
+import json
+import os
+import posixpath
+import queue
+import threading
+import time
+from dataclasses import dataclass, field
+from datetime import datetime
+from pathlib import Path
+from typing import Callable, Dict, Iterable, List, Optional, Set, Tuple
+
+# サーバー上のマニフェストのファイル名（同期対象ディレクトリ直下に置く）
+# 同じディレクトリへ別々のローカルディレクトリをデプロイする場合は manifest_name で分ける
+REMOTE_MANIFEST_NAME = ".deploy_manifest.json"
+
+# マニフェストの形式バージョン（不一致の場合は全ファイルを変更ありとして扱う）
+MANIFEST_VERSION = 1
+
+# 同期対象から除外するファイル名
+EXCLUDED_NAMES = {REMOTE_MANIFEST_NAME, ".DS_Store", "Thumbs.db"}
+
+
+class FTPSyncError(Exception):
+    """差分同期のエラー"""
+    pass
+
+
+@dataclass
+class SyncPlan:
+    """同期計画"""
+    uploads: List[str] = field(default_factory=list)
+    deletes: List[str] = field(default_factory=list)
+    unchanged: int = 0
+    directories: List[str] = field(default_factory=list)
+    upload_bytes: int = 0
+
+
+@dataclass
+class SyncResult:
+    """同期結果"""
+    uploaded: int = 0
+    skipped: int = 0
+    deleted: int = 0
+    directories_created: int = 0
+    bytes_uploaded: int = 0
+    failed: Dict[str, str] = field(default_factory=dict)
+    elapsed: float = 0.0
+
+    @property
+    def success(self) -> bool:
+        return not self.failed
+
+    def format_summary(self) -> str:
+        """ログ出力用の要約"""
+        return (
+            f"アップロード {self.uploaded}件（{self.bytes_uploaded / 1024:.1f}KB） / "
+            f"変更なし {self.skipped}件 / 削除 {self.deleted}件 / "
+            f"ディレクトリ作成 {self.directories_created}件 / 失敗 {len(self.failed)}件 / "
+            f"{self.elapsed:.1f}秒"
+        )
+
+
+def file_sha256(path: Path) -> str:
+    """ファイル内容のSHA-256"""
+    hasher = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b""):
+            hasher.update(chunk)
+    return hasher.hexdigest()
+
+
+def parent_directories(paths: Iterable[str]) -> List[str]:
+    """ファイルの相対パスから必要なディレクトリを親→子の順で列挙"""
+    directories: Set[str] = set()
+    for path in paths:
+        directory = posixpath.dirname(path)
+        while directory and directory not in directories:
+            directories.add(directory)
+            directory = posixpath.dirname(directory)
+    return sorted(directories, key=lambda d: (d.count("/"), d))
+
+
+class FTPDeltaSync:
+    """
+    ローカルディレクトリをFTPサーバー上のディレクトリへ差分同期する
+
+    使い方:
+        sync = FTPDeltaSync(host, user, password, "/as_teizan", connections=4)
+        result = sync.sync(Path("static_site"), atomic=True)
+    """
+
+    def __init__(
+        self,
+        host: str,
+        user: str,
+        password: str,
+        remote_dir: str,
+        port: int = 21,
+        connections: int = 4,
+        local_manifest_path: Optional[Path] = None,
+        delete_orphans: bool = True,
+        timeout: float = 60,
+        log: Callable[[str], None] = print,
+        manifest_name: str = REMOTE_MANIFEST_NAME
+    ):
+        self.host = host
+        self.user = user
+        self.password = password
+        self.port = port
+        self.remote_dir = "/" + remote_dir.strip("/") if remote_dir.strip("/") else "/"
+        self.connections = max(1, connections)
+        self.delete_orphans = delete_orphans
+        self.timeout = timeout
+        self.log = log
+        # 削除対象はこのマニフェストに記録したファイルだけなので、別のマニフェストで
+        # 管理しているファイル（他のデプロイスクリプトの出力）には触れない
+        self.manifest_name = manifest_name
+
+        if local_manifest_path is None:
+            safe_name = f"{host}_{self.remote_dir}".replace("/", "_").replace(":", "_")
+            if manifest_name != REMOTE_MANIFEST_NAME:
+                safe_name = f"{safe_name}_{manifest_name.strip('.')}"
+
+            local_manifest_path = Path("cache") / "ftp_sync" / f"{safe_name}.json"
+        self.local_manifest_path = Path(local_manifest_path)
+
+    # ---- 公開API ----
+
+    def scan_local(self, local_dir: Path) -> Dict[str, str]:
+        """
+        ローカルディレクトリの (相対パス → SHA-256) を取得
+
+        サイズと更新時刻が前回と同じファイルはローカルマニフェストのハッシュを再利用する。
+        """
+        local_dir = Path(local_dir)
+        if not local_dir.is_dir():
+            raise FTPSyncError(f"ローカルディレクトリが見つかりません: {local_dir}")
+
+        cached = self._load_local_manifest()
+        scanned: Dict[str, Tuple[int, int, str]] = {}
+
+        for path in sorted(local_dir.rglob("*")):
+            if not path.is_file() or path.name in EXCLUDED_NAMES or path.name == self.manifest_name:
+                continue
+            relative_path = path.relative_to(local_dir).as_posix()
+            stat = path.stat()
+            entry = cached.get(relative_path)
+            if entry is not None and entry[0] == stat.st_size and entry[1] == stat.st_mtime_ns:
+                scanned[relative_path] = (stat.st_size, stat.st_mtime_ns, entry[2])
+            else:
+                scanned[relative_path] = (stat.st_size, stat.st_mtime_ns, file_sha256(path))
+
+        self._save_local_manifest(scanned)
+        return {relative_path: entry[2] for relative_path, entry in scanned.items()}
+
+    def fetch_remote_manifest(self, ftp: Optional[ftplib.FTP] = None) -> Dict[str, str]:
+        """サーバー上のマニフェストを取得（存在しない場合は空）"""
+        own_connection = ftp is None
+        ftp = ftp or self._connect()
+        buffer = io.BytesIO()
+        try:
+            ftp.retrbinary(f"RETR {self._remote_path(self.manifest_name)}", buffer.write)
+        except ftplib.error_perm:
+            return {}
+        finally:
+            if own_connection:
+                self._quit(ftp)
+
+        try:
+            data = json.loads(buffer.getvalue().decode("utf-8"))
+        except (UnicodeDecodeError, json.JSONDecodeError):
+            self.log("⚠️ リモートマニフェストが壊れているため全ファイルを変更ありとして扱います")
+            return {}
+        if not isinstance(data, dict) or data.get("version") != MANIFEST_VERSION:
+            return {}
+        return dict(data.get("files", {}))
+
+    def plan(self, local: Dict[str, str], remote: Dict[str, str], local_dir: Optional[Path] = None) -> SyncPlan:
+        """ローカルとリモートのマニフェストから同期計画を作成"""
+        plan = SyncPlan()
+        for relative_path, digest in local.items():
+            if remote.get(relative_path) == digest:
+                plan.unchanged += 1
+            else:
+                plan.uploads.append(relative_path)
+                if local_dir is not None:
+                    plan.upload_bytes += (Path(local_dir) / relative_path).stat().st_size
+
+        if self.delete_orphans:
+            plan.deletes = sorted(set(remote) - set(local))
+
+        # 前回のデプロイでファイルがあったディレクトリは作成済みとみなす
+        existing = set(parent_directories(remote))
+        plan.directories = [d for d in parent_directories(plan.uploads) if d not in existing]
+        return plan
+
+    def sync(self, local_dir: Path, atomic: bool = False, dry_run: bool = False) -> SyncResult:
+        """
+        差分同期を実行
+
+        Args:
+            local_dir: 公開するローカルディレクトリ
+            atomic: 変更ファイルをステージングディレクトリへ送ってからまとめてリネームする
+            dry_run: 計画の表示のみ行い、サーバーは変更しない
+        """
+        started = time.perf_counter()
+        local_dir = Path(local_dir)
+        result = SyncResult()
+
+        local = self.scan_local(local_dir)
+        ftp = self._connect()
+        try:
+            remote = self.fetch_remote_manifest(ftp)
+            plan = self.plan(local, remote, local_dir)
+            result.skipped = plan.unchanged
+
+            self.log(
+                f"📋 同期計画: アップロード {len(plan.uploads)}件（{plan.upload_bytes / 1024:.1f}KB） / "
+                f"変更なし {plan.unchanged}件 / 削除 {len(plan.deletes)}件 / "
+                f"新規ディレクトリ {len(plan.directories)}件"
+            )
+            if dry_run:
+                for relative_path in plan.uploads:
+                    self.log(f"  + {relative_path}")
+                for relative_path in plan.deletes:
+                    self.log(f"  - {relative_path}")
+                result.elapsed = time.perf_counter() - started
+                return result
+
+            self._ensure_remote_root(ftp)
+            if atomic:
+                staging = f".deploy-staging-{datetime.now().strftime('%Y%m%d%H%M%S')}"
+                for directory in [staging] + [f"{staging}/{d}" for d in parent_directories(plan.uploads)]:
+                    self._mkd(ftp, self._remote_path(directory))
+                self._upload_all(local_dir, plan.uploads, result, target_prefix=staging)
+                ftp = self._reconnect_if_idle(ftp)
+                if result.failed:
+                    # 失敗した場合は公開中のファイルに触れずに終了する
+                    self._remove_tree(ftp, staging, plan.uploads)
+                    raise FTPSyncError(f"アップロードに失敗したため公開を中止しました: {len(result.failed)}件")
+                self._make_directories(ftp, plan.directories, result)
+                self._promote(ftp, staging, plan.uploads)
+                self._remove_tree(ftp, staging, plan.uploads, delete_files=False)
+            else:
+                self._make_directories(ftp, plan.directories, result)
+                self._upload_all(local_dir, plan.uploads, result)
+                ftp = self._reconnect_if_idle(ftp)
+
+            if plan.deletes:
+                self._delete_files(ftp, plan.deletes, result)
+                self._remove_empty_directories(ftp, plan.deletes, local)
+
+            # 失敗したファイル（途中まで上書きされた可能性がある）は次回再送するため記録しない
+            uploaded_manifest = {
+                relative_path: digest for relative_path, digest in local.items()
+                if relative_path not in result.failed
+            }
+            self._store_remote_manifest(ftp, uploaded_manifest)
+        finally:
+            self._quit(ftp)
+
+        result.elapsed = time.perf_counter() - started
+        return result
+
+    # ---- 接続 ----
+
+    def _connect(self) -> ftplib.FTP:
+        """FTPサーバーに接続"""
+        ftp = ftplib.FTP()
+        ftp.encoding = "utf-8"
+        ftp.connect(self.host, self.port, timeout=self.timeout)
+        ftp.login(self.user, self.password)
+        return ftp
+
+    def _reconnect_if_idle(self, ftp: ftplib.FTP) -> ftplib.FTP:
+        """並列アップロード中に待機していた接続がタイムアウトしていれば接続し直す"""
+        try:
+            ftp.voidcmd("NOOP")
+            return ftp
+        except ftplib.all_errors:
+            ftp.close()
+            return self._connect()
+
+    @staticmethod
+    def _quit(ftp: ftplib.FTP):
+        """FTP切断（切断時のエラーは無視）"""
+        try:
+            ftp.quit()
+        except ftplib.all_errors:
+            ftp.close()
+
+    def _remote_path(self, relative_path: str) -> str:
+        """同期対象ディレクトリからの相対パスを絶対パスに変換"""
+        return posixpath.join(self.remote_dir, relative_path) if relative_path else self.remote_dir
+
+    # ---- ディレクトリ ----
+
+    def _ensure_remote_root(self, ftp: ftplib.FTP):
+        """同期対象ディレクトリを（親から順に）作成"""
+        current = ""
+        for part in self.remote_dir.strip("/").split("/"):
+            if not part:
+                continue
+            current = f"{current}/{part}"
+            self._mkd(ftp, current)
+
+    def _make_directories(self, ftp: ftplib.FTP, directories: List[str], result: SyncResult):
+        """ディレクトリを親から順に1回ずつ作成"""
+        for directory in directories:
+            if self._mkd(ftp, self._remote_path(directory)):
+                result.directories_created += 1
+
+    @staticmethod
+    def _mkd(ftp: ftplib.FTP, path: str) -> bool:
+        """ディレクトリを作成（既に存在する場合はFalse）"""
+        try:
+            ftp.mkd(path)
+            return True
+        except ftplib.error_perm as e:
+            # 550: 既に存在する（サーバーによって文言が異なるため存在確認で判定する）
+            try:
+                ftp.cwd(path)
+                ftp.cwd("/")
+                return False
+            except ftplib.error_perm:
+                raise FTPSyncError(f"ディレクトリを作成できません: {path} ({e})")
+
+    # ---- アップロード ----
+
+    def _upload_all(self, local_dir: Path, uploads: List[str], result: SyncResult, target_prefix: str = ""):
+        """複数のFTP接続でファイルを並列にアップロード"""
+        if not uploads:
+            return
+
+        # 大きいファイルから送ると接続ごとの負荷が偏りにくい
+        ordered = sorted(uploads, key=lambda p: (Path(local_dir) / p).stat().st_size, reverse=True)
+        tasks: "queue.Queue[str]" = queue.Queue()
+        for relative_path in ordered:
+            tasks.put(relative_path)
+
+        lock = threading.Lock()
+        workers = min(self.connections, len(ordered))
+
+        def worker():
+            ftp = None
+            try:
+                while True:
+                    try:
+                        relative_path = tasks.get_nowait()
+                    except queue.Empty:
+                        return
+                    target = f"{target_prefix}/{relative_path}" if target_prefix else relative_path
+                    try:
+                        if ftp is None:
+                            ftp = self._connect()
+                        size = self._upload_file(ftp, Path(local_dir) / relative_path, self._remote_path(target))
+                    except ftplib.all_errors:
+                        # 接続が切れた可能性があるため1回だけ再接続して再送する
+                        if ftp is not None:
+                            ftp.close()
+                        try:
+                            ftp = self._connect()
+                            size = self._upload_file(ftp, Path(local_dir) / relative_path, self._remote_path(target))
+                        except ftplib.all_errors as retry_error:
+                            with lock:
+                                result.failed[relative_path] = str(retry_error)
+                            self.log(f"❌ {relative_path}: {retry_error}")
+                            ftp = None
+                            continue
+                    with lock:
+                        result.uploaded += 1
+                        result.bytes_uploaded += size
+                    self.log(f"✓ {relative_path}")
+            finally:
+                if ftp is not None:
+                    self._quit(ftp)
+
+        threads = [threading.Thread(target=worker, name=f"ftp-sync-{i}", daemon=True) for i in range(workers)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+    @staticmethod
+    def _upload_file(ftp: ftplib.FTP, local_file: Path, remote_path: str) -> int:
+        """1ファイルをアップロードしてサイズを返す"""
+        with open(local_file, "rb") as f:
+            ftp.storbinary(f"STOR {remote_path}", f)
+        return local_file.stat().st_size
+
+    # ---- アトミックモード ----
+
+    def _promote(self, ftp: ftplib.FTP, staging: str, uploads: List[str]):
+        """ステージングディレクトリのファイルを本来の場所へリネーム"""
+        for relative_path in uploads:
+            source = self._remote_path(f"{staging}/{relative_path}")
+            target = self._remote_path(relative_path)
+            try:
+                ftp.rename(source, target)
+            except ftplib.error_perm:
+                # 上書きのリネームを許可しないサーバーでは既存ファイルを消してから移動する
+                try:
+                    ftp.delete(target)
+                except ftplib.error_perm:
+                    pass
+                ftp.rename(source, target)
+
+    def _remove_tree(self, ftp: ftplib.FTP, staging: str, uploads: List[str], delete_files: bool = True):
+        """ステージングディレクトリを削除（delete_files の場合は残ったファイルも削除する）"""
+        for relative_path in uploads if delete_files else []:
+            try:
+                ftp.delete(self._remote_path(f"{staging}/{relative_path}"))
+            except ftplib.error_perm:
+                pass
+        for directory in reversed([staging] + [f"{staging}/{d}" for d in parent_directories(uploads)]):
+            try:
+                ftp.rmd(self._remote_path(directory))
+            except ftplib.error_perm:
+                pass
+
+    # ---- 削除 ----
+
+    def _delete_files(self, ftp: ftplib.FTP, deletes: List[str], result: SyncResult):
+        """ローカルから消えたファイルをサーバーからも削除"""
+        for relative_path in deletes:
+            try:
+                ftp.delete(self._remote_path(relative_path))
+                result.deleted += 1
+                self.log(f"🗑️ {relative_path}")
+            except ftplib.error_perm as e:
+                # 既に手動で削除されている場合など
+                self.log(f"⚠️ 削除できませんでした: {relative_path} ({e})")
+
+    def _remove_empty_directories(self, ftp: ftplib.FTP, deletes: List[str], local: Dict[str, str]):
+        """ファイルがなくなったディレクトリを深い順に削除"""
+        still_used = set(parent_directories(local))
+        for directory in reversed(parent_directories(deletes)):
+            if directory in still_used:
+                continue
+            try:
+                ftp.rmd(self._remote_path(directory))
+            except ftplib.error_perm:
+                # 同期対象外のファイルが残っている場合は残す
+                pass
+
+    # ---- マニフェスト ----
+
+    def _store_remote_manifest(self, ftp: ftplib.FTP, files: Dict[str, str]):
+        """サーバー上のマニフェストを一時ファイル経由で置き換え"""
+        payload = json.dumps(
+            {"version": MANIFEST_VERSION, "updated_at": datetime.now().isoformat(), "files": files},
+            ensure_ascii=False, sort_keys=True
+        ).encode("utf-8")
+        tmp_path = self._remote_path(f"{self.manifest_name}.tmp")
+        ftp.storbinary(f"STOR {tmp_path}", io.BytesIO(payload))
+        try:
+            ftp.rename(tmp_path, self._remote_path(self.manifest_name))
+        except ftplib.error_perm:
+            try:
+                ftp.delete(self._remote_path(self.manifest_name))
+            except ftplib.error_perm:
+                pass
+            ftp.rename(tmp_path, self._remote_path(self.manifest_name))
+
+    def _load_local_manifest(self) -> Dict[str, Tuple[int, int, str]]:
+        """ローカルマニフェストを読み込み"""
+        try:
+            with open(self.local_manifest_path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            return {}
+        if not isinstance(data, dict) or data.get("version") != MANIFEST_VERSION:
+            return {}
+        return {path: tuple(entry) for path, entry in data.get("files", {}).items()}
+
+    def _save_local_manifest(self, files: Dict[str, Tuple[int, int, str]]):
+        """ローカルマニフェストを保存"""
+        self.local_manifest_path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.local_manifest_path.with_suffix(f".{os.getpid()}.tmp")
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump({"version": MANIFEST_VERSION, "files": files}, f, ensure_ascii=False)
+        os.replace(tmp_path, self.local_manifest_path)
@@ -0,0 +1,100 @@
+"""
+読み取り専用APIのレスポンスキャッシュ実装
+
+山データのように「元データが変わらない限り同じ応答になる」エンドポイント向けに、
+シリアライズ済みのレスポンス本文と強い ETag をデータのバージョンごとに保持する。
+バージョンが変わった（データを再読み込みした）時点で古いエントリはすべて破棄する。
+
+JSON のエンコードには orjson がある場合はそれを使い、ない場合は標準ライブラリの json を使う。
+どちらの場合も dataclass は辞書として出力する。
+"""
+import dataclasses
+import hashlib
+import json
+import threading
+from collections import OrderedDict
+from typing import Any, Callable, Hashable, NamedTuple
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - orjson は任意の依存関係
+    orjson = None
+
+
+def _json_default(value: Any) -> Any:
+    """標準ライブラリの json で扱えない値の変換（orjson と同じく dataclass は辞書にする）"""
+    if dataclasses.is_dataclass(value) and not isinstance(value, type):
+        return dataclasses.asdict(value)
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+def dumps_json(payload: Any) -> bytes:
+    """JSON を UTF-8 のバイト列にエンコード（日本語はエスケープしない）"""
+    if orjson is not None:
+        return orjson.dumps(payload)
+    return json.dumps(payload, ensure_ascii=False, separators=(",", ":"),
+                      default=_json_default).encode("utf-8")
+
+
+def make_etag(body: bytes) -> str:
+    """本文の内容から強い ETag の値を生成（引用符は含まない）"""
+    return hashlib.blake2b(body, digest_size=16).hexdigest()
+
+
+class CachedBody(NamedTuple):
+    """シリアライズ済みのレスポンス本文"""
+    body: bytes
+    etag: str
+
+
+class VersionedResponseCache:
+    """
+    データのバージョンをキーにしたレスポンス本文のキャッシュ
+
+    get() に渡したバージョンが前回と異なる場合はキャッシュ全体を破棄してから作り直す。
+    クエリパラメータの組み合わせごとにエントリができるため、件数が上限を超えたら
+    最後に使われたのが古いものから削除する。
+    """
+
+    def __init__(self, max_entries: int = 256):
+        self.max_entries = max_entries
+
+        self.hits = 0
+        self.misses = 0
+
+        self._lock = threading.Lock()
+        self._version: Hashable = None
+        self._entries: "OrderedDict[Hashable, CachedBody]" = OrderedDict()
+
+    def get(self, version: Hashable, key: Hashable, build: Callable[[], bytes]) -> CachedBody:
+        """
+        キャッシュ済みの本文を返す（ない場合は build() で作成して保存）
+
+        build() はロックの外で呼ぶため、同じキーを同時に要求された場合は
+        複数回呼ばれることがある（結果は同じなので後から保存した方が残る）。
+        """
+        with self._lock:
+            if version != self._version:
+                self._version = version
+                self._entries.clear()
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry
+            self.misses += 1
+
+        body = build()
+        entry = CachedBody(body, make_etag(body))
+
+        with self._lock:
+            if version == self._version:
+                self._entries[key] = entry
+                while len(self._entries) > self.max_entries:
+                    self._entries.popitem(last=False)
+        return entry
+
+    def clear(self):
+        """キャッシュを破棄"""
+        with self._lock:
+            self._entries.clear()
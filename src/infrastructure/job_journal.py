@@ -0,0 +1,219 @@
+"""
+一括処理ジョブのジャーナル（チェックポイント）実装
+
+ジョブの完了したタスクを1件1行の JSONL としてファイルへ追記する。処理が途中で止まっても
+（APIエラー・Ctrl-C・プロセスの強制終了）、同じジョブを再実行すると記録済みのタスクを
+ジャーナルから復元し、残りのタスクだけを処理できる。
+
+  - ジョブはパラメータ（対象の山・テーマ等）のハッシュで識別する。パラメータが変われば別のジョブ
+  - 1件記録するごとに fsync する。書き込み途中で終了した最後の行は読み込み時に切り捨てる
+  - 失敗したタスクも記録するが、再実行時には再び処理する
+  - 全タスクが成功するとジョブを完了として記録し、次回の実行は新しいジョブとして最初から行う
+"""
+import hashlib
+import json
+import os
+import threading
+import time
+from dataclasses import dataclass, field
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+from config.logging_config import LoggerMixin
+
+# ジャーナルの形式バージョン（不一致の場合は新しいジョブとして扱う）
+JOURNAL_VERSION = 1
+
+
+def _format_duration(seconds: float) -> str:
+    """秒数 → "1時間5分" / "3分20秒" / "45秒\""""
+    seconds = int(round(seconds))
+    hours, rest = divmod(seconds, 3600)
+    minutes, secs = divmod(rest, 60)
+    if hours:
+        return f"{hours}時間{minutes}分"
+    if minutes:
+        return f"{minutes}分{secs}秒"
+    return f"{secs}秒"
+
+
+@dataclass
+class JobProgress:
+    """ジョブの進捗と残り時間の見積もり"""
+    total: int
+    resumed: int = 0
+    succeeded: int = 0
+    failed: int = 0
+    started_at: float = field(default_factory=time.monotonic)
+
+    def record(self, success: bool):
+        """今回の実行で1件処理した"""
+        if success:
+            self.succeeded += 1
+        else:
+            self.failed += 1
+
+    @property
+    def done(self) -> int:
+        """完了件数（前回までの完了分を含む）"""
+        return self.resumed + self.succeeded
+
+    @property
+    def elapsed(self) -> float:
+        return time.monotonic() - self.started_at
+
+    @property
+    def eta_seconds(self) -> Optional[float]:
+        """残り時間の見積もり（今回の実行の処理速度から。1件も処理していなければNone）"""
+        processed = self.succeeded + self.failed
+        if processed == 0:
+            return None
+        remaining = max(0, self.total - self.done - self.failed)
+        return self.elapsed / processed * remaining
+
+    def format(self) -> str:
+        """進捗表示用の文字列"""
+        percent = self.done / self.total * 100 if self.total else 100.0
+        text = f"[{self.done}/{self.total} {percent:.0f}%]"
+        eta = self.eta_seconds
+        if eta is not None and self.done + self.failed < self.total:
+            text += f" 残り約{_format_duration(eta)}"
+        return text
+
+
+class JobJournal(LoggerMixin):
+    """
+    JSONL 形式のジョブジャーナル
+
+    使い方:
+        journal = JobJournal.for_job("./cache/jobs", "wordpress_export", params)
+        journal.open(total=len(tasks))
+        for key in tasks:
+            if key in journal.completed:
+                continue
+            journal.record_success(key, data)
+        journal.finish()
+    """
+
+    def __init__(self, path: Path, job_id: str):
+        self.path = Path(path)
+        self.job_id = job_id
+        self.completed: Dict[str, Dict[str, Any]] = {}
+        self.failures: Dict[str, str] = {}
+        self.resumed = False
+        self._file = None
+        self._lock = threading.Lock()
+
+    @classmethod
+    def for_job(cls, journal_dir: str, name: str, params: Any) -> "JobJournal":
+        """ジョブ名とパラメータからジャーナルを決定"""
+        payload = json.dumps(params, ensure_ascii=False, sort_keys=True, default=str)
+        job_id = hashlib.sha256(f"{name}\n{payload}".encode("utf-8")).hexdigest()
+        return cls(Path(journal_dir) / f"{name}_{job_id[:16]}.jsonl", job_id)
+
+    def open(self, total: int, resume: bool = True) -> "JobJournal":
+        """
+        ジャーナルを開く
+
+        未完了の同じジョブのジャーナルがあれば記録済みのタスクを読み込んで再開する。
+        resume=False の場合、または前回のジョブが完了している場合は新しいジョブとして始める。
+        """
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        if resume and self._load():
+            self.resumed = True
+            self.log_info(f"Resuming job {self.path.name}: {len(self.completed)}/{total} completed")
+            self._file = open(self.path, "a", encoding="utf-8")
+        else:
+            self.completed.clear()
+            self.failures.clear()
+            self._file = open(self.path, "w", encoding="utf-8")
+            self._append({
+                "type": "job",
+                "version": JOURNAL_VERSION,
+                "job_id": self.job_id,
+                "total": total,
+                "created_at": datetime.now().isoformat(timespec="seconds")
+            })
+        return self
+
+    def record_success(self, key: str, data: Dict[str, Any]):
+        """タスクの完了を記録"""
+        self.failures.pop(key, None)
+        self.completed[key] = data
+        self._append({"type": "done", "key": key, "data": data})
+
+    def record_failure(self, key: str, error: Optional[str]):
+        """タスクの失敗を記録（再実行時には再び処理する）"""
+        self.failures[key] = error or ""
+        self._append({"type": "failed", "key": key, "error": error})
+
+    def finish(self):
+        """ジョブの完了を記録して閉じる"""
+        self._append({"type": "finished", "finished_at": datetime.now().isoformat(timespec="seconds")})
+        self.close()
+
+    def close(self):
+        with self._lock:
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+
+    def __enter__(self) -> "JobJournal":
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    def _append(self, record: Dict[str, Any]):
+        line = json.dumps(record, ensure_ascii=False) + "\n"
+        with self._lock:
+            if self._file is None:
+                raise RuntimeError("JobJournal is not open")
+            self._file.write(line)
+            self._file.flush()
+            os.fsync(self._file.fileno())
+
+    def _load(self) -> bool:
+        """未完了の同じジョブの記録を読み込む（再開できない場合はFalse）"""
+        if not self.path.exists():
+            return False
+
+        completed: Dict[str, Dict[str, Any]] = {}
+        failures: Dict[str, str] = {}
+        valid_bytes = 0
+        header = None
+        with open(self.path, "rb") as f:
+            for raw in f:
+                # 書き込み途中で終了した最後の行は捨てる
+                if not raw.endswith(b"\n"):
+                    break
+                try:
+                    record = json.loads(raw)
+                except ValueError:
+                    break
+                valid_bytes += len(raw)
+                kind = record.get("type")
+                if header is None:
+                    header = record
+                    continue
+                if kind == "done":
+                    completed[record["key"]] = record["data"]
+                    failures.pop(record["key"], None)
+                elif kind == "failed":
+                    failures[record["key"]] = record.get("error") or ""
+                elif kind == "finished":
+                    return False
+
+        if (header is None or header.get("type") != "job" or header.get("version") != JOURNAL_VERSION
+                or header.get("job_id") != self.job_id):
+            return False
+
+        if valid_bytes < self.path.stat().st_size:
+            self.log_warning(f"Discarding truncated journal record: {self.path.name}")
+            with open(self.path, "r+b") as f:
+                f.truncate(valid_bytes)
+
+        self.completed = completed
+        self.failures = failures
+        return True
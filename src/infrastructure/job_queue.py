@@ -0,0 +1,378 @@
+"""
+バックグラウンドジョブキューの実装
+
+Web UI の記事生成のように時間のかかる処理を、リクエストを処理するスレッドから切り離して
+プロセス内のワーカープールで実行する。ジョブの状態と結果は SQLite に保存する。
+
+  - submit() はジョブを登録してすぐに返す。状態は get()、または wait()（完了するまで待つ）で確認する
+  - 同時実行数は max_workers、待機中のジョブ数は max_pending で制限する（超えると QueueFullError）
+  - 結果はプロセスを再起動しても参照できる。再起動時に未完了だったジョブは失敗として記録する
+    （ワーカーはプロセス内にあるため、1つのデータベースを使うプロセスは1つに限る）
+  - 保存期間を過ぎた完了済みのジョブは削除する
+  - 実行中のジョブは JobContext.emit() で進捗イベントを発行でき、events() で順に受け取れる
+    （Server-Sent Events 用。イベントはメモリ上にだけ保持し、完了後しばらくすると破棄する）
+  - cancel() で待機中のジョブは実行せず、実行中のジョブには中断を要求する
+"""
+import json
+import sqlite3
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Callable, Dict, List, NamedTuple, Optional, Tuple
+
+from config.logging_config import LoggerMixin
+
+# ジョブの状態
+QUEUED = "queued"
+RUNNING = "running"
+SUCCEEDED = "succeeded"
+FAILED = "failed"
+CANCELLED = "cancelled"
+
+FINISHED_STATUSES = (SUCCEEDED, FAILED, CANCELLED)
+
+# 完了したジョブの進捗イベントをメモリに残しておく秒数（再接続したクライアント用）
+EVENT_RETENTION_SECONDS = 300
+
+Payload = Dict[str, Any]
+
+
+class QueueFullError(Exception):
+    """待機中のジョブ数が上限に達している"""
+    pass
+
+
+class JobEvent(NamedTuple):
+    """ジョブの進捗イベント（seq はジョブごとに1から始まる連番）"""
+    seq: int
+    kind: str
+    data: Payload
+
+
+class _EventLog:
+    """ジョブ1件分の進捗イベント"""
+
+    def __init__(self):
+        self.events: List[JobEvent] = []
+        self.changed = threading.Condition()
+        self.finished_at: Optional[float] = None
+
+    def append(self, kind: str, data: Payload):
+        with self.changed:
+            self.events.append(JobEvent(len(self.events) + 1, kind, data))
+            self.changed.notify_all()
+
+    def touch(self, finished: bool = False):
+        """状態の変化を待っているクライアントを起こす"""
+        with self.changed:
+            if finished:
+                self.finished_at = time.time()
+            self.changed.notify_all()
+
+
+class JobContext:
+    """実行中のジョブから使う進捗通知と中断要求"""
+
+    def __init__(self, job_id: str, log: _EventLog):
+        self.job_id = job_id
+        self.cancelled = threading.Event()
+        self._log = log
+
+    def emit(self, kind: str, data: Payload):
+        """進捗イベントを発行"""
+        self._log.append(kind, data)
+
+    def is_cancelled(self) -> bool:
+        return self.cancelled.is_set()
+
+
+@dataclass
+class Job:
+    """ジョブの状態と結果"""
+    id: str
+    kind: str
+    status: str
+    params: Payload
+    result: Optional[Payload] = None
+    error: Optional[str] = None
+    created_at: float = 0.0
+    started_at: Optional[float] = None
+    finished_at: Optional[float] = None
+    # 待機中の場合の順番（1 = 次に実行される）
+    position: Optional[int] = None
+
+    @property
+    def done(self) -> bool:
+        return self.status in FINISHED_STATUSES
+
+    def to_dict(self) -> Payload:
+        """API応答用の辞書"""
+        def isoformat(timestamp: Optional[float]) -> Optional[str]:
+            return datetime.fromtimestamp(timestamp).isoformat(timespec="seconds") if timestamp else None
+
+        return {
+            "id": self.id,
+            "kind": self.kind,
+            "status": self.status,
+            "position": self.position,
+            "result": self.result,
+            "error": self.error,
+            "created_at": isoformat(self.created_at),
+            "started_at": isoformat(self.started_at),
+            "finished_at": isoformat(self.finished_at),
+        }
+
+
+class JobQueue(LoggerMixin):
+    """
+    SQLite に状態を保存するプロセス内ジョブキュー
+
+    使い方:
+        queue = JobQueue("./cache/web_jobs.sqlite3", max_workers=2)
+        job = queue.submit("generate_article", {"mountain_id": "mt_takao"}, handler)
+        job = queue.wait(job.id, timeout=30)
+
+    handler(params, context) は結果の辞書を返す。例外を送出した場合はジョブを失敗として記録する
+    （中断を要求された後の例外は中断として記録する）。
+    """
+
+    def __init__(
+        self,
+        db_path: str,
+        max_workers: int = 2,
+        max_pending: int = 20,
+        retention_seconds: float = 7 * 24 * 3600
+    ):
+        self.db_path = Path(db_path)
+        self.max_workers = max(1, max_workers)
+        self.max_pending = max_pending
+        self.retention_seconds = retention_seconds
+
+        self._lock = threading.Lock()
+        self._changed = threading.Condition(self._lock)
+        self._executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="job")
+        self._contexts: Dict[str, JobContext] = {}
+        self._logs: Dict[str, _EventLog] = {}
+
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(str(self.db_path), check_same_thread=False, timeout=30)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS jobs (
+                id TEXT PRIMARY KEY,
+                kind TEXT NOT NULL,
+                status TEXT NOT NULL,
+                params TEXT NOT NULL,
+                result TEXT,
+                error TEXT,
+                created_at REAL NOT NULL,
+                started_at REAL,
+                finished_at REAL
+            )
+            """
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS jobs_status ON jobs (status, created_at)")
+        self._conn.commit()
+
+        self._recover_interrupted()
+        self.purge()
+
+    def submit(
+        self,
+        kind: str,
+        params: Payload,
+        handler: Callable[[Payload, JobContext], Payload]
+    ) -> Job:
+        """
+        ジョブを登録してワーカープールで実行する
+
+        Args:
+            kind: ジョブの種類
+            params: handler に渡すパラメータ（JSONに変換できること）
+            handler: ジョブの処理
+
+        Raises:
+            QueueFullError: 待機中のジョブ数が上限に達している場合
+        """
+        job_id = uuid.uuid4().hex
+        now = time.time()
+        with self._lock:
+            pending = self._conn.execute("SELECT COUNT(*) FROM jobs WHERE status = ?", (QUEUED,)).fetchone()[0]
+            if pending >= self.max_pending:
+                raise QueueFullError(f"Too many pending jobs ({pending})")
+            self._conn.execute(
+                "INSERT INTO jobs (id, kind, status, params, created_at) VALUES (?, ?, ?, ?, ?)",
+                (job_id, kind, QUEUED, json.dumps(params, ensure_ascii=False), now)
+            )
+            self._conn.commit()
+            job = self._fetch(job_id)
+            self._prune_events()
+            log = self._logs[job_id] = _EventLog()
+            context = self._contexts[job_id] = JobContext(job_id, log)
+
+        self._executor.submit(self._run, context, params, handler)
+        self.log_info(f"Job queued: {kind} {job_id}")
+        return job
+
+    def get(self, job_id: str) -> Optional[Job]:
+        """ジョブを取得（存在しない場合はNone）"""
+        with self._lock:
+            return self._fetch(job_id)
+
+    def wait(self, job_id: str, timeout: float) -> Optional[Job]:
+        """ジョブが完了するまで最大 timeout 秒待って返す（完了していなければその時点の状態）"""
+        deadline = time.monotonic() + timeout
+        with self._changed:
+            while True:
+                job = self._fetch(job_id)
+                remaining = deadline - time.monotonic()
+                if job is None or job.done or remaining <= 0:
+                    return job
+                self._changed.wait(remaining)
+
+    def events(self, job_id: str, after: int = 0, timeout: float = 15.0) -> Tuple[List[JobEvent], Optional[Job]]:
+        """
+        seq が after より大きい進捗イベントと、ジョブの現在の状態を返す
+
+        新しいイベントがなければ、イベントが発行されるか、いずれかのジョブの状態が変わるまで
+        最大 timeout 秒待つ（待機中のジョブの順番の変化も通知するため）。
+        """
+        with self._lock:
+            log = self._logs.get(job_id)
+        if log is not None:
+            with log.changed:
+                if len(log.events) <= after and log.finished_at is None:
+                    log.changed.wait(timeout)
+                events = log.events[after:]
+        else:
+            events = []
+        return events, self.get(job_id)
+
+    def cancel(self, job_id: str) -> Optional[Job]:
+        """
+        ジョブの中断を要求する（待機中のジョブは実行しない。存在しない場合はNone）
+
+        実行中のジョブが実際に止まるかは処理側が JobContext.is_cancelled() を確認するかによる。
+        """
+        with self._lock:
+            context = self._contexts.get(job_id)
+            if context is not None:
+                context.cancelled.set()
+            job = self._fetch(job_id)
+        if job is not None and job.status == QUEUED:
+            if self._update(job_id, "status = ?, error = ?, finished_at = ?",
+                            (CANCELLED, "キャンセルされました", time.time()), only_if=QUEUED):
+                self._finish(job_id)
+            job = self.get(job_id)
+        if job is not None:
+            self.log_info(f"Job cancel requested: {job_id} ({job.status})")
+        return job
+
+    def purge(self) -> int:
+        """保存期間を過ぎた完了済みのジョブを削除して件数を返す"""
+        cutoff = time.time() - self.retention_seconds
+        with self._lock:
+            cursor = self._conn.execute(
+                f"DELETE FROM jobs WHERE status IN ({','.join('?' * len(FINISHED_STATUSES))}) AND finished_at < ?",
+                (*FINISHED_STATUSES, cutoff)
+            )
+            self._conn.commit()
+        return cursor.rowcount
+
+    def shutdown(self, wait: bool = True):
+        """ワーカープールを停止（待機中のジョブは実行しない。次回起動時に失敗として記録される）"""
+        self._executor.shutdown(wait=wait, cancel_futures=True)
+
+    def _run(self, context: JobContext, params: Payload, handler: Callable[[Payload, JobContext], Payload]):
+        job_id = context.job_id
+        # 待機中にキャンセルされたジョブは実行しない
+        if not self._update(job_id, "status = ?, started_at = ?", (RUNNING, time.time()), only_if=QUEUED):
+            return
+        self._touch_all()
+        try:
+            result = handler(params, context)
+            self._update(
+                job_id,
+                "status = ?, result = ?, finished_at = ?",
+                (SUCCEEDED, json.dumps(result, ensure_ascii=False, default=str), time.time())
+            )
+            self.log_info(f"Job succeeded: {job_id}")
+        except Exception as e:
+            status = CANCELLED if context.is_cancelled() else FAILED
+            if status == CANCELLED:
+                self.log_info(f"Job cancelled: {job_id}")
+            else:
+                self.log_error(f"Job failed: {job_id}", error=e)
+            self._update(job_id, "status = ?, error = ?, finished_at = ?", (status, str(e), time.time()))
+        finally:
+            self._finish(job_id)
+
+    def _finish(self, job_id: str):
+        """終了したジョブの後始末（進捗イベントの受信者に終了を通知する）"""
+        with self._lock:
+            self._contexts.pop(job_id, None)
+            log = self._logs.get(job_id)
+        if log is not None:
+            log.touch(finished=True)
+        self._touch_all()
+
+    def _update(self, job_id: str, assignments: str, values: tuple, only_if: Optional[str] = None) -> bool:
+        """ジョブの行を更新（only_if を指定した場合はその状態の場合だけ）。更新したかを返す"""
+        condition = "id = ?" if only_if is None else "id = ? AND status = ?"
+        params = (*values, job_id) if only_if is None else (*values, job_id, only_if)
+        with self._changed:
+            cursor = self._conn.execute(f"UPDATE jobs SET {assignments} WHERE {condition}", params)
+            self._conn.commit()
+            self._changed.notify_all()
+        return cursor.rowcount > 0
+
+    def _touch_all(self):
+        """待機中のジョブの順番が変わったことを全受信者に通知"""
+        with self._lock:
+            logs = list(self._logs.values())
+        for log in logs:
+            log.touch()
+
+    def _prune_events(self):
+        """完了後しばらく経ったジョブの進捗イベントを破棄（ロックを取得した状態で呼ぶ）"""
+        cutoff = time.time() - EVENT_RETENTION_SECONDS
+        for job_id in [job_id for job_id, log in self._logs.items()
+                       if log.finished_at is not None and log.finished_at < cutoff]:
+            del self._logs[job_id]
+
+    def _fetch(self, job_id: str) -> Optional[Job]:
+        """ジョブを読み込む（ロックを取得した状態で呼ぶ）"""
+        row = self._conn.execute(
+            "SELECT id, kind, status, params, result, error, created_at, started_at, finished_at "
+            "FROM jobs WHERE id = ?",
+            (job_id,)
+        ).fetchone()
+        if row is None:
+            return None
+        job = Job(
+            id=row[0], kind=row[1], status=row[2], params=json.loads(row[3]),
+            result=json.loads(row[4]) if row[4] else None, error=row[5],
+            created_at=row[6], started_at=row[7], finished_at=row[8]
+        )
+        if job.status == QUEUED:
+            ahead = self._conn.execute(
+                "SELECT COUNT(*) FROM jobs WHERE status = ? AND created_at < ?", (QUEUED, job.created_at)
+            ).fetchone()[0]
+            job.position = ahead + 1
+        return job
+
+    def _recover_interrupted(self):
+        """前回のプロセスで未完了だったジョブを失敗として記録"""
+        with self._lock:
+            cursor = self._conn.execute(
+                "UPDATE jobs SET status = ?, error = ?, finished_at = ? WHERE status IN (?, ?)",
+                (FAILED, "サーバーの再起動により中断されました", time.time(), QUEUED, RUNNING)
+            )
+            self._conn.commit()
+        if cursor.rowcount:
+            self.log_warning(f"Marked {cursor.rowcount} interrupted jobs as failed")
@@ -0,0 +1,224 @@
+"""
+サイト内外のリンク先を検証する実装
+
+  - LocalLinkResolver: ページ内のリンク（相対パス・ルート相対パス）が出力ディレクトリ内の
+    ファイルを指しているかを判定する。リンク先のパスごとに結果をメモ化するため、
+    全ページに共通するナビゲーションやCSSへのリンクはファイルシステムを1回しか参照しない
+  - ExternalLinkChecker: 外部URLを並列に検証する。同じURLは1回だけ確認し、結果は
+    JSONファイルに保存して次回以降の実行で再利用する（失敗した結果は短期間だけ再利用する）
+
+標準ライブラリのみで実装しているため、設定（pydantic）を読み込まない
+サイトチェックスクリプトからも利用できる。
+"""
+import json
+import os
+import stat
+import threading
+import time
+import urllib.error
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Dict, Iterable, NamedTuple, Optional, Union
+from urllib.parse import unquote, urldefrag, urlsplit
+
+# 検証しない（ファイルを指さない）リンク
+SKIPPED_SCHEMES = ("mailto:", "tel:", "javascript:", "data:")
+EXTERNAL_SCHEMES = ("http://", "https://")
+
+# 外部リンクの検証結果キャッシュの形式バージョン
+CACHE_VERSION = 1
+
+# HEAD に対応していないサーバーが返すステータス（GET で再確認する）
+_HEAD_UNSUPPORTED = {403, 405, 501}
+
+
+def is_external_link(link: str) -> bool:
+    return link.startswith(EXTERNAL_SCHEMES)
+
+
+def link_path(link: str) -> str:
+    """リンクからクエリとフラグメントを除いたパス（URLエンコードを戻す）"""
+    return unquote(link.split("#", 1)[0].split("?", 1)[0])
+
+
+class LocalLinkResolver:
+    """
+    ページ内リンクのリンク先の存在確認（結果をリンク先のパスごとにメモ化）
+
+    ディレクトリやファイル名に拡張子がないリンクは index.html を指しているものとして扱う。
+    複数のスレッドから同時に呼び出してよい（同じパスを重複して確認することはあるが結果は同じ）。
+    """
+
+    def __init__(self, base_dir: Union[str, Path]):
+        self.base_dir = str(base_dir)
+        self._targets: Dict[str, bool] = {}
+
+    @property
+    def unique_targets(self) -> int:
+        """確認したリンク先のパスの数"""
+        return len(self._targets)
+
+    def exists(self, link: str, page_path: Union[str, Path]) -> bool:
+        """リンク先が存在するか（外部リンク・アンカーリンク等は常にTrue）"""
+        if is_external_link(link) or link.startswith(SKIPPED_SCHEMES) or link.startswith("#"):
+            return True
+
+        path = link_path(link)
+        if not path:
+            # "?page=2" 等はページ自身を指す
+            return True
+        if path.startswith("/"):
+            target = os.path.join(self.base_dir, path.lstrip("/"))
+        else:
+            target = os.path.join(os.path.dirname(str(page_path)), path)
+        target = os.path.normpath(target)
+
+        found = self._targets.get(target)
+        if found is None:
+            found = self._targets[target] = self._resolve(target)
+        return found
+
+    @staticmethod
+    def _resolve(target: str) -> bool:
+        try:
+            mode = os.stat(target).st_mode
+        except OSError:
+            # 拡張子がない場合はディレクトリの index.html を指しているとみなす
+            if not os.path.splitext(target)[1]:
+                return os.path.isfile(os.path.join(target, "index.html"))
+            return False
+        if stat.S_ISDIR(mode):
+            return os.path.isfile(os.path.join(target, "index.html"))
+        return True
+
+
+class ExternalLinkStatus(NamedTuple):
+    """外部URLの検証結果"""
+    url: str
+    ok: bool
+    status: Optional[int]
+    error: Optional[str]
+    checked_at: float
+
+
+class ExternalLinkChecker:
+    """
+    外部URLの並列検証
+
+    使い方:
+        checker = ExternalLinkChecker("./cache/external_links.json")
+        results = checker.check(urls)
+        broken = [url for url, result in results.items() if not result.ok]
+
+    HEAD で確認し、HEAD に対応していないサーバーには GET で再確認する（リダイレクトは追う）。
+    同じホストへの同時接続数は per_host 以下に抑える。
+    """
+
+    def __init__(
+        self,
+        cache_path: Optional[Union[str, Path]] = None,
+        max_workers: int = 8,
+        per_host: int = 2,
+        timeout: float = 10.0,
+        ttl_seconds: float = 7 * 24 * 3600,
+        failure_ttl_seconds: float = 3600,
+        user_agent: str = "Mozilla/5.0 (compatible; site-link-checker)"
+    ):
+        self.cache_path = Path(cache_path) if cache_path else None
+        self.max_workers = max(1, max_workers)
+        self.per_host = max(1, per_host)
+        self.timeout = timeout
+        self.ttl_seconds = ttl_seconds
+        self.failure_ttl_seconds = failure_ttl_seconds
+        self.user_agent = user_agent
+
+        self.cache_hits = 0
+        self.fetched = 0
+        self._cache: Dict[str, ExternalLinkStatus] = self._load()
+        self._host_slots: Dict[str, threading.Semaphore] = {}
+        self._lock = threading.Lock()
+
+    def check(self, urls: Iterable[str]) -> Dict[str, ExternalLinkStatus]:
+        """URLを検証して URL → 結果 を返す（フラグメント違いの同じURLは1回だけ確認する）"""
+        keys = {url: urldefrag(url)[0] for url in urls}
+        now = time.time()
+
+        results: Dict[str, ExternalLinkStatus] = {}
+        pending = []
+        for key in dict.fromkeys(keys.values()):
+            cached = self._cache.get(key)
+            if cached is not None and self._is_fresh(cached, now):
+                results[key] = cached
+                self.cache_hits += 1
+            else:
+                pending.append(key)
+
+        if pending:
+            with ThreadPoolExecutor(max_workers=min(self.max_workers, len(pending))) as executor:
+                for result in executor.map(self._fetch, pending):
+                    results[result.url] = result
+                    self._cache[result.url] = result
+            self.fetched += len(pending)
+            self.save()
+
+        return {url: results[key] for url, key in keys.items()}
+
+    def save(self):
+        """検証結果をキャッシュファイルに保存"""
+        if self.cache_path is None:
+            return
+        self.cache_path.parent.mkdir(parents=True, exist_ok=True)
+        data = {
+            "version": CACHE_VERSION,
+            "entries": {url: result._asdict() for url, result in self._cache.items()}
+        }
+        tmp_path = self.cache_path.with_suffix(f".{os.getpid()}.tmp")
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(data, f, ensure_ascii=False)
+        os.replace(tmp_path, self.cache_path)
+
+    def _is_fresh(self, result: ExternalLinkStatus, now: float) -> bool:
+        ttl = self.ttl_seconds if result.ok else self.failure_ttl_seconds
+        return now - result.checked_at < ttl
+
+    def _load(self) -> Dict[str, ExternalLinkStatus]:
+        if self.cache_path is None or not self.cache_path.exists():
+            return {}
+        try:
+            with open(self.cache_path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+            if data.get("version") != CACHE_VERSION:
+                return {}
+            return {url: ExternalLinkStatus(**entry) for url, entry in data["entries"].items()}
+        except (OSError, ValueError, TypeError, KeyError, AttributeError):
+            # 壊れたキャッシュは使わない（次回の保存で上書きされる）
+            return {}
+
+    def _slot(self, url: str) -> threading.Semaphore:
+        host = urlsplit(url).netloc.lower()
+        with self._lock:
+            slot = self._host_slots.get(host)
+            if slot is None:
+                slot = self._host_slots[host] = threading.Semaphore(self.per_host)
+            return slot
+
+    def _fetch(self, url: str) -> ExternalLinkStatus:
+        with self._slot(url):
+            status, error = self._request(url, "HEAD")
+            if status in _HEAD_UNSUPPORTED:
+                status, error = self._request(url, "GET")
+        ok = status is not None and 200 <= status < 400
+        return ExternalLinkStatus(url, ok, status, error, time.time())
+
+    def _request(self, url: str, method: str):
+        """(ステータスコード, エラーメッセージ)"""
+        request = urllib.request.Request(url, method=method, headers={"User-Agent": self.user_agent})
+        try:
+            with urllib.request.urlopen(request, timeout=self.timeout) as response:
+                return response.status, None
+        except urllib.error.HTTPError as e:
+            return e.code, f"HTTP {e.code}"
+        except (urllib.error.URLError, OSError, ValueError) as e:
+            reason = getattr(e, "reason", None) or e
+            return None, str(reason)
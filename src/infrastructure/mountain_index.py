@@ -0,0 +1,200 @@
+"""
+山データの検索インデックス実装
+"""
+from bisect import bisect_left, bisect_right
+from operator import add
+from typing import Dict, FrozenSet, Iterable, List, Optional, Set, Tuple
+
+from src.domain.entities import Mountain, DifficultyLevel
+
+
+# インデックス対象の設備フラグ
+FACILITY_FLAGS = ("restrooms", "restaurant", "parking", "cable_car", "visitor_center")
+
+
+class Postings:
+    """インデックスの1エントリ（位置の昇順タプルと、所属判定用の集合）"""
+
+    __slots__ = ("positions", "members")
+
+    def __init__(self, positions: Iterable[int]):
+        self.positions: Tuple[int, ...] = tuple(sorted(positions))
+        self.members: FrozenSet[int] = frozenset(self.positions)
+
+    def __len__(self) -> int:
+        return len(self.positions)
+
+
+EMPTY = Postings(())
+
+
+class MountainIndex:
+    """
+    山データの二次インデックス
+
+    リポジトリの読み込み時に一度だけ構築し、以降の検索は全件走査せずに
+    インデックスの積集合で絞り込む。
+    検索結果は常にデータファイルの並び順で返す。
+
+      - 地域・都道府県・難易度・設備フラグ: 値 → 位置の一覧
+      - 標高: 標高順に並べた配列（範囲検索は二分探索）
+      - キーワード: 検索対象文字列の文字バイグラム（と単一文字） → 位置の転置インデックス
+    """
+
+    def __init__(self, mountains: Iterable[Mountain]):
+        self.mountains: List[Mountain] = list(mountains)
+        self._all = Postings(range(len(self.mountains)))
+
+        by_region: Dict[str, List[int]] = {}
+        by_prefecture: Dict[str, List[int]] = {}
+        by_difficulty: Dict[DifficultyLevel, List[int]] = {}
+        by_facility: Dict[str, List[int]] = {flag: [] for flag in FACILITY_FLAGS}
+        beginner: List[int] = []
+        grams: Dict[str, List[int]] = {}
+        self._search_texts: List[str] = []
+
+        for position, mountain in enumerate(self.mountains):
+            by_region.setdefault(mountain.region, []).append(position)
+            by_prefecture.setdefault(mountain.prefecture, []).append(position)
+            by_difficulty.setdefault(mountain.difficulty.level, []).append(position)
+
+            if mountain.is_beginner_friendly():
+                beginner.append(position)
+
+            if mountain.facilities:
+                for flag in FACILITY_FLAGS:
+                    if getattr(mountain.facilities, flag, False):
+                        by_facility[flag].append(position)
+
+            # 名前、県名、地域、特徴、キーワードを検索対象とする
+            search_text = " ".join([
+                mountain.name,
+                mountain.prefecture,
+                mountain.region,
+                " ".join(mountain.features),
+                " ".join(mountain.keywords)
+            ]).lower()
+            self._search_texts.append(search_text)
+            # 1文字のキーワードにも対応できるよう単一文字も登録する
+            for gram in _grams(search_text).union(search_text):
+                grams.setdefault(gram, []).append(position)
+
+        self._by_region = {key: Postings(p) for key, p in by_region.items()}
+        self._by_prefecture = {key: Postings(p) for key, p in by_prefecture.items()}
+        self._by_difficulty = {key: Postings(p) for key, p in by_difficulty.items()}
+        self._by_facility = {key: Postings(p) for key, p in by_facility.items()}
+        self._beginner = Postings(beginner)
+        self._not_beginner = Postings(self._all.members - self._beginner.members)
+        self._grams: Dict[str, FrozenSet[int]] = {key: frozenset(p) for key, p in grams.items()}
+
+        self._elevation_order = sorted(self._all.positions, key=lambda p: self.mountains[p].elevation)
+        self._elevations = [self.mountains[p].elevation for p in self._elevation_order]
+
+    def __len__(self) -> int:
+        return len(self.mountains)
+
+    def query(
+        self,
+        region: Optional[str] = None,
+        prefecture: Optional[str] = None,
+        difficulty: Optional[DifficultyLevel] = None,
+        beginner_friendly: Optional[bool] = None,
+        facilities: Optional[Iterable[str]] = None,
+        min_elevation: Optional[int] = None,
+        max_elevation: Optional[int] = None,
+        keyword: Optional[str] = None,
+        limit: Optional[int] = None
+    ) -> List[Mountain]:
+        """
+        条件を組み合わせて山を検索（指定した条件はすべてAND）
+
+        Args:
+            prefecture: 部分一致（「東京」で「東京都」、「山梨県」で「山梨県・静岡県」も一致）
+            facilities: FACILITY_FLAGS のうち必須とする設備
+            keyword: 名前・県名・地域・特徴・キーワードの部分一致（大文字小文字を区別しない）
+        """
+        conditions: List[Postings] = []
+
+        if region is not None:
+            conditions.append(self._by_region.get(region, EMPTY))
+        if prefecture is not None:
+            conditions.append(self._prefecture_postings(prefecture))
+        if difficulty is not None:
+            conditions.append(self._by_difficulty.get(DifficultyLevel(difficulty), EMPTY))
+        if beginner_friendly is not None:
+            conditions.append(self._beginner if beginner_friendly else self._not_beginner)
+        for flag in facilities or ():
+            if flag not in self._by_facility:
+                raise ValueError(f"Unknown facility flag: {flag} (expected one of {FACILITY_FLAGS})")
+            conditions.append(self._by_facility[flag])
+
+        elevation_range: Optional[Tuple[float, float]] = None
+
+        if min_elevation is not None or max_elevation is not None:
+            start = bisect_left(self._elevations, min_elevation) if min_elevation is not None else 0
+            end = bisect_right(self._elevations, max_elevation) if max_elevation is not None else len(self)
+            if not conditions or end - start < min(len(c) for c in conditions):
+                # 標高が最も絞り込める条件の場合のみ、範囲から候補一覧を作る
+                conditions.append(Postings(self._elevation_order[start:end]))
+            else:
+                elevation_range = (
+                    min_elevation if min_elevation is not None else float("-inf"),
+                    max_elevation if max_elevation is not None else float("inf")
+                )
+
+        if keyword is not None:
+            keyword_postings = self._keyword_postings(keyword)
+            if keyword_postings is not None:
+                conditions.append(keyword_postings)
+
+        # 件数の少ない条件から順に積集合をとる
+        conditions.sort(key=len)
+        if len(conditions) <= 1:
+            positions = (conditions[0] if conditions else self._all).positions
+        else:
+            members = conditions[0].members
+            for other in conditions[1:]:
+                if not members:
+                    break
+                members = members & other.members
+            positions = sorted(members)
+
+        result = [self.mountains[p] for p in positions]
+        if elevation_range is not None:
+            low, high = elevation_range
+            result = [m for m in result if low <= m.elevation <= high]
+        return result[:limit] if limit is not None else result
+
+    def _prefecture_postings(self, prefecture: str) -> Postings:
+        """都道府県（部分一致）に該当する位置"""
+        exact = self._by_prefecture.get(prefecture)
+        partial = [postings for value, postings in self._by_prefecture.items()
+                   if value != prefecture and prefecture in value]
+        if not partial:
+            return exact or EMPTY
+        if exact is not None:
+            partial.append(exact)
+        return Postings(frozenset().union(*(p.members for p in partial)))
+
+    def _keyword_postings(self, keyword: str) -> Optional[Postings]:
+        """キーワードを部分一致で含む位置（空のキーワードは絞り込まないためNone）"""
+        keyword = keyword.lower()
+        if not keyword:
+            return None
+
+        # 出現件数の少ないバイグラムから順に積集合をとり、最後に文字列で照合する
+        postings = sorted((self._grams.get(gram, frozenset()) for gram in _grams(keyword)), key=len)
+        candidates = postings[0]
+        for other in postings[1:]:
+            if not candidates:
+                return EMPTY
+            candidates = candidates & other
+
+        return Postings(p for p in candidates if keyword in self._search_texts[p])
+
+
+def _grams(text: str) -> Set[str]:
+    """文字バイグラムの集合（1文字の場合はその文字）"""
+    if len(text) < 2:
+        return {text} if text else set()
+    return set(map(add, text, text[1:]))
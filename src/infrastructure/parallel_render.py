@@ -0,0 +1,98 @@
+"""
+静的サイトのページ生成を並列化する実装
+
+ページの生成（テンプレートの描画）をプロセスプールに分散し、生成結果のバイト列を
+入力順にメインプロセスへ返す。ファイルの書き込みはメインプロセスだけが行うため、
+並列数に関係なく出力は逐次生成と同じになる。
+
+各ワーカーは起動時に factory で描画用の状態（Jinja2環境やジェネレーター）を一度だけ作成し、
+以降のページで使い回す（テンプレートのコンパイル結果もワーカー内でキャッシュされる）。
+
+標準ライブラリのみで実装しているため、設定（pydantic）を読み込まない
+サイト生成スクリプトからも利用できる。
+"""
+import os
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Callable, Iterator, NamedTuple, Optional, Sequence, Union
+
+Content = Union[str, bytes]
+
+
+class RenderResult(NamedTuple):
+    """1ページ分の生成結果（失敗時は content がNoneで error にメッセージ）"""
+    item: Any
+    content: Optional[bytes]
+    error: Optional[str]
+
+
+# ワーカープロセス内の描画状態（_init_worker で設定）
+_worker_state: Any = None
+_worker_render: Optional[Callable[[Any, Any], Content]] = None
+
+
+def resolve_jobs(jobs: Optional[int]) -> int:
+    """並列数の指定を解決（0以下・None はCPU数）"""
+    if jobs is None or jobs <= 0:
+        return os.cpu_count() or 1
+    return jobs
+
+
+def render_pages(
+    items: Sequence[Any],
+    render: Callable[[Any, Any], Content],
+    factory: Callable[[], Any],
+    jobs: int = 1,
+    local_state: Any = None
+) -> Iterator[RenderResult]:
+    """
+    ページを生成して入力順に返す
+
+    Args:
+        items: ページごとの入力（ワーカーへ渡すためpickle可能であること）
+        render: render(state, item) でページ内容を返すモジュールレベルの関数
+        factory: ワーカーごとの描画状態を作成するモジュールレベルの関数（クラスも可）
+        jobs: 並列数（1の場合はプロセスを起動せずこのプロセスで生成）
+        local_state: jobs=1 の場合に使う描画状態（省略時は factory で作成）
+    """
+    jobs = resolve_jobs(jobs)
+
+    if jobs == 1 or len(items) <= 1:
+        state = local_state if local_state is not None else factory()
+        for item in items:
+            yield _render_one(state, render, item)
+        return
+
+    workers = min(jobs, len(items))
+    # 1回のやり取りで複数ページを渡し、プロセス間通信の回数を抑える
+    chunksize = max(1, len(items) // (workers * 4))
+    with ProcessPoolExecutor(
+        max_workers=workers,
+        initializer=_init_worker,
+        initargs=(factory, render)
+    ) as executor:
+        for item, (content, error) in zip(items, executor.map(_render_in_worker, items, chunksize=chunksize)):
+            yield RenderResult(item, content, error)
+
+
+def _init_worker(factory: Callable[[], Any], render: Callable[[Any, Any], Content]):
+    """ワーカープロセスの初期化（描画状態を一度だけ作成）"""
+    global _worker_state, _worker_render
+    _worker_state = factory()
+    _worker_render = render
+
+
+def _render_in_worker(item: Any):
+    """ワーカープロセスで1ページを生成"""
+    result = _render_one(_worker_state, _worker_render, item)
+    return result.content, result.error
+
+
+def _render_one(state: Any, render: Callable[[Any, Any], Content], item: Any) -> RenderResult:
+    """1ページを生成してUTF-8のバイト列にする（例外は結果として返す）"""
+    try:
+        content = render(state, item)
+    except Exception as e:
+        return RenderResult(item, None, f"{type(e).__name__}: {e}")
+    if isinstance(content, str):
+        content = content.encode("utf-8")
+    return RenderResult(item, content, None)
@@ -0,0 +1,278 @@
+"""
+アフィリエイト商品検索結果の永続キャッシュ実装
+
+キーワード（と検索条件）をキーに、楽天APIの検索結果をSQLiteに保存する。
+stale-while-revalidate 方式で、鮮度切れのエントリは即座に返しつつ
+バックグラウンドで再取得する。
+
+標準ライブラリのみで実装しているため、設定（pydantic）を読み込まない
+スタンドアロンのスクリプト（update_affiliate_simple.py など）からも利用できる。
+"""
+import json
+import queue
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Any, Callable, Dict, List, NamedTuple, Optional, Sequence, Set, Tuple
+
+# エントリの鮮度
+FRESH = "fresh"
+STALE = "stale"
+EXPIRED = "expired"
+
+Payload = List[Dict[str, Any]]
+
+
+class CachedEntry(NamedTuple):
+    """キャッシュされた検索結果"""
+    payload: Payload
+    fetched_at: float
+
+
+class ProductCache:
+    """
+    キーワード単位の商品キャッシュ
+
+    取得からの経過時間でエントリを3段階に分類する。
+
+      - fresh   (経過 < fresh_seconds):      そのまま返す
+      - stale   (経過 < max_stale_seconds):  そのまま返し、バックグラウンドで再取得
+      - expired (それ以上):                  同期的に再取得（失敗時は古い値を返す）
+
+    オフラインモードでは楽天APIを一切呼ばず、鮮度に関係なくキャッシュだけを返す。
+    """
+
+    def __init__(
+        self,
+        db_path: str,
+        fresh_seconds: float,
+        max_stale_seconds: float,
+        offline: bool = False,
+        refresh_workers: int = 2,
+        on_error: Optional[Callable[[str, Exception], None]] = None
+    ):
+        self.db_path = Path(db_path)
+        self.fresh_seconds = fresh_seconds
+        self.max_stale_seconds = max(max_stale_seconds, fresh_seconds)
+        self.offline = offline
+        self.on_error = on_error
+
+        self.fresh_hits = 0
+        self.stale_hits = 0
+        self.misses = 0
+        self.fetches = 0
+        self.refreshes = 0
+
+        self._lock = threading.Lock()
+        self._refresh_workers = max(1, refresh_workers)
+        self._refresh_queue: "queue.Queue[Tuple[str, str, Callable[[str], Payload]]]" = queue.Queue()
+        self._workers: List[threading.Thread] = []
+        self._in_flight: Set[str] = set()
+        self._idle = threading.Condition(self._lock)
+
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(str(self.db_path), check_same_thread=False, timeout=30)
+        # サイト生成とスクリプトが同時に読み書きしても待たされないようにする
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS product_cache (
+                cache_key TEXT PRIMARY KEY,
+                keyword TEXT NOT NULL,
+                payload TEXT NOT NULL,
+                fetched_at REAL NOT NULL
+            )
+            """
+        )
+        self._conn.commit()
+
+    @staticmethod
+    def make_key(kind: str, keyword: str, **params: Any) -> str:
+        """検索種別・キーワード・検索条件からキャッシュキーを生成"""
+        return json.dumps([kind, keyword, params], ensure_ascii=False, sort_keys=True)
+
+    def lookup(self, key: str) -> Optional[CachedEntry]:
+        """エントリを取得（存在しない場合はNone）"""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT payload, fetched_at FROM product_cache WHERE cache_key = ?", (key,)
+            ).fetchone()
+        if row is None:
+            return None
+        try:
+            return CachedEntry(json.loads(row[0]), row[1])
+        except json.JSONDecodeError:
+            return None
+
+    def store(self, key: str, keyword: str, payload: Payload):
+        """検索結果を保存"""
+        data = json.dumps(payload, ensure_ascii=False)
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO product_cache (cache_key, keyword, payload, fetched_at) "
+                "VALUES (?, ?, ?, ?)",
+                (key, keyword, data, time.time())
+            )
+            self._conn.commit()
+
+    def state_of(self, entry: CachedEntry) -> str:
+        """エントリの鮮度を判定"""
+        age = time.time() - entry.fetched_at
+        if age < self.fresh_seconds:
+            return FRESH
+        if age < self.max_stale_seconds:
+            return STALE
+        return EXPIRED
+
+    def get(
+        self,
+        key: str,
+        keyword: str,
+        fetch: Callable[[str], Payload],
+        block_on_miss: bool = True
+    ) -> Optional[Payload]:
+        """
+        キャッシュ経由で検索結果を取得
+
+        Args:
+            fetch: キーワードを受け取りAPIから検索結果を取得する関数（失敗時は例外を送出）
+            block_on_miss: Falseの場合、未取得・期限切れでもAPIの応答を待たず、
+                手元の値（なければNone）を返して再取得はバックグラウンドで行う
+        """
+        return self.get_many(
+            [(key, keyword)],
+            lambda keywords: [fetch(keywords[0])],
+            block_on_miss=block_on_miss
+        )[0]
+
+    def get_many(
+        self,
+        entries: Sequence[Tuple[str, str]],
+        fetch_many: Callable[[List[str]], List[Payload]],
+        block_on_miss: bool = True
+    ) -> List[Optional[Payload]]:
+        """
+        複数キーワードの検索結果をまとめて取得（結果は入力順）
+
+        同期的な取得が必要なキーワードだけを fetch_many に1回で渡すため、
+        同時検索に対応したクライアントをそのまま利用できる。
+        """
+        results: List[Optional[Payload]] = [None] * len(entries)
+        pending: List[int] = []
+
+        def fetch_one(keyword: str) -> Payload:
+            return fetch_many([keyword])[0]
+
+        for index, (key, keyword) in enumerate(entries):
+            entry = self.lookup(key)
+            state = self.state_of(entry) if entry is not None else None
+
+            if state == FRESH or (entry is not None and self.offline):
+                self._count("fresh_hits" if state == FRESH else "stale_hits")
+                results[index] = entry.payload
+            elif state == STALE or (entry is not None and not block_on_miss):
+                self._count("stale_hits")
+                results[index] = entry.payload
+                self.refresh_in_background(key, keyword, fetch_one)
+            else:
+                self._count("misses")
+                if self.offline:
+                    continue
+                if not block_on_miss:
+                    self.refresh_in_background(key, keyword, fetch_one)
+                    continue
+                pending.append(index)
+
+        if not pending:
+            return results
+
+        keywords = [entries[index][1] for index in pending]
+        self._count("fetches", len(pending))
+        try:
+            fetched = fetch_many(keywords)
+        except Exception as e:
+            # 期限切れでも手元に値があるものは古い値で代用する（stale-if-error）
+            if any(self.lookup(entries[index][0]) is None for index in pending):
+                raise
+            self._report_error(", ".join(keywords), e)
+            for index in pending:
+                results[index] = self.lookup(entries[index][0]).payload
+            return results
+
+        for index, payload in zip(pending, fetched):
+            key, keyword = entries[index]
+            self.store(key, keyword, payload)
+            results[index] = payload
+
+        return results
+
+    def refresh_in_background(self, key: str, keyword: str, fetch: Callable[[str], Payload]):
+        """
+        エントリをバックグラウンドで再取得（同じキーの再取得は重複させない）
+
+        再取得は refresh_workers 本のワーカースレッドが順に処理する。
+        """
+        if self.offline:
+            return
+
+        with self._lock:
+            if key in self._in_flight:
+                return
+            self._in_flight.add(key)
+            self._refresh_queue.put((key, keyword, fetch))
+            if len(self._workers) < self._refresh_workers:
+                # プロセス終了を妨げないようデーモンスレッドで実行する
+                worker = threading.Thread(
+                    target=self._refresh_worker,
+                    name=f"product-cache-refresh-{len(self._workers) + 1}",
+                    daemon=True
+                )
+                self._workers.append(worker)
+                worker.start()
+
+    def wait_for_refreshes(self, timeout: Optional[float] = None) -> bool:
+        """実行中のバックグラウンド再取得の完了を待つ（タイムアウト時はFalse）"""
+        with self._idle:
+            return self._idle.wait_for(lambda: not self._in_flight, timeout)
+
+    def format_stats(self) -> str:
+        """ログ出力用の統計文字列"""
+        with self._lock:
+            return (
+                f"fresh={self.fresh_hits} stale={self.stale_hits} misses={self.misses} "
+                f"fetches={self.fetches} refreshes={self.refreshes}"
+            )
+
+    def close(self):
+        """データベース接続を閉じる"""
+        with self._lock:
+            self._conn.close()
+
+    def _refresh_worker(self):
+        """再取得キューを処理し続けるワーカー"""
+        while True:
+            self._refresh(*self._refresh_queue.get())
+
+    def _refresh(self, key: str, keyword: str, fetch: Callable[[str], Payload]):
+        """再取得の本体（失敗時は古い値を残す）"""
+        try:
+            payload = fetch(keyword)
+            self.store(key, keyword, payload)
+            self._count("refreshes")
+        except Exception as e:
+            self._report_error(keyword, e)
+        finally:
+            with self._idle:
+                self._in_flight.discard(key)
+                self._idle.notify_all()
+
+    def _count(self, name: str, amount: int = 1):
+        """統計カウンターを加算"""
+        with self._lock:
+            setattr(self, name, getattr(self, name) + amount)
+
+    def _report_error(self, keyword: str, error: Exception):
+        """取得失敗を通知"""
+        if self.on_error is not None:
+            self.on_error(keyword, error)
@@ -3,12 +3,18 @@
 """
 import json
 import random
-from typing import Dict, List, Optional, Any
+from typing import Dict, Iterable, List, Optional, Any, Tuple
 from pathlib import Path
 
 from config.settings import get_settings
 from config.logging_config import LoggerMixin
-from src.domain.entities import Mountain, MountainFactory, DifficultyLevel
+from src.domain.entities import Mountain, MountainFactory, DifficultyLevel, ProductKeywordPlanner
+from src.infrastructure.data_snapshot import load_snapshot
+from src.infrastructure.mountain_index import MountainIndex
+
+
+# スナップショットに保存する構造のバージョン（エンティティや索引の構造を変えたら上げる）
+SNAPSHOT_VERSION = 2
 
 
 class RepositoryError(Exception):
@@ -23,49 +29,96 @@ class MountainRepository(LoggerMixin):
         self.settings = get_settings()
         self._mountains_cache: Optional[Dict[str, Mountain]] = None
         self._mountains_data: Optional[Dict[str, Any]] = None
+        self._keyword_plans: Dict[str, Tuple[str, ...]] = {}
+        self._index: Optional[MountainIndex] = None
+        self._data_file: Optional[Path] = None
+        self._data_version = 0
+    
+    @property
+    def data_file_path(self) -> Optional[Path]:
+        """読み込んだ山データファイルのパス（未読み込みの場合はNone）"""
+        return self._data_file
+    
+    @property
+    def data_version(self) -> int:
+        """
+        読み込み済みデータのバージョン
+        
+        reload_data 後にデータを読み込み直すたびに変わる。
+        データから作った応答をキャッシュする場合のキーに使う。
+        """
+        self._load_mountains_cache()
+        return self._data_version
+    
+    def _find_data_file(self) -> Path:
+        """読み込む山データファイルを決定"""
+        mountains_file = Path(self.settings.mountains_file_path)
+        
+        # 拡張版全国データファイルを最優先
+        expanded_file = Path(self.settings.DATA_DIR) / "mountains_japan_expanded.json"
+        japan_file = Path(self.settings.DATA_DIR) / "mountains_japan.json"
+        
+        if expanded_file.exists():
+            return expanded_file
+        if japan_file.exists():
+            return japan_file
+        if mountains_file.exists():
+            return mountains_file
+        raise RepositoryError("山データファイルが見つかりません")
+    
+    @staticmethod
+    def _build_snapshot(data: Dict[str, Any]) -> Dict[str, Any]:
+        """解析済みのJSONからスナップショットに保存する構造を組み立て"""
+        mountains = {}
+        for mountain_data in data['mountains']:
+            mountain = MountainFactory.from_dict(mountain_data)
+            mountains[mountain.id] = mountain
+        
+        return {
+            "data": data,
+            "mountains": mountains,
+            # 商品キーワードは山ごとに固定なので読み込み時に一度だけ計算する
+            "keyword_plans": {
+                mountain_id: ProductKeywordPlanner.plan(mountain)
+                for mountain_id, mountain in mountains.items()
+            },
+            "index": MountainIndex(mountains.values()),
+        }
+    
+    def _load_snapshot(self):
+        """山データとエンティティ・インデックスをスナップショット経由で読み込み"""
+        data_file = self._find_data_file()
+        try:
+            snapshot = load_snapshot(
+                data_file,
+                build=self._build_snapshot,
+                kind="repository",
+                version=SNAPSHOT_VERSION
+            )
+        except (FileNotFoundError, json.JSONDecodeError) as e:
+            self.log_error("Failed to load mountain data", e)
+            raise RepositoryError(f"山データの読み込みに失敗: {str(e)}")
+        
+        self._mountains_data = snapshot["data"]
+        self._keyword_plans = snapshot["keyword_plans"]
+        self._index = snapshot["index"]
+        self._mountains_cache = snapshot["mountains"]
+        self._data_file = data_file
+        self._data_version += 1
+        
+        self.log_info(f"Loaded mountain data from: {data_file}")
+        self.log_info(f"Cached {len(self._mountains_cache)} mountains")
     
     def _load_mountains_data(self) -> Dict[str, Any]:
         """山データを読み込み"""
         if self._mountains_data is None:
-            try:
-                mountains_file = Path(self.settings.mountains_file_path)
-                
-                # 拡張版全国データファイルを最優先
-                expanded_file = Path(self.settings.DATA_DIR) / "mountains_japan_expanded.json"
-                japan_file = Path(self.settings.DATA_DIR) / "mountains_japan.json"
-                
-                if expanded_file.exists():
-                    data_file = expanded_file
-                elif japan_file.exists():
-                    data_file = japan_file
-                elif mountains_file.exists():
-                    data_file = mountains_file
-                else:
-                    raise RepositoryError("山データファイルが見つかりません")
-                
-                with open(data_file, 'r', encoding='utf-8') as f:
-                    self._mountains_data = json.load(f)
-                
-                self.log_info(f"Loaded mountain data from: {data_file}")
-                
-            except (FileNotFoundError, json.JSONDecodeError) as e:
-                self.log_error("Failed to load mountain data", e)
-                raise RepositoryError(f"山データの読み込みに失敗: {str(e)}")
-        
+            self._load_snapshot()
         return self._mountains_data
     
     def _load_mountains_cache(self) -> Dict[str, Mountain]:
         """山エンティティのキャッシュを読み込み"""
         if self._mountains_cache is None:
-            data = self._load_mountains_data()
-            self._mountains_cache = {}
-            
-            for mountain_data in data['mountains']:
-                mountain = MountainFactory.from_dict(mountain_data)
-                self._mountains_cache[mountain.id] = mountain
-            
-            self.log_info(f"Cached {len(self._mountains_cache)} mountains")
-        
+            self._load_snapshot()
         return self._mountains_cache
     
     def get_by_id(self, mountain_id: str) -> Optional[Mountain]:
@@ -73,56 +126,80 @@ class MountainRepository(LoggerMixin):
         mountains = self._load_mountains_cache()
         return mountains.get(mountain_id)
     
+    def get_product_keywords(self, mountain: Mountain) -> Tuple[str, ...]:
+        """山の商品キーワードを取得（データにない山はその場で計算）"""
+        self._load_mountains_cache()
+        keywords = self._keyword_plans.get(mountain.id)
+        if keywords is None or self._mountains_cache.get(mountain.id) is not mountain:
+            return ProductKeywordPlanner.plan(mountain)
+        return keywords
+    
     def get_all(self) -> List[Mountain]:
         """全ての山を取得"""
         mountains = self._load_mountains_cache()
         return list(mountains.values())
     
+    def _get_index(self) -> MountainIndex:
+        """検索インデックスを取得（未読み込みの場合は読み込む）"""
+        self._load_mountains_cache()
+        return self._index
+    
+    def find(
+        self,
+        region: Optional[str] = None,
+        prefecture: Optional[str] = None,
+        difficulty: Optional[DifficultyLevel] = None,
+        beginner_friendly: Optional[bool] = None,
+        facilities: Optional[Iterable[str]] = None,
+        min_elevation: Optional[int] = None,
+        max_elevation: Optional[int] = None,
+        keyword: Optional[str] = None,
+        limit: Optional[int] = None
+    ) -> List[Mountain]:
+        """
+        複数条件を組み合わせて山を検索（指定した条件はすべてAND）
+        
+        条件の詳細は MountainIndex.query を参照。
+        """
+        return self._get_index().query(
+            region=region,
+            prefecture=prefecture,
+            difficulty=difficulty,
+            beginner_friendly=beginner_friendly,
+            facilities=facilities,
+            min_elevation=min_elevation,
+            max_elevation=max_elevation,
+            keyword=keyword,
+            limit=limit
+        )
+    
     def get_by_region(self, region: str) -> List[Mountain]:
         """地域で山を検索"""
-        mountains = self.get_all()
-        return [m for m in mountains if m.region == region]
+        return self.find(region=region)
     
     def get_by_prefecture(self, prefecture: str) -> List[Mountain]:
         """都道府県で山を検索"""
-        mountains = self.get_all()
-        return [m for m in mountains if prefecture in m.prefecture]
+        return self.find(prefecture=prefecture)
     
     def get_by_difficulty(self, difficulty: DifficultyLevel) -> List[Mountain]:
         """難易度で山を検索"""
-        mountains = self.get_all()
-        return [m for m in mountains if m.difficulty.level == difficulty]
+        return self.find(difficulty=difficulty)
+    
+    def get_by_elevation(self, min_elevation: Optional[int] = None, max_elevation: Optional[int] = None) -> List[Mountain]:
+        """標高の範囲で山を検索"""
+        return self.find(min_elevation=min_elevation, max_elevation=max_elevation)
     
     def get_beginner_friendly(self) -> List[Mountain]:
         """初心者向けの山を取得"""
-        mountains = self.get_all()
-        return [m for m in mountains if m.is_beginner_friendly()]
+        return self.find(beginner_friendly=True)
     
     def get_with_cable_car(self) -> List[Mountain]:
         """ケーブルカーがある山を取得"""
-        mountains = self.get_all()
-        return [m for m in mountains if m.has_cable_car()]
+        return self.find(facilities=["cable_car"])
     
     def search_by_keyword(self, keyword: str) -> List[Mountain]:
-        """キーワードで山を検索"""
-        mountains = self.get_all()
-        keyword_lower = keyword.lower()
-        
-        results = []
-        for mountain in mountains:
-            # 名前、県名、特徴、キーワードで検索
-            search_text = " ".join([
-                mountain.name,
-                mountain.prefecture,
-                mountain.region,
-                " ".join(mountain.features),
-                " ".join(mountain.keywords)
-            ]).lower()
-            
-            if keyword_lower in search_text:
-                results.append(mountain)
-        
-        return results
+        """キーワードで山を検索（名前、県名、地域、特徴、キーワードの部分一致）"""
+        return self.find(keyword=keyword)
     
     def search_by_tags(self, tags: List[str]) -> List[Mountain]:
         """タグで山を検索"""
@@ -213,6 +290,8 @@ class MountainRepository(LoggerMixin):
         """データを再読み込み"""
         self._mountains_cache = None
         self._mountains_data = None
+        self._keyword_plans = {}
+        self._index = None
         self.log_info("Mountain data cache cleared")
 
 
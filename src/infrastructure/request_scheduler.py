@@ -0,0 +1,293 @@
+"""
+外部API呼び出しのスケジューラー実装
+
+ホストごとのトークンバケットによるレート制御、同時実行数の上限、
+Retry-After を尊重したジッター付き指数バックオフによる再試行をまとめて提供する。
+"""
+import asyncio
+import random
+import threading
+import time
+from email.utils import parsedate_to_datetime
+from typing import Any, Awaitable, Callable, Dict, Optional, Set, TypeVar
+from urllib.parse import urlparse
+
+import aiohttp
+import anthropic
+import requests
+
+from config.settings import get_settings
+from config.logging_config import LoggerMixin
+
+
+T = TypeVar("T")
+
+# 再試行の対象とするHTTPステータス
+RETRYABLE_STATUSES = {408, 425, 429, 500, 502, 503, 504, 529}
+
+# 再試行の対象とする通信エラー
+RETRYABLE_ERRORS = (
+    requests.ConnectionError,
+    requests.Timeout,
+    anthropic.APIConnectionError,
+    aiohttp.ClientConnectionError,
+    asyncio.TimeoutError,
+    ConnectionError,
+    TimeoutError,
+)
+
+
+def host_of(url: str) -> str:
+    """URLからホスト名を取り出す"""
+    return urlparse(str(url)).hostname or str(url)
+
+
+class TokenBucket:
+    """
+    トークンバケット（スレッドセーフ）
+
+    reserve() はトークンを1つ予約し、予約分が補充されるまでの待ち時間を返す。
+    待ち時間の sleep は呼び出し側で行うため、同期・非同期のどちらからも利用できる。
+    """
+
+    def __init__(self, rate_per_sec: float, burst: Optional[float] = None):
+        self.rate = rate_per_sec
+        self.capacity = burst if burst is not None else max(1.0, rate_per_sec)
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def reserve(self) -> float:
+        """トークンを1つ予約し、必要な待ち時間（秒）を返す"""
+        if self.rate <= 0:
+            return 0.0
+
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+            self._tokens -= 1
+            if self._tokens >= 0:
+                return 0.0
+            return -self._tokens / self.rate
+
+
+class HostPolicy:
+    """ホストごとのレート・同時実行数の制御"""
+
+    def __init__(self, rate_per_sec: float, burst: Optional[float], max_concurrency: int):
+        self.bucket = TokenBucket(rate_per_sec, burst)
+        self.max_concurrency = max_concurrency
+        self.semaphore = threading.BoundedSemaphore(max_concurrency)
+        self._async_semaphores: Dict[asyncio.AbstractEventLoop, asyncio.Semaphore] = {}
+        self._lock = threading.Lock()
+
+    def async_semaphore(self) -> asyncio.Semaphore:
+        """実行中のイベントループ用のセマフォを取得"""
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            if loop not in self._async_semaphores:
+                self._async_semaphores[loop] = asyncio.Semaphore(self.max_concurrency)
+            return self._async_semaphores[loop]
+
+
+class RequestScheduler(LoggerMixin):
+    """
+    外部APIリクエストのスケジューラー
+
+    すべてのAPIクライアントが共有し、ホスト単位で
+    トークンバケット・同時実行数上限・再試行を適用する。
+    """
+
+    def __init__(
+        self,
+        max_retries: int,
+        retry_delay: float,
+        max_retry_delay: float = 60.0,
+        default_max_concurrency: int = 8
+    ):
+        self.max_retries = max_retries
+        self.retry_delay = retry_delay
+        self.max_retry_delay = max_retry_delay
+        self.default_max_concurrency = default_max_concurrency
+        self._policies: Dict[str, HostPolicy] = {}
+        self._configured: Set[str] = set()
+        self._lock = threading.Lock()
+        self._random = random.Random()
+
+    def configure_host(
+        self,
+        host: str,
+        rate_per_sec: float,
+        max_concurrency: int,
+        burst: Optional[float] = None
+    ):
+        """
+        ホストのレート・同時実行数を設定
+
+        クライアントは生成のたびに呼び出すため、設定済みのホストは変更しない
+        （バケットとセマフォを全クライアントで共有するため）。
+        """
+        with self._lock:
+            if host in self._configured:
+                return
+            self._policies[host] = HostPolicy(rate_per_sec, burst, max_concurrency)
+            self._configured.add(host)
+        self.log_debug(
+            f"Configured host {host}: {rate_per_sec}/s, max_concurrency={max_concurrency}"
+        )
+
+    def policy_for(self, host: str) -> HostPolicy:
+        """ホストのポリシーを取得（未設定のホストはレート制限なし）"""
+        with self._lock:
+            if host not in self._policies:
+                self._policies[host] = HostPolicy(0, None, self.default_max_concurrency)
+            return self._policies[host]
+
+    def call(
+        self,
+        host: str,
+        func: Callable[..., T],
+        *args: Any,
+        idempotent: bool = True,
+        **kwargs: Any
+    ) -> T:
+        """
+        同期関数をスケジューラー経由で呼び出す
+
+        Args:
+            host: レート制御の単位となるホスト名
+            func: 実行する関数（失敗時は例外を送出すること）
+            idempotent: Falseの場合、429（未処理が確実な応答）以外では再試行しない
+        """
+        policy = self.policy_for(host)
+
+        for attempt in range(self.max_retries + 1):
+            with policy.semaphore:
+                wait = policy.bucket.reserve()
+                if wait > 0:
+                    time.sleep(wait)
+                try:
+                    return func(*args, **kwargs)
+                except Exception as e:
+                    delay = self._next_delay(e, attempt, idempotent)
+                    if delay is None:
+                        raise
+                    self._log_retry(host, e, attempt, delay)
+
+            time.sleep(delay)
+
+        raise AssertionError("unreachable")
+
+    async def call_async(
+        self,
+        host: str,
+        coro_factory: Callable[[], Awaitable[T]],
+        idempotent: bool = True
+    ) -> T:
+        """
+        コルーチンをスケジューラー経由で実行する
+
+        再試行のたびに新しいコルーチンが必要なため、コルーチンを返す関数を受け取る。
+        """
+        policy = self.policy_for(host)
+        semaphore = policy.async_semaphore()
+
+        for attempt in range(self.max_retries + 1):
+            async with semaphore:
+                wait = policy.bucket.reserve()
+                if wait > 0:
+                    await asyncio.sleep(wait)
+                try:
+                    return await coro_factory()
+                except Exception as e:
+                    delay = self._next_delay(e, attempt, idempotent)
+                    if delay is None:
+                        raise
+                    self._log_retry(host, e, attempt, delay)
+
+            await asyncio.sleep(delay)
+
+        raise AssertionError("unreachable")
+
+    def _next_delay(self, error: Exception, attempt: int, idempotent: bool) -> Optional[float]:
+        """再試行までの待ち時間を決定（再試行しない場合はNone）"""
+        if attempt >= self.max_retries:
+            return None
+
+        status = _status_of(error)
+        if status is not None:
+            if status not in RETRYABLE_STATUSES:
+                return None
+            if not idempotent and status != 429:
+                return None
+        elif not isinstance(error, RETRYABLE_ERRORS) or not idempotent:
+            return None
+
+        retry_after = _retry_after_of(error)
+        if retry_after is not None:
+            # サーバー指定の待ち時間を優先し、同時再試行が揃わないよう少しだけずらす
+            return min(self.max_retry_delay, retry_after) + self._random.uniform(0, 0.5)
+
+        # ジッター付き指数バックオフ（待ち時間の半分は固定、残り半分をランダム化）
+        backoff = min(self.max_retry_delay, self.retry_delay * (2 ** attempt))
+        return backoff / 2 + self._random.uniform(0, backoff / 2)
+
+    def _log_retry(self, host: str, error: Exception, attempt: int, delay: float):
+        """再試行をログに記録"""
+        self.log_warning(
+            f"Request to {host} failed ({type(error).__name__}: {error}); "
+            f"retry {attempt + 1}/{self.max_retries} in {delay:.1f}s"
+        )
+
+
+def _status_of(error: Exception) -> Optional[int]:
+    """例外からHTTPステータスを取り出す（requests / anthropic / aiohttp）"""
+    status = getattr(error, 'status_code', None) or getattr(error, 'status', None)
+    if status is None:
+        response = getattr(error, 'response', None)
+        status = getattr(response, 'status_code', None)
+    return status if isinstance(status, int) else None
+
+
+def _retry_after_of(error: Exception) -> Optional[float]:
+    """例外に含まれるレスポンスの Retry-After ヘッダーを秒数で返す"""
+    headers = getattr(error, 'headers', None)
+    if headers is None:
+        headers = getattr(getattr(error, 'response', None), 'headers', None)
+    if not headers:
+        return None
+
+    value = headers.get('Retry-After') or headers.get('retry-after')
+    if not value:
+        return None
+
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+
+    try:
+        retry_at = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    return max(0.0, retry_at.timestamp() - time.time())
+
+
+# シングルトンインスタンス
+_scheduler_instance: Optional[RequestScheduler] = None
+_scheduler_lock = threading.Lock()
+
+
+def get_request_scheduler() -> RequestScheduler:
+    """共有スケジューラーを取得（シングルトンパターン）"""
+    global _scheduler_instance
+    with _scheduler_lock:
+        if _scheduler_instance is None:
+            settings = get_settings()
+            _scheduler_instance = RequestScheduler(
+                max_retries=settings.MAX_RETRIES,
+                retry_delay=settings.RETRY_DELAY,
+                max_retry_delay=settings.MAX_RETRY_DELAY
+            )
+        return _scheduler_instance
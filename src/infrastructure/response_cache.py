@@ -0,0 +1,233 @@
+"""
+APIレスポンスのディスクキャッシュ実装
+"""
+import hashlib
+import json
+import os
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+from config.logging_config import LoggerMixin
+
+
+class ResponseCache(LoggerMixin):
+    """
+    内容アドレス方式のレスポンスキャッシュ
+
+    リクエスト内容のハッシュをキーとして、レスポンスを1件1ファイルで保存する。
+    有効期限（TTL）切れのエントリは読み込み時に破棄し、合計サイズが上限を
+    超えた場合は最終アクセスが古いものから削除する。
+    """
+
+    def __init__(self, cache_dir: str, ttl_seconds: int, max_bytes: int):
+        self.cache_dir = Path(cache_dir)
+        self.ttl_seconds = ttl_seconds
+        self.max_bytes = max_bytes
+
+        self.hits = 0
+        self.misses = 0
+        self.stores = 0
+        self.evictions = 0
+
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self._total_bytes: Optional[int] = None
+
+    @staticmethod
+    def make_key(**parts: Any) -> str:
+        """リクエスト内容からキャッシュキーを生成"""
+        payload = json.dumps(parts, ensure_ascii=False, sort_keys=True, default=str)
+        return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+    def get(self, key: str) -> Optional[str]:
+        """キャッシュからレスポンスを取得（存在しない・期限切れの場合はNone）"""
+        path = self._entry_path(key)
+        entry = self._read_entry(path)
+
+        if entry is not None and self._is_expired(entry):
+            self._remove(path)
+            entry = None
+
+        with self._lock:
+            if entry is None:
+                self.misses += 1
+                self._local.last_status = "miss"
+                return None
+
+            self.hits += 1
+            self._local.last_status = "hit"
+
+        # 最終アクセス時刻を更新（サイズ超過時の削除順に使用）
+        try:
+            os.utime(path, None)
+        except OSError:
+            pass
+
+        return entry['response']
+
+    def put(self, key: str, response: str, metadata: Optional[Dict[str, Any]] = None):
+        """レスポンスをキャッシュに保存"""
+        path = self._entry_path(key)
+        entry = {
+            "key": key,
+            "created_at": time.time(),
+            "metadata": metadata or {},
+            "response": response
+        }
+
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            data = json.dumps(entry, ensure_ascii=False).encode('utf-8')
+            previous_size = path.stat().st_size if path.exists() else 0
+
+            tmp_path = path.with_suffix(f".{threading.get_ident()}.tmp")
+            tmp_path.write_bytes(data)
+            os.replace(tmp_path, path)
+
+            with self._lock:
+                self.stores += 1
+                if self._total_bytes is not None:
+                    self._total_bytes += len(data) - previous_size
+
+            self._evict_if_needed()
+
+        except OSError as e:
+            self.log_warning(f"Failed to write cache entry {key[:12]}: {e}")
+
+    def record_skip(self, status: str):
+        """キャッシュを参照しなかった理由（bypass / refresh）を記録"""
+        self._local.last_status = status
+
+    def clear(self) -> int:
+        """全エントリを削除して削除件数を返す"""
+        removed = 0
+        for path in self._iter_entries():
+            if self._remove(path):
+                removed += 1
+        with self._lock:
+            self._total_bytes = 0
+        self.log_info(f"Cleared {removed} cache entries from {self.cache_dir}")
+        return removed
+
+    def purge_expired(self) -> int:
+        """期限切れのエントリを削除して削除件数を返す"""
+        removed = 0
+        for path in self._iter_entries():
+            entry = self._read_entry(path)
+            if entry is None or self._is_expired(entry):
+                if self._remove(path):
+                    removed += 1
+        return removed
+
+    def iter_entries(self):
+        """有効期限内の全エントリを列挙（統計・最終アクセス時刻は更新しない）"""
+        for path in self._iter_entries():
+            entry = self._read_entry(path)
+            if entry is not None and not self._is_expired(entry):
+                yield entry
+
+    def fingerprint(self) -> str:
+        """
+        キャッシュ内容の変化を検出するための指紋（件数と合計サイズ）
+
+        ヒット時に最終アクセス時刻を更新するため、更新時刻は指紋に含めない。
+        """
+        paths = self._iter_entries()
+        total = 0
+        for path in paths:
+            try:
+                total += path.stat().st_size
+            except OSError:
+                continue
+        return f"{len(paths)}:{total}"
+
+    def format_stats(self) -> str:
+        """ログ出力用の統計文字列"""
+        with self._lock:
+            lookups = self.hits + self.misses
+            hit_rate = (self.hits / lookups * 100) if lookups else 0.0
+            last_status = getattr(self._local, 'last_status', '-')
+            return (
+                f"cache={last_status} hits={self.hits} misses={self.misses} "
+                f"hit_rate={hit_rate:.1f}%"
+            )
+
+    def _entry_path(self, key: str) -> Path:
+        """キーに対応するファイルパス（先頭2文字でディレクトリを分割）"""
+        return self.cache_dir / key[:2] / f"{key}.json"
+
+    def _iter_entries(self):
+        """キャッシュファイルを列挙"""
+        if not self.cache_dir.exists():
+            return []
+        return list(self.cache_dir.glob("*/*.json"))
+
+    def _read_entry(self, path: Path) -> Optional[Dict[str, Any]]:
+        """エントリを読み込み（壊れたファイルは削除）"""
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return None
+        except (OSError, json.JSONDecodeError) as e:
+            self.log_warning(f"Discarding unreadable cache entry {path.name}: {e}")
+            self._remove(path)
+            return None
+
+    def _is_expired(self, entry: Dict[str, Any]) -> bool:
+        """期限切れかどうかを判定"""
+        if self.ttl_seconds <= 0:
+            return False
+        return time.time() - entry.get('created_at', 0) > self.ttl_seconds
+
+    def _remove(self, path: Path) -> bool:
+        """エントリを削除"""
+        try:
+            size = path.stat().st_size
+            path.unlink()
+        except OSError:
+            return False
+
+        with self._lock:
+            if self._total_bytes is not None:
+                self._total_bytes -= size
+        return True
+
+    def _evict_if_needed(self):
+        """合計サイズが上限を超えていれば古いエントリから削除"""
+        if self.max_bytes <= 0:
+            return
+
+        with self._lock:
+            total = self._total_bytes
+
+        if total is None:
+            total = sum(p.stat().st_size for p in self._iter_entries())
+            with self._lock:
+                self._total_bytes = total
+
+        if total <= self.max_bytes:
+            return
+
+        entries = []
+        for path in self._iter_entries():
+            try:
+                stat = path.stat()
+            except OSError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, path))
+        entries.sort()
+
+        # 上限の9割まで減らして削除が頻発しないようにする
+        target = int(self.max_bytes * 0.9)
+        for _, size, path in entries:
+            if total <= target:
+                break
+            if self._remove(path):
+                total -= size
+                with self._lock:
+                    self.evictions += 1
+
+        self.log_info(f"Cache size limit reached, evicted entries down to {total} bytes")
@@ -0,0 +1,393 @@
+"""
+山・記事の全文検索インデックス実装
+
+日本語は単語の区切りがないため、文字 n-gram（バイグラム・トライグラム）で
+転置インデックスを作り、BM25 で順位付けする。
+"""
+import json
+import math
+import os
+import re
+import threading
+import time
+import unicodedata
+from bisect import bisect_left
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+from config.settings import get_settings
+from config.logging_config import LoggerMixin
+from src.domain.entities import Mountain
+from src.infrastructure.repositories import MountainRepository, RepositoryFactory
+from src.infrastructure.response_cache import ResponseCache
+
+
+# 語の区切りとして扱う文字（空白・記号）
+_SEPARATORS = re.compile(r"[\s\W_]+", re.UNICODE)
+_HTML_TAGS = re.compile(r"<[^>]+>")
+
+# 山のフィールドごとの重み
+MOUNTAIN_FIELD_WEIGHTS = {
+    "name": 5.0,
+    "name_en": 3.0,
+    "prefecture": 2.0,
+    "region": 1.5,
+    "keywords": 2.0,
+    "features": 1.5,
+    "nearby_attractions": 1.0,
+    "articles": 0.5,
+}
+
+
+def normalize(text: str) -> str:
+    """検索用に正規化（全角・半角の統一、小文字化）"""
+    return unicodedata.normalize("NFKC", text).lower()
+
+
+def segments(text: str) -> List[str]:
+    """正規化した文字列を空白・記号で区切る"""
+    return [segment for segment in _SEPARATORS.split(normalize(text)) if segment]
+
+
+def ngrams(segment: str) -> List[str]:
+    """区切り済みの文字列のバイグラムとトライグラム（1文字の場合はその文字）"""
+    if len(segment) == 1:
+        return [segment]
+    grams = [segment[i:i + 2] for i in range(len(segment) - 1)]
+    grams.extend(segment[i:i + 3] for i in range(len(segment) - 2))
+    return grams
+
+
+class NgramSearchIndex:
+    """
+    文字 n-gram の転置インデックス（BM25 による順位付け）
+
+    各文書はフィールドごとの文字列を持ち、フィールドの重みを掛けた出現回数で
+    スコアを計算する（BM25F の簡易版）。検索語の各区切りのバイグラムを
+    すべて含む文書だけを候補とし、トライグラムの一致で連続した一致を上位にする。
+    1文字の区切りはその文字で始まる n-gram への前方一致として扱う。
+    """
+
+    FORMAT_VERSION = 2
+
+    def __init__(self, k1: float = 1.2, b: float = 0.75, prefix_boost: float = 1.5):
+        self.k1 = k1
+        self.b = b
+        self.prefix_boost = prefix_boost
+        self.doc_ids: List[str] = []
+        self.doc_titles: List[str] = []
+        self.doc_lengths: List[float] = []
+        self.postings: Dict[str, Dict[int, float]] = {}
+        self._sorted_grams: Optional[List[str]] = None
+
+    def __len__(self) -> int:
+        return len(self.doc_ids)
+
+    def add(self, doc_id: str, fields: Dict[str, Iterable[str]], weights: Dict[str, float], title: str = ""):
+        """文書を追加（fields はフィールド名 → 文字列の一覧）"""
+        doc = len(self.doc_ids)
+        self.doc_ids.append(doc_id)
+        self.doc_titles.append(normalize(title))
+
+        length = 0.0
+        for field, texts in fields.items():
+            weight = weights.get(field, 1.0)
+            for text in texts:
+                for segment in segments(text):
+                    for gram in ngrams(segment):
+                        postings = self.postings.setdefault(gram, {})
+                        postings[doc] = postings.get(doc, 0.0) + weight
+                        length += weight
+
+        self.doc_lengths.append(length)
+        self._sorted_grams = None
+
+    def search(self, query: str, limit: Optional[int] = None) -> List[Tuple[str, float]]:
+        """検索して (文書ID, スコア) をスコアの高い順に返す"""
+        query_segments = segments(query)
+        if not query_segments or not self.doc_ids:
+            return []
+
+        candidates: Optional[set] = None
+        scoring: List[Dict[int, float]] = []
+
+        for segment in query_segments:
+            if len(segment) == 1:
+                # 1文字は前方一致（その文字で始まる n-gram のいずれかを含む文書）
+                merged: Dict[int, float] = {}
+                for gram in self._grams_with_prefix(segment):
+                    for doc, tf in self.postings[gram].items():
+                        merged[doc] = max(merged.get(doc, 0.0), tf)
+                required = [merged]
+                scoring.append(merged)
+            else:
+                grams = ngrams(segment)
+                bigrams = grams[:len(segment) - 1]
+                required = [self.postings.get(gram, {}) for gram in bigrams]
+                scoring.extend(self.postings.get(gram, {}) for gram in grams)
+
+            for postings in sorted(required, key=len):
+                docs = set(postings) if candidates is None else candidates.intersection(postings)
+                candidates = docs
+                if not candidates:
+                    return []
+
+        doc_count = len(self.doc_ids)
+        average_length = sum(self.doc_lengths) / doc_count or 1.0
+        scores: Dict[int, float] = {}
+
+        for postings in scoring:
+            if not postings:
+                continue
+            idf = math.log(1 + (doc_count - len(postings) + 0.5) / (len(postings) + 0.5))
+            for doc in candidates.intersection(postings):
+                tf = postings[doc]
+                norm = self.k1 * (1 - self.b + self.b * self.doc_lengths[doc] / average_length)
+                scores[doc] = scores.get(doc, 0.0) + idf * tf * (self.k1 + 1) / (tf + norm)
+
+        # タイトル（山名）が検索語で始まる文書を優先
+        normalized_query = "".join(query_segments)
+        for doc in scores:
+            if self.doc_titles[doc].startswith(normalized_query):
+                scores[doc] *= self.prefix_boost
+
+        ranked = sorted(scores.items(), key=lambda item: (-item[1], item[0]))
+        if limit is not None:
+            ranked = ranked[:limit]
+        return [(self.doc_ids[doc], score) for doc, score in ranked]
+
+    def to_dict(self) -> Dict:
+        """シリアライズ用の辞書に変換"""
+        return {
+            "version": self.FORMAT_VERSION,
+            "params": {"k1": self.k1, "b": self.b, "prefix_boost": self.prefix_boost},
+            "doc_ids": self.doc_ids,
+            "doc_titles": self.doc_titles,
+            "doc_lengths": self.doc_lengths,
+            "postings": {gram: list(docs.items()) for gram, docs in self.postings.items()},
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict) -> "NgramSearchIndex":
+        """辞書から復元"""
+        if data.get("version") != cls.FORMAT_VERSION:
+            raise ValueError(f"Unsupported search index version: {data.get('version')}")
+
+        index = cls(**data["params"])
+        index.doc_ids = data["doc_ids"]
+        index.doc_titles = data["doc_titles"]
+        index.doc_lengths = data["doc_lengths"]
+        index.postings = {gram: dict((doc, tf) for doc, tf in docs) for gram, docs in data["postings"].items()}
+        return index
+
+    def _grams_with_prefix(self, prefix: str) -> List[str]:
+        """指定した文字列で始まる n-gram の一覧"""
+        if self._sorted_grams is None:
+            self._sorted_grams = sorted(self.postings)
+        grams = []
+        for position in range(bisect_left(self._sorted_grams, prefix), len(self._sorted_grams)):
+            gram = self._sorted_grams[position]
+            if not gram.startswith(prefix):
+                break
+            grams.append(gram)
+        return grams
+
+
+class MountainSearchIndex(LoggerMixin):
+    """
+    山の全文検索インデックス
+
+    山名・県名・地域・特徴・キーワード・周辺の見どころに加えて、
+    Claude API レスポンスキャッシュにある生成済み記事の本文も山ごとに索引化する。
+    インデックスはディスクに保存し、山データ・記事キャッシュが変わった場合のみ再構築する。
+    """
+
+    # 山データ・記事キャッシュの変更を確認する間隔（秒）
+    CHECK_INTERVAL = 5.0
+
+    def __init__(
+        self,
+        mountain_repo: MountainRepository,
+        index_path: str,
+        article_cache: Optional[ResponseCache] = None
+    ):
+        self.mountain_repo = mountain_repo
+        self.index_path = Path(index_path)
+        self.article_cache = article_cache
+        self._index: Optional[NgramSearchIndex] = None
+        self._fingerprint: Optional[str] = None
+        self._checked_at = 0.0
+        self._lock = threading.Lock()
+
+    def search(self, query: str, limit: Optional[int] = None) -> List[Tuple[Mountain, float]]:
+        """山を検索して (山, スコア) をスコアの高い順に返す"""
+        index = self._get_index()
+        results = []
+        for mountain_id, score in index.search(query):
+            mountain = self.mountain_repo.get_by_id(mountain_id)
+            if mountain is None:
+                continue
+            results.append((mountain, score))
+            if limit is not None and len(results) >= limit:
+                break
+        return results
+
+    def search_mountains(self, query: str, within: Optional[Sequence[Mountain]] = None) -> List[Mountain]:
+        """山を検索して関連度順に返す（within を指定した場合はその中から）"""
+        allowed = None if within is None else {m.id for m in within}
+        return [
+            mountain for mountain, _ in self.search(query)
+            if allowed is None or mountain.id in allowed
+        ]
+
+    def rebuild(self) -> NgramSearchIndex:
+        """インデックスを再構築してディスクに保存"""
+        with self._lock:
+            fingerprint = self._current_fingerprint()
+            self._index = self._build()
+            self._fingerprint = fingerprint
+            self._checked_at = time.monotonic()
+            self._save(self._index, fingerprint)
+            return self._index
+
+    def _get_index(self) -> NgramSearchIndex:
+        """最新のインデックスを取得（必要に応じて読み込み・再構築）"""
+        with self._lock:
+            # 変更の確認はファイル一覧の走査を伴うため、一定間隔でのみ行う
+            now = time.monotonic()
+            if self._index is not None and now - self._checked_at < self.CHECK_INTERVAL:
+                return self._index
+            self._checked_at = now
+
+            fingerprint = self._current_fingerprint()
+            if self._index is not None and self._fingerprint == fingerprint:
+                return self._index
+
+            index = self._load(fingerprint)
+            if index is None:
+                index = self._build()
+                self._save(index, fingerprint)
+
+            self._index = index
+            self._fingerprint = fingerprint
+            return index
+
+    def _build(self) -> NgramSearchIndex:
+        """山データと生成済み記事からインデックスを構築"""
+        mountains = self.mountain_repo.get_all()
+        articles = self._collect_articles(mountains)
+
+        index = NgramSearchIndex()
+        for mountain in mountains:
+            index.add(
+                mountain.id,
+                {
+                    "name": [mountain.name],
+                    "name_en": [mountain.name_en],
+                    "prefecture": [mountain.prefecture],
+                    "region": [mountain.region],
+                    "keywords": mountain.keywords,
+                    "features": mountain.features,
+                    "nearby_attractions": mountain.nearby_attractions,
+                    "articles": articles.get(mountain.id, []),
+                },
+                MOUNTAIN_FIELD_WEIGHTS,
+                title=mountain.name
+            )
+
+        article_count = sum(len(texts) for texts in articles.values())
+        self.log_info(
+            f"Built search index: {len(index)} mountains, {article_count} articles, "
+            f"{len(index.postings)} n-grams"
+        )
+        return index
+
+    def _collect_articles(self, mountains: List[Mountain]) -> Dict[str, List[str]]:
+        """
+        レスポンスキャッシュから山IDごとの記事本文を集める
+
+        同名の山（浅間山など）を区別するため、メタデータの山IDで対応付ける。
+        山IDを持たない古いエントリは山名で対応付けるが、同名の山が複数ある場合は
+        どの山の記事か判断できないため含めない。
+        """
+        articles: Dict[str, List[str]] = {}
+        if self.article_cache is None:
+            return articles
+
+        ids = {mountain.id for mountain in mountains}
+        ids_by_name: Dict[str, List[str]] = {}
+        for mountain in mountains:
+            ids_by_name.setdefault(mountain.name, []).append(mountain.id)
+
+        for entry in self.article_cache.iter_entries():
+            metadata = entry.get("metadata", {})
+            mountain_id = metadata.get("mountain_id")
+            if mountain_id is None:
+                candidates = ids_by_name.get(metadata.get("mountain"), [])
+                mountain_id = candidates[0] if len(candidates) == 1 else None
+            if mountain_id in ids:
+                articles.setdefault(mountain_id, []).append(_HTML_TAGS.sub(" ", entry.get("response", "")))
+        return articles
+
+    def _current_fingerprint(self) -> str:
+        """山データファイルと記事キャッシュの状態"""
+        parts = [f"v{NgramSearchIndex.FORMAT_VERSION}"]
+        self.mountain_repo.get_by_id("")  # データファイルを確定させるため読み込んでおく
+        data_file = self.mountain_repo.data_file_path
+        if data_file is not None and data_file.exists():
+            stat = data_file.stat()
+            parts.append(f"{data_file}:{stat.st_size}:{stat.st_mtime_ns}")
+        if self.article_cache is not None:
+            parts.append(self.article_cache.fingerprint())
+        return "|".join(parts)
+
+    def _load(self, fingerprint: str) -> Optional[NgramSearchIndex]:
+        """保存済みのインデックスを読み込み（内容が古い場合はNone）"""
+        try:
+            with open(self.index_path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+            if data.get("fingerprint") != fingerprint:
+                return None
+            return NgramSearchIndex.from_dict(data["index"])
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError, KeyError) as e:
+            self.log_warning(f"Discarding unreadable search index {self.index_path}: {e}")
+            return None
+
+    def _save(self, index: NgramSearchIndex, fingerprint: str):
+        """インデックスをディスクに保存"""
+        try:
+            self.index_path.parent.mkdir(parents=True, exist_ok=True)
+            tmp_path = self.index_path.with_suffix(f".{threading.get_ident()}.tmp")
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump({"fingerprint": fingerprint, "index": index.to_dict()}, f, ensure_ascii=False)
+            os.replace(tmp_path, self.index_path)
+        except OSError as e:
+            self.log_warning(f"Failed to save search index {self.index_path}: {e}")
+
+
+# シングルトンインスタンス
+_search_index_instance: Optional[MountainSearchIndex] = None
+_search_index_lock = threading.Lock()
+
+
+def get_mountain_search_index() -> MountainSearchIndex:
+    """共有の山検索インデックスを取得（シングルトンパターン）"""
+    global _search_index_instance
+    with _search_index_lock:
+        if _search_index_instance is None:
+            settings = get_settings()
+            article_cache = None
+            if settings.CLAUDE_CACHE_ENABLED:
+                article_cache = ResponseCache(
+                    cache_dir=settings.CLAUDE_CACHE_DIR,
+                    ttl_seconds=settings.CLAUDE_CACHE_TTL,
+                    max_bytes=settings.CLAUDE_CACHE_MAX_MB * 1024 * 1024
+                )
+            _search_index_instance = MountainSearchIndex(
+                RepositoryFactory.get_mountain_repository(),
+                index_path=settings.SEARCH_INDEX_PATH,
+                article_cache=article_cache
+            )
+        return _search_index_instance
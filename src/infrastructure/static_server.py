@@ -0,0 +1,394 @@
+"""
+生成済み静的サイトを配信するHTTPサーバーの実装（プレビュー・ステージング・負荷試験用）
+
+http.server の SimpleHTTPRequestHandler をもとに、本番のWebサーバー（.htaccess の設定）と
+同じ応答を返すようにしたもの。
+
+  - スレッドごとにリクエストを処理（ThreadingHTTPServer、HTTP/1.1 の keep-alive に対応）
+  - ETag / Last-Modified を付け、If-None-Match / If-Modified-Since が一致すれば 304 を返す
+  - Accept-Encoding に応じて、サイト生成時に作成した .br / .gz（asset_pipeline.py）をそのまま返す
+  - 小さいファイルはメモリ上のLRUキャッシュから返し、大きいファイルは sendfile で送る
+  - 単一の Range 要求（bytes=開始-終了）に 206 で応答する
+  - アクセスログに処理時間を出力し、処理時間のヒストグラムを集計する
+
+Cache-Control は .htaccess と同じく、ハッシュ付きの CSS / JS は長期間（immutable）、
+HTML は毎回再検証（no-cache）、それ以外は max_age 秒とする。
+
+標準ライブラリのみで実装しているため、設定（pydantic）を読み込まない serve.py からも利用できる。
+"""
+import email.utils
+import http.server
+import os
+import re
+import threading
+import time
+from collections import OrderedDict
+from functools import partial
+from http import HTTPStatus
+from typing import List, NamedTuple, Optional, Sequence, Tuple
+
+from src.infrastructure.asset_fingerprint import FINGERPRINTED_NAME_PATTERN
+from src.infrastructure.asset_pipeline import TEXT_ASSET_TYPES
+
+# メモリ上にキャッシュする合計サイズと1ファイルの上限（上限を超えるファイルは sendfile で送る）
+DEFAULT_CACHE_BYTES = 64 * 1024 * 1024
+DEFAULT_MAX_CACHED_FILE_BYTES = 256 * 1024
+
+# ハッシュ付きでも HTML でもないファイルをブラウザにキャッシュさせる秒数
+DEFAULT_MAX_AGE = 3600
+
+# 優先する順の圧縮形式（Content-Encoding, 圧縮済みファイルの拡張子）
+PRECOMPRESSED_ENCODINGS = (("br", ".br"), ("gzip", ".gz"))
+
+# 処理時間ヒストグラムの区切り（ミリ秒。最後の区切りを超えたものはまとめて数える）
+LATENCY_BUCKETS_MS = (1, 2, 5, 10, 25, 50, 100, 250, 500, 1000)
+
+_IMMUTABLE_NAME = re.compile(FINGERPRINTED_NAME_PATTERN + r"$")
+_RANGE = re.compile(r"bytes=(\d*)-(\d*)$")
+
+
+class FileCache:
+    """
+    小さいファイルの内容を保持するLRUキャッシュ
+
+    キーはファイルのパス。更新日時とサイズが変わったファイルは読み込み直す。
+    """
+
+    def __init__(self, max_bytes: int = DEFAULT_CACHE_BYTES,
+                 max_file_bytes: int = DEFAULT_MAX_CACHED_FILE_BYTES):
+        self.max_bytes = max_bytes
+        self.max_file_bytes = max_file_bytes
+
+        self.hits = 0
+        self.misses = 0
+
+        self._lock = threading.Lock()
+        self._entries: "OrderedDict[str, Tuple[int, int, bytes]]" = OrderedDict()
+        self._total_bytes = 0
+
+    def accepts(self, size: int) -> bool:
+        """キャッシュに載せる大きさかどうか"""
+        return size <= self.max_file_bytes and self.max_bytes > 0
+
+    def read(self, path: str, stat: os.stat_result) -> bytes:
+        """ファイルの内容を返す（キャッシュにない・変更された場合は読み込んで保存）"""
+        with self._lock:
+            entry = self._entries.get(path)
+            if entry is not None and entry[:2] == (stat.st_mtime_ns, stat.st_size):
+                self._entries.move_to_end(path)
+                self.hits += 1
+                return entry[2]
+            self.misses += 1
+
+        with open(path, "rb") as f:
+            data = f.read()
+
+        with self._lock:
+            previous = self._entries.pop(path, None)
+            if previous is not None:
+                self._total_bytes -= len(previous[2])
+            self._entries[path] = (stat.st_mtime_ns, stat.st_size, data)
+            self._total_bytes += len(data)
+            while self._total_bytes > self.max_bytes and self._entries:
+                _, (_, _, evicted) = self._entries.popitem(last=False)
+                self._total_bytes -= len(evicted)
+        return data
+
+    @property
+    def total_bytes(self) -> int:
+        return self._total_bytes
+
+
+class LatencyHistogram:
+    """リクエストの処理時間のヒストグラム（スレッドセーフ）"""
+
+    def __init__(self, buckets_ms: Sequence[float] = LATENCY_BUCKETS_MS):
+        self.buckets_ms = tuple(buckets_ms)
+        self.counts = [0] * (len(self.buckets_ms) + 1)
+        self.total = 0
+        self.total_ms = 0.0
+        self.max_ms = 0.0
+        self._lock = threading.Lock()
+
+    def record(self, seconds: float):
+        """処理時間を1件記録"""
+        ms = seconds * 1000
+        index = next((i for i, bound in enumerate(self.buckets_ms) if ms <= bound), len(self.buckets_ms))
+        with self._lock:
+            self.counts[index] += 1
+            self.total += 1
+            self.total_ms += ms
+            self.max_ms = max(self.max_ms, ms)
+
+    def percentile(self, q: float) -> Optional[float]:
+        """q パーセンタイルを含む区切りの上限（ミリ秒。最後の区切りを超える場合は最大値）"""
+        with self._lock:
+            if not self.total:
+                return None
+            threshold = self.total * q / 100
+            seen = 0
+            for i, count in enumerate(self.counts):
+                seen += count
+                if seen >= threshold:
+                    return self.buckets_ms[i] if i < len(self.buckets_ms) else self.max_ms
+        return self.max_ms
+
+    def format(self, width: int = 40) -> str:
+        """ヒストグラムを表示用の文字列にする"""
+        if not self.total:
+            return "リクエストはありません"
+        with self._lock:
+            counts = list(self.counts)
+            total, total_ms, max_ms = self.total, self.total_ms, self.max_ms
+        peak = max(counts)
+        labels = [f"≤{bound:g}ms" for bound in self.buckets_ms] + [f">{self.buckets_ms[-1]:g}ms"]
+        lines = [
+            f"{total}件  平均 {total_ms / total:.2f}ms  最大 {max_ms:.2f}ms  "
+            f"p50 ≤{self.percentile(50):g}ms  p95 ≤{self.percentile(95):g}ms  p99 ≤{self.percentile(99):g}ms"
+        ]
+        for label, count in zip(labels, counts):
+            if count:
+                bar = "█" * max(1, round(count / peak * width))
+                lines.append(f"  {label:>9} {count:>8}  {bar}")
+        return "\n".join(lines)
+
+
+class _Representation(NamedTuple):
+    """返すファイル（元のファイルまたは圧縮済みファイル）"""
+    path: str
+    encoding: Optional[str]
+    stat: os.stat_result
+
+
+class StaticRequestHandler(http.server.SimpleHTTPRequestHandler):
+    """静的サイト配信用のリクエストハンドラー（StaticSiteServer と組み合わせて使う）"""
+
+    server_version = "MountainBlogStatic/1.0"
+    protocol_version = "HTTP/1.1"
+    # ヘッダーと本文を別々に送るため、Nagle アルゴリズムと遅延ACKで keep-alive 時に約40ms待たされるのを防ぐ
+    disable_nagle_algorithm = True
+
+    def parse_request(self) -> bool:
+        # keep-alive の待ち時間を含めないよう、リクエスト行を受け取った時点から計測する
+        self._started = time.perf_counter()
+        self._status = None
+        self._sent_encoding = None
+        return super().parse_request()
+
+    def handle_one_request(self):
+        self._status = None
+        super().handle_one_request()
+        if self._status is not None:
+            elapsed = time.perf_counter() - self._started
+            self.server.latency.record(elapsed)
+            if self.server.access_log:
+                self.log_message('"%s" %s %s %.2fms%s', self.requestline, self._status, self._size,
+                                 elapsed * 1000, f" {self._sent_encoding}" if self._sent_encoding else "")
+
+    def log_request(self, code="-", size="-"):
+        # 応答の送信後に処理時間と合わせて出力する（handle_one_request）
+        self._status = code.value if isinstance(code, HTTPStatus) else code
+        self._size = size
+
+    def do_GET(self):
+        self._serve(head=False)
+
+    def do_HEAD(self):
+        self._serve(head=True)
+
+    def _serve(self, head: bool):
+        path = self.translate_path(self.path)
+        if os.path.isdir(path):
+            index = os.path.join(path, "index.html")
+            if not self.path.split("?", 1)[0].endswith("/") or not os.path.isfile(index):
+                # 末尾にスラッシュのないディレクトリのリダイレクトと一覧表示は標準の処理に任せる
+                return super().do_HEAD() if head else super().do_GET()
+            path = index
+        elif not os.path.isfile(path):
+            self.send_error(HTTPStatus.NOT_FOUND, "File not found")
+            return
+
+        try:
+            original = os.stat(path)
+            representation = self._select_representation(path, original)
+        except OSError:
+            self.send_error(HTTPStatus.NOT_FOUND, "File not found")
+            return
+
+        stat = representation.stat
+        suffix = f"-{representation.encoding}" if representation.encoding else ""
+        etag = f'"{stat.st_mtime_ns:x}-{stat.st_size:x}{suffix}"'
+
+        if self._not_modified(etag, original.st_mtime):
+            self.send_response(HTTPStatus.NOT_MODIFIED)
+            self._send_cache_headers(path, etag, original.st_mtime)
+            self.end_headers()
+            return
+
+        start, end = 0, stat.st_size - 1
+        byte_range = self._requested_range(etag, stat.st_size) if representation.encoding is None else None
+        if byte_range == "unsatisfiable":
+            self.send_response(HTTPStatus.REQUESTED_RANGE_NOT_SATISFIABLE)
+            self.send_header("Content-Range", f"bytes */{stat.st_size}")
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+            return
+        if byte_range:
+            start, end = byte_range
+            self.send_response(HTTPStatus.PARTIAL_CONTENT)
+            self.send_header("Content-Range", f"bytes {start}-{end}/{stat.st_size}")
+        else:
+            self.send_response(HTTPStatus.OK)
+
+        length = max(end - start + 1, 0)
+        self.send_header("Content-Type", self._content_type(path))
+        self.send_header("Content-Length", str(length))
+        if representation.encoding:
+            self.send_header("Content-Encoding", representation.encoding)
+            self._sent_encoding = representation.encoding
+        self._send_cache_headers(path, etag, original.st_mtime)
+        self.end_headers()
+        self._size = length
+
+        if head or not length:
+            return
+        cache = self.server.file_cache
+        if cache.accepts(stat.st_size):
+            self.wfile.write(memoryview(cache.read(representation.path, stat))[start:end + 1])
+        else:
+            with open(representation.path, "rb") as f:
+                # socket.sendfile は os.sendfile が使えない環境では通常の送信に切り替える
+                self.connection.sendfile(f, offset=start, count=length)
+
+    def _select_representation(self, path: str, original: os.stat_result) -> _Representation:
+        """Accept-Encoding に応じて、元のファイルか圧縮済みファイルを選ぶ"""
+        if self.headers.get("Range") is None and self._is_text_asset(path):
+            accepted = self._accepted_encodings()
+            for encoding, extension in PRECOMPRESSED_ENCODINGS:
+                if encoding not in accepted:
+                    continue
+                try:
+                    stat = os.stat(path + extension)
+                except OSError:
+                    continue
+                # 元のファイルより古い圧縮済みファイルは内容が異なるため使わない
+                if stat.st_mtime_ns >= original.st_mtime_ns:
+                    return _Representation(path + extension, encoding, stat)
+        return _Representation(path, None, original)
+
+    def _accepted_encodings(self) -> List[str]:
+        """Accept-Encoding のうち q=0 でない形式"""
+        accepted = []
+        for item in (self.headers.get("Accept-Encoding") or "").split(","):
+            name, _, params = item.strip().partition(";")
+            if params.replace(" ", "") in ("q=0", "q=0.0", "q=0.00", "q=0.000"):
+                continue
+            accepted.append(name.strip().lower())
+        return accepted
+
+    def _not_modified(self, etag: str, mtime: float) -> bool:
+        """条件付きリクエストが一致するか（If-None-Match を優先する）"""
+        if_none_match = self.headers.get("If-None-Match")
+        if if_none_match is not None:
+            tags = [tag.strip() for tag in if_none_match.split(",")]
+            return "*" in tags or etag in tags or f"W/{etag}" in tags
+
+        if_modified_since = self.headers.get("If-Modified-Since")
+        if if_modified_since:
+            try:
+                since = email.utils.parsedate_to_datetime(if_modified_since)
+            except (TypeError, ValueError, IndexError, OverflowError):
+                return False
+            return since is not None and int(mtime) <= since.timestamp()
+        return False
+
+    def _requested_range(self, etag: str, size: int):
+        """
+        単一の Range 要求を (開始, 終了) にする
+
+        Range がない・解釈できない・If-Range が一致しない場合は None（全体を返す）、
+        範囲がファイルの外の場合は "unsatisfiable"。
+        """
+        header = self.headers.get("Range")
+        if not header:
+            return None
+        if_range = self.headers.get("If-Range")
+        if if_range is not None and if_range.strip() != etag:
+            return None
+        match = _RANGE.match(header.strip())
+        if not match or not any(match.groups()):
+            return None
+        first, last = match.groups()
+        if not first:
+            # bytes=-N は末尾の N バイト
+            length = int(last)
+            if not length:
+                return "unsatisfiable"
+            return max(size - length, 0), size - 1
+        start = int(first)
+        end = min(int(last), size - 1) if last else size - 1
+        if start >= size or end < start:
+            return "unsatisfiable"
+        return start, end
+
+    def _send_cache_headers(self, path: str, etag: str, mtime: float):
+        """ETag / Last-Modified / Cache-Control / Vary"""
+        self.send_header("ETag", etag)
+        self.send_header("Last-Modified", email.utils.formatdate(mtime, usegmt=True))
+        self.send_header("Cache-Control", self._cache_control(path))
+        self.send_header("Accept-Ranges", "bytes")
+        if self._is_text_asset(path):
+            self.send_header("Vary", "Accept-Encoding")
+
+    def _cache_control(self, path: str) -> str:
+        if _IMMUTABLE_NAME.search(path):
+            return "public, max-age=31536000, immutable"
+        if path.endswith(".html"):
+            return "no-cache"
+        return f"public, max-age={self.server.max_age}"
+
+    def _content_type(self, path: str) -> str:
+        return TEXT_ASSET_TYPES.get(os.path.splitext(path)[1][1:].lower()) or self.guess_type(path)
+
+    @staticmethod
+    def _is_text_asset(path: str) -> bool:
+        return os.path.splitext(path)[1][1:].lower() in TEXT_ASSET_TYPES
+
+
+class StaticSiteServer(http.server.ThreadingHTTPServer):
+    """
+    静的サイト配信サーバー
+
+    使い方:
+        with StaticSiteServer(("", 8888), "static_site") as server:
+            server.serve_forever()
+    """
+
+    daemon_threads = True
+
+    def __init__(
+        self,
+        address: Tuple[str, int],
+        directory: str,
+        cache_bytes: int = DEFAULT_CACHE_BYTES,
+        max_cached_file_bytes: int = DEFAULT_MAX_CACHED_FILE_BYTES,
+        max_age: int = DEFAULT_MAX_AGE,
+        access_log: bool = True
+    ):
+        self.directory = os.path.abspath(directory)
+        self.file_cache = FileCache(cache_bytes, max_cached_file_bytes)
+        self.latency = LatencyHistogram()
+        self.max_age = max_age
+        self.access_log = access_log
+        super().__init__(address, partial(StaticRequestHandler, directory=self.directory))
+
+    def format_stats(self) -> str:
+        """処理時間のヒストグラムとキャッシュの利用状況"""
+        cache = self.file_cache
+        requests = cache.hits + cache.misses
+        hit_rate = cache.hits / requests if requests else 0.0
+        return (
+            f"{self.latency.format()}\n"
+            f"メモリキャッシュ: ヒット {cache.hits}件 / 読み込み {cache.misses}件"
+            f"（ヒット率 {hit_rate:.0%}、{cache.total_bytes / 1024 / 1024:.1f}MB 使用）"
+        )
@@ -0,0 +1,68 @@
+"""
+{{key}} 形式のプレースホルダーを持つテンプレートの実装
+
+テンプレートを一度だけ解析して「固定文字列」と「変数名」の並びに分割しておき、
+描画時は各部分を1回の join で連結する。変数ごとにテンプレート全体を置換・複製する
+str.replace 方式と異なり、描画コストはテンプレートの大きさと変数の数の和に比例する。
+
+標準ライブラリのみで実装しているため、設定（pydantic）を読み込まない
+サイト生成スクリプトからも利用できる。
+"""
+import re
+from typing import Any, Dict, List, Mapping, Tuple
+
+PLACEHOLDER_PATTERN = re.compile(r"\{\{(\w+)\}\}")
+
+# 値が渡されなかったことを表す番兵（None は値として描画する）
+_MISSING = object()
+
+
+class CompiledTemplate:
+    """
+    解析済みのテンプレート
+
+    描画時に値が渡されなかったプレースホルダーは {{key}} のまま残す
+    （従来の str.replace 方式と同じ動作）。
+    """
+
+    __slots__ = ("source", "_literals", "_keys")
+
+    def __init__(self, source: str):
+        self.source = source
+        # split は [固定文字列, 変数名, 固定文字列, 変数名, ..., 固定文字列] を返す
+        parts = PLACEHOLDER_PATTERN.split(source)
+        self._literals: Tuple[str, ...] = tuple(parts[0::2])
+        self._keys: Tuple[str, ...] = tuple(parts[1::2])
+
+    @property
+    def keys(self) -> Tuple[str, ...]:
+        """テンプレート中の変数名（出現順、重複あり）"""
+        return self._keys
+
+    def render(self, variables: Mapping[str, Any]) -> str:
+        """変数を埋め込んだ文字列を生成"""
+        literals = self._literals
+        out: List[str] = [literals[0]]
+        for index, key in enumerate(self._keys, 1):
+            value = variables.get(key, _MISSING)
+            out.append("{{" + key + "}}" if value is _MISSING else str(value))
+            out.append(literals[index])
+        return "".join(out)
+
+
+class TemplateCache:
+    """テンプレート文字列 → 解析済みテンプレートのキャッシュ"""
+
+    def __init__(self):
+        self._compiled: Dict[str, CompiledTemplate] = {}
+
+    def get(self, source: str) -> CompiledTemplate:
+        """解析済みテンプレートを取得（初回のみ解析）"""
+        compiled = self._compiled.get(source)
+        if compiled is None:
+            compiled = self._compiled[source] = CompiledTemplate(source)
+        return compiled
+
+    def render(self, source: str, variables: Mapping[str, Any]) -> str:
+        """テンプレート文字列に変数を埋め込む"""
+        return self.get(source).render(variables)
@@ -0,0 +1,295 @@
+"""
+WordPress インポート用 WXR（WordPress eXtended RSS）ファイルの逐次書き込み実装
+
+ヘッダー（チャンネル情報・投稿者・カテゴリ）を書いた後、記事を1件ずつ <item> として
+ファイルへ書き出す。文書全体を文字列として組み立てないため、記事数が増えてもメモリ使用量は
+1記事分で済み、途中で処理が止まってもそれまでに書いた記事はファイルに残る。
+
+  - 本文・抜粋等は CDATA セクションで出力する。本文中の "]]>" は CDATA を分割して出力し、
+    XML 1.0 で使えない制御文字は取り除く
+  - 出力先のファイル名が .gz で終わる場合（または compress=True）は gzip 圧縮して書き込む
+    （WordPress のインポーターは .xml.gz をそのまま読み込める）
+
+標準ライブラリのみで実装しているため、設定（pydantic）を読み込まない
+utils/ のスクリプトからも利用できる。
+"""
+import gzip
+import io
+import re
+from dataclasses import dataclass, field
+from datetime import datetime
+from pathlib import Path
+from typing import IO, Iterable, List, Optional, Tuple, Union
+from xml.sax.saxutils import escape, quoteattr
+
+# WXR 1.2 で使う名前空間
+WXR_NAMESPACES = (
+    ("excerpt", "http://wordpress.org/export/1.2/excerpt/"),
+    ("content", "http://purl.org/rss/1.0/modules/content/"),
+    ("wfw", "http://wellformedweb.org/CommentAPI/"),
+    ("dc", "http://purl.org/dc/elements/1.1/"),
+    ("wp", "http://wordpress.org/export/1.2/"),
+)
+
+WXR_VERSION = "1.2"
+
+# <pubDate> と <wp:post_date> の日時形式
+RSS_DATE_FORMAT = "%a, %d %b %Y %H:%M:%S +0000"
+POST_DATE_FORMAT = "%Y-%m-%d %H:%M:%S"
+
+# XML 1.0 で使えない文字（タブ・改行・復帰以外の制御文字等）
+_INVALID_XML_CHARS = re.compile("[\x00-\x08\x0b\x0c\x0e-\x1f\ufffe\uffff]")
+
+
+def clean_xml_text(text) -> str:
+    """XML 1.0 で使えない文字を取り除く"""
+    return _INVALID_XML_CHARS.sub("", "" if text is None else str(text))
+
+
+def cdata(text) -> str:
+    """CDATA セクション（本文中の "]]>" は CDATA を分割して表す）"""
+    return "<![CDATA[" + clean_xml_text(text).replace("]]>", "]]]]><![CDATA[>") + "]]>"
+
+
+def escape_text(text) -> str:
+    """要素のテキストとしてエスケープ"""
+    return escape(clean_xml_text(text))
+
+
+def create_slug(text: str) -> str:
+    """URLスラッグを生成"""
+    slug = re.sub(r'[^\w\s-]', '', text.lower())
+    slug = re.sub(r'[-\s]+', '-', slug)
+    return slug[:50]  # 長さ制限
+
+
+def featured_image_postmeta(image_url: str, title: str) -> List[Tuple[str, str]]:
+    """アイキャッチ画像のポストメタ（複数のプラグイン対応）"""
+    alt = f"{title}のアイキャッチ画像"
+    return [
+        ("_thumbnail_url", image_url),
+        ("_thumbnail_id", "0"),
+        ("fifu_image_url", image_url),
+        ("fifu_image_alt", alt),
+        ("_yoast_wpseo_opengraph-image", image_url),
+        ("_yoast_wpseo_twitter-image", image_url),
+        ("_wp_attachment_image_alt", alt),
+    ]
+
+
+@dataclass
+class WXRAuthor:
+    """投稿者"""
+    login: str
+    email: str = ""
+    display_name: str = ""
+    author_id: int = 1
+
+
+@dataclass
+class WXRCategory:
+    """カテゴリ"""
+    nicename: str
+    name: str
+    term_id: int = 1
+    parent: str = ""
+
+
+@dataclass
+class WXRChannel:
+    """チャンネル情報（ファイルのヘッダー部分）"""
+    title: str
+    link: str
+    description: str = ""
+    pub_date: Optional[datetime] = None
+    language: str = "ja"
+    generator: Optional[str] = None
+    author: Optional[WXRAuthor] = None
+    categories: List[WXRCategory] = field(default_factory=list)
+
+
+@dataclass
+class WXRItem:
+    """記事1件"""
+    post_id: int
+    title: str
+    content: str
+    post_date: datetime
+    excerpt: str = ""
+    status: str = "draft"
+    creator: str = "admin"
+    post_name: Optional[str] = None
+    # (domain, nicename, 名前)。タグは tags に指定する
+    categories: List[Tuple[str, str, str]] = field(default_factory=lambda: [("category", "area", "エリア別")])
+    tags: List[str] = field(default_factory=list)
+    postmeta: List[Tuple[str, str]] = field(default_factory=list)
+
+
+class WXRWriter:
+    """
+    WXR ファイルを記事1件ずつ書き込む
+
+    使い方:
+        with WXRWriter("export.xml.gz", channel) as writer:
+            for item in items:
+                writer.write_item(item)
+
+    書き込み中に例外が発生した場合も、それまでに書いた記事を含む正しい形式のファイルとして閉じる。
+    """
+
+    def __init__(self, output: Union[str, Path, IO[str]], channel: WXRChannel, compress: Optional[bool] = None):
+        """
+        Args:
+            output: 出力先のファイルパス、またはテキストのファイルオブジェクト
+            channel: チャンネル情報
+            compress: gzip 圧縮するか（None の場合はファイル名が .gz で終わるか）
+        """
+        self.output = output
+        self.channel = channel
+        self.compress = compress
+        self.items_written = 0
+        self._file: Optional[IO[str]] = None
+        self._owns_file = False
+
+    def __enter__(self) -> "WXRWriter":
+        return self.open()
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    def open(self) -> "WXRWriter":
+        """出力先を開いてヘッダーを書き込む"""
+        if isinstance(self.output, (str, Path)):
+            path = Path(self.output)
+            compress = self.compress if self.compress is not None else path.suffix == ".gz"
+            if compress:
+                self._file = gzip.open(path, "wt", encoding="utf-8", newline="\n")
+            else:
+                self._file = open(path, "w", encoding="utf-8", newline="\n")
+            self._owns_file = True
+        else:
+            self._file = self.output
+        self._file.write(self._render_header())
+        return self
+
+    def write_item(self, item: WXRItem):
+        """記事を1件書き込む（書き込み後にフラッシュする）"""
+        if self._file is None:
+            raise RuntimeError("WXRWriter is not open")
+        self._file.write(self._render_item(item))
+        self._file.flush()
+        self.items_written += 1
+
+    def close(self):
+        """フッターを書き込んで閉じる"""
+        if self._file is None:
+            return
+        try:
+            self._file.write("\n</channel>\n</rss>\n")
+            self._file.flush()
+        finally:
+            if self._owns_file:
+                self._file.close()
+            self._file = None
+
+    def _render_header(self) -> str:
+        channel = self.channel
+        lines = ['<?xml version="1.0" encoding="UTF-8"?>', '<rss version="2.0"']
+        lines.extend(f'\txmlns:{prefix}="{uri}"' for prefix, uri in WXR_NAMESPACES)
+        lines.extend([">", "", "<channel>"])
+        lines.append(f"\t<title>{escape_text(channel.title)}</title>")
+        lines.append(f"\t<link>{escape_text(channel.link)}</link>")
+        lines.append(f"\t<description>{escape_text(channel.description)}</description>")
+        if channel.pub_date is not None:
+            lines.append(f"\t<pubDate>{channel.pub_date.strftime(RSS_DATE_FORMAT)}</pubDate>")
+        lines.append(f"\t<language>{escape_text(channel.language)}</language>")
+        lines.append(f"\t<wp:wxr_version>{WXR_VERSION}</wp:wxr_version>")
+        lines.append(f"\t<wp:base_site_url>{escape_text(channel.link)}</wp:base_site_url>")
+        lines.append(f"\t<wp:base_blog_url>{escape_text(channel.link)}</wp:base_blog_url>")
+        if channel.generator:
+            lines.append(f"\t<generator>{escape_text(channel.generator)}</generator>")
+
+        if channel.author is not None:
+            author = channel.author
+            lines.extend([
+                "",
+                "\t<wp:author>",
+                f"\t\t<wp:author_id>{author.author_id}</wp:author_id>",
+                f"\t\t<wp:author_login>{cdata(author.login)}</wp:author_login>",
+                f"\t\t<wp:author_email>{cdata(author.email)}</wp:author_email>",
+                f"\t\t<wp:author_display_name>{cdata(author.display_name or author.login)}</wp:author_display_name>",
+                f"\t\t<wp:author_first_name>{cdata('')}</wp:author_first_name>",
+                f"\t\t<wp:author_last_name>{cdata('')}</wp:author_last_name>",
+                "\t</wp:author>",
+            ])
+
+        for category in channel.categories:
+            lines.extend([
+                "",
+                "\t<wp:category>",
+                f"\t\t<wp:term_id>{category.term_id}</wp:term_id>",
+                f"\t\t<wp:category_nicename>{cdata(category.nicename)}</wp:category_nicename>",
+                f"\t\t<wp:category_parent>{cdata(category.parent)}</wp:category_parent>",
+                f"\t\t<wp:cat_name>{cdata(category.name)}</wp:cat_name>",
+                "\t</wp:category>",
+            ])
+        return "\n".join(lines) + "\n"
+
+    def _render_item(self, item: WXRItem) -> str:
+        link = f"{self.channel.link}/?p={item.post_id}"
+        post_date = item.post_date.strftime(POST_DATE_FORMAT)
+        lines = [
+            "",
+            "\t<item>",
+            f"\t\t<title>{escape_text(item.title)}</title>",
+            f"\t\t<link>{escape_text(link)}</link>",
+            f"\t\t<pubDate>{item.post_date.strftime(RSS_DATE_FORMAT)}</pubDate>",
+            f"\t\t<dc:creator>{cdata(item.creator)}</dc:creator>",
+            f'\t\t<guid isPermaLink="false">{escape_text(link)}</guid>',
+            "\t\t<description></description>",
+            f"\t\t<content:encoded>{cdata(item.content)}</content:encoded>",
+            f"\t\t<excerpt:encoded>{cdata(item.excerpt)}</excerpt:encoded>",
+            f"\t\t<wp:post_id>{item.post_id}</wp:post_id>",
+            f"\t\t<wp:post_date>{cdata(post_date)}</wp:post_date>",
+            f"\t\t<wp:post_date_gmt>{cdata(post_date)}</wp:post_date_gmt>",
+            f"\t\t<wp:comment_status>{cdata('open')}</wp:comment_status>",
+            f"\t\t<wp:ping_status>{cdata('open')}</wp:ping_status>",
+            f"\t\t<wp:post_name>{cdata(item.post_name or create_slug(item.title))}</wp:post_name>",
+            f"\t\t<wp:status>{cdata(item.status)}</wp:status>",
+            "\t\t<wp:post_parent>0</wp:post_parent>",
+            "\t\t<wp:menu_order>0</wp:menu_order>",
+            f"\t\t<wp:post_type>{cdata('post')}</wp:post_type>",
+            f"\t\t<wp:post_password>{cdata('')}</wp:post_password>",
+            "\t\t<wp:is_sticky>0</wp:is_sticky>",
+        ]
+        categories = list(item.categories) + [("post_tag", create_slug(tag), tag) for tag in item.tags]
+        for domain, nicename, name in categories:
+            lines.append(
+                f"\t\t<category domain={quoteattr(domain)} nicename={quoteattr(clean_xml_text(nicename))}>"
+                f"{cdata(name)}</category>"
+            )
+        for key, value in item.postmeta:
+            lines.extend([
+                "\t\t<wp:postmeta>",
+                f"\t\t\t<wp:meta_key>{cdata(key)}</wp:meta_key>",
+                f"\t\t\t<wp:meta_value>{cdata(value)}</wp:meta_value>",
+                "\t\t</wp:postmeta>",
+            ])
+        lines.append("\t</item>")
+        return "\n".join(lines)
+
+
+def write_wxr(output: Union[str, Path, IO[str]], channel: WXRChannel, items: Iterable[WXRItem],
+              compress: Optional[bool] = None) -> int:
+    """記事を順に書き込んだ WXR ファイルを作成して記事数を返す"""
+    with WXRWriter(output, channel, compress=compress) as writer:
+        for item in items:
+            writer.write_item(item)
+    return writer.items_written
+
+
+def wxr_to_string(channel: WXRChannel, items: Iterable[WXRItem]) -> str:
+    """WXR を文字列として作成（少数の記事を扱う既存スクリプト用）"""
+    buffer = io.StringIO()
+    write_wxr(buffer, channel, items)
+    return buffer.getvalue()
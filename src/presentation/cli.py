@@ -15,13 +15,32 @@ from config.settings import get_settings
 from config.logging_config import initialize_logging
 from src.application.services import MountainArticleService
 from src.infrastructure.repositories import RepositoryFactory
-from src.domain.entities import DifficultyLevel
+from src.infrastructure.response_cache import ResponseCache
+from src.infrastructure.search_index import get_mountain_search_index
+from src.domain.entities import CacheMode, DifficultyLevel, GenerationRequest
 
 
 # Rich console for beautiful output
 console = Console()
 
 
+def _journal_record(result) -> dict:
+    """一括生成ジャーナルに記録する内容"""
+    return {
+        "title": result.article.content.title,
+        "wordpress_id": result.article.wordpress_id
+    }
+
+
+def _resolve_cache_mode(no_cache: bool, refresh_cache: bool) -> CacheMode:
+    """CLIフラグからキャッシュ利用方法を決定"""
+    if no_cache:
+        return CacheMode.BYPASS
+    if refresh_cache:
+        return CacheMode.REFRESH
+    return CacheMode.USE
+
+
 @click.group()
 @click.version_option(version="1.0.0")
 def cli():
@@ -58,21 +77,16 @@ def list_mountains(region: Optional[str], difficulty: Optional[str], prefecture:
     try:
         mountain_repo = RepositoryFactory.get_mountain_repository()
         
-        # フィルタリング
-        mountains = mountain_repo.get_all()
-        
-        if region:
-            mountains = [m for m in mountains if m.region == region]
-        
-        if difficulty:
-            diff_level = DifficultyLevel(difficulty)
-            mountains = [m for m in mountains if m.difficulty.level == diff_level]
-        
-        if prefecture:
-            mountains = [m for m in mountains if prefecture in m.prefecture]
+        # フィルタリング（すべての条件を組み合わせて検索）
+        mountains = mountain_repo.find(
+            region=region,
+            difficulty=DifficultyLevel(difficulty) if difficulty else None,
+            prefecture=prefecture
+        )
         
+        # キーワードは全文検索インデックスで関連度順に並べる
         if keyword:
-            mountains = mountain_repo.search_by_keyword(keyword)
+            mountains = get_mountain_search_index().search_mountains(keyword, within=mountains)
         
         if not mountains:
             console.print("[yellow]条件に一致する山が見つかりませんでした。[/yellow]")
@@ -152,7 +166,16 @@ def show_mountain(mountain_id: str):
 @click.option('--theme', help='記事テーマ（指定しない場合は自動選択）')
 @click.option('--publish', is_flag=True, help='生成後すぐにWordPressに公開')
 @click.option('--length', default=2000, help='目標文字数（デフォルト: 2000文字）')
-def generate_article(mountain_id: str, theme: Optional[str], publish: bool, length: int):
+@click.option('--no-cache', is_flag=True, help='Claude APIのレスポンスキャッシュを使用しない')
+@click.option('--refresh-cache', is_flag=True, help='キャッシュを無視して再生成し、キャッシュを更新')
+def generate_article(
+    mountain_id: str,
+    theme: Optional[str],
+    publish: bool,
+    length: int,
+    no_cache: bool,
+    refresh_cache: bool
+):
     """山の記事を生成"""
     try:
         # 山の存在確認
@@ -175,7 +198,9 @@ def generate_article(mountain_id: str, theme: Optional[str], publish: bool, leng
             result = service.create_and_publish_article(
                 mountain_id=mountain_id,
                 theme=theme,
-                publish=publish
+                publish=publish,
+                target_length=length,
+                cache_mode=_resolve_cache_mode(no_cache, refresh_cache)
             )
         
         if result.success and result.article:
@@ -218,6 +243,132 @@ def generate_article(mountain_id: str, theme: Optional[str], publish: bool, leng
         console.print(f"[red]エラー: {str(e)}[/red]")
 
 
+@cli.command()
+@click.argument('mountain_ids', nargs=-1)
+@click.option('--all', 'all_mountains', is_flag=True, help='全ての山を対象にする')
+@click.option('--region', help='地域で絞り込み（例: 関東、関西）')
+@click.option('--limit', type=int, help='生成する記事数の上限')
+@click.option('--theme', help='記事テーマ（全記事共通）')
+@click.option('--workers', type=int, help='同時実行数（デフォルト: 設定値 BATCH_MAX_WORKERS）')
+@click.option('--publish', is_flag=True, help='生成後すぐにWordPressに公開')
+@click.option('--length', default=2000, help='目標文字数（デフォルト: 2000文字）')
+@click.option('--no-cache', is_flag=True, help='Claude APIのレスポンスキャッシュを使用しない')
+@click.option('--refresh-cache', is_flag=True, help='キャッシュを無視して再生成し、キャッシュを更新')
+@click.option('--resume', is_flag=True, help='中断した同じ条件の一括生成を再開（完了済みの記事は生成・公開しない）')
+def generate_batch(
+    mountain_ids: tuple,
+    all_mountains: bool,
+    region: Optional[str],
+    limit: Optional[int],
+    theme: Optional[str],
+    workers: Optional[int],
+    publish: bool,
+    length: int,
+    no_cache: bool,
+    refresh_cache: bool,
+    resume: bool
+):
+    """複数の山の記事を並列に一括生成"""
+    try:
+        mountain_repo = RepositoryFactory.get_mountain_repository()
+
+        if mountain_ids:
+            mountains = []
+            for mountain_id in mountain_ids:
+                mountain = mountain_repo.get_by_id(mountain_id)
+                if not mountain:
+                    console.print(f"[red]山が見つかりません: {mountain_id}[/red]")
+                    return
+                mountains.append(mountain)
+        elif all_mountains or region:
+            mountains = mountain_repo.get_by_region(region) if region else mountain_repo.get_all()
+        else:
+            console.print("[yellow]山IDを指定するか、--all / --region を指定してください。[/yellow]")
+            return
+
+        if limit:
+            mountains = mountains[:limit]
+
+        if not mountains:
+            console.print("[yellow]条件に一致する山が見つかりませんでした。[/yellow]")
+            return
+
+        cache_mode = _resolve_cache_mode(no_cache, refresh_cache)
+        requests = [
+            GenerationRequest(mountain_id=m.id, theme=theme, target_length=length, cache_mode=cache_mode)
+            for m in mountains
+        ]
+
+        console.print(f"[bold green]🗻 {len(requests)}件の記事を一括生成中...[/bold green]")
+
+        completed = 0
+        processed = []
+
+        def on_result(index: int, result, progress=None):
+            nonlocal completed
+            completed += 1
+            processed.append((index, result))
+            name = mountains[index].name
+            counter = progress.format() if progress else f"[{completed}/{len(requests)}]"
+            if result.success:
+                console.print(f"  ✅ {counter} {name}")
+            else:
+                console.print(f"  ❌ {counter} {name}: {result.error_message}")
+
+        service = MountainArticleService()
+        if resume:
+            batch = service.create_articles_resumable(
+                requests,
+                job_name='generate_batch',
+                serialize=_journal_record,
+                publish=publish,
+                max_workers=workers,
+                on_result=on_result
+            )
+            if batch.summary.resumed:
+                console.print(f"[cyan]♻️ 前回までに完了: {batch.summary.resumed}件（ジャーナルから復元）[/cyan]")
+        else:
+            batch = service.create_and_publish_articles(
+                requests,
+                publish=publish,
+                max_workers=workers,
+                on_result=on_result
+            )
+
+        table = Table(title=f"📊 一括生成結果 ({batch.summary.succeeded}/{batch.summary.total}件成功)")
+        table.add_column("No", style="cyan", no_wrap=True)
+        table.add_column("山名", style="bold green")
+        table.add_column("結果", style="magenta")
+        table.add_column("タイトル / エラー", style="white")
+        table.add_column("生成時間", style="yellow", justify="right")
+
+        for index, result in sorted(processed, key=lambda item: item[0]):
+            if result.success and result.article:
+                status, detail = "✅", result.article.content.title
+            else:
+                status, detail = "❌", result.error_message or "記事生成に失敗しました"
+            elapsed = f"{result.generation_time:.2f}秒" if result.generation_time is not None else "-"
+            table.add_row(str(index + 1), mountains[index].name, status, detail, elapsed)
+
+        console.print(table)
+
+        summary = batch.summary
+        console.print(Panel.fit(
+            f"[bold green]成功:[/bold green] {summary.succeeded}件 / "
+            f"[bold red]失敗:[/bold red] {summary.failed}件\n"
+            f"[bold cyan]同時実行数:[/bold cyan] {summary.max_workers}\n"
+            f"[bold yellow]総経過時間:[/bold yellow] {summary.wall_time:.2f}秒\n"
+            f"[bold magenta]スループット:[/bold magenta] {summary.throughput_per_minute:.1f}記事/分\n"
+            f"[bold blue]レイテンシ:[/bold blue] 平均 {summary.latency_avg:.2f}秒 / "
+            f"p50 {summary.latency_p50:.2f}秒 / p95 {summary.latency_p95:.2f}秒 / "
+            f"最大 {summary.latency_max:.2f}秒",
+            title="⏱️ 処理統計"
+        ))
+
+    except Exception as e:
+        console.print(f"[red]エラー: {str(e)}[/red]")
+
+
 @cli.command()
 @click.option('--count', default=5, help='表示する山の数（デフォルト: 5）')
 def suggestions(count: int):
@@ -362,6 +513,40 @@ def search_by_tags(tag):
         console.print(f"[red]エラー: {str(e)}[/red]")
 
 
+@cli.command()
+@click.option('--expired-only', is_flag=True, help='有効期限切れのエントリのみ削除')
+def clear_cache(expired_only: bool):
+    """Claude APIのレスポンスキャッシュを削除"""
+    try:
+        settings = get_settings()
+        cache = ResponseCache(
+            cache_dir=settings.CLAUDE_CACHE_DIR,
+            ttl_seconds=settings.CLAUDE_CACHE_TTL,
+            max_bytes=settings.CLAUDE_CACHE_MAX_MB * 1024 * 1024
+        )
+        
+        removed = cache.purge_expired() if expired_only else cache.clear()
+        console.print(f"[green]🧹 キャッシュを{removed}件削除しました: {settings.CLAUDE_CACHE_DIR}[/green]")
+        
+    except Exception as e:
+        console.print(f"[red]エラー: {str(e)}[/red]")
+
+
+@cli.command()
+def rebuild_search_index():
+    """山・記事の全文検索インデックスを再構築"""
+    try:
+        search_index = get_mountain_search_index()
+        index = search_index.rebuild()
+        console.print(
+            f"[green]🔎 検索インデックスを再構築しました: {len(index)}山, "
+            f"{len(index.postings)} n-gram ({search_index.index_path})[/green]"
+        )
+        
+    except Exception as e:
+        console.print(f"[red]エラー: {str(e)}[/red]")
+
+
 def main():
     """メイン関数"""
     try:
@@ -18,9 +18,27 @@ import unicodedata
 
 from config.settings import get_settings
 from config.logging_config import initialize_logging, get_logger
-from src.application.services import MountainArticleService
+from src.application.services import GenerationListener, MountainArticleService
 from src.infrastructure.repositories import RepositoryFactory
-from src.domain.entities import Mountain, Article, GenerationRequest
+from src.infrastructure.search_index import get_mountain_search_index
+from src.domain.entities import Mountain, Article, GenerationRequest, GenerationStage
+
+
+class QueueGenerationListener(GenerationListener):
+    """記事生成の進捗をGUIスレッドへのキューに送るリスナー"""
+    
+    def __init__(self, result_queue: queue.Queue):
+        self.result_queue = result_queue
+        self.cancelled = threading.Event()
+    
+    def on_stage(self, stage: GenerationStage, detail):
+        self.result_queue.put(("stage", (stage, detail)))
+    
+    def on_text(self, delta: str):
+        self.result_queue.put(("text", delta))
+    
+    def is_cancelled(self) -> bool:
+        return self.cancelled.is_set()
 
 
 class MountainBlogGUI:
@@ -42,6 +60,7 @@ class MountainBlogGUI:
         self.selected_mountain: Optional[Mountain] = None
         self.generated_article: Optional[Article] = None
         self.result_queue = queue.Queue()
+        self.generation_listener: Optional[QueueGenerationListener] = None
         
         # メインウィンドウ作成
         self.setup_main_window()
@@ -220,6 +239,12 @@ class MountainBlogGUI:
         self.difficulty_combo.grid(row=1, column=1, padx=(5, 0), pady=(5, 0))
         self.difficulty_combo.bind('<<ComboboxSelected>>', self.filter_mountains)
         
+        ttk.Label(filter_frame, text="Search:").grid(row=2, column=0, sticky=tk.W, pady=(5, 0))
+        self.search_var = tk.StringVar(value="")
+        self.search_entry = ttk.Entry(filter_frame, textvariable=self.search_var, width=17)
+        self.search_entry.grid(row=2, column=1, padx=(5, 0), pady=(5, 0))
+        self.search_entry.bind('<KeyRelease>', self.filter_mountains)
+        
         # 山リスト
         list_frame = ttk.Frame(mountain_frame)
         list_frame.grid(row=1, column=0, sticky=(tk.W, tk.E, tk.N, tk.S), pady=(10, 0))
@@ -338,6 +363,19 @@ class MountainBlogGUI:
         )
         self.generate_button.pack(side=tk.LEFT, padx=(0, 10))
         
+        self.cancel_button = tk.Button(
+            button_frame,
+            text="Cancel",
+            font=self.default_font,
+            bg="#e74c3c",
+            fg="white",
+            padx=15,
+            pady=8,
+            command=self.cancel_generation,
+            state=tk.DISABLED
+        )
+        self.cancel_button.pack(side=tk.LEFT, padx=(0, 10))
+        
         self.preview_button = tk.Button(
             button_frame,
             text="Preview",
@@ -516,15 +554,15 @@ class MountainBlogGUI:
             "Intermediate": "中級", "Advanced": "上級"
         }
         
-        mountains = self.mountains
+        jp_region = region_map.get(region, region) if region != "All" else None
+        jp_difficulty = difficulty_map.get(difficulty, difficulty) if difficulty != "All" else None
         
-        if region != "All":
-            jp_region = region_map.get(region, region)
-            mountains = [m for m in mountains if m.region == jp_region]
+        mountains = self.mountain_repo.find(region=jp_region, difficulty=jp_difficulty)
         
-        if difficulty != "All":
-            jp_difficulty = difficulty_map.get(difficulty, difficulty)
-            mountains = [m for m in mountains if m.difficulty.level.value == jp_difficulty]
+        # 検索語がある場合は全文検索インデックスで関連度順に並べる
+        query = self.search_var.get().strip()
+        if query:
+            mountains = get_mountain_search_index().search_mountains(query, within=mountains)
         
         self.populate_mountain_list(mountains)
         self.update_status(f"Filter result: {len(mountains)} mountains")
@@ -579,16 +617,33 @@ class MountainBlogGUI:
         
         # UI状態更新
         self.generate_button.config(state=tk.DISABLED)
+        self.cancel_button.config(state=tk.NORMAL)
         self.progress.start()
         self.update_status("Generating article...")
         
-        # バックグラウンドで記事生成
-        threading.Thread(target=self._generate_article_thread, daemon=True).start()
+        self.result_text.config(state=tk.NORMAL)
+        self.result_text.delete(1.0, tk.END)
+        self.result_text.config(state=tk.DISABLED)
+        
+        # バックグラウンドで記事生成（進捗はリスナー経由でキューに届く）
+        self.generation_listener = QueueGenerationListener(self.result_queue)
+        threading.Thread(
+            target=self._generate_article_thread,
+            args=(self.generation_listener,),
+            daemon=True
+        ).start()
         
         # 定期的に結果をチェック
         self.check_generation_result()
     
-    def _generate_article_thread(self):
+    def cancel_generation(self):
+        """生成中の記事生成を中断（本文の生成を打ち切る）"""
+        if self.generation_listener:
+            self.generation_listener.cancelled.set()
+            self.cancel_button.config(state=tk.DISABLED)
+            self.update_status("Cancelling...")
+    
+    def _generate_article_thread(self, listener: QueueGenerationListener):
         """記事生成のバックグラウンド処理"""
         try:
             # テーマの英語から日本語マッピング
@@ -610,7 +665,8 @@ class MountainBlogGUI:
             result = self.mountain_service.create_and_publish_article(
                 mountain_id=self.selected_mountain.id,
                 theme=theme,
-                publish=publish
+                publish=publish,
+                listener=listener
             )
             
             self.result_queue.put(("success", result))
@@ -619,23 +675,58 @@ class MountainBlogGUI:
             self.result_queue.put(("error", str(e)))
     
     def check_generation_result(self):
-        """生成結果をチェック"""
+        """生成の進捗と結果をチェック（届いているメッセージをまとめて処理）"""
+        text = []
         try:
-            result_type, result_data = self.result_queue.get_nowait()
-            
-            # UI状態リセット
-            self.progress.stop()
-            self.generate_button.config(state=tk.NORMAL)
-            
-            if result_type == "success":
-                self.handle_generation_success(result_data)
-            else:
-                self.handle_generation_error(result_data)
+            while True:
+                result_type, result_data = self.result_queue.get_nowait()
+                
+                if result_type == "text":
+                    text.append(result_data)
+                    continue
+                if result_type == "stage":
+                    self.handle_generation_stage(*result_data)
+                    continue
+                
+                # UI状態リセット
+                self.progress.stop()
+                self.generate_button.config(state=tk.NORMAL)
+                self.cancel_button.config(state=tk.DISABLED)
+                cancelled = self.generation_listener.is_cancelled()
+                self.generation_listener = None
+                
+                if result_type == "success" and cancelled and not result_data.success:
+                    self.update_status("記事生成を中断しました")
+                elif result_type == "success":
+                    self.handle_generation_success(result_data)
+                else:
+                    self.handle_generation_error(result_data)
+                return
                 
         except queue.Empty:
-            # まだ完了していない場合は100ms後に再チェック
+            # 生成中の本文を追記して、まだ完了していない場合は100ms後に再チェック
+            if text:
+                self.append_generated_text("".join(text))
             self.root.after(100, self.check_generation_result)
     
+    def handle_generation_stage(self, stage: GenerationStage, detail):
+        """生成段階の進捗を表示"""
+        messages = {
+            GenerationStage.STARTED: "Generating article...",
+            GenerationStage.GENERATED: "Fetching images...",
+            GenerationStage.IMAGES: "Searching affiliate products...",
+            GenerationStage.AFFILIATES: "Finishing article...",
+            GenerationStage.PUBLISHED: "Published to WordPress",
+        }
+        self.update_status(messages.get(stage, stage.value))
+    
+    def append_generated_text(self, text: str):
+        """生成中の本文を結果欄に追記"""
+        self.result_text.config(state=tk.NORMAL)
+        self.result_text.insert(tk.END, text)
+        self.result_text.see(tk.END)
+        self.result_text.config(state=tk.DISABLED)
+    
     def handle_generation_success(self, result):
         """生成成功時の処理"""
         if result.success and result.article:
@@ -3,12 +3,14 @@
 Mountain Blog Generator - Web Application
 Flask ベースの Web UI
 """
+import dataclasses
 import sys
 import os
+import io
 import json
 import traceback
 from datetime import datetime
-from flask import Flask, render_template, request, jsonify, send_file
+from flask import Flask, Response, render_template, request, jsonify, send_file, url_for
 from werkzeug.exceptions import HTTPException
 
 # プロジェクトルートをパスに追加
@@ -16,9 +18,12 @@ sys.path.insert(0, os.path.abspath('../../..'))
 
 from config.settings import get_settings
 from config.logging_config import get_logger
-from src.application.services import MountainArticleService
+from src.application.services import GenerationListener, MountainArticleService
+from src.infrastructure.http_cache import VersionedResponseCache, dumps_json
+from src.infrastructure.job_queue import SUCCEEDED, JobQueue, QueueFullError
 from src.infrastructure.repositories import RepositoryFactory
-from src.domain.entities import GenerationRequest
+from src.infrastructure.search_index import get_mountain_search_index
+from src.domain.entities import GenerationRequest, GenerationStage
 
 app = Flask(__name__)
 app.config['SECRET_KEY'] = 'mountain-blog-generator-secret-key'  # 実際の運用では環境変数から取得
@@ -30,60 +35,189 @@ logger = get_logger("web_app")
 mountain_service = MountainArticleService()
 mountain_repo = RepositoryFactory.get_mountain_repository()
 
+# 記事生成ジョブキュー（生成はリクエストのスレッドではなくワーカーで実行）
+_settings = get_settings()
+generation_queue = JobQueue(
+    db_path=_settings.WEB_JOB_DB_PATH,
+    max_workers=_settings.WEB_JOB_WORKERS,
+    max_pending=_settings.WEB_JOB_MAX_PENDING,
+    retention_seconds=_settings.WEB_JOB_RETENTION_HOURS * 3600
+)
+
+# 山データから作る応答（トップページ・山一覧/詳細API）のキャッシュ（データ再読み込みで破棄）
+response_cache = VersionedResponseCache(max_entries=512)
+
+# 山一覧APIの項目と1回に返す最大件数
+MOUNTAIN_SUMMARY_FIELDS = (
+    'id', 'name', 'name_en', 'prefecture', 'region', 'elevation',
+    'difficulty', 'features', 'article_themes'
+)
+MOUNTAINS_PAGE_MAX = 500
+
+# ジョブ状態APIで完了を待つ最大秒数（ロングポーリング）
+JOB_WAIT_MAX_SECONDS = 30
+
+# 進捗ストリーム（SSE）で何も送るものがない場合にコメント行を送る間隔（プロキシの切断防止）
+SSE_KEEPALIVE_SECONDS = 15
+
+def _cached_response(key, build, mimetype='application/json'):
+    """
+    山データから作る応答をデータのバージョンごとにキャッシュして返す
+    
+    本文は初回だけ build() で作成し、以降はシリアライズ済みのものを返す。
+    強い ETag を付け、If-None-Match が一致する場合は 304 を返す。
+    """
+    entry = response_cache.get(mountain_repo.data_version, key, build)
+    response = Response(entry.body, mimetype=mimetype)
+    response.set_etag(entry.etag)
+    response.cache_control.no_cache = True  # 毎回 ETag で再検証させる
+    return response.make_conditional(request)
+
 @app.route('/')
 def index():
     """メインページ"""
-    try:
+    def build():
         mountains = mountain_repo.get_all()
-        settings = get_settings()
         
         # 地域でグループ化
         regions = {}
         for mountain in mountains:
-            region = mountain.region
-            if region not in regions:
-                regions[region] = []
-            regions[region].append(mountain)
+            regions.setdefault(mountain.region, []).append(mountain)
         
         return render_template('index.html', 
-                             mountains=mountains,
-                             regions=regions,
-                             wp_url=settings.WP_URL)
+                               mountains=mountains,
+                               regions=regions,
+                               wp_url=get_settings().WP_URL).encode('utf-8')
+    
+    try:
+        return _cached_response(('index',), build, mimetype='text/html')
     except Exception as e:
         logger.error(f"Index page error: {e}")
         return render_template('error.html', error=str(e)), 500
 
+def _mountain_summary(mountain):
+    """山一覧APIの1件分"""
+    return {
+        'id': mountain.id,
+        'name': mountain.name,
+        'name_en': mountain.name_en,
+        'prefecture': mountain.prefecture,
+        'region': mountain.region,
+        'elevation': mountain.elevation,
+        'difficulty': {
+            'level': mountain.difficulty.level.value,
+            'hiking_time': mountain.difficulty.hiking_time,
+            'distance': mountain.difficulty.distance
+        },
+        'features': mountain.features[:3],  # 最初の3つの特徴
+        'article_themes': mountain.article_themes[:3]  # 最初の3つのテーマ
+    }
+
+def _parse_fields(value):
+    """fields パラメータ（カンマ区切り）を検証して項目名のタプルにする"""
+    if not value:
+        return None
+    fields = tuple(dict.fromkeys(field.strip() for field in value.split(',') if field.strip()))
+    unknown = [field for field in fields if field not in MOUNTAIN_SUMMARY_FIELDS]
+    if unknown:
+        raise ValueError(f"不明な項目です: {', '.join(unknown)}（指定できる項目: {', '.join(MOUNTAIN_SUMMARY_FIELDS)}）")
+    return fields or None
+
 @app.route('/api/mountains')
 def get_mountains():
-    """山データAPI"""
+    """
+    山データAPI
+    
+    クエリパラメータ（すべて任意・AND条件）:
+        region, prefecture, difficulty, keyword, min_elevation, max_elevation,
+        facility（複数指定可: restrooms / restaurant / parking / cable_car / visitor_center）,
+        beginner（true / false）
+    
+    ページングと項目の絞り込み:
+        offset: 先頭から飛ばす件数（デフォルト0）
+        limit: 返す件数（省略時は全件、最大 MOUNTAINS_PAGE_MAX）
+        fields: 返す項目（カンマ区切り。例: id,name,elevation）
+    
+    total は条件に一致した全件数、count は今回返した件数。
+    """
     try:
-        mountains = mountain_repo.get_all()
-        mountains_data = []
+        beginner = request.args.get('beginner')
+        filters = {
+            'region': request.args.get('region') or None,
+            'prefecture': request.args.get('prefecture') or None,
+            'difficulty': request.args.get('difficulty') or None,
+            'keyword': request.args.get('keyword') or None,
+            'min_elevation': request.args.get('min_elevation', type=int),
+            'max_elevation': request.args.get('max_elevation', type=int),
+            'facilities': tuple(request.args.getlist('facility')),
+            'beginner_friendly': None if beginner is None else beginner.lower() in ('1', 'true', 'yes')
+        }
+        offset = max(request.args.get('offset', 0, type=int), 0)
+        limit = request.args.get('limit', type=int)
+        if limit is not None:
+            limit = min(max(limit, 1), MOUNTAINS_PAGE_MAX)
+        fields = _parse_fields(request.args.get('fields'))
         
-        for mountain in mountains:
-            mountains_data.append({
-                'id': mountain.id,
-                'name': mountain.name,
-                'name_en': mountain.name_en,
-                'prefecture': mountain.prefecture,
-                'region': mountain.region,
-                'elevation': mountain.elevation,
-                'difficulty': {
-                    'level': mountain.difficulty.level.value,
-                    'hiking_time': mountain.difficulty.hiking_time,
-                    'distance': mountain.difficulty.distance
-                },
-                'features': mountain.features[:3],  # 最初の3つの特徴
-                'article_themes': mountain.article_themes[:3]  # 最初の3つのテーマ
+        def build():
+            mountains = mountain_repo.find(**filters)
+            page = mountains[offset:offset + limit] if limit is not None else mountains[offset:]
+            mountains_data = [_mountain_summary(mountain) for mountain in page]
+            if fields:
+                mountains_data = [{field: item[field] for field in fields} for item in mountains_data]
+            
+            return dumps_json({
+                'success': True,
+                'mountains': mountains_data,
+                'total': len(mountains),
+                'count': len(mountains_data),
+                'offset': offset,
+                'limit': limit
             })
         
+        key = ('mountains', tuple(sorted(filters.items())), offset, limit, fields)
+        return _cached_response(key, build)
+    except ValueError as e:
+        return jsonify({'success': False, 'error': str(e)}), 400
+    except Exception as e:
+        logger.error(f"Mountains API error: {e}")
+        return jsonify({'success': False, 'error': str(e)}), 500
+
+@app.route('/api/search')
+def search_mountains():
+    """
+    山・記事の全文検索API
+    
+    クエリパラメータ:
+        q: 検索語（必須）
+        limit: 最大件数（デフォルト20）
+    """
+    query = request.args.get('q', '').strip()
+    if not query:
+        return jsonify({'success': False, 'error': '検索語（q）を指定してください'}), 400
+    
+    try:
+        limit = min(max(request.args.get('limit', 20, type=int), 1), 100)
+        results = get_mountain_search_index().search(query, limit=limit)
+        
         return jsonify({
             'success': True,
-            'mountains': mountains_data,
-            'total': len(mountains_data)
+            'query': query,
+            'results': [
+                {
+                    'id': mountain.id,
+                    'name': mountain.name,
+                    'prefecture': mountain.prefecture,
+                    'region': mountain.region,
+                    'elevation': mountain.elevation,
+                    'difficulty': mountain.difficulty.level.value,
+                    'score': round(score, 4)
+                }
+                for mountain, score in results
+            ],
+            'total': len(results)
         })
     except Exception as e:
-        logger.error(f"Mountains API error: {e}")
+        logger.error(f"Search API error: {e}")
         return jsonify({'success': False, 'error': str(e)}), 500
 
 @app.route('/api/mountain/<mountain_id>')
@@ -94,43 +228,106 @@ def get_mountain_detail(mountain_id):
         if not mountain:
             return jsonify({'success': False, 'error': '山が見つかりません'}), 404
         
-        mountain_data = {
-            'id': mountain.id,
-            'name': mountain.name,
-            'name_en': mountain.name_en,
-            'prefecture': mountain.prefecture,
-            'region': mountain.region,
-            'elevation': mountain.elevation,
-            'description': getattr(mountain, 'description', ''),
-            'difficulty': {
-                'level': mountain.difficulty.level.value,
-                'hiking_time': mountain.difficulty.hiking_time,
-                'distance': mountain.difficulty.distance,
-                'elevation_gain': mountain.difficulty.elevation_gain
-            },
-            'location': {
-                'nearest_station': getattr(mountain.location, 'nearest_station', ''),
-                'access_time': getattr(mountain.location, 'access_time', ''),
-                'driving_time': getattr(mountain.location, 'driving_time', ''),
-                'parking_info': getattr(mountain.location, 'parking_info', '')
-            },
-            'features': getattr(mountain, 'features', []),
-            'facilities': getattr(mountain, 'facilities', []),
-            'article_themes': getattr(mountain, 'article_themes', []),
-            'best_seasons': getattr(mountain, 'best_seasons', [])
-        }
+        def build():
+            return dumps_json({
+                'success': True,
+                'mountain': {
+                    'id': mountain.id,
+                    'name': mountain.name,
+                    'name_en': mountain.name_en,
+                    'prefecture': mountain.prefecture,
+                    'region': mountain.region,
+                    'elevation': mountain.elevation,
+                    'description': getattr(mountain, 'description', ''),
+                    'difficulty': {
+                        'level': mountain.difficulty.level.value,
+                        'hiking_time': mountain.difficulty.hiking_time,
+                        'distance': mountain.difficulty.distance,
+                        'elevation_gain': mountain.difficulty.elevation_gain
+                    },
+                    'location': {
+                        'nearest_station': getattr(mountain.location, 'nearest_station', ''),
+                        'access_time': getattr(mountain.location, 'access_time', ''),
+                        'driving_time': getattr(mountain.location, 'driving_time', ''),
+                        'parking_info': getattr(mountain.location, 'parking_info', '')
+                    },
+                    'features': getattr(mountain, 'features', []),
+                    'facilities': dataclasses.asdict(mountain.facilities) if mountain.facilities else None,
+                    'article_themes': getattr(mountain, 'article_themes', []),
+                    'best_seasons': getattr(mountain, 'best_seasons', [])
+                }
+            })
         
-        return jsonify({
-            'success': True,
-            'mountain': mountain_data
-        })
+        return _cached_response(('mountain', mountain_id), build)
     except Exception as e:
         logger.error(f"Mountain detail API error: {e}")
         return jsonify({'success': False, 'error': str(e)}), 500
 
+def _serialize_article(article):
+    """記事 → API応答用の辞書"""
+    return {
+        'id': article.id,
+        'mountain': {
+            'id': article.mountain.id,
+            'name': article.mountain.name,
+            'elevation': article.mountain.elevation
+        },
+        'content': {
+            'title': article.content.title,
+            'content': article.content.content,
+            'excerpt': article.content.excerpt,
+            'tags': article.content.tags,
+            'word_count': article.content.get_word_count()
+        },
+        'featured_image': {
+            'url': None,  # 一時的に無効化
+            'alt_text': None
+        },
+        'wordpress_id': article.wordpress_id,
+        'created_at': article.created_at.isoformat() if article.created_at else None
+    }
+
+class _JobProgressListener(GenerationListener):
+    """記事生成の進捗をジョブの進捗イベントとして発行"""
+    
+    def __init__(self, context):
+        self.context = context
+    
+    def on_stage(self, stage: GenerationStage, detail):
+        self.context.emit('stage', {'stage': stage.value, **detail})
+    
+    def on_text(self, delta: str):
+        self.context.emit('token', {'text': delta})
+    
+    def is_cancelled(self) -> bool:
+        return self.context.is_cancelled()
+
+def _run_generation_job(params, context):
+    """記事生成ジョブの処理（ワーカースレッドで実行）"""
+    result = mountain_service.create_and_publish_article(
+        mountain_id=params['mountain_id'],
+        theme=params.get('theme'),
+        publish=params.get('publish', False),
+        listener=_JobProgressListener(context)
+    )
+
+    if not (result.success and result.article):
+        raise RuntimeError(result.error_message or '記事生成に失敗しました')
+
+    return {
+        'article': _serialize_article(result.article),
+        'generation_time': round(result.generation_time, 2),
+        'published': bool(result.article.wordpress_id)
+    }
+
 @app.route('/api/generate', methods=['POST'])
 def generate_article():
-    """記事生成API"""
+    """
+    記事生成API
+
+    生成ジョブを登録してすぐに 202 を返す。進捗と結果は status_url（/api/jobs/<job_id>）、
+    生成中の本文と各段階の進捗は events_url（Server-Sent Events）で取得する。
+    """
     try:
         data = request.json
         mountain_id = data.get('mountain_id')
@@ -142,59 +339,162 @@ def generate_article():
         
         logger.info(f"Article generation request: {mountain_id}, theme: {theme}")
         
-        # 記事生成実行
-        result = mountain_service.create_and_publish_article(
-            mountain_id=mountain_id,
-            theme=theme if theme else None,
-            publish=publish
+        job = generation_queue.submit(
+            'generate_article',
+            {'mountain_id': mountain_id, 'theme': theme or None, 'publish': bool(publish)},
+            _run_generation_job
         )
+        status_url = url_for('get_job', job_id=job.id)
         
-        if result.success and result.article:
-            article_data = {
-                'id': result.article.id,
-                'mountain': {
-                    'id': result.article.mountain.id,
-                    'name': result.article.mountain.name,
-                    'elevation': result.article.mountain.elevation
-                },
-                'content': {
-                    'title': result.article.content.title,
-                    'content': result.article.content.content,
-                    'excerpt': result.article.content.excerpt,
-                    'tags': result.article.content.tags,
-                    'word_count': result.article.content.get_word_count()
-                },
-                'featured_image': {
-                    'url': None,  # 一時的に無効化
-                    'alt_text': None
-                },
-                'wordpress_id': result.article.wordpress_id,
-                'created_at': result.article.created_at.isoformat() if result.article.created_at else None
-            }
-            
-            return jsonify({
-                'success': True,
-                'article': article_data,
-                'generation_time': round(result.generation_time, 2),
-                'published': bool(result.article.wordpress_id)
-            })
-        else:
-            error_msg = result.error_message or '記事生成に失敗しました'
-            logger.error(f"Article generation failed: {error_msg}")
-            return jsonify({'success': False, 'error': error_msg}), 500
+        return jsonify({
+            'success': True,
+            'job_id': job.id,
+            'job': job.to_dict(),
+            'status_url': status_url,
+            'events_url': url_for('stream_job_events', job_id=job.id),
+            'cancel_url': url_for('cancel_job', job_id=job.id),
+            'download_url': url_for('download_article', job_id=job.id)
+        }), 202, {'Location': status_url}
             
+    except QueueFullError:
+        return jsonify({
+            'success': False,
+            'error': '記事生成の待ちが混み合っています。しばらくしてから再度お試しください'
+        }), 429, {'Retry-After': '30'}
     except Exception as e:
         logger.error(f"Generate article API error: {e}")
         traceback.print_exc()
         return jsonify({'success': False, 'error': str(e)}), 500
 
-@app.route('/api/download/<article_id>')
-def download_article(article_id):
-    """記事ダウンロード"""
+@app.route('/api/jobs/<job_id>')
+def get_job(job_id):
+    """
+    記事生成ジョブの状態API
+    
+    クエリパラメータ:
+        wait: 完了するまで待つ最大秒数（デフォルト0・最大30。ロングポーリング用）
+    """
+    try:
+        wait = min(max(request.args.get('wait', 0, type=float), 0), JOB_WAIT_MAX_SECONDS)
+        job = generation_queue.wait(job_id, wait) if wait else generation_queue.get(job_id)
+        if not job:
+            return jsonify({'success': False, 'error': 'ジョブが見つかりません'}), 404
+        
+        return jsonify({
+            'success': True,
+            'job': job.to_dict()
+        })
+    except Exception as e:
+        logger.error(f"Job status API error: {e}")
+        return jsonify({'success': False, 'error': str(e)}), 500
+
+def _sse(event: str, data, event_id=None) -> str:
+    """Server-Sent Events の1メッセージ"""
+    message = f"event: {event}\n"
+    if event_id is not None:
+        message += f"id: {event_id}\n"
+    return message + f"data: {json.dumps(data, ensure_ascii=False)}\n\n"
+
+@app.route('/api/jobs/<job_id>/events')
+def stream_job_events(job_id):
+    """
+    記事生成ジョブの進捗ストリーム（Server-Sent Events）
+    
+    イベント:
+        status: ジョブの状態・待機中の順番が変わった
+        stage:  ワークフローの段階が進んだ（started / generated / images / affiliates / published）
+        token:  Claude API が生成した本文の断片
+        done:   ジョブが終了した（ジョブ全体。以降は送らずに切断する）
+    
+    再接続時は Last-Event-ID（または after パラメータ）以降のイベントから再送する。
+    """
+    if not generation_queue.get(job_id):
+        return jsonify({'success': False, 'error': 'ジョブが見つかりません'}), 404
+    
+    after = request.headers.get('Last-Event-ID') or request.args.get('after') or 0
+    try:
+        after = max(int(after), 0)
+    except ValueError:
+        after = 0
+    
+    def stream():
+        seq = after
+        last_status = None
+        yield "retry: 3000\n\n"
+        while True:
+            events, job = generation_queue.events(job_id, after=seq, timeout=SSE_KEEPALIVE_SECONDS)
+            if job is None:
+                return
+            
+            for event in events:
+                seq = event.seq
+                yield _sse(event.kind, event.data, event.seq)
+            
+            status = (job.status, job.position)
+            if status != last_status:
+                last_status = status
+                yield _sse('status', {'status': job.status, 'position': job.position})
+            
+            if job.done:
+                yield _sse('done', job.to_dict())
+                return
+            
+            if not events:
+                yield ": keepalive\n\n"
+    
+    return Response(stream(), mimetype='text/event-stream', headers={
+        'Cache-Control': 'no-cache',
+        'X-Accel-Buffering': 'no'  # nginx のバッファリングを無効化
+    })
+
+@app.route('/api/jobs/<job_id>/cancel', methods=['POST'])
+def cancel_job(job_id):
+    """記事生成ジョブの中断（待機中なら実行しない。生成中なら本文の生成を打ち切る）"""
+    try:
+        job = generation_queue.cancel(job_id)
+        if not job:
+            return jsonify({'success': False, 'error': 'ジョブが見つかりません'}), 404
+        
+        return jsonify({
+            'success': True,
+            'job': job.to_dict()
+        })
+    except Exception as e:
+        logger.error(f"Cancel job API error: {e}")
+        return jsonify({'success': False, 'error': str(e)}), 500
+
+@app.route('/api/jobs/<job_id>/download')
+def download_article(job_id):
+    """
+    記事ダウンロード（生成ジョブの結果から取得）
+    
+    生成直後の記事はまだIDを持たないため、生成ジョブのIDで指定する。
+    
+    クエリパラメータ:
+        format: txt（デフォルト）/ json
+    """
     try:
-        # 簡易実装: セッションから記事データを取得
-        # 実際の実装では記事IDからDBまたはキャッシュから取得
-        return jsonify({'success': False, 'error': 'ダウンロード機能は開発中です'}), 501
+        job = generation_queue.get(job_id)
+        if not job or job.status != SUCCEEDED or not job.result:
+            return jsonify({'success': False, 'error': '記事が見つかりません'}), 404
+        
+        article = job.result['article']
+        if request.args.get('format') == 'json':
+            return jsonify({'success': True, 'article': article})
+        
+        content = article['content']
+        created_at = article['created_at'] or job.to_dict()['finished_at']
+        text = (
+            f"{content['title']}\n\n{content['content']}\n\n"
+            f"タグ: {', '.join(content['tags'])}\n\n生成日時: {created_at}"
+        )
+        filename = f"{article['mountain']['name']}_記事_{created_at[:10]}.txt"
+        return send_file(
+            io.BytesIO(text.encode('utf-8')),
+            mimetype='text/plain; charset=utf-8',
+            as_attachment=True,
+            download_name=filename
+        )
     except Exception as e:
         logger.error(f"Download article error: {e}")
         return jsonify({'success': False, 'error': str(e)}), 500
@@ -1,5 +1,20 @@
 // Article Generation Functions
 
+// Job currently being generated (used by the cancel button)
+let currentGenerationJob = null;
+
+// Download URL of the last generated article (keyed by its generation job)
+let generatedArticleDownloadUrl = null;
+
+// Progress shown for each pipeline stage reported by the server
+const GENERATION_STAGES = {
+    started: { progress: 10, text: 'Claude AIで記事を生成中...' },
+    generated: { progress: 60, text: 'Unsplash画像を取得中...' },
+    images: { progress: 75, text: '楽天商品を検索中...' },
+    affiliates: { progress: 90, text: '記事を最終調整中...' },
+    published: { progress: 100, text: 'WordPressに投稿しました' }
+};
+
 // Generate article
 async function generateArticle() {
     if (!selectedMountain) {
@@ -33,9 +48,23 @@ async function generateArticle() {
         progressBar.style.width = '0%';
         progressText.textContent = '記事生成を開始しています...';
 
-        // Start progress animation
+        // Start progress animation (advances only while the job is running
+        // and the server is not reporting stages itself)
         let progress = 0;
+        let jobStatus = 'queued';
+        let queuePosition = null;
+        let stageReported = false;
         let progressInterval = setInterval(() => {
+            if (stageReported) {
+                return;
+            }
+            if (jobStatus === 'queued') {
+                progressText.textContent = queuePosition > 1
+                    ? `順番待ち中です（${queuePosition}番目）...`
+                    : '記事生成を開始しています...';
+                return;
+            }
+
             progress += Math.random() * 3;
             if (progress > 90) progress = 90;
             
@@ -55,7 +84,7 @@ async function generateArticle() {
 
         console.log('🚀 Starting article generation:', requestData);
 
-        // Make API request
+        // Submit generation job (returns immediately with a job ID)
         const response = await fetch('/api/generate', {
             method: 'POST',
             headers: {
@@ -64,7 +93,52 @@ async function generateArticle() {
             body: JSON.stringify(requestData)
         });
 
-        const result = await response.json();
+        const submitted = await response.json();
+        if (!submitted.success) {
+            throw new Error(submitted.error || '記事生成に失敗しました');
+        }
+
+        currentGenerationJob = submitted;
+        setCancelButton(true);
+
+        // Wait for the job to finish (progress stream, or long polling as a fallback)
+        let preview = null;
+        const job = await waitForJob(submitted, {
+            status(status) {
+                jobStatus = status.status;
+                queuePosition = status.position;
+            },
+            stage(stage) {
+                const info = GENERATION_STAGES[stage.stage];
+                if (!info) return;
+                stageReported = true;
+                progressBar.style.width = `${info.progress}%`;
+                progressText.textContent = info.text;
+            },
+            token(token) {
+                if (!preview) {
+                    resultContainer.innerHTML = '<pre class="small text-muted mb-0" style="white-space: pre-wrap; max-height: 400px; overflow-y: auto;"></pre>';
+                    preview = resultContainer.firstElementChild;
+                }
+                preview.textContent += token.text;
+                preview.scrollTop = preview.scrollHeight;
+            }
+        });
+
+        if (job.status === 'cancelled') {
+            resultContainer.innerHTML = `
+                <div class="text-center text-muted">
+                    <i class="fas fa-ban fa-2x mb-2"></i>
+                    <h6>記事生成を中断しました</h6>
+                </div>
+            `;
+            showAlert('記事生成を中断しました', 'info');
+            return;
+        }
+
+        const result = job.status === 'succeeded'
+            ? { success: true, ...job.result }
+            : { success: false, error: job.error };
 
         // Clear progress animation
         if (typeof progressInterval !== 'undefined') {
@@ -74,6 +148,7 @@ async function generateArticle() {
 
         if (result.success) {
             generatedArticle = result.article;
+            generatedArticleDownloadUrl = submitted.download_url;
             displayGenerationResult(result);
             showAlert('記事生成が完了しました！', 'success');
             console.log('✅ Article generated successfully');
@@ -104,6 +179,8 @@ async function generateArticle() {
         if (typeof progressInterval !== 'undefined') {
             clearInterval(progressInterval);
         }
+        currentGenerationJob = null;
+        setCancelButton(false);
         generateBtn.disabled = false;
         generateBtn.innerHTML = '<i class="fas fa-magic"></i> 記事を生成する';
         
@@ -113,6 +190,76 @@ async function generateArticle() {
     }
 }
 
+// Wait for a generation job to finish and return the final job.
+// Progress events (status / stage / token) are passed to the handlers as they arrive.
+function waitForJob(submitted, handlers) {
+    if (!window.EventSource || !submitted.events_url) {
+        return pollJob(submitted, handlers);
+    }
+
+    return new Promise((resolve, reject) => {
+        const source = new EventSource(submitted.events_url);
+        for (const kind of ['status', 'stage', 'token']) {
+            source.addEventListener(kind, (event) => handlers[kind](JSON.parse(event.data)));
+        }
+        source.addEventListener('done', (event) => {
+            source.close();
+            resolve(JSON.parse(event.data));
+        });
+        source.onerror = () => {
+            // The browser reconnects by itself (resuming from Last-Event-ID);
+            // a closed stream means the job is gone
+            if (source.readyState === EventSource.CLOSED) {
+                reject(new Error('記事生成の状態を取得できませんでした'));
+            }
+        };
+    });
+}
+
+// Fallback for browsers without EventSource: long polling on the job status
+async function pollJob(submitted, handlers) {
+    let job = submitted.job;
+    while (job.status === 'queued' || job.status === 'running') {
+        handlers.status(job);
+        const statusResponse = await fetch(`${submitted.status_url}?wait=25`);
+        const status = await statusResponse.json();
+        if (!status.success) {
+            throw new Error(status.error || '記事生成の状態を取得できませんでした');
+        }
+        job = status.job;
+    }
+    return job;
+}
+
+// Cancel the running generation
+async function cancelGeneration() {
+    if (!currentGenerationJob) return;
+
+    const cancelBtn = document.getElementById('cancelGenerationBtn');
+    cancelBtn.disabled = true;
+    cancelBtn.innerHTML = '<i class="fas fa-spinner fa-spin"></i> 中断しています...';
+
+    try {
+        const response = await fetch(currentGenerationJob.cancel_url, { method: 'POST' });
+        const result = await response.json();
+        if (!result.success) {
+            throw new Error(result.error || '中断できませんでした');
+        }
+    } catch (error) {
+        console.error('❌ Cancel error:', error);
+        showAlert(`中断エラー: ${error.message}`, 'danger');
+        setCancelButton(true);
+    }
+}
+
+function setCancelButton(visible) {
+    const cancelBtn = document.getElementById('cancelGenerationBtn');
+    if (!cancelBtn) return;
+    cancelBtn.style.display = visible ? 'inline-block' : 'none';
+    cancelBtn.disabled = false;
+    cancelBtn.innerHTML = '<i class="fas fa-stop"></i> 生成を中断';
+}
+
 // Display generation result
 function displayGenerationResult(result) {
     const resultContainer = document.getElementById('resultContent');
@@ -200,15 +347,13 @@ async function copyArticle() {
 
 // Download article
 function downloadArticle() {
-    if (!generatedArticle) {
+    if (!generatedArticle || !generatedArticleDownloadUrl) {
         showAlert('生成された記事がありません', 'warning');
         return;
     }
 
-    const content = `${generatedArticle.content.title}\n\n${generatedArticle.content.content}\n\nタグ: ${generatedArticle.content.tags.join(', ')}\n\n生成日時: ${new Date().toLocaleString('ja-JP')}`;
-    const filename = `${generatedArticle.mountain.name}_記事_${new Date().toISOString().split('T')[0]}.txt`;
-    
-    downloadTextFile(content, filename);
+    // The server keeps finished articles in the job store
+    window.location.href = generatedArticleDownloadUrl;
     showAlert('記事をダウンロードしました', 'success');
 }
 
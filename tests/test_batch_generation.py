@@ -0,0 +1,147 @@
+"""
+記事一括生成（create_and_publish_articles）のテスト
+"""
+import threading
+from pathlib import Path
+
+import pytest
+
+import config.settings
+from src.application.services import MountainArticleService
+from src.domain.entities import GenerationRequest
+from src.infrastructure.api_clients import APIClientError
+from src.infrastructure.repositories import RepositoryFactory
+
+ROOT = Path(__file__).resolve().parents[1]
+WAIT_TIMEOUT = 10
+
+
+class ReversedClaudeClient:
+    """後ろのリクエストから順に応答を返す Claude APIスタブ
+
+    各リクエストは次のリクエストの結果が集計される（on_result が呼ばれる）まで応答しないため、
+    完了順は入力の逆順になる。全リクエストを同時に実行できるワーカー数で使う。
+    """
+
+    def __init__(self, names, failing_name=None):
+        self.order = {name: index for index, name in enumerate(names)}
+        self.collected = [threading.Event() for _ in names]
+        self.failing_name = failing_name
+
+    def on_result(self, index, result):
+        self.collected[index].set()
+
+    def generate_article(self, mountain_data, theme=None, target_length=2000, cache_mode=None,
+                         on_text=None, should_cancel=None):
+        name = mountain_data["name"]
+        index = self.order[name]
+        if index + 1 < len(self.collected) and not self.collected[index + 1].wait(WAIT_TIMEOUT):
+            raise APIClientError(f"{name}: 後続のリクエストが完了しない")
+        if name == self.failing_name:
+            raise APIClientError(f"{name}: 応答エラー")
+        return f"{name}の登山ガイド", f"<p>{theme}</p>", f"{name}の魅力", ["登山"]
+
+
+class StubImageService:
+    def get_featured_image(self, mountain):
+        return None
+
+    def get_inline_images(self, mountain, count=2):
+        return []
+
+
+class StubAffiliateService:
+    def get_hiking_products(self, mountain):
+        return []
+
+    def get_nearby_hotels(self, mountain):
+        return []
+
+
+@pytest.fixture
+def service(tmp_path, monkeypatch):
+    """ダミーの認証情報とデータの複製で、外部APIを呼ばないサービスを作る"""
+    data_dir = tmp_path / "data"
+    data_dir.mkdir()
+    (data_dir / "mountains_japan.json").write_bytes((ROOT / "data" / "mountains_japan.json").read_bytes())
+
+    for key in ["ANTHROPIC_API_KEY", "RAKUTEN_APP_ID", "RAKUTEN_AFFILIATE_ID",
+                "WP_URL", "WP_USERNAME", "WP_APP_PASSWORD"]:
+        monkeypatch.setenv(key, "test-dummy")
+    monkeypatch.setenv("DATA_DIR", str(data_dir))
+    # 設定とリポジトリのシングルトンはテスト後に元へ戻す
+    monkeypatch.setattr(config.settings, "_settings_instance", None)
+    monkeypatch.setattr(RepositoryFactory, "_mountain_repository", None)
+    monkeypatch.setattr(RepositoryFactory, "_area_code_repository", None)
+
+    service = MountainArticleService()
+    monkeypatch.setattr(service.publishing_service, "image_service", StubImageService())
+    monkeypatch.setattr(service.publishing_service, "affiliate_service", StubAffiliateService())
+    return service
+
+
+def _requests(service, count):
+    mountains = service.mountain_repo.get_all()[:count]
+    return mountains, [GenerationRequest(mountain_id=m.id, theme=f"テーマ{i}") for i, m in enumerate(mountains)]
+
+
+def test_results_keep_input_order(service, monkeypatch):
+    """完了順が逆でも結果は入力順に並ぶ"""
+    mountains, requests = _requests(service, 4)
+    claude = ReversedClaudeClient([m.name for m in mountains])
+    monkeypatch.setattr(service.generation_service, "claude_client", claude)
+    completed = []
+
+    def on_result(index, result):
+        completed.append(index)
+        claude.on_result(index, result)
+
+    batch = service.create_and_publish_articles(requests, max_workers=len(requests), on_result=on_result)
+
+    assert completed == [3, 2, 1, 0]
+    assert [r.article.mountain.id for r in batch.results] == [m.id for m in mountains]
+    assert [r.article.content.title for r in batch.results] == [f"{m.name}の登山ガイド" for m in mountains]
+
+
+def test_failures_do_not_abort_batch(service, monkeypatch):
+    """1件の失敗や例外は失敗結果になり、残りの記事は生成される"""
+    mountains, requests = _requests(service, 4)
+    claude = ReversedClaudeClient([m.name for m in mountains], failing_name=mountains[1].name)
+    monkeypatch.setattr(service.generation_service, "claude_client", claude)
+
+    # process_request から漏れた例外も失敗結果として扱う
+    process_request = service.process_request
+
+    def flaky_process_request(request, publish=False):
+        if request.mountain_id == mountains[2].id:
+            raise RuntimeError("想定外のエラー")
+        return process_request(request, publish=publish)
+
+    monkeypatch.setattr(service, "process_request", flaky_process_request)
+
+    batch = service.create_and_publish_articles(
+        requests, max_workers=len(requests), on_result=claude.on_result
+    )
+
+    assert [r.success for r in batch.results] == [True, False, False, True]
+    assert "応答エラー" in batch.results[1].error_message
+    assert batch.results[2].error_message == "想定外のエラー"
+    assert batch.results[0].article.mountain.id == mountains[0].id
+    assert batch.results[3].article.mountain.id == mountains[3].id
+
+
+def test_summary_counts_and_throughput(service, monkeypatch):
+    """集計に件数・同時実行数・スループット・レイテンシが入る"""
+    mountains, requests = _requests(service, 5)
+    claude = ReversedClaudeClient([m.name for m in mountains], failing_name=mountains[0].name)
+    monkeypatch.setattr(service.generation_service, "claude_client", claude)
+
+    summary = service.create_and_publish_articles(requests, max_workers=8, on_result=claude.on_result).summary
+
+    assert (summary.total, summary.succeeded, summary.failed) == (5, 4, 1)
+    # 同時実行数はリクエスト数を上限とする
+    assert summary.max_workers == 5
+    assert summary.wall_time > 0
+    assert summary.throughput_per_minute == pytest.approx(summary.total / summary.wall_time * 60)
+    assert 0 < summary.latency_p50 <= summary.latency_p95 <= summary.latency_max
+    assert summary.latency_max <= summary.wall_time
@@ -0,0 +1,55 @@
+"""
+データファイルのスナップショットのテスト
+"""
+import json
+import threading
+
+from src.infrastructure.data_snapshot import _snapshot_path, load_snapshot
+
+DATA = {"mountains": [{"id": f"mt_{i}", "elevation": i} for i in range(50)]}
+
+
+def _source(tmp_path):
+    source = tmp_path / "mountains.json"
+    source.write_text(json.dumps(DATA), encoding="utf-8")
+    return source
+
+
+def test_snapshot_is_reused(tmp_path):
+    """2回目以降は元ファイルを解析せずスナップショットから読み込む"""
+    source = _source(tmp_path)
+    builds = []
+
+    def build(data):
+        builds.append(1)
+        return data
+
+    assert load_snapshot(source, build) == DATA
+    assert load_snapshot(source, build) == DATA
+    assert len(builds) == 1
+
+
+def test_corrupt_snapshot_is_rebuilt(tmp_path):
+    """どのバイトが壊れていても例外にせず、元ファイルから作り直す"""
+    source = _source(tmp_path)
+    load_snapshot(source)
+    snapshot = _snapshot_path(source, "json")
+    original = snapshot.read_bytes()
+
+    for position in range(0, len(original), 7):
+        corrupted = bytearray(original)
+        corrupted[position] ^= 0xFF
+        snapshot.write_bytes(bytes(corrupted))
+        snapshot.chmod(0o600)
+        assert load_snapshot(source) == DATA
+
+
+def test_unpicklable_result_is_not_saved(tmp_path):
+    """保存できない結果でも読み込み自体は成功する"""
+    source = _source(tmp_path)
+
+    result = load_snapshot(source, build=lambda data: threading.Lock(), kind="lock")
+
+    assert result is not None
+    assert not _snapshot_path(source, "lock").exists()
+    assert not list(_snapshot_path(source, "lock").parent.glob("*.tmp"))
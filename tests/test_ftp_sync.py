@@ -0,0 +1,202 @@
+"""
+FTP差分同期デプロイのテスト（ローカルの pyftpdlib サーバーに対して実行）
+"""
+import logging
+import threading
+from pathlib import Path
+
+import pytest
+
+from src.infrastructure.ftp_sync import FTPDeltaSync, FTPSyncError, REMOTE_MANIFEST_NAME
+
+pytest.importorskip("pyftpdlib")
+
+from pyftpdlib.authorizers import DummyAuthorizer  # noqa: E402
+from pyftpdlib.handlers import FTPHandler  # noqa: E402
+from pyftpdlib.log import config_logging  # noqa: E402
+from pyftpdlib.servers import ThreadedFTPServer  # noqa: E402
+
+USER, PASSWORD = "deploy", "test"
+REMOTE_DIR = "/site"
+
+SITE = {
+    "index.html": "<h1>トップ</h1>",
+    "css/style.css": "body {}",
+    "mountains/高尾山/index.html": "<h1>高尾山</h1>",
+    "mountains/高尾山/map.html": "<p>地図</p>",
+    "mountains/筑波山/index.html": "<h1>筑波山</h1>",
+}
+
+
+class RecordingHandler(FTPHandler):
+    """MKD を記録し、名前に "fail" を含むファイルの STOR を拒否するハンドラー"""
+
+    mkd_paths = []
+
+    def ftp_MKD(self, path):
+        self.mkd_paths.append(self.fs.fs2ftp(path))
+        return super().ftp_MKD(path)
+
+    def ftp_STOR(self, file, mode="w"):
+        if "fail" in Path(file).name:
+            self.respond("550 Upload refused.")
+            return
+        return super().ftp_STOR(file, mode)
+
+
+@pytest.fixture
+def server(tmp_path):
+    """ローカルFTPサーバーを起動して (サーバーのルート, ポート) を返す"""
+    config_logging(level=logging.WARNING)
+    root = tmp_path / "server"
+    root.mkdir()
+    authorizer = DummyAuthorizer()
+    authorizer.add_user(USER, PASSWORD, str(root), perm="elradfmwMT")
+    handler = type("TestHandler", (RecordingHandler,), {"authorizer": authorizer, "mkd_paths": []})
+    ftp_server = ThreadedFTPServer(("127.0.0.1", 0), handler)
+    thread = threading.Thread(target=ftp_server.serve_forever, kwargs={"handle_exit": False}, daemon=True)
+    thread.start()
+    yield root, ftp_server.address[1], handler
+    ftp_server.close_all()
+
+
+def write_site(local_dir: Path, files=SITE):
+    for relative_path, content in files.items():
+        path = local_dir / relative_path
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(content, encoding="utf-8")
+
+
+def remote_files(root: Path, remote_dir: str = REMOTE_DIR, exclude=(REMOTE_MANIFEST_NAME,)):
+    """サーバー上のファイル（相対パス → 内容）"""
+    base = root / remote_dir.strip("/")
+    return {
+        path.relative_to(base).as_posix(): path.read_text(encoding="utf-8")
+        for path in base.rglob("*") if path.is_file() and path.name not in exclude
+    }
+
+
+def make_sync(tmp_path, port, remote_dir=REMOTE_DIR, **kwargs):
+    return FTPDeltaSync(
+        "127.0.0.1", USER, PASSWORD, remote_dir, port=port, connections=3,
+        local_manifest_path=tmp_path / f"manifest{remote_dir.replace('/', '_')}.json",
+        log=lambda message: None, **kwargs
+    )
+
+
+def test_noop_resync_uploads_nothing(tmp_path, server):
+    """変更がなければ2回目の同期は何もアップロードしない"""
+    root, port, _ = server
+    local = tmp_path / "local"
+    write_site(local)
+    sync = make_sync(tmp_path, port)
+
+    first = sync.sync(local)
+    assert first.success
+    assert first.uploaded == len(SITE)
+    assert remote_files(root) == SITE
+
+    second = sync.sync(local)
+    assert second.uploaded == 0
+    assert second.skipped == len(SITE)
+    assert second.deleted == 0
+
+
+def test_changed_and_deleted_files(tmp_path, server):
+    """変更したファイルだけを送り、ローカルから消えたファイルと空のディレクトリを削除する"""
+    root, port, _ = server
+    local = tmp_path / "local"
+    write_site(local)
+    sync = make_sync(tmp_path, port)
+    sync.sync(local)
+
+    (local / "index.html").write_text("<h1>更新</h1>", encoding="utf-8")
+    (local / "mountains/筑波山/index.html").unlink()
+    (local / "mountains/筑波山").rmdir()
+
+    result = sync.sync(local)
+
+    assert result.uploaded == 1
+    assert result.deleted == 1
+    expected = {**SITE, "index.html": "<h1>更新</h1>"}
+    del expected["mountains/筑波山/index.html"]
+    assert remote_files(root) == expected
+    assert not (root / "site/mountains/筑波山").exists()
+
+
+def test_directories_created_once(tmp_path, server):
+    """ディレクトリは親から順に1回ずつだけ作成する"""
+    root, port, handler = server
+    local = tmp_path / "local"
+    write_site(local)
+    sync = make_sync(tmp_path, port)
+
+    result = sync.sync(local)
+
+    created = [path for path in handler.mkd_paths if path != REMOTE_DIR]
+    assert sorted(created) == sorted({
+        "/site/css", "/site/mountains", "/site/mountains/高尾山", "/site/mountains/筑波山"
+    })
+    assert result.directories_created == 4
+
+    # 既存のディレクトリへのファイル追加ではディレクトリを作成しない
+    handler.mkd_paths.clear()
+    write_site(local, {"mountains/高尾山/access.html": "<p>アクセス</p>"})
+    result = sync.sync(local)
+    assert result.directories_created == 0
+    assert [path for path in handler.mkd_paths if path != REMOTE_DIR] == []
+
+
+def test_atomic_sync_leaves_no_staging(tmp_path, server):
+    """アトミックモードの同期後にステージングディレクトリが残らない"""
+    root, port, _ = server
+    local = tmp_path / "local"
+    write_site(local)
+    sync = make_sync(tmp_path, port)
+    sync.sync(local)
+
+    (local / "css/style.css").write_text("body { margin: 0 }", encoding="utf-8")
+    write_site(local, {"mountains/大山/index.html": "<h1>大山</h1>"})
+    result = sync.sync(local, atomic=True)
+
+    assert result.success
+    assert result.uploaded == 2
+    assert remote_files(root)["css/style.css"] == "body { margin: 0 }"
+    assert remote_files(root)["mountains/大山/index.html"] == "<h1>大山</h1>"
+    assert not list((root / "site").glob(".deploy-staging-*"))
+
+
+def test_atomic_sync_failure_keeps_live_files(tmp_path, server):
+    """アトミックモードでアップロードに失敗した場合は公開中のファイルを変更しない"""
+    root, port, _ = server
+    local = tmp_path / "local"
+    write_site(local)
+    sync = make_sync(tmp_path, port)
+    sync.sync(local)
+
+    (local / "index.html").write_text("<h1>更新</h1>", encoding="utf-8")
+    write_site(local, {"fail.html": "<p>送れないファイル</p>"})
+
+    with pytest.raises(FTPSyncError):
+        sync.sync(local, atomic=True)
+
+    assert remote_files(root) == SITE
+    assert not list((root / "site").glob(".deploy-staging-*"))
+
+
+def test_separate_manifests_do_not_delete_each_other(tmp_path, server):
+    """マニフェストを分けた同期同士は、互いのファイルを削除対象にしない"""
+    root, port, _ = server
+    site = tmp_path / "site_a"
+    articles = tmp_path / "site_b"
+    write_site(site)
+    write_site(articles, {"articles/記事.html": "<p>記事</p>"})
+
+    make_sync(tmp_path, port).sync(site)
+    make_sync(tmp_path / "b", port, manifest_name=".deploy_manifest.articles.json").sync(articles)
+    result = make_sync(tmp_path, port).sync(site)
+
+    assert result.deleted == 0
+    assert remote_files(root, exclude=(REMOTE_MANIFEST_NAME, ".deploy_manifest.articles.json")) == {
+        **SITE, "articles/記事.html": "<p>記事</p>"
+    }
@@ -0,0 +1,133 @@
+"""
+Web UI のAPIのテスト
+"""
+import importlib
+import json
+from pathlib import Path
+
+import pytest
+
+from src.infrastructure import http_cache
+
+ROOT = Path(__file__).resolve().parents[1]
+
+FACILITIES = {
+    "restrooms": True,
+    "restaurant": True,
+    "parking": False,
+    "cable_car": True,
+    "visitor_center": False,
+}
+
+
+class StubClaudeClient:
+    """Claude APIスタブ（on_text には本文を1回で渡す）"""
+
+    def generate_article(self, mountain_data, theme=None, target_length=2000, cache_mode=None,
+                         on_text=None, should_cancel=None):
+        name = mountain_data["name"]
+        content = f"<h2>{name}</h2><p>{theme}</p>"
+        if on_text is not None:
+            on_text(content)
+        return f"{name}の登山ガイド", content, f"{name}の魅力を紹介します。", ["登山", name]
+
+
+class StubImageService:
+    """画像取得スタブ（画像なし）"""
+
+    def get_featured_image(self, mountain):
+        return None
+
+    def get_inline_images(self, mountain, count=2):
+        return []
+
+
+class StubAffiliateService:
+    """アフィリエイト取得スタブ（商品・宿泊施設なし）"""
+
+    def get_hiking_products(self, mountain):
+        return []
+
+    def get_nearby_hotels(self, mountain):
+        return []
+
+
+@pytest.fixture(scope="module")
+def web(tmp_path_factory):
+    """施設情報を持つ山を含むデータで Web アプリを読み込む"""
+    data_dir = tmp_path_factory.mktemp("data")
+    source = json.loads((ROOT / "data" / "mountains_japan.json").read_text(encoding="utf-8"))
+    source["mountains"][0]["facilities"] = FACILITIES
+    (data_dir / "mountains_japan.json").write_text(json.dumps(source, ensure_ascii=False), encoding="utf-8")
+
+    with pytest.MonkeyPatch.context() as mp:
+        # 実APIを呼ばないためダミーの認証情報で設定を初期化する
+        for key in ["ANTHROPIC_API_KEY", "RAKUTEN_APP_ID", "RAKUTEN_AFFILIATE_ID",
+                    "WP_URL", "WP_USERNAME", "WP_APP_PASSWORD"]:
+            mp.setenv(key, "test-dummy")
+        mp.setenv("DATA_DIR", str(data_dir))
+        mp.setenv("WEB_JOB_DB_PATH", str(data_dir / "web_jobs.sqlite3"))
+
+        module = importlib.import_module("src.presentation.web.app")
+        yield module
+        module.generation_queue.shutdown(wait=False)
+
+
+def test_mountain_detail_with_facilities_without_orjson(web, monkeypatch):
+    """orjson がなくても施設情報（dataclass）を含む山詳細を返せる"""
+    monkeypatch.setattr(http_cache, "orjson", None)
+    web.response_cache.clear()
+
+    mountain = next(m for m in web.mountain_repo.get_all() if m.facilities)
+    response = web.app.test_client().get(f"/api/mountain/{mountain.id}")
+
+    assert response.status_code == 200
+    assert response.get_json()["mountain"]["facilities"] == FACILITIES
+
+
+def test_dumps_json_converts_dataclasses_without_orjson(monkeypatch):
+    """標準ライブラリの json でも dataclass を辞書として出力する"""
+    from src.domain.entities import Facilities
+
+    monkeypatch.setattr(http_cache, "orjson", None)
+
+    assert json.loads(http_cache.dumps_json({"facilities": Facilities(parking=True)})) == {
+        "facilities": {
+            "restrooms": False,
+            "restaurant": False,
+            "parking": True,
+            "cable_car": False,
+            "visitor_center": False,
+        }
+    }
+
+
+def test_download_generated_article(web, monkeypatch):
+    """生成ジョブの完了後、ジョブIDで記事をダウンロードできる"""
+    service = web.mountain_service
+    monkeypatch.setattr(service.generation_service, "claude_client", StubClaudeClient())
+    monkeypatch.setattr(service.publishing_service, "image_service", StubImageService())
+    monkeypatch.setattr(service.publishing_service, "affiliate_service", StubAffiliateService())
+
+    client = web.app.test_client()
+    mountain = web.mountain_repo.get_all()[0]
+    submitted = client.post("/api/generate", json={"mountain_id": mountain.id, "theme": "紅葉"}).get_json()
+    assert submitted["success"]
+
+    job = client.get(f"{submitted['status_url']}?wait=10").get_json()["job"]
+    assert job["status"] == "succeeded"
+
+    response = client.get(submitted["download_url"])
+    assert response.status_code == 200
+    assert response.mimetype == "text/plain"
+    text = response.get_data(as_text=True)
+    assert text.startswith(f"{mountain.name}の登山ガイド")
+    assert "紅葉" in text
+
+    article = client.get(f"{submitted['download_url']}?format=json").get_json()["article"]
+    assert article["mountain"]["name"] == mountain.name
+
+
+def test_download_unknown_job(web):
+    """存在しないジョブのダウンロードは 404"""
+    assert web.app.test_client().get("/api/jobs/unknown/download").status_code == 404
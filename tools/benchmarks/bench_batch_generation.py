@@ -0,0 +1,125 @@
+#!/usr/bin/env python3
+"""
+記事一括生成のベンチマーク
+
+Claude API・楽天APIを人工的な遅延を入れたスタブに差し替え、
+逐次実行（workers=1）と並列実行のスループットを比較する。
+結果が入力順に並んでいることも合わせて検証する。
+
+使い方:
+    python tools/benchmarks/bench_batch_generation.py --count 20 --workers 8 --latency 0.5
+"""
+import argparse
+import os
+import random
+import sys
+import time
+from pathlib import Path
+
+# プロジェクトルートをパスに追加
+sys.path.insert(0, str(Path(__file__).resolve().parents[2]))
+
+# 実APIを呼ばないためダミーの認証情報で設定を初期化する
+for key in ["ANTHROPIC_API_KEY", "RAKUTEN_APP_ID", "RAKUTEN_AFFILIATE_ID",
+            "WP_URL", "WP_USERNAME", "WP_APP_PASSWORD"]:
+    os.environ.setdefault(key, "benchmark-dummy")
+
+from src.application.services import MountainArticleService
+from src.domain.entities import GenerationRequest
+from src.infrastructure.repositories import RepositoryFactory
+
+
+class StubClaudeClient:
+    """遅延を注入するClaude APIスタブ"""
+
+    def __init__(self, latency: float, jitter: float):
+        self.latency = latency
+        self.jitter = jitter
+
+    def generate_article(self, mountain_data, theme=None, target_length=2000, cache_mode=None,
+                         on_text=None, should_cancel=None):
+        time.sleep(max(0.0, self.latency + random.uniform(-self.jitter, self.jitter)))
+        name = mountain_data['name']
+        content = f"<h2>{name}</h2><p>{theme or ''}</p>" * 20
+        if on_text is not None:
+            on_text(content)
+        return (
+            f"{name}の登山ガイド",
+            content,
+            f"{name}の魅力を紹介します。",
+            ["登山", name]
+        )
+
+
+class StubRakutenClient:
+    """遅延を注入する楽天APIスタブ"""
+
+    def __init__(self, latency: float):
+        self.latency = latency
+
+    def search_products(self, keyword, max_results=5, min_price=1000, max_price=50000):
+        time.sleep(self.latency)
+        return []
+
+    def search_products_many(self, keywords, max_results=5, min_price=1000, max_price=50000):
+        time.sleep(self.latency)
+        return [[] for _ in keywords]
+
+    def search_hotels(self, area_code="01", max_results=3):
+        return []
+
+
+def build_service(latency: float, jitter: float, rakuten_latency: float) -> MountainArticleService:
+    """スタブを組み込んだサービスを生成"""
+    service = MountainArticleService()
+    service.generation_service.claude_client = StubClaudeClient(latency, jitter)
+    service.publishing_service.affiliate_service.rakuten_client = StubRakutenClient(rakuten_latency)
+    return service
+
+
+def run(service: MountainArticleService, requests, workers: int):
+    """一括生成を実行して結果を検証"""
+    batch = service.create_and_publish_articles(requests, max_workers=workers)
+
+    for request, result in zip(requests, batch.results):
+        assert result.success, result.error_message
+        assert result.article.mountain.id == request.mountain_id, "結果の順序が入力と一致しません"
+
+    return batch.summary
+
+
+def main():
+    parser = argparse.ArgumentParser(description="記事一括生成ベンチマーク")
+    parser.add_argument("--count", type=int, default=16, help="生成件数")
+    parser.add_argument("--workers", type=int, default=8, help="並列実行時の同時実行数")
+    parser.add_argument("--latency", type=float, default=0.5, help="Claudeスタブの平均遅延（秒）")
+    parser.add_argument("--jitter", type=float, default=0.2, help="Claudeスタブの遅延ゆらぎ（秒）")
+    parser.add_argument("--rakuten-latency", type=float, default=0.05, help="楽天スタブの遅延（秒）")
+    args = parser.parse_args()
+
+    mountains = RepositoryFactory.get_mountain_repository().get_all()
+    targets = [mountains[i % len(mountains)] for i in range(args.count)]
+    requests = [GenerationRequest(mountain_id=m.id, theme="ベンチマーク") for m in targets]
+
+    service = build_service(args.latency, args.jitter, args.rakuten_latency)
+
+    print(f"🏁 一括生成ベンチマーク: {args.count}件, Claude遅延 {args.latency}±{args.jitter}秒")
+    print("=" * 60)
+
+    sequential = run(service, requests, 1)
+    parallel = run(service, requests, args.workers)
+
+    for label, summary in [("逐次 (workers=1)", sequential), (f"並列 (workers={args.workers})", parallel)]:
+        print(f"{label}:")
+        print(f"  総経過時間: {summary.wall_time:.2f}秒")
+        print(f"  スループット: {summary.throughput_per_minute:.1f}記事/分")
+        print(f"  レイテンシ: 平均 {summary.latency_avg:.2f}秒 / p50 {summary.latency_p50:.2f}秒 / "
+              f"p95 {summary.latency_p95:.2f}秒 / 最大 {summary.latency_max:.2f}秒")
+
+    speedup = sequential.wall_time / parallel.wall_time if parallel.wall_time else 0.0
+    print("=" * 60)
+    print(f"⚡ 高速化: {speedup:.1f}倍（結果の順序: ✅ 入力順）")
+
+
+if __name__ == "__main__":
+    main()
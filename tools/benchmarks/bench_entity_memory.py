@@ -0,0 +1,193 @@
+#!/usr/bin/env python3
+"""
+山エンティティのメモリ使用量ベンチマーク
+
+実データの山を元に合成した大規模カタログ（既定10万件）を読み込み、
+従来の定義（__dict__ を持つ通常の dataclass、文字列のインターンなし）と
+現在の定義（slots・frozen・インターンあり）で、保持されるメモリ量を比較する。
+
+使い方:
+    python tools/benchmarks/bench_entity_memory.py --count 100000
+"""
+import argparse
+import gc
+import json
+import re
+import sys
+import time
+import tracemalloc
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import List, Optional
+
+# プロジェクトルートをパスに追加
+sys.path.insert(0, str(Path(__file__).resolve().parents[2]))
+
+from src.domain.entities import DifficultyLevel, MountainFactory
+
+
+# ---- 従来の定義（比較用） ----
+
+@dataclass
+class LegacyLocation:
+    latitude: float
+    longitude: float
+    nearest_station: str
+    access_time: str
+
+
+@dataclass
+class LegacyDifficulty:
+    level: DifficultyLevel
+    hiking_time: str
+    distance: str
+    elevation_gain: str
+
+
+@dataclass
+class LegacyTrail:
+    name: str
+    description: str
+    time: str
+
+
+@dataclass
+class LegacySeasons:
+    best: List[str]
+    cherry_blossom: Optional[str] = None
+    autumn_leaves: Optional[str] = None
+
+
+@dataclass
+class LegacyFacilities:
+    restrooms: bool = False
+    restaurant: bool = False
+    parking: bool = False
+    cable_car: bool = False
+    visitor_center: bool = False
+
+
+@dataclass
+class LegacyMountain:
+    id: str
+    name: str
+    name_en: str
+    prefecture: str
+    region: str
+    elevation: int
+    location: LegacyLocation
+    difficulty: LegacyDifficulty
+    features: List[str]
+    trails: List[LegacyTrail] = field(default_factory=list)
+    seasons: Optional[LegacySeasons] = None
+    facilities: Optional[LegacyFacilities] = None
+    nearby_attractions: List[str] = field(default_factory=list)
+    keywords: List[str] = field(default_factory=list)
+    article_themes: List[str] = field(default_factory=list)
+
+    def get_hiking_hours(self) -> float:
+        match = re.search(r'(\d+)', self.difficulty.hiking_time)
+        return float(match.group(1)) if match else 3.0
+
+
+def legacy_from_dict(data):
+    """従来の MountainFactory.from_dict 相当"""
+    seasons = data.get('seasons')
+    facilities = data.get('facilities')
+    return LegacyMountain(
+        id=data['id'],
+        name=data['name'],
+        name_en=data['name_en'],
+        prefecture=data['prefecture'],
+        region=data['region'],
+        elevation=data['elevation'],
+        location=LegacyLocation(**data['location']),
+        difficulty=LegacyDifficulty(
+            level=DifficultyLevel(data['difficulty']['level']),
+            hiking_time=data['difficulty']['hiking_time'],
+            distance=data['difficulty']['distance'],
+            elevation_gain=data['difficulty']['elevation_gain']
+        ),
+        features=data['features'],
+        trails=[LegacyTrail(t['name'], t['description'], t['time']) for t in data.get('trails', [])],
+        seasons=LegacySeasons(
+            best=seasons['best'],
+            cherry_blossom=seasons.get('cherry_blossom'),
+            autumn_leaves=seasons.get('autumn_leaves')
+        ) if seasons else None,
+        facilities=LegacyFacilities(**facilities) if facilities else None,
+        nearby_attractions=data.get('nearby_attractions', []),
+        keywords=data.get('keywords', []),
+        article_themes=data.get('article_themes', [])
+    )
+
+
+# ---- 計測 ----
+
+def load_templates() -> List[dict]:
+    """合成の元にする実データ（必須項目の揃った山のみ）"""
+    data_file = Path(__file__).resolve().parents[2] / "data" / "mountains_japan_expanded.json"
+    with open(data_file, 'r', encoding='utf-8') as f:
+        mountains = json.load(f)["mountains"]
+    required = ("name_en", "location", "difficulty", "features")
+    return [m for m in mountains if all(key in m for key in required)]
+
+
+def synthesize(templates: List[dict], count: int) -> bytes:
+    """件数を水増ししたカタログのJSON（名前やIDは山ごとに一意にする）"""
+    catalog = []
+    for i in range(count):
+        mountain = dict(templates[i % len(templates)])
+        mountain["id"] = f"{mountain['id']}_{i}"
+        mountain["name"] = f"{mountain['name']}{i}"
+        mountain["name_en"] = f"{mountain['name_en']} {i}"
+        mountain["elevation"] = mountain["elevation"] + i % 50
+        catalog.append(mountain)
+    return json.dumps({"mountains": catalog}, ensure_ascii=False).encode("utf-8")
+
+
+def measure(raw: bytes, factory) -> tuple:
+    """JSONを解析してエンティティを組み立て、解析結果を捨てた後に残るメモリ量（バイト）と所要時間"""
+    gc.collect()
+    tracemalloc.start()
+    start = time.perf_counter()
+    data = json.loads(raw)
+    entities = [factory(m) for m in data["mountains"]]
+    elapsed = time.perf_counter() - start
+    del data
+    gc.collect()
+    retained, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return retained, elapsed, entities
+
+
+def main():
+    parser = argparse.ArgumentParser(description="山エンティティのメモリ使用量ベンチマーク")
+    parser.add_argument("--count", type=int, default=100000, help="合成する山の件数")
+    args = parser.parse_args()
+
+    raw = synthesize(load_templates(), args.count)
+    print(f"🏁 山エンティティ メモリベンチマーク: {args.count}件（JSON {len(raw) / 1024 / 1024:.1f}MB）")
+    print("=" * 64)
+
+    results = {}
+    for label, factory in [("従来", legacy_from_dict), ("slots+intern", MountainFactory.from_dict)]:
+        retained, elapsed, entities = measure(raw, factory)
+
+        start = time.perf_counter()
+        for mountain in entities:
+            mountain.get_hiking_hours()
+        hours_time = time.perf_counter() - start
+        del entities
+
+        results[label] = retained
+        print(f"{label:<14} 保持 {retained / 1024 / 1024:7.1f}MB  1件あたり {retained / args.count:6.0f}B  "
+              f"構築 {elapsed:5.2f}s  get_hiking_hours全件 {hours_time * 1000:6.1f}ms")
+
+    legacy, current = results["従来"], results["slots+intern"]
+    print("-" * 64)
+    print(f"削減: 1件あたり {(legacy - current) / args.count:.0f}B（{(1 - current / legacy) * 100:.0f}%）")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,156 @@
+#!/usr/bin/env python3
+"""
+FTP差分同期デプロイのベンチマーク
+
+pyftpdlib のFTPサーバーをローカルで起動し、合成した静的サイトを
+従来方式（全ファイルを1接続で、ファイルごとに MKD してからアップロード）と
+FTPDeltaSync（差分のみ・並列接続）でデプロイして所要時間を比較する。
+各デプロイ後にサーバー上のファイルがローカルと一致することも検証する。
+
+使い方:
+    pip install pyftpdlib
+    python tools/benchmarks/bench_ftp_sync.py --files 500 --connections 4
+"""
+import argparse
+import ftplib
+import logging
+import random
+import sys
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+# プロジェクトルートをパスに追加
+sys.path.insert(0, str(Path(__file__).resolve().parents[2]))
+
+from src.infrastructure.ftp_sync import FTPDeltaSync, REMOTE_MANIFEST_NAME
+
+try:
+    from pyftpdlib.authorizers import DummyAuthorizer
+    from pyftpdlib.handlers import FTPHandler
+    from pyftpdlib.log import config_logging
+    from pyftpdlib.servers import ThreadedFTPServer
+except ImportError:
+    sys.exit("pyftpdlib が必要です: pip install pyftpdlib")
+
+USER, PASSWORD = "deploy", "benchmark"
+
+
+def start_server(root: Path):
+    """ローカルFTPサーバーを別スレッドで起動して (サーバー, ポート) を返す"""
+    config_logging(level=logging.WARNING)
+    authorizer = DummyAuthorizer()
+    authorizer.add_user(USER, PASSWORD, str(root), perm="elradfmwMT")
+    handler = type("BenchmarkHandler", (FTPHandler,), {"authorizer": authorizer, "banner": "benchmark"})
+    server = ThreadedFTPServer(("127.0.0.1", 0), handler)
+    threading.Thread(target=server.serve_forever, kwargs={"handle_exit": False}, daemon=True).start()
+    return server, server.address[1]
+
+
+def build_site(root: Path, files: int, rng: random.Random):
+    """山ページ・静的ファイルを模した合成サイト"""
+    for i in range(files):
+        if i % 10 == 0:
+            path = root / "static" / ("css" if i % 20 == 0 else "js") / f"asset{i}.txt"
+        else:
+            path = root / "mountains" / f"山{i // 3}" / f"page{i % 3}.html"
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_bytes(rng.randbytes(rng.randint(2_000, 30_000)))
+
+
+def legacy_deploy(port: int, local_dir: Path, remote_dir: str):
+    """従来方式: 1接続で全ファイルを送信し、ファイルごとに親ディレクトリの MKD を試みる"""
+    ftp = ftplib.FTP()
+    ftp.encoding = "utf-8"
+    ftp.connect("127.0.0.1", port)
+    ftp.login(USER, PASSWORD)
+    try:
+        ftp.mkd(remote_dir)
+    except ftplib.error_perm:
+        pass
+    for item in local_dir.rglob("*"):
+        if item.is_file():
+            remote_path = f"{remote_dir}/{item.relative_to(local_dir).as_posix()}"
+            parts = remote_path.split("/")[:-1]
+            for depth in range(2, len(parts) + 1):
+                try:
+                    ftp.mkd("/".join(parts[:depth]))
+                except ftplib.error_perm:
+                    pass
+            with open(item, "rb") as f:
+                ftp.storbinary(f"STOR {remote_path}", f)
+    ftp.quit()
+
+
+def assert_same_tree(local_dir: Path, remote_root: Path):
+    """サーバー上のファイルがローカルと一致することを確認（マニフェストは除く）"""
+    local = {p.relative_to(local_dir).as_posix(): p.read_bytes() for p in local_dir.rglob("*") if p.is_file()}
+    remote = {
+        p.relative_to(remote_root).as_posix(): p.read_bytes()
+        for p in remote_root.rglob("*") if p.is_file() and p.name != REMOTE_MANIFEST_NAME
+    }
+    assert local.keys() == remote.keys(), f"ファイル一覧が一致しません: {sorted(local.keys() ^ remote.keys())[:5]}"
+    assert all(local[k] == remote[k] for k in local), "ファイル内容が一致しません"
+    leftovers = [p.name for p in remote_root.iterdir() if p.name.startswith(".deploy-staging")]
+    assert not leftovers, f"ステージングディレクトリが残っています: {leftovers}"
+
+
+def main():
+    parser = argparse.ArgumentParser(description="FTP差分同期デプロイベンチマーク")
+    parser.add_argument("--files", type=int, default=500, help="合成サイトのファイル数")
+    parser.add_argument("--connections", type=int, default=4, help="並列接続数")
+    args = parser.parse_args()
+
+    rng = random.Random(0)
+    with tempfile.TemporaryDirectory() as tmp:
+        tmp = Path(tmp)
+        local_dir, server_root, cache_dir = tmp / "site", tmp / "server", tmp / "cache"
+        local_dir.mkdir()
+        server_root.mkdir()
+        build_site(local_dir, args.files, rng)
+
+        server, port = start_server(server_root)
+        try:
+            print(f"🏁 FTP差分同期ベンチマーク: {args.files}ファイル / 並列接続 {args.connections}")
+            print("=" * 64)
+
+            start = time.perf_counter()
+            legacy_deploy(port, local_dir, "/legacy")
+            legacy_time = time.perf_counter() - start
+            assert_same_tree(local_dir, server_root / "legacy")
+            print(f"従来方式（全件）        {legacy_time:6.2f}秒")
+
+            sync = FTPDeltaSync(
+                "127.0.0.1", USER, PASSWORD, "/site", port=port,
+                connections=args.connections, local_manifest_path=cache_dir / "manifest.json",
+                log=lambda message: None
+            )
+
+            result = sync.sync(local_dir)
+            assert_same_tree(local_dir, server_root / "site")
+            print(f"差分同期（初回）        {result.elapsed:6.2f}秒  {result.format_summary()}")
+
+            result = sync.sync(local_dir)
+            assert result.uploaded == 0
+            print(f"差分同期（変更なし）    {result.elapsed:6.2f}秒  {result.format_summary()}")
+
+            # 数ページの変更・削除・追加をアトミックモードで反映する
+            pages = sorted(p for p in local_dir.rglob("*.html"))
+            for page in pages[:5]:
+                page.write_bytes(rng.randbytes(5_000))
+            for page in pages[-3:]:
+                page.unlink()
+            (local_dir / "mountains" / "新しい山").mkdir()
+            (local_dir / "mountains" / "新しい山" / "page0.html").write_bytes(rng.randbytes(5_000))
+
+            result = sync.sync(local_dir, atomic=True)
+            assert_same_tree(local_dir, server_root / "site")
+            assert (result.uploaded, result.deleted) == (6, 3)
+            print(f"差分同期（アトミック）  {result.elapsed:6.2f}秒  {result.format_summary()}")
+        finally:
+            server.close_all()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,642 @@
+#!/usr/bin/env python3
+"""
+Web UI（web/app.py）と生成済み静的サイトの負荷試験
+
+asyncio の HTTP クライアント（keep-alive・並列数を指定）でローカルのサーバーに
+重み付きのリクエストを送り続け、エンドポイントごとの p50 / p95 / p99 レイテンシ、
+スループット、エラー率を集計する。
+
+  - web:  Web アプリを同じプロセス内で起動する。Claude・楽天・WordPress の
+          クライアントは遅延を注入するスタブに差し替えるため、実APIは呼ばない
+  - site: 生成済みの静的サイトを StaticSiteServer（serve.py と同じ）で配信する
+  - --url を指定した場合は起動済みのサーバーに送る（スタブは使わない）
+
+結果は --output で JSON に保存できる。--compare で以前の結果と比較し、
+p95 の悪化やエラー率の上昇が閾値を超えた場合は終了コード 1 で終了する（CI 用）。
+
+使い方:
+    python tools/benchmarks/bench_load.py web --concurrency 20 --duration 15 --output web.json
+    python tools/benchmarks/bench_load.py site --site-dir static_site --compare baseline.json
+"""
+import argparse
+import asyncio
+import json
+import math
+import os
+import random
+import sys
+import tempfile
+import threading
+import time
+from collections import Counter
+from datetime import datetime
+from pathlib import Path
+from typing import Awaitable, Callable, Dict, List, NamedTuple, Optional, Tuple
+from urllib.parse import quote, urlsplit
+
+# プロジェクトルートと Web アプリをパスに追加
+ROOT = Path(__file__).resolve().parents[2]
+sys.path.insert(0, str(ROOT))
+sys.path.insert(0, str(ROOT / "src" / "presentation" / "web"))
+
+# 実APIを呼ばないためダミーの認証情報で設定を初期化する（ログは警告以上のみ）
+for key in ["ANTHROPIC_API_KEY", "RAKUTEN_APP_ID", "RAKUTEN_AFFILIATE_ID",
+            "WP_URL", "WP_USERNAME", "WP_APP_PASSWORD"]:
+    os.environ.setdefault(key, "benchmark-dummy")
+os.environ.setdefault("LOG_LEVEL", "WARNING")
+
+# 結果ファイルの形式のバージョン（項目を変えたら上げる）
+RESULT_VERSION = 1
+
+
+# ---- 遅延を注入するAPIスタブ ----
+
+class StubLatency:
+    """平均 latency 秒・ゆらぎ ±jitter 秒の遅延"""
+
+    def __init__(self, latency: float, jitter: float = 0.0):
+        self.latency = latency
+        self.jitter = jitter
+
+    def sleep(self, fraction: float = 1.0):
+        time.sleep(max(0.0, (self.latency + random.uniform(-self.jitter, self.jitter)) * fraction))
+
+
+class StubClaudeClient:
+    """Claude APIスタブ（on_text を指定した場合は本文を分割して少しずつ渡す）"""
+
+    CHUNKS = 10
+
+    def __init__(self, delay: StubLatency):
+        self.delay = delay
+
+    def generate_article(self, mountain_data, theme=None, target_length=2000, cache_mode=None,
+                         on_text=None, should_cancel=None):
+        from src.infrastructure.api_clients import RequestCancelledError
+
+        name = mountain_data['name']
+        content = f"<h2>{name}</h2><p>{theme or ''}</p>" * 20
+        if on_text is None:
+            self.delay.sleep()
+        else:
+            size = math.ceil(len(content) / self.CHUNKS)
+            for i in range(0, len(content), size):
+                self.delay.sleep(1 / self.CHUNKS)
+                if should_cancel is not None and should_cancel():
+                    raise RequestCancelledError("記事生成がキャンセルされました")
+                on_text(content[i:i + size])
+        return f"{name}の登山ガイド", content, f"{name}の魅力を紹介します。", ["登山", name]
+
+
+class StubRakutenClient:
+    """楽天APIスタブ（商品・宿泊施設とも空の結果を返す）"""
+
+    def __init__(self, delay: StubLatency):
+        self.delay = delay
+
+    def search_products(self, keyword, max_results=5, min_price=1000, max_price=50000):
+        self.delay.sleep()
+        return []
+
+    def search_products_many(self, keywords, max_results=5, min_price=1000, max_price=50000):
+        self.delay.sleep()
+        return [[] for _ in keywords]
+
+    def search_hotels(self, area_code="01", max_results=3):
+        self.delay.sleep()
+        return []
+
+    def close(self):
+        pass
+
+
+class StubWordPressClient:
+    """WordPress APIスタブ（連番の投稿IDを返す）"""
+
+    def __init__(self, delay: StubLatency):
+        self.delay = delay
+        self._ids = iter(range(1, 1 << 31))
+        self._lock = threading.Lock()
+
+    def _next_id(self) -> int:
+        with self._lock:
+            return next(self._ids)
+
+    def create_post(self, post_data):
+        self.delay.sleep()
+        return self._next_id()
+
+    def upload_media(self, image_url, image_data):
+        self.delay.sleep()
+        return self._next_id()
+
+
+# ---- asyncio HTTP クライアント ----
+
+class HTTPResponse(NamedTuple):
+    status: int
+    headers: Dict[str, str]
+    body: bytes
+
+
+class AsyncHTTPClient:
+    """1本の keep-alive 接続で逐次リクエストを送る最小限の HTTP/1.1 クライアント"""
+
+    def __init__(self, host: str, port: int, timeout: float):
+        self.host = host
+        self.port = port
+        self.timeout = timeout
+        self._reader: Optional[asyncio.StreamReader] = None
+        self._writer: Optional[asyncio.StreamWriter] = None
+
+    async def request(self, method: str, path: str, headers: Optional[Dict[str, str]] = None,
+                      body: bytes = b"") -> HTTPResponse:
+        return await asyncio.wait_for(self._request(method, path, headers or {}, body), self.timeout)
+
+    async def _request(self, method: str, path: str, headers: Dict[str, str], body: bytes) -> HTTPResponse:
+        for attempt in range(2):
+            reused = self._writer is not None
+            if not reused:
+                self._reader, self._writer = await asyncio.open_connection(self.host, self.port)
+            lines = [f"{method} {path} HTTP/1.1", f"Host: {self.host}:{self.port}",
+                     f"Content-Length: {len(body)}"]
+            lines += [f"{name}: {value}" for name, value in headers.items()]
+            try:
+                self._writer.write(("\r\n".join(lines) + "\r\n\r\n").encode("latin-1") + body)
+                await self._writer.drain()
+                status_line = await self._reader.readline()
+                if not status_line:
+                    raise ConnectionResetError("接続が閉じられました")
+                return await self._read_response(method, status_line)
+            except (ConnectionError, asyncio.IncompleteReadError):
+                self.close()
+                # サーバーが閉じた keep-alive 接続を再利用した場合だけ1回やり直す
+                if not reused or attempt:
+                    raise
+        raise ConnectionError("unreachable")
+
+    async def _read_response(self, method: str, status_line: bytes) -> HTTPResponse:
+        version, status = status_line.decode("latin-1").split(None, 2)[:2]
+        headers: Dict[str, str] = {}
+        while True:
+            line = await self._reader.readline()
+            if line in (b"\r\n", b"\n", b""):
+                break
+            name, _, value = line.decode("latin-1").partition(":")
+            headers[name.strip().lower()] = value.strip()
+
+        status_code = int(status)
+        if method == "HEAD" or status_code in (204, 304) or 100 <= status_code < 200:
+            body = b""
+        elif headers.get("transfer-encoding", "").lower() == "chunked":
+            chunks = []
+            while True:
+                size = int((await self._reader.readline()).split(b";")[0], 16)
+                if not size:
+                    await self._reader.readline()
+                    break
+                chunks.append(await self._reader.readexactly(size))
+                await self._reader.readline()
+            body = b"".join(chunks)
+        elif "content-length" in headers:
+            body = await self._reader.readexactly(int(headers["content-length"]))
+        else:
+            body = await self._reader.read()
+            headers["connection"] = "close"
+
+        keep_alive = version == "HTTP/1.1" and headers.get("connection", "").lower() != "close"
+        if not keep_alive:
+            self.close()
+        return HTTPResponse(status_code, headers, body)
+
+    def close(self):
+        if self._writer is not None:
+            self._writer.close()
+        self._reader = self._writer = None
+
+
+# ---- 集計 ----
+
+def percentile(sorted_values: List[float], percent: float) -> float:
+    """ソート済みの値から最近接順位法でパーセンタイルを求める"""
+    if not sorted_values:
+        return 0.0
+    rank = max(1, math.ceil(len(sorted_values) * percent / 100))
+    return sorted_values[rank - 1]
+
+
+class LoadStats:
+    """エンドポイントごとのレイテンシ・ステータス・エラー"""
+
+    def __init__(self):
+        self.latencies: Dict[str, List[float]] = {}
+        self.statuses: Dict[str, Counter] = {}
+        self.errors: Dict[str, Counter] = {}
+        self.recording = False
+
+    def record(self, name: str, seconds: float, status: Optional[int], error: Optional[str] = None):
+        if not self.recording:
+            return
+        self.latencies.setdefault(name, []).append(seconds * 1000)
+        self.statuses.setdefault(name, Counter())[str(status) if status is not None else "error"] += 1
+        if error is None and (status is None or status >= 400):
+            error = f"HTTP {status}"
+        if error is not None:
+            self.errors.setdefault(name, Counter())[error] += 1
+
+    def summarize(self, latencies: List[float], errors: int, duration: float) -> Dict[str, object]:
+        values = sorted(latencies)
+        return {
+            "requests": len(values),
+            "errors": errors,
+            "error_rate": round(errors / len(values), 4) if values else 0.0,
+            "throughput_rps": round(len(values) / duration, 2) if duration else 0.0,
+            "latency_ms": {
+                "p50": round(percentile(values, 50), 2),
+                "p95": round(percentile(values, 95), 2),
+                "p99": round(percentile(values, 99), 2),
+                "mean": round(sum(values) / len(values), 2) if values else 0.0,
+                "max": round(values[-1], 2) if values else 0.0,
+            },
+        }
+
+    def to_dict(self, duration: float) -> Dict[str, object]:
+        endpoints = {}
+        for name in sorted(self.latencies):
+            errors = self.errors.get(name, Counter())
+            endpoints[name] = {
+                **self.summarize(self.latencies[name], sum(errors.values()), duration),
+                "status": dict(sorted(self.statuses[name].items())),
+                "error_types": dict(errors.most_common()),
+            }
+        all_latencies = [value for values in self.latencies.values() for value in values]
+        total_errors = sum(sum(errors.values()) for errors in self.errors.values())
+        return {"overall": self.summarize(all_latencies, total_errors, duration), "endpoints": endpoints}
+
+
+async def timed(stats: LoadStats, name: str, request: Awaitable[HTTPResponse]) -> Optional[HTTPResponse]:
+    """リクエスト1件の所要時間とステータスを記録（失敗した場合は None）"""
+    start = time.perf_counter()
+    try:
+        response = await request
+    except Exception as e:
+        stats.record(name, time.perf_counter() - start, None, type(e).__name__)
+        return None
+    stats.record(name, time.perf_counter() - start, response.status)
+    return response
+
+
+# ---- シナリオ ----
+
+Action = Callable[[AsyncHTTPClient, random.Random, LoadStats, Dict[str, str]], Awaitable[None]]
+
+
+class Scenario(NamedTuple):
+    """重み付きのリクエストの組み合わせ"""
+    actions: List[Tuple[Action, int]]
+
+    def pick(self, rng: random.Random) -> Action:
+        return rng.choices([action for action, _ in self.actions],
+                           weights=[weight for _, weight in self.actions])[0]
+
+
+async def web_scenario(client: AsyncHTTPClient, publish_ratio: float) -> Scenario:
+    """Web アプリのシナリオ（閲覧中心に、一部で記事生成ジョブを投入して完了まで待つ）"""
+    response = await client.request("GET", "/api/mountains?fields=id,name,prefecture")
+    if response.status != 200:
+        raise RuntimeError(f"山データを取得できません（HTTP {response.status}）: {response.body[:200]!r}")
+    mountains = json.loads(response.body)["mountains"]
+    if not mountains:
+        raise RuntimeError("山データが空です")
+    words = sorted({word for m in mountains for word in (m["name"], m["prefecture"].split("・")[0])})
+
+    def get(name: str, path: Callable[[random.Random], str], conditional: bool = False) -> Action:
+        async def action(client, rng, stats, etags):
+            url = path(rng)
+            headers = {"If-None-Match": etags[url]} if conditional and url in etags else {}
+            response = await timed(stats, name, client.request("GET", url, headers))
+            if response is not None and "etag" in response.headers:
+                etags[url] = response.headers["etag"]
+        return action
+
+    async def generate(client, rng, stats, etags):
+        # 投入（202）の応答時間と、ブラウザと同じくロングポーリングで完了を待つまでの時間を記録する
+        payload = {"mountain_id": rng.choice(mountains)["id"], "publish": rng.random() < publish_ratio}
+        start = time.perf_counter()
+        response = await timed(stats, "POST /api/generate", client.request(
+            "POST", "/api/generate", {"Content-Type": "application/json"}, json.dumps(payload).encode()
+        ))
+        if response is None or response.status != 202:
+            return
+
+        status, error = response.status, None
+        try:
+            status_url = json.loads(response.body)["status_url"]
+            while True:
+                poll = await client.request("GET", f"{status_url}?wait=30")
+                status = poll.status
+                if poll.status != 200:
+                    break
+                job = json.loads(poll.body)["job"]
+                if job["status"] in ("succeeded", "failed", "cancelled"):
+                    if job["status"] != "succeeded":
+                        error = f"job {job['status']}"
+                    break
+        except Exception as e:
+            status, error = None, type(e).__name__
+        stats.record("記事生成（完了まで）", time.perf_counter() - start, status, error)
+
+    def mountain(rng):
+        return f"/api/mountain/{rng.choice(mountains)['id']}"
+
+    return Scenario([
+        (get("GET /", lambda rng: "/", conditional=True), 10),
+        (get("GET /api/mountains", lambda rng: "/api/mountains"), 10),
+        (get("GET /api/mountains?limit=20&fields=…", lambda rng: (
+            f"/api/mountains?offset={rng.randrange(len(mountains))}&limit=20&fields=id,name,elevation")), 15),
+        (get("GET /api/mountain/<id>", mountain), 20),
+        (get("GET /api/mountain/<id>（304）", mountain, conditional=True), 10),
+        (get("GET /api/search", lambda rng: f"/api/search?q={quote(rng.choice(words))}"), 10),
+        (get("GET /health", lambda rng: "/health"), 5),
+        (generate, 2),
+    ])
+
+
+def site_scenario(site_dir: Path) -> Scenario:
+    """静的サイトのシナリオ（HTMLページ・再訪問時の条件付きリクエスト・CSS/JS・画像）"""
+    groups: Dict[str, List[str]] = {"html": [], "asset": [], "image": []}
+    for path in site_dir.rglob("*"):
+        if not path.is_file() or path.suffix in (".gz", ".br") or "templates" in path.parts:
+            continue
+        url = "/" + path.relative_to(site_dir).as_posix()
+        if path.name == "index.html":
+            groups["html"].append(url[:-len("index.html")])
+        elif path.suffix == ".html":
+            groups["html"].append(url)
+        elif path.suffix in (".css", ".js"):
+            groups["asset"].append(url)
+        elif path.suffix.lower() in (".png", ".jpg", ".jpeg", ".gif", ".svg", ".webp", ".ico"):
+            groups["image"].append(url)
+    if not groups["html"]:
+        raise RuntimeError(f"HTMLページが見つかりません: {site_dir}")
+
+    def get(name: str, urls: List[str], headers: Dict[str, str], conditional: bool = False) -> Action:
+        async def action(client, rng, stats, etags):
+            url = quote(rng.choice(urls))
+            request_headers = dict(headers)
+            if conditional and url in etags:
+                request_headers["If-None-Match"] = etags[url]
+            response = await timed(stats, name, client.request("GET", url, request_headers))
+            if response is not None and "etag" in response.headers:
+                etags[url] = response.headers["etag"]
+        return action
+
+    browser = {"Accept-Encoding": "br, gzip"}
+    actions = [
+        (get("GET ページ（HTML）", groups["html"], browser), 50),
+        (get("GET ページ（HTML・304）", groups["html"], browser, conditional=True), 20),
+    ]
+    if groups["asset"]:
+        actions.append((get("GET CSS / JS", groups["asset"], browser, conditional=True), 20))
+    if groups["image"]:
+        actions.append((get("GET 画像", groups["image"], {}), 10))
+    return Scenario(actions)
+
+
+# ---- サーバーの起動 ----
+
+def start_web_app(args) -> Tuple[str, int, Callable[[], None]]:
+    """スタブに差し替えた Web アプリを別スレッドで起動"""
+    tmp = tempfile.mkdtemp(prefix="bench_load_")
+    os.environ.setdefault("WEB_JOB_DB_PATH", str(Path(tmp) / "web_jobs.sqlite3"))
+    # 負荷試験中は生成ジョブを待たせても断らない
+    os.environ.setdefault("WEB_JOB_MAX_PENDING", "100000")
+
+    from werkzeug.serving import WSGIRequestHandler, make_server
+    import app as web
+
+    service = web.mountain_service
+    service.generation_service.claude_client = StubClaudeClient(StubLatency(args.claude_latency, args.claude_jitter))
+    service.publishing_service.affiliate_service.rakuten_client = StubRakutenClient(StubLatency(args.rakuten_latency))
+    service.publishing_service.wordpress_client = StubWordPressClient(StubLatency(args.wordpress_latency))
+
+    class QuietRequestHandler(WSGIRequestHandler):
+        def log_request(self, *args, **kwargs):
+            pass
+
+    server = make_server("127.0.0.1", 0, web.app, threaded=True, request_handler=QuietRequestHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+
+    def stop():
+        server.shutdown()
+        web.generation_queue.shutdown(wait=False)
+
+    return "127.0.0.1", server.port, stop
+
+
+def start_static_site(site_dir: Path) -> Tuple[str, int, Callable[[], None]]:
+    """静的サイトを StaticSiteServer で別スレッドで起動"""
+    from src.infrastructure.static_server import StaticSiteServer
+
+    server = StaticSiteServer(("127.0.0.1", 0), str(site_dir), access_log=False)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+
+    def stop():
+        server.shutdown()
+        server.server_close()
+
+    return "127.0.0.1", server.server_address[1], stop
+
+
+# ---- 実行 ----
+
+async def run_load(host: str, port: int, args) -> Dict[str, object]:
+    """並列数 args.concurrency で args.duration 秒（または args.requests 件）リクエストを送る"""
+    setup = AsyncHTTPClient(host, port, args.timeout)
+    try:
+        if args.target == "web":
+            scenario = await web_scenario(setup, args.publish_ratio)
+        else:
+            scenario = site_scenario(Path(args.site_dir))
+    finally:
+        setup.close()
+
+    stats = LoadStats()
+    remaining = [args.requests] if args.requests else None
+
+    async def worker(index: int, stop: asyncio.Event):
+        rng = random.Random(args.seed * 1000 + index)
+        client = AsyncHTTPClient(host, port, args.timeout)
+        etags: Dict[str, str] = {}
+        try:
+            while not stop.is_set():
+                if stats.recording and remaining is not None:
+                    if remaining[0] <= 0:
+                        return
+                    remaining[0] -= 1
+                try:
+                    await scenario.pick(rng)(client, rng, stats, etags)
+                except Exception:
+                    # レスポンス本文の解析失敗等（失敗したリクエスト自体は記録済み）
+                    client.close()
+        finally:
+            client.close()
+
+    async def run_phase(seconds: Optional[float]) -> float:
+        """全ワーカーを seconds 秒動かして止める（None の場合はリクエスト数を使い切るまで）"""
+        start = time.perf_counter()
+        stop = asyncio.Event()
+        tasks = [asyncio.create_task(worker(i, stop)) for i in range(args.concurrency)]
+        if seconds is None:
+            await asyncio.gather(*tasks)
+        else:
+            await asyncio.wait(tasks, timeout=seconds)
+        elapsed = time.perf_counter() - start
+        # 時間切れの時点で処理中のリクエストは記録せずに打ち切る
+        # （wait_for がキャンセルを取りこぼす場合に備えてワーカーにも停止を知らせる）
+        stats.recording = False
+        stop.set()
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        return elapsed
+
+    if args.warmup > 0:
+        await run_phase(args.warmup)
+
+    stats.recording = True
+    duration = await run_phase(None if args.requests else args.duration)
+
+    config = {
+        "concurrency": args.concurrency,
+        "duration_s": args.duration if not args.requests else None,
+        "requests": args.requests or None,
+        "warmup_s": args.warmup,
+        "seed": args.seed,
+    }
+    if args.target == "web" and not args.url:
+        config["stubs"] = {
+            "claude_latency_s": args.claude_latency,
+            "claude_jitter_s": args.claude_jitter,
+            "rakuten_latency_s": args.rakuten_latency,
+            "wordpress_latency_s": args.wordpress_latency,
+            "publish_ratio": args.publish_ratio,
+        }
+    if args.target == "site":
+        config["site_dir"] = str(args.site_dir)
+
+    return {
+        "version": RESULT_VERSION,
+        "target": args.target,
+        "url": args.url or f"http://{host}:{port}",
+        "started_at": datetime.now().isoformat(timespec="seconds"),
+        "elapsed_s": round(duration, 3),
+        "config": config,
+        **stats.to_dict(duration),
+    }
+
+
+def print_report(result: Dict[str, object]):
+    """エンドポイントごとの集計を表示"""
+    print(f"🏁 負荷試験: {result['target']}（{result['url']}）並列数 {result['config']['concurrency']}、"
+          f"{result['elapsed_s']:.1f}秒")
+    print("=" * 100)
+    print(f"{'エンドポイント':<40} {'件数':>7} {'req/s':>8} {'エラー率':>8} "
+          f"{'p50':>8} {'p95':>8} {'p99':>8}  (ms)")
+    rows = list(result["endpoints"].items()) + [("合計", result["overall"])]
+    for name, summary in rows:
+        latency = summary["latency_ms"]
+        print(f"{name:<40} {summary['requests']:>7} {summary['throughput_rps']:>8.1f} "
+              f"{summary['error_rate']:>8.1%} {latency['p50']:>8.2f} {latency['p95']:>8.2f} {latency['p99']:>8.2f}")
+    for name, summary in result["endpoints"].items():
+        if summary["error_types"]:
+            errors = ", ".join(f"{error} ×{count}" for error, count in summary["error_types"].items())
+            print(f"⚠️  {name}: {errors}")
+
+
+def compare(result: Dict[str, object], baseline: Dict[str, object], max_regression: float,
+            min_delta_ms: float, max_error_increase: float) -> List[str]:
+    """
+    以前の結果と比較して悪化したエンドポイントを返す
+
+    p95 が max_regression の割合を超えて（かつ min_delta_ms 以上）遅くなった場合と、
+    エラー率が max_error_increase を超えて上がった場合を悪化とみなす。
+    """
+    regressions = []
+    print("\n📊 前回との比較（p95）")
+    for name, summary in result["endpoints"].items():
+        previous = baseline.get("endpoints", {}).get(name)
+        if previous is None:
+            print(f"  {name:<40} 新規")
+            continue
+        before, after = previous["latency_ms"]["p95"], summary["latency_ms"]["p95"]
+        change = (after - before) / before if before else 0.0
+        error_increase = summary["error_rate"] - previous["error_rate"]
+        slower = change > max_regression and after - before >= min_delta_ms
+        more_errors = error_increase > max_error_increase
+        mark = "❌" if slower or more_errors else "✅"
+        print(f"  {mark} {name:<40} {before:8.2f}ms → {after:8.2f}ms ({change:+.0%})  "
+              f"エラー率 {previous['error_rate']:.1%} → {summary['error_rate']:.1%}")
+        if slower:
+            regressions.append(f"{name}: p95 {before:.2f}ms → {after:.2f}ms ({change:+.0%})")
+        if more_errors:
+            regressions.append(f"{name}: エラー率 {previous['error_rate']:.1%} → {summary['error_rate']:.1%}")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Web UI・静的サイトの負荷試験")
+    parser.add_argument("target", choices=["web", "site"], help="試験対象")
+    parser.add_argument("--url", help="起動済みのサーバーのURL（省略時はこのプロセス内で起動）")
+    parser.add_argument("--site-dir", default=str(ROOT / "static_site"), help="site の配信ディレクトリ")
+    parser.add_argument("--concurrency", type=int, default=20, help="並列数（同時接続数）")
+    parser.add_argument("--duration", type=float, default=10.0, help="計測時間（秒）")
+    parser.add_argument("--requests", type=int, default=0, help="計測するリクエスト数（指定時は --duration より優先）")
+    parser.add_argument("--warmup", type=float, default=1.0, help="計測前のウォームアップ（秒）")
+    parser.add_argument("--timeout", type=float, default=60.0, help="1リクエストのタイムアウト（秒）")
+    parser.add_argument("--seed", type=int, default=1, help="リクエストを選ぶ乱数のシード")
+    parser.add_argument("--claude-latency", type=float, default=2.0, help="Claudeスタブの平均遅延（秒）")
+    parser.add_argument("--claude-jitter", type=float, default=0.5, help="Claudeスタブの遅延ゆらぎ（秒）")
+    parser.add_argument("--rakuten-latency", type=float, default=0.2, help="楽天スタブの遅延（秒）")
+    parser.add_argument("--wordpress-latency", type=float, default=0.3, help="WordPressスタブの遅延（秒）")
+    parser.add_argument("--publish-ratio", type=float, default=0.5, help="記事生成のうちWordPressに投稿する割合")
+    parser.add_argument("--output", help="結果を保存するJSONファイル")
+    parser.add_argument("--compare", help="比較する以前の結果（JSON）")
+    parser.add_argument("--max-regression", type=float, default=0.2, help="許容する p95 の悪化の割合")
+    parser.add_argument("--min-delta-ms", type=float, default=1.0, help="悪化とみなす p95 の最小の差（ミリ秒）")
+    parser.add_argument("--max-error-increase", type=float, default=0.01, help="許容するエラー率の上昇")
+    args = parser.parse_args()
+
+    if args.url:
+        parts = urlsplit(args.url)
+        host, port, stop = parts.hostname, parts.port or 80, (lambda: None)
+    elif args.target == "web":
+        host, port, stop = start_web_app(args)
+    else:
+        if not Path(args.site_dir).is_dir():
+            parser.error(f"ディレクトリが見つかりません: {args.site_dir}")
+        host, port, stop = start_static_site(Path(args.site_dir))
+
+    try:
+        result = asyncio.run(run_load(host, port, args))
+    finally:
+        stop()
+
+    print_report(result)
+    if args.output:
+        Path(args.output).write_text(json.dumps(result, ensure_ascii=False, indent=2) + "\n", encoding="utf-8")
+        print(f"\n💾 結果を保存しました: {args.output}")
+
+    if args.compare:
+        baseline = json.loads(Path(args.compare).read_text(encoding="utf-8"))
+        regressions = compare(result, baseline, args.max_regression, args.min_delta_ms, args.max_error_increase)
+        if regressions:
+            print("\n❌ 性能が悪化しました:")
+            for regression in regressions:
+                print(f"  - {regression}")
+            sys.exit(1)
+        print("\n✅ 悪化はありません")
+
+
+if __name__ == "__main__":
+    main()
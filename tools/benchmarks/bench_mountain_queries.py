@@ -0,0 +1,99 @@
+#!/usr/bin/env python3
+"""
+山データ検索のベンチマーク
+
+実データの山を複製して件数を水増しし、全件走査による検索（従来の実装）と
+MountainIndex による検索の所要時間を比較する。両者の結果が一致することも検証する。
+
+使い方:
+    python tools/benchmarks/bench_mountain_queries.py --count 20000
+"""
+import argparse
+import os
+import sys
+import time
+from dataclasses import replace
+from pathlib import Path
+
+# プロジェクトルートをパスに追加
+sys.path.insert(0, str(Path(__file__).resolve().parents[2]))
+
+# 実APIを呼ばないためダミーの認証情報で設定を初期化する
+for key in ["ANTHROPIC_API_KEY", "RAKUTEN_APP_ID", "RAKUTEN_AFFILIATE_ID",
+            "WP_URL", "WP_USERNAME", "WP_APP_PASSWORD"]:
+    os.environ.setdefault(key, "benchmark-dummy")
+
+from src.domain.entities import DifficultyLevel
+from src.infrastructure.mountain_index import MountainIndex
+from src.infrastructure.repositories import RepositoryFactory
+
+
+def linear_query(mountains, region=None, difficulty=None, max_elevation=None, keyword=None):
+    """従来方式: 全件走査で絞り込み"""
+    result = mountains
+    if region:
+        result = [m for m in result if m.region == region]
+    if difficulty:
+        result = [m for m in result if m.difficulty.level == difficulty]
+    if max_elevation is not None:
+        result = [m for m in result if m.elevation <= max_elevation]
+    if keyword:
+        keyword_lower = keyword.lower()
+        result = [
+            m for m in result
+            if keyword_lower in " ".join([
+                m.name, m.prefecture, m.region, " ".join(m.features), " ".join(m.keywords)
+            ]).lower()
+        ]
+    return result
+
+
+def best_of(func, rounds: int) -> float:
+    """最良の所要時間（秒）"""
+    best = float("inf")
+    for _ in range(rounds):
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description="山データ検索ベンチマーク")
+    parser.add_argument("--count", type=int, default=20000, help="水増し後の山の件数")
+    parser.add_argument("--rounds", type=int, default=20, help="計測回数（最良値を採用）")
+    args = parser.parse_args()
+
+    base = RepositoryFactory.get_mountain_repository().get_all()
+    mountains = [
+        replace(base[i % len(base)], id=f"{base[i % len(base)].id}_{i}", elevation=base[i % len(base)].elevation + i % 7)
+        for i in range(args.count)
+    ]
+
+    start = time.perf_counter()
+    index = MountainIndex(mountains)
+    build_time = time.perf_counter() - start
+
+    cases = [
+        ("地域", dict(region="関東")),
+        ("難易度+標高", dict(difficulty=DifficultyLevel.BEGINNER, max_elevation=800)),
+        ("キーワード", dict(keyword="紅葉")),
+        ("複合条件", dict(region="中部", difficulty=DifficultyLevel.INTERMEDIATE, keyword="アルプス")),
+    ]
+
+    print(f"🏁 山データ検索ベンチマーク: {args.count}件（インデックス構築 {build_time * 1000:.0f}ms）")
+    print("=" * 64)
+
+    for label, conditions in cases:
+        expected = linear_query(mountains, **conditions)
+        actual = index.query(**conditions)
+        assert [m.id for m in actual] == [m.id for m in expected], f"{label}: 結果が一致しません"
+
+        linear = best_of(lambda: linear_query(mountains, **conditions), args.rounds)
+        indexed = best_of(lambda: index.query(**conditions), args.rounds)
+        print(f"{label:<10} {len(actual):>6}件  全件走査 {linear * 1000:8.3f}ms  "
+              f"インデックス {indexed * 1000:7.3f}ms  ({linear / indexed:6.1f}倍)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,143 @@
+#!/usr/bin/env python3
+"""
+楽天APIクライアントのベンチマーク
+
+ローカルに立てたスタブHTTPサーバー（楽天商品検索APIと同じ形式のJSONを返す）に対して、
+以下の3方式で同じキーワード群を検索し、所要時間を比較する。
+
+  1. requests.get を1件ずつ（従来の実装: セッションなし・逐次）
+  2. RakutenAPIClient.search_products を1件ずつ（共有コネクションプール・逐次）
+  3. RakutenAPIClient.search_products_many（共有コネクションプール・同時実行）
+
+使い方:
+    python tools/benchmarks/bench_rakuten_client.py --keywords 20 --latency 0.1
+"""
+import argparse
+import json
+import os
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from urllib.parse import parse_qs, urlparse
+
+import requests
+
+# プロジェクトルートをパスに追加
+sys.path.insert(0, str(Path(__file__).resolve().parents[2]))
+
+# 実APIを呼ばないためダミーの認証情報で設定を初期化する
+for key in ["ANTHROPIC_API_KEY", "RAKUTEN_APP_ID", "RAKUTEN_AFFILIATE_ID",
+            "WP_URL", "WP_USERNAME", "WP_APP_PASSWORD"]:
+    os.environ.setdefault(key, "benchmark-dummy")
+
+from src.infrastructure.api_clients import RakutenAPIClient
+
+
+def make_handler(latency: float):
+    """指定した遅延で応答するスタブハンドラーを生成"""
+
+    class StubRakutenHandler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+        disable_nagle_algorithm = True
+
+        def do_GET(self):
+            time.sleep(latency)
+            keyword = parse_qs(urlparse(self.path).query).get('keyword', [''])[0]
+            body = json.dumps({
+                "Items": [{
+                    "Item": {
+                        "itemName": f"{keyword} テスト商品{i}",
+                        "itemPrice": 3000 + i * 1000,
+                        "affiliateUrl": f"https://example.com/{i}",
+                        "mediumImageUrls": [{"imageUrl": "https://example.com/img.jpg"}],
+                        "itemCaption": "スタブ商品",
+                        "genreId": "101070",
+                        "reviewAverage": 4.5,
+                        "reviewCount": 10,
+                        "shopName": "スタブショップ"
+                    }
+                } for i in range(3)]
+            }, ensure_ascii=False).encode('utf-8')
+
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json; charset=utf-8")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args):
+            pass
+
+    return StubRakutenHandler
+
+
+def bench_requests(base_url: str, keywords):
+    """従来方式: requests.get を逐次実行"""
+    for keyword in keywords:
+        response = requests.get(f"{base_url}/IchibaItem/Search/20170706",
+                                params={'keyword': keyword, 'format': 'json'}, timeout=30)
+        response.raise_for_status()
+        response.json()
+
+
+def bench_pooled_sequential(client: RakutenAPIClient, keywords):
+    """共有セッションで逐次実行"""
+    for keyword in keywords:
+        client.search_products(keyword, max_results=3)
+
+
+def bench_pooled_concurrent(client: RakutenAPIClient, keywords):
+    """共有セッションで同時実行"""
+    results = client.search_products_many(keywords, max_results=3)
+    assert len(results) == len(keywords)
+    for keyword, products in zip(keywords, results):
+        assert products and products[0].name.startswith(keyword), "結果の順序が一致しません"
+
+
+def main():
+    parser = argparse.ArgumentParser(description="楽天APIクライアントベンチマーク")
+    parser.add_argument("--keywords", type=int, default=20, help="検索キーワード数")
+    parser.add_argument("--latency", type=float, default=0.1, help="スタブサーバーの応答遅延（秒）")
+    parser.add_argument("--rounds", type=int, default=3, help="計測回数（最良値を採用）")
+    args = parser.parse_args()
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), make_handler(args.latency))
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    base_url = f"http://127.0.0.1:{server.server_address[1]}"
+
+    client = RakutenAPIClient()
+    client.base_url = base_url
+    keywords = [f"登山用品{i}" for i in range(args.keywords)]
+
+    print(f"🏁 楽天APIクライアントベンチマーク: {args.keywords}キーワード, 応答遅延 {args.latency}秒")
+    print("=" * 60)
+
+    cases = [
+        ("requests.get 逐次（従来）", lambda: bench_requests(base_url, keywords)),
+        ("共有セッション 逐次", lambda: bench_pooled_sequential(client, keywords)),
+        ("共有セッション 同時実行", lambda: bench_pooled_concurrent(client, keywords)),
+    ]
+
+    timings = {}
+    for label, func in cases:
+        best = float("inf")
+        for _ in range(args.rounds):
+            start = time.perf_counter()
+            func()
+            best = min(best, time.perf_counter() - start)
+        timings[label] = best
+        print(f"{label:<24} {best:7.3f}秒  ({args.keywords / best:6.1f} 件/秒)")
+
+    baseline = timings[cases[0][0]]
+    concurrent = timings[cases[2][0]]
+    print("=" * 60)
+    print(f"⚡ 同時実行による高速化: {baseline / concurrent:.1f}倍")
+
+    client.close()
+    server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,127 @@
+#!/usr/bin/env python3
+"""
+サイト品質チェック（site_minimal/check_site.py）のベンチマーク
+
+合成したサイト（既定1000ページ・各ページに共通のナビゲーション/CSS/JSと個別のリンク）を、
+従来方式（チェックごとに全ファイルを読み直し、リンクのたびに Path.exists / is_dir を呼ぶ）と
+SiteQualityChecker（各ファイルを1回だけ読み込み、リンク先をメモ化）でチェックし、所要時間を比較する。
+検出したリンク切れの件数が一致することも検証する。
+
+使い方:
+    python tools/benchmarks/bench_site_check.py --pages 1000 --jobs 4
+"""
+import argparse
+import contextlib
+import io
+import re
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+# プロジェクトルートと site_minimal をパスに追加
+ROOT = Path(__file__).resolve().parents[2]
+sys.path.insert(0, str(ROOT))
+sys.path.insert(0, str(ROOT / "site_minimal"))
+
+from check_site import SiteQualityChecker
+
+NAV = "".join(f'<li><a href="/section{i}/">セクション{i}</a></li>' for i in range(20))
+
+
+def build_site(base: Path, pages: int):
+    """合成サイトを作成（10ページに1つ存在しないページへのリンクを含む）"""
+    for name in ("css", "js", "images", "mountains", "equipment", "beginner"):
+        (base / name).mkdir(parents=True, exist_ok=True)
+    (base / "css" / "minimal_design.css").write_text("@media a{}@media b{}@media c{}", encoding="utf-8")
+    (base / "js" / "minimal.js").write_text("", encoding="utf-8")
+    (base / "images" / "logo.png").write_bytes(b"")
+    for i in range(20):
+        (base / f"section{i}").mkdir(exist_ok=True)
+        (base / f"section{i}" / "index.html").write_text("<title>section</title>", encoding="utf-8")
+
+    for i in range(pages):
+        page_dir = base / "mountains" / f"area{i % 30}" / f"m{i}"
+        page_dir.mkdir(parents=True, exist_ok=True)
+        related = f'<a href="../m{i - 30}/">同じエリアの山</a>' if i >= 30 else ""
+        broken = '<a href="/mountains/missing/">存在しない山</a>' if i % 10 == 0 else ""
+        (page_dir / "index.html").write_text(f"""<!DOCTYPE html>
+<html lang="ja"><head><meta charset="UTF-8"><meta name="viewport" content="width=device-width">
+<title>山{i}の登山ガイド | 低山旅行</title><meta name="description" content="山{i}の紹介">
+<link rel="stylesheet" href="/css/minimal_design.css"><script src="/js/minimal.js"></script></head>
+<body><nav><ul>{NAV}</ul></nav><main><h1>山{i}</h1><img src="/images/logo.png" alt="ロゴ">
+{related}{broken}<a href="#top">上へ</a></main></body></html>
+""", encoding="utf-8")
+
+
+def legacy_exists(base_dir: Path, link: str, page: Path) -> bool:
+    """従来の check_link_exists（メモ化なし）"""
+    if link.startswith(('http://', 'https://', 'mailto:', 'tel:')) or link.startswith('#'):
+        return True
+    target = base_dir / link.lstrip('/') if link.startswith('/') else page.parent / link
+    if target.is_dir():
+        target = target / "index.html"
+    if not target.suffix and not target.exists():
+        target = target / "index.html"
+    return target.exists()
+
+
+def legacy_check(base_dir: Path) -> int:
+    """従来方式: チェックごとに全ファイルを読み直す（リンク切れの件数を返す）"""
+    files = [f for f in base_dir.rglob("*.html") if "templates" not in str(f)]
+    broken = 0
+    # リンク切れ・CSS・JS・画像の参照チェックはそれぞれ全ファイルを読み直してリンク先を確認していた
+    for pattern in (None, r'<link[^>]*href=["\']([^"\']*\.css)["\']',
+                    r'<script[^>]*src=["\']([^"\']*\.js)["\']', r'<img[^>]*src=["\']([^"\']*)["\']'):
+        for page in files:
+            content = page.read_text(encoding="utf-8")
+            if pattern is None:
+                links = re.findall(r'href=["\']([^"\']+)["\']', content) + re.findall(r'src=["\']([^"\']+)["\']', content)
+            else:
+                links = re.findall(pattern, content)
+            missing = sum(1 for link in links if not legacy_exists(base_dir, link, page))
+            if pattern is None:
+                broken += missing
+    # HTML構造・アクセシビリティ・viewport・SEO・サイトマップも全ファイルを読み直していた
+    for _ in range(5):
+        for page in files:
+            page.read_text(encoding="utf-8")
+    return broken
+
+
+def new_check(base_dir: Path, jobs: int):
+    """SiteQualityChecker（リンク切れの件数, 確認したリンク先のパス数）"""
+    checker = SiteQualityChecker(base_dir=base_dir, jobs=jobs)
+    with contextlib.redirect_stdout(io.StringIO()):
+        checker.run_all_checks()
+    return sum(1 for issue in checker.issues if issue["category"] == "broken_link"), checker.resolver.unique_targets
+
+
+def main():
+    parser = argparse.ArgumentParser(description="サイト品質チェックのベンチマーク")
+    parser.add_argument("--pages", type=int, default=1000, help="合成するページ数")
+    parser.add_argument("--jobs", type=int, default=4, help="SiteQualityChecker の並列数")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        base = Path(tmp)
+        build_site(base, args.pages)
+        print(f"🏁 サイト品質チェック ベンチマーク: {args.pages}ページ")
+        print("=" * 64)
+
+        start = time.perf_counter()
+        legacy_broken = legacy_check(base)
+        legacy_time = time.perf_counter() - start
+        print(f"{legacy_time:6.2f}秒  リンク切れ {legacy_broken}件  従来（チェックごとに読み直し）")
+
+        for jobs in sorted({1, args.jobs}):
+            start = time.perf_counter()
+            broken, targets = new_check(base, jobs)
+            elapsed = time.perf_counter() - start
+            assert broken == legacy_broken, f"リンク切れの件数が一致しません: {broken} != {legacy_broken}"
+            print(f"{elapsed:6.2f}秒  リンク切れ {broken}件  SiteQualityChecker（jobs={jobs}、"
+                  f"リンク先 {targets}パス）  {legacy_time / elapsed:.1f}倍")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,105 @@
+#!/usr/bin/env python3
+"""
+ミニマルサイトのテンプレート描画ベンチマーク
+
+site_minimal/generate_site.py の山詳細ページを全山分生成し、
+従来の描画（ページごとにテンプレートを読み込み、変数ごとに str.replace）と
+解析済みテンプレート（string_template.CompiledTemplate）の1ページあたりの所要時間を比較する。
+両者の出力が一致することも検証する。
+
+使い方:
+    python tools/benchmarks/bench_template_render.py --rounds 20
+"""
+import argparse
+import sys
+import time
+from pathlib import Path
+
+# プロジェクトルートと site_minimal をパスに追加
+ROOT = Path(__file__).resolve().parents[2]
+sys.path.insert(0, str(ROOT))
+sys.path.insert(0, str(ROOT / "site_minimal"))
+
+from generate_site import SiteGenerator
+
+
+class LegacySiteGenerator(SiteGenerator):
+    """従来の描画方式（比較用）"""
+
+    def load_template(self, template_name):
+        template_path = self.templates_dir / template_name
+        with open(template_path, 'r', encoding='utf-8') as f:
+            return f.read()
+
+    def render_template(self, template_content, variables):
+        for key, value in variables.items():
+            template_content = template_content.replace(f"{{{{{key}}}}}", str(value))
+        return template_content
+
+
+def collect_variables(generator, mountains):
+    """各ページの描画に渡されるテンプレートと変数を記録（描画処理だけを計測するため）"""
+    calls = []
+    original = generator.render_template
+
+    def record(template_content, variables):
+        calls.append((template_content, variables))
+        return original(template_content, variables)
+
+    generator.render_template = record
+    for mountain in mountains:
+        generator.render_mountain_detail_page(mountain)
+    del generator.render_template
+    return calls
+
+
+def best_of(func, rounds: int) -> float:
+    """最良の所要時間（秒）"""
+    best = float("inf")
+    for _ in range(rounds):
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description="テンプレート描画ベンチマーク")
+    parser.add_argument("--rounds", type=int, default=20, help="計測回数（最良値を採用）")
+    args = parser.parse_args()
+
+    legacy = LegacySiteGenerator()
+    compiled = SiteGenerator()
+    mountains = compiled.mountains_data
+    pages = len(mountains)
+
+    for mountain in mountains:
+        expected = legacy.render_mountain_detail_page(mountain)
+        actual = compiled.render_mountain_detail_page(mountain)
+        assert actual == expected, f"{mountain.get('name')}: 出力が一致しません"
+
+    print(f"🏁 テンプレート描画ベンチマーク: 山詳細ページ {pages}件")
+    print("=" * 64)
+
+    # ページ全体（本文の組み立て + テンプレート読み込み + 描画）
+    def render_all(generator):
+        return lambda: [generator.render_mountain_detail_page(m) for m in mountains]
+
+    legacy_page = best_of(render_all(legacy), args.rounds) / pages
+    compiled_page = best_of(render_all(compiled), args.rounds) / pages
+
+    # テンプレートへの埋め込みのみ
+    calls = collect_variables(compiled, mountains)
+    legacy_render = best_of(lambda: [legacy.render_template(t, v) for t, v in calls], args.rounds) / pages
+    compiled_render = best_of(lambda: [compiled.render_template(t, v) for t, v in calls], args.rounds) / pages
+
+    for label, before, after in [
+        ("ページ全体", legacy_page, compiled_page),
+        ("テンプレート描画のみ", legacy_render, compiled_render),
+    ]:
+        print(f"{label:<12} 従来 {before * 1e6:8.1f}µs/ページ  解析済み {after * 1e6:8.1f}µs/ページ  "
+              f"({before / after:5.1f}倍)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,114 @@
+#!/usr/bin/env python3
+"""
+Web UI の読み取り専用API（トップページ・山一覧・山詳細）のベンチマーク
+
+実データの山を複製して件数を水増しした山データで Web アプリを起動し、
+従来の実装（リクエストごとに辞書を組み立てて jsonify / テンプレートを描画）と、
+データのバージョンごとにシリアライズ済みの本文を返す実装、ETag 一致時の 304 応答の
+1リクエストあたりの所要時間を比較する。両者の応答内容が一致することも検証する。
+
+使い方:
+    python tools/benchmarks/bench_web_api.py --count 2000
+"""
+import argparse
+import json
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+# プロジェクトルートと Web アプリをパスに追加
+ROOT = Path(__file__).resolve().parents[2]
+sys.path.insert(0, str(ROOT))
+sys.path.insert(0, str(ROOT / "src" / "presentation" / "web"))
+
+# 実APIを呼ばないためダミーの認証情報で設定を初期化する
+for key in ["ANTHROPIC_API_KEY", "RAKUTEN_APP_ID", "RAKUTEN_AFFILIATE_ID",
+            "WP_URL", "WP_USERNAME", "WP_APP_PASSWORD"]:
+    os.environ.setdefault(key, "benchmark-dummy")
+
+
+def build_data(data_dir: Path, count: int):
+    """実データの山を複製して count 件の山データを作成"""
+    source = json.loads((ROOT / "data" / "mountains_japan.json").read_text(encoding="utf-8"))
+    base = source["mountains"]
+    mountains = []
+    for i in range(count):
+        mountain = dict(base[i % len(base)])
+        mountain["id"] = f"{mountain['id']}_{i}"
+        mountains.append(mountain)
+    (data_dir / "mountains_japan.json").write_text(
+        json.dumps({**source, "mountains": mountains}, ensure_ascii=False), encoding="utf-8"
+    )
+
+
+def per_request(client, path: str, rounds: int, headers=None) -> float:
+    """1リクエストあたりの所要時間（ミリ秒）"""
+    start = time.perf_counter()
+    for _ in range(rounds):
+        client.get(path, headers=headers)
+    return (time.perf_counter() - start) / rounds * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Web UI 読み取り専用APIのベンチマーク")
+    parser.add_argument("--count", type=int, default=2000, help="水増し後の山の件数")
+    parser.add_argument("--rounds", type=int, default=50, help="エンドポイントごとのリクエスト数")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        build_data(Path(tmp), args.count)
+        os.environ["DATA_DIR"] = tmp
+        os.environ["WEB_JOB_DB_PATH"] = str(Path(tmp) / "web_jobs.sqlite3")
+
+        import app as web
+        from flask import jsonify, render_template
+
+        # 従来の実装（キャッシュなし）を比較用のルートとして登録
+        @web.app.route("/legacy/")
+        def legacy_index():
+            mountains = web.mountain_repo.get_all()
+            regions = {}
+            for mountain in mountains:
+                regions.setdefault(mountain.region, []).append(mountain)
+            return render_template("index.html", mountains=mountains, regions=regions,
+                                   wp_url=web.get_settings().WP_URL)
+
+        @web.app.route("/legacy/api/mountains")
+        def legacy_mountains():
+            mountains = [web._mountain_summary(m) for m in web.mountain_repo.find()]
+            return jsonify({"success": True, "mountains": mountains, "total": len(mountains)})
+
+        client = web.app.test_client()
+        mountain_id = web.mountain_repo.get_all()[0].id
+        cases = [
+            ("トップページ", "/", "/legacy/"),
+            ("山一覧", "/api/mountains", "/legacy/api/mountains"),
+            ("山一覧（50件・3項目）", "/api/mountains?limit=50&fields=id,name,elevation", None),
+            ("山詳細", f"/api/mountain/{mountain_id}", None),
+        ]
+
+        print(f"🏁 Web UI 読み取り専用APIベンチマーク: {args.count}件")
+        print("=" * 72)
+        try:
+            for label, path, legacy_path in cases:
+                response = client.get(path)
+                etag = response.headers["ETag"]
+                if legacy_path and path.startswith("/api/"):
+                    legacy = client.get(legacy_path).get_json()
+                    cached = response.get_json()
+                    assert legacy["mountains"] == cached["mountains"], f"{label}: 応答が一致しません"
+
+                legacy_ms = per_request(client, legacy_path, args.rounds) if legacy_path else None
+                cached_ms = per_request(client, path, args.rounds)
+                not_modified_ms = per_request(client, path, args.rounds, headers={"If-None-Match": etag})
+                legacy_text = f"従来 {legacy_ms:8.2f}ms  " if legacy_ms is not None else " " * 19
+                print(f"{label:<16} {legacy_text}キャッシュ {cached_ms:7.2f}ms  304 {not_modified_ms:6.2f}ms  "
+                      f"({len(response.data) / 1024:,.0f}KB)")
+        finally:
+            web.generation_queue.shutdown(wait=False)
+
+
+if __name__ == "__main__":
+    main()
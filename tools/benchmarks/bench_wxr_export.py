@@ -0,0 +1,127 @@
+#!/usr/bin/env python3
+"""
+WXRエクスポートのメモリ使用量ベンチマーク
+
+合成した記事（既定2000件・1記事約8KB）を、従来方式（ElementTree で文書全体を組み立て、
+文字列化してから正規表現で CDATA を付けて書き込む）と WXRWriter（1記事ずつ書き込む）で
+ファイルへ出力し、ピークメモリと所要時間を比較する。
+記事は1件ずつ生成して渡すため、WXRWriter のピークは記事数に依存しない。
+出力した2つのファイルを解析し、記事の内容が一致することも検証する。
+
+使い方:
+    python tools/benchmarks/bench_wxr_export.py --articles 2000
+"""
+import argparse
+import gc
+import re
+import sys
+import tempfile
+import time
+import tracemalloc
+import xml.etree.ElementTree as ET
+from datetime import datetime
+from pathlib import Path
+
+# プロジェクトルートをパスに追加
+sys.path.insert(0, str(Path(__file__).resolve().parents[2]))
+
+from src.infrastructure.wxr_writer import WXRChannel, WXRItem, WXRWriter
+
+CONTENT_NS = "{http://purl.org/rss/1.0/modules/content/}"
+WP_NS = "{http://wordpress.org/export/1.2/}"
+
+
+def synthesize(count: int):
+    """記事データを1件ずつ生成"""
+    paragraph = "<p>低山ハイキングの魅力は、気軽に登れて眺望も楽しめることです。</p>\n"
+    for i in range(count):
+        yield {
+            "title": f"山{i}の登山ガイド",
+            "content": f"<h2>山{i}</h2>\n" + paragraph * 80,
+            "excerpt": f"山{i}の見どころを紹介します。",
+            "tags": ["低山", "日帰り", f"エリア{i % 10}"],
+        }
+
+
+def legacy_export(articles, path: Path):
+    """従来方式: 文書全体を組み立ててから書き込む"""
+    rss = ET.Element("rss", version="2.0")
+    rss.set("xmlns:excerpt", "http://wordpress.org/export/1.2/excerpt/")
+    rss.set("xmlns:content", "http://purl.org/rss/1.0/modules/content/")
+    rss.set("xmlns:wp", "http://wordpress.org/export/1.2/")
+    channel = ET.SubElement(rss, "channel")
+    ET.SubElement(channel, "title").text = "benchmark"
+    for i, article in enumerate(articles):
+        item = ET.SubElement(channel, "item")
+        ET.SubElement(item, "title").text = article["title"]
+        ET.SubElement(item, CONTENT_NS + "encoded").text = article["content"]
+        ET.SubElement(item, "{http://wordpress.org/export/1.2/excerpt/}encoded").text = article["excerpt"]
+        ET.SubElement(item, WP_NS + "post_id").text = str(i + 1000)
+        for tag in article["tags"]:
+            ET.SubElement(item, "category", domain="post_tag").text = tag
+    xml_str = ET.tostring(rss, encoding="unicode", method="xml")
+    for name in ("content:encoded", "excerpt:encoded"):
+        xml_str = re.sub(
+            f"<{name}>(.*?)</{name}>",
+            lambda m: f"<{name}><![CDATA[{m.group(1)}]]></{name}>",
+            xml_str,
+            flags=re.DOTALL
+        )
+    path.write_text('<?xml version="1.0" encoding="UTF-8" ?>\n' + xml_str, encoding="utf-8")
+
+
+def streaming_export(articles, path: Path):
+    """WXRWriter で1記事ずつ書き込む"""
+    now = datetime.now()
+    with WXRWriter(path, WXRChannel(title="benchmark", link="https://example.com")) as writer:
+        for i, article in enumerate(articles):
+            writer.write_item(WXRItem(
+                post_id=i + 1000, title=article["title"], content=article["content"],
+                excerpt=article["excerpt"], post_date=now, tags=article["tags"]
+            ))
+
+
+def measure(export, count: int, path: Path):
+    """ピークメモリ（バイト）と所要時間"""
+    gc.collect()
+    tracemalloc.start()
+    start = time.perf_counter()
+    export(synthesize(count), path)
+    elapsed = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return peak, elapsed
+
+
+def read_items(path: Path):
+    """(タイトル, 本文) の一覧"""
+    root = ET.parse(path).getroot()
+    return [(item.findtext("title"), item.findtext(CONTENT_NS + "encoded")) for item in root.iter("item")]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="WXRエクスポートのメモリ使用量ベンチマーク")
+    parser.add_argument("--articles", type=int, default=2000, help="合成する記事数")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        tmp = Path(tmp)
+        print(f"🏁 WXRエクスポート メモリベンチマーク: {args.articles}記事")
+        print("=" * 64)
+
+        results = {}
+        for label, export in [("従来（全体を構築）", legacy_export), ("WXRWriter（逐次）", streaming_export)]:
+            path = tmp / f"{export.__name__}.xml"
+            peak, elapsed = measure(export, args.articles, path)
+            results[label] = (peak, path)
+            print(f"ピーク {peak / 1024:9.0f}KB  {elapsed:5.2f}秒  "
+                  f"ファイル {path.stat().st_size / 1024 / 1024:6.1f}MB  {label}")
+
+        (legacy_peak, legacy_path), (stream_peak, stream_path) = results.values()
+        assert read_items(legacy_path) == read_items(stream_path), "記事の内容が一致しません"
+        print("-" * 64)
+        print(f"ピークメモリ: {legacy_peak / stream_peak:.0f}分の1（記事の内容は一致）")
+
+
+if __name__ == "__main__":
+    main()
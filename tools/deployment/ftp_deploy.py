@@ -1,16 +1,29 @@
 #!/usr/bin/env python3
 """
 ロリポップサーバーへのFTPデプロイスクリプト
+
+記事JSONからHTMLをローカルの build_dir に生成し、FTPDeltaSync で差分同期する
+（変更のあったファイルだけを複数接続でアップロードする）。
 """
-import ftplib
 import os
+import posixpath
+import sys
 from pathlib import Path
 from datetime import datetime
 import json
 from dotenv import load_dotenv
 
+# プロジェクトルートをパスに追加
+sys.path.insert(0, str(Path(__file__).resolve().parents[2]))
+
+from src.infrastructure.ftp_sync import FTPDeltaSync, FTPSyncError, SyncResult
+
 load_dotenv()
 
+# unified_deploy.py と同じリモートディレクトリへ別の内容をデプロイするため、
+# マニフェストを分けて互いのファイルを削除対象にしない
+MANIFEST_NAME = ".deploy_manifest.ftp_deploy.json"
+
 class LolipopFTPDeployer:
     def __init__(self):
         # FTP設定（.envファイルから読み込み）
@@ -19,53 +32,33 @@ class LolipopFTPDeployer:
         self.ftp_pass = os.getenv('LOLIPOP_FTP_PASS')
         self.remote_dir = os.getenv('LOLIPOP_REMOTE_DIR', '/mountain-blog')
         
+        self.connections = int(os.getenv('FTP_CONNECTIONS', '4'))
+        self.atomic = os.getenv('FTP_ATOMIC') == '1'
+        
         # ローカルディレクトリ
         self.local_dir = Path('dist')
         self.articles_dir = Path('generated_articles')
-        
-    def connect(self):
-        """FTP接続"""
-        self.ftp = ftplib.FTP(self.ftp_host)
-        self.ftp.login(self.ftp_user, self.ftp_pass)
-        print(f"Connected to {self.ftp_host}")
-        
-    def disconnect(self):
-        """FTP切断"""
-        self.ftp.quit()
-        print("Disconnected from FTP server")
-    
-    def create_remote_dir(self, path):
-        """リモートディレクトリ作成"""
-        try:
-            self.ftp.mkd(path)
-            print(f"Created directory: {path}")
-        except ftplib.error_perm:
-            # ディレクトリが既に存在する場合
-            pass
-    
-    def upload_file(self, local_file, remote_path):
-        """ファイルアップロード"""
-        with open(local_file, 'rb') as f:
-            self.ftp.storbinary(f'STOR {remote_path}', f)
-        print(f"Uploaded: {local_file} -> {remote_path}")
+        # アップロードするサイトを組み立てるディレクトリ（次回の差分判定のため残しておく）
+        self.build_dir = Path('cache') / 'ftp_deploy_site'
     
-    def upload_directory(self, local_dir, remote_dir):
-        """ディレクトリ全体をアップロード"""
-        local_path = Path(local_dir)
+    def upload_directory(self, local_dir, remote_dir, atomic=None) -> SyncResult:
+        """
+        ディレクトリ全体を差分同期でアップロード
         
-        for item in local_path.rglob('*'):
-            if item.is_file():
-                # リモートパス計算
-                relative_path = item.relative_to(local_path)
-                remote_path = f"{remote_dir}/{relative_path}".replace('\\', '/')
-                
-                # ディレクトリ作成
-                remote_file_dir = '/'.join(remote_path.split('/')[:-1])
-                if remote_file_dir:
-                    self.create_remote_dir(remote_file_dir)
-                
-                # ファイルアップロード
-                self.upload_file(item, remote_path)
+        remote_dir が相対パスの場合は LOLIPOP_REMOTE_DIR からの相対パスとする。
+        アップロードに失敗したファイルがある場合は FTPSyncError を送出する。
+        """
+        sync = FTPDeltaSync(
+            self.ftp_host, self.ftp_user, self.ftp_pass,
+            posixpath.join(self.remote_dir, str(remote_dir)),
+            connections=self.connections,
+            manifest_name=MANIFEST_NAME
+        )
+        result = sync.sync(Path(local_dir), atomic=self.atomic if atomic is None else atomic)
+        if not result.success:
+            raise FTPSyncError(f"アップロードに失敗したファイルがあります: {', '.join(result.failed)}")
+        print(f"FTP同期完了: {result.format_summary()}")
+        return result
     
     def generate_html_from_article(self, article_json):
         """記事JSONからHTML生成"""
@@ -136,49 +129,46 @@ class LolipopFTPDeployer:
         """
     
     def deploy_site(self):
-        """サイト全体をデプロイ"""
-        try:
-            self.connect()
-            
-            # 基本ディレクトリ作成
-            self.create_remote_dir(self.remote_dir)
-            self.ftp.cwd(self.remote_dir)
-            
-            # CSSアップロード
-            self.create_remote_dir('css')
-            self.upload_file('static/style.css', 'css/style.css')
-            
-            # 記事HTMLを生成してアップロード
-            self.create_remote_dir('articles')
-            for json_file in self.articles_dir.glob('*.json'):
-                if 'with_image' not in str(json_file):
-                    html_content = self.generate_html_from_article(json_file)
-                    html_filename = json_file.stem + '.html'
-                    
-                    # 一時HTMLファイル作成
-                    temp_html = Path(f'temp_{html_filename}')
-                    with open(temp_html, 'w', encoding='utf-8') as f:
-                        f.write(html_content)
-                    
-                    # アップロード
-                    self.upload_file(temp_html, f'articles/{html_filename}')
-                    
-                    # 一時ファイル削除
-                    temp_html.unlink()
-            
-            # インデックスページ生成・アップロード
-            self.generate_and_upload_index()
-            
-            print("Deployment completed successfully!")
-            
-        finally:
-            self.disconnect()
+        """サイト全体を生成して差分同期でデプロイ"""
+        self.build_site()
+        self.upload_directory(self.build_dir, '')
+        print("Deployment completed successfully!")
+    
+    def build_site(self):
+        """アップロードするサイト（CSS・記事HTML・インデックス）を build_dir に生成"""
+        (self.build_dir / 'css').mkdir(parents=True, exist_ok=True)
+        (self.build_dir / 'articles').mkdir(parents=True, exist_ok=True)
+        
+        # CSS
+        self._write_if_changed(self.build_dir / 'css' / 'style.css', Path('static/style.css').read_text(encoding='utf-8'))
+        
+        # 記事HTML（記事JSONがなくなったページは削除し、次回の同期でサーバーからも消す）
+        article_pages = set()
+        for json_file in sorted(self.articles_dir.glob('*.json')):
+            if 'with_image' not in str(json_file):
+                html_filename = json_file.stem + '.html'
+                article_pages.add(html_filename)
+                self._write_if_changed(self.build_dir / 'articles' / html_filename,
+                                       self.generate_html_from_article(json_file))
+        for stale_page in (self.build_dir / 'articles').glob('*.html'):
+            if stale_page.name not in article_pages:
+                stale_page.unlink()
+        
+        # インデックスページ
+        self._write_if_changed(self.build_dir / 'index.html', self.generate_index_html())
+    
+    @staticmethod
+    def _write_if_changed(path: Path, content: str):
+        """内容が変わった場合だけ書き込む（更新時刻を保ち、ハッシュの再計算を省く）"""
+        if path.exists() and path.read_text(encoding='utf-8') == content:
+            return
+        path.write_text(content, encoding='utf-8')
     
-    def generate_and_upload_index(self):
-        """インデックスページ生成・アップロード"""
+    def generate_index_html(self):
+        """インデックスページ生成"""
         # 記事一覧取得
         articles = []
-        for json_file in self.articles_dir.glob('*.json'):
+        for json_file in sorted(self.articles_dir.glob('*.json')):
             if 'with_image' not in str(json_file):
                 with open(json_file, 'r', encoding='utf-8') as f:
                     article = json.load(f)
@@ -222,13 +212,7 @@ class LolipopFTPDeployer:
 </body>
 </html>"""
         
-        # 一時ファイル作成・アップロード
-        temp_index = Path('temp_index.html')
-        with open(temp_index, 'w', encoding='utf-8') as f:
-            f.write(index_html)
-        
-        self.upload_file(temp_index, 'index.html')
-        temp_index.unlink()
+        return index_html
 
 if __name__ == "__main__":
     deployer = LolipopFTPDeployer()
@@ -5,12 +5,18 @@
 """
 import json
 import os
+import sys
 from datetime import datetime
 from pathlib import Path
 from ftplib import FTP
 import shutil
 from static_site_generator import StaticSiteGenerator
 
+# プロジェクトルートをパスに追加
+sys.path.insert(0, str(Path(__file__).resolve().parents[2]))
+
+from src.infrastructure.ftp_sync import FTPDeltaSync, FTPSyncError
+
 class UnifiedDeploySystem:
     def __init__(self):
         self.generator = StaticSiteGenerator()
@@ -44,64 +50,21 @@ class UnifiedDeploySystem:
         print("=== デプロイ完了 ===")
         
     def upload_to_ftp(self):
-        """生成されたファイルをFTPでアップロード"""
+        """生成されたファイルをFTPでアップロード（前回デプロイからの差分のみ）"""
         try:
-            # FTP接続
-            ftp = FTP(self.ftp_host)
-            ftp.login(self.ftp_user, self.ftp_pass)
-            
-            # リモートディレクトリに移動（なければ作成）
-            self.ensure_remote_dir(ftp, self.remote_dir)
-            
-            # ローカルの静的サイトディレクトリから全ファイルをアップロード
-            self.upload_directory(ftp, self.generator.base_dir, self.remote_dir)
-            
-            ftp.quit()
+            sync = FTPDeltaSync(
+                self.ftp_host, self.ftp_user, self.ftp_pass, self.remote_dir,
+                connections=int(os.getenv('FTP_CONNECTIONS', '4'))
+            )
+            result = sync.sync(self.generator.base_dir, atomic=os.getenv('FTP_ATOMIC') == '1')
+            if not result.success:
+                raise FTPSyncError(f"アップロードに失敗したファイルがあります: {', '.join(result.failed)}")
             print("FTPアップロード完了")
             
         except Exception as e:
             print(f"FTPエラー: {e}")
             raise
     
-    def ensure_remote_dir(self, ftp, path):
-        """リモートディレクトリを確認・作成"""
-        dirs = path.strip('/').split('/')
-        current = '/'
-        
-        for dir in dirs:
-            if dir:
-                current = f"{current}/{dir}".replace('//', '/')
-                try:
-                    ftp.cwd(current)
-                except:
-                    ftp.mkd(current)
-                    ftp.cwd(current)
-        
-        ftp.cwd('/')
-    
-    def upload_directory(self, ftp, local_dir, remote_dir):
-        """ディレクトリを再帰的にアップロード"""
-        local_dir = Path(local_dir)
-        
-        for item in local_dir.iterdir():
-            if item.is_file():
-                # ファイルをアップロード
-                remote_path = f"{remote_dir}/{item.name}"
-                print(f"アップロード: {item} → {remote_path}")
-                
-                with open(item, 'rb') as f:
-                    ftp.storbinary(f'STOR {remote_path}', f)
-                    
-            elif item.is_dir():
-                # サブディレクトリを作成してアップロード
-                remote_subdir = f"{remote_dir}/{item.name}"
-                try:
-                    ftp.mkd(remote_subdir)
-                except:
-                    pass  # 既に存在する場合
-                
-                self.upload_directory(ftp, item, remote_subdir)
-    
     def deploy_all_articles(self):
         """すべての記事を再デプロイ"""
         articles_dir = Path("data/articles")
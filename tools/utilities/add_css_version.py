@@ -1,51 +1,42 @@
 #!/usr/bin/env python3
 """
-HTMLファイルのCSSリンクにバージョンパラメータを追加
+HTMLファイルのCSSリンクをCSSの内容のハッシュ付きの名前に更新
+
+css/style.css の内容から css/style.<ハッシュ>.css を作成し、全HTMLの参照
+（/css/style.css・以前の ?v=YYYYmmddHHMM 付き・以前のハッシュ付きの名前）を書き換える。
+CSSが変わっていなければHTMLは変更しない（再アップロード不要）。
 """
+import sys
 from pathlib import Path
-import re
-from datetime import datetime
+
+# プロジェクトルートをパスに追加
+sys.path.insert(0, str(Path(__file__).resolve().parents[2]))
+
+from src.infrastructure.asset_fingerprint import fingerprint_site
 
 def add_css_version():
-    """全HTMLファイルのCSSリンクにバージョンを追加"""
-    
-    # バージョンタイムスタンプ
-    version = datetime.now().strftime("%Y%m%d%H%M")
-    
+    """全HTMLファイルのCSSリンクをハッシュ付きの名前に更新"""
+
     # 対象ディレクトリ
     static_dir = Path('static_site')
-    
-    # 置換パターン
-    old_pattern = r'<link rel="stylesheet" href="/css/style\.css">'
-    new_pattern = f'<link rel="stylesheet" href="/css/style.css?v={version}">'
-    
-    updated_files = []
-    
-    print(f"🔄 CSSリンクにバージョン v={version} を追加中...")
-    
-    # 全HTMLファイルを処理
-    for html_file in static_dir.rglob('*.html'):
-        content = html_file.read_text(encoding='utf-8')
-        
-        if '/css/style.css' in content:
-            # バージョンパラメータを追加
-            new_content = re.sub(old_pattern, new_pattern, content)
-            
-            if new_content != content:
-                html_file.write_text(new_content, encoding='utf-8')
-                updated_files.append(str(html_file))
-                print(f"  ✅ 更新: {html_file}")
-    
+
+    print("🔄 CSSリンクをハッシュ付きの名前に更新中...")
+
+    assets, updated_files = fingerprint_site(static_dir, ['css/style.css'])
+    for html_file in updated_files:
+        print(f"  ✅ 更新: {html_file}")
+
     print(f"\n📊 更新結果:")
     print(f"  更新ファイル数: {len(updated_files)}")
-    print(f"  バージョン: v={version}")
-    
+    for path, output_path in assets.mapping.items():
+        print(f"  {path} → {output_path}")
+
     return updated_files
 
 if __name__ == "__main__":
     files = add_css_version()
-    
+
     if files:
         print(f"\n🚀 {len(files)}個のファイルを更新しました。デプロイが必要です。")
     else:
-        print("\n✅ 更新が必要なファイルはありませんでした。")
\ No newline at end of file
+        print("\n✅ 更新が必要なファイルはありませんでした。")
@@ -0,0 +1,41 @@
+#!/usr/bin/env python3
+"""
+生成済みサイトのHTML/CSS/JSを縮小し、.gz/.br と .htaccess を作成
+
+使い方:
+    python tools/utilities/optimize_assets.py                    # site_fresh / static_site / site_minimal
+    python tools/utilities/optimize_assets.py site_fresh --no-minify
+"""
+import argparse
+import sys
+from pathlib import Path
+
+# プロジェクトルートをパスに追加
+ROOT = Path(__file__).resolve().parents[2]
+sys.path.insert(0, str(ROOT))
+
+from src.infrastructure.asset_pipeline import optimize_site
+
+DEFAULT_SITES = ["site_fresh", "static_site", "site_minimal"]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="生成済みサイトの縮小・事前圧縮")
+    parser.add_argument("sites", nargs="*", help=f"対象の出力ディレクトリ（省略時: {' '.join(DEFAULT_SITES)}）")
+    parser.add_argument("--no-minify", action="store_true", help="縮小せずに圧縮のみ行う")
+    parser.add_argument("--no-precompress", action="store_true", help="縮小のみ行う（.gz/.br を削除する）")
+    args = parser.parse_args()
+
+    sites = [Path(site) for site in args.sites] or [ROOT / site for site in DEFAULT_SITES]
+    for site in sites:
+        if not site.is_dir():
+            print(f"⚠️ ディレクトリが存在しません: {site}")
+            continue
+        print(f"🗜️ {site}")
+        report = optimize_site(site, minify=not args.no_minify, precompress=not args.no_precompress)
+        print(report.format_report())
+        print()
+
+
+if __name__ == "__main__":
+    main()
@@ -4,16 +4,28 @@
 （標準ライブラリのみ使用）
 """
 
-import json
 import os
 import re
 from simple_rakuten_client import SimpleRakutenClient, get_fallback_products, get_fallback_hotels
+from src.infrastructure.data_snapshot import load_snapshot
+from src.infrastructure.product_cache import ProductCache
+
+def create_product_cache():
+    """環境変数に基づいて楽天商品キャッシュを作成（設定項目名は config/settings.py と共通）"""
+    fresh_hours = float(os.environ.get("PRODUCT_CACHE_FRESH_HOURS", 24))
+    max_stale_hours = float(os.environ.get("PRODUCT_CACHE_MAX_STALE_HOURS", 24 * 14))
+    offline = os.environ.get("RAKUTEN_OFFLINE", "").lower() in ("1", "true", "yes")
+    
+    return ProductCache(
+        db_path=os.environ.get("PRODUCT_CACHE_PATH", "./cache/rakuten_products.sqlite3"),
+        fresh_seconds=fresh_hours * 3600,
+        max_stale_seconds=max_stale_hours * 3600,
+        offline=offline
+    )
 
 def load_mountain_data():
     """山データを読み込み"""
-    data_file = "data/mountains_japan_expanded.json"
-    with open(data_file, 'r', encoding='utf-8') as f:
-        return json.load(f)
+    return load_snapshot("data/mountains_japan_expanded.json")
 
 def get_prefecture_area_code(prefecture):
     """都道府県名から楽天の地域コードを取得"""
@@ -225,8 +237,11 @@ def main():
     
     try:
         # 楽天APIクライアントを初期化
-        rakuten_client = SimpleRakutenClient()
-        print("✅ 楽天APIクライアント初期化完了")
+        product_cache = create_product_cache()
+        # キャッシュにない商品は代替商品で埋め、楽天APIの取得はバックグラウンドで行う（ページ更新を止めない）
+        rakuten_client = SimpleRakutenClient(cache=product_cache, block_on_miss=False)
+        mode = "オフライン（キャッシュのみ）" if product_cache.offline else "キャッシュ有効"
+        print(f"✅ 楽天APIクライアント初期化完了（{mode}）")
         
         # データ読み込み
         data = load_mountain_data()
@@ -277,6 +292,12 @@ def main():
                 print(f"  • 最終成功数: {success_count}/{total_count}")
         else:
             print(f"  ⚠️ 一部ページで処理できませんでした")
+        
+        # バックグラウンド再取得を短時間だけ待ってから終了（取得できた分は次回実行時に反映される）
+        refresh_wait = float(os.environ.get("PRODUCT_CACHE_REFRESH_WAIT_SECONDS", 10))
+        if not product_cache.wait_for_refreshes(timeout=refresh_wait):
+            print("  ⚠️ 一部の商品キャッシュ更新が完了しませんでした（次回実行時に再取得します）")
+        print(f"  • 商品キャッシュ: {product_cache.format_stats()}")
     
     except Exception as e:
         print(f"❌ エラーが発生しました: {e}")
@@ -5,8 +5,9 @@
 - 2記事目以降: 10分間隔で予約投稿
 """
 import json
+import os
 from datetime import datetime, timedelta
-from wordpress_wxr_fixed import generate_valid_wxr
+from wordpress_wxr_fixed import scheduled_item, wxr_channel, write_wxr
 
 def create_adjusted_schedule_xml():
     """調整されたスケジュールでXML作成"""
@@ -64,156 +65,25 @@ def create_adjusted_schedule_xml():
         print(f"   {info['article_name']}: {info['schedule_time'].strftime('%Y-%m-%d %H:%M:%S')} ({info['schedule_type']})")
     
     # カスタムXML生成（最初の記事のステータスを変更）
-    xml_content = generate_custom_wxr_with_mixed_status(articles_data, schedule_info)
-    
-    # ファイル保存
     timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
     xml_filename = f"adjusted_schedule_articles_{timestamp}.xml"
-    
-    with open(xml_filename, 'w', encoding='utf-8') as f:
-        f.write(xml_content)
+    generate_custom_wxr_with_mixed_status(articles_data, schedule_info, xml_filename)
     
     print(f"\n✅ 調整済みXMLファイル作成: {xml_filename}")
-    print(f"   ファイルサイズ: {len(xml_content) / 1024:.1f} KB")
+    print(f"   ファイルサイズ: {os.path.getsize(xml_filename) / 1024:.1f} KB")
     
     return xml_filename
 
-def generate_custom_wxr_with_mixed_status(articles_data, schedule_info):
-    """即座公開と予約投稿が混在するカスタムWXR生成"""
+def generate_custom_wxr_with_mixed_status(articles_data, schedule_info, xml_filename):
+    """即座公開と予約投稿が混在するカスタムWXRを1記事ずつファイルへ書き込む"""
     
-    # WXR XMLヘッダー
-    xml_content = """<?xml version="1.0" encoding="UTF-8"?>
-<rss version="2.0"
-	xmlns:excerpt="http://wordpress.org/export/1.2/excerpt/"
-	xmlns:content="http://purl.org/rss/1.0/modules/content/"
-	xmlns:wfw="http://wellformedweb.org/CommentAPI/"
-	xmlns:dc="http://purl.org/dc/elements/1.1/"
-	xmlns:wp="http://wordpress.org/export/1.2/"
->
-
-<channel>
-	<title>低山旅行 - Mixed Schedule Articles</title>
-	<link>https://teizan.abg.ooo</link>
-	<description>Mountain Blog Generator - Adjusted Schedule Export</description>
-	<pubDate>""" + datetime.now().strftime('%a, %d %b %Y %H:%M:%S +0000') + """</pubDate>
-	<language>ja</language>
-	<wp:wxr_version>1.2</wp:wxr_version>
-	<wp:base_site_url>https://teizan.abg.ooo</wp:base_site_url>
-	<wp:base_blog_url>https://teizan.abg.ooo</wp:base_blog_url>
-
-	<wp:author>
-		<wp:author_id>1</wp:author_id>
-		<wp:author_login><![CDATA[aime]]></wp:author_login>
-		<wp:author_email><![CDATA[aime@example.com]]></wp:author_email>
-		<wp:author_display_name><![CDATA[aime]]></wp:author_display_name>
-		<wp:author_first_name><![CDATA[]]></wp:author_first_name>
-		<wp:author_last_name><![CDATA[]]></wp:author_last_name>
-	</wp:author>
-
-	<wp:category>
-		<wp:term_id>1</wp:term_id>
-		<wp:category_nicename><![CDATA[area]]></wp:category_nicename>
-		<wp:category_parent><![CDATA[]]></wp:category_parent>
-		<wp:cat_name><![CDATA[エリア別]]></wp:cat_name>
-	</wp:category>
-
-"""
-
-    # 各記事を追加
-    for i, (article, schedule) in enumerate(zip(articles_data, schedule_info)):
-        scheduled_time = schedule['schedule_time']
-        post_status = schedule['status']
-        
-        # 記事の内容をエスケープ
-        title = escape_xml(article['title'])
-        content = article['content']
-        excerpt = article['excerpt']
-        
-        xml_content += f"""
-	<item>
-		<title>{title}</title>
-		<link>https://teizan.abg.ooo/?p={i+3000}</link>
-		<pubDate>{scheduled_time.strftime('%a, %d %b %Y %H:%M:%S +0000')}</pubDate>
-		<dc:creator><![CDATA[aime]]></dc:creator>
-		<guid isPermaLink="false">https://teizan.abg.ooo/?p={i+3000}</guid>
-		<description></description>
-		<content:encoded><![CDATA[{content}]]></content:encoded>
-		<excerpt:encoded><![CDATA[{excerpt}]]></excerpt:encoded>
-		<wp:post_id>{i+3000}</wp:post_id>
-		<wp:post_date><![CDATA[{scheduled_time.strftime('%Y-%m-%d %H:%M:%S')}]]></wp:post_date>
-		<wp:post_date_gmt><![CDATA[{scheduled_time.strftime('%Y-%m-%d %H:%M:%S')}]]></wp:post_date_gmt>
-		<wp:comment_status><![CDATA[open]]></wp:comment_status>
-		<wp:ping_status><![CDATA[open]]></wp:ping_status>
-		<wp:post_name><![CDATA[{create_slug(article['title'])}]]></wp:post_name>
-		<wp:status><![CDATA[{post_status}]]></wp:status>
-		<wp:post_parent>0</wp:post_parent>
-		<wp:menu_order>0</wp:menu_order>
-		<wp:post_type><![CDATA[post]]></wp:post_type>
-		<wp:post_password><![CDATA[]]></wp:post_password>
-		<wp:is_sticky>0</wp:is_sticky>
-		<category domain="category" nicename="area"><![CDATA[エリア別]]></category>"""
-
-        # タグを追加
-        for tag in article.get('tags', []):
-            tag_slug = create_slug(tag)
-            xml_content += f"""
-		<category domain="post_tag" nicename="{tag_slug}"><![CDATA[{escape_xml(tag)}]]></category>"""
-
-        # アイキャッチ画像のメタデータ
-        if article.get('featured_image_url'):
-            xml_content += f"""
-		<wp:postmeta>
-			<wp:meta_key><![CDATA[_thumbnail_url]]></wp:meta_key>
-			<wp:meta_value><![CDATA[{article['featured_image_url']}]]></wp:meta_value>
-		</wp:postmeta>
-		<wp:postmeta>
-			<wp:meta_key><![CDATA[_thumbnail_id]]></wp:meta_key>
-			<wp:meta_value><![CDATA[0]]></wp:meta_value>
-		</wp:postmeta>
-		<wp:postmeta>
-			<wp:meta_key><![CDATA[fifu_image_url]]></wp:meta_key>
-			<wp:meta_value><![CDATA[{article['featured_image_url']}]]></wp:meta_value>
-		</wp:postmeta>
-		<wp:postmeta>
-			<wp:meta_key><![CDATA[fifu_image_alt]]></wp:meta_key>
-			<wp:meta_value><![CDATA[{title}のアイキャッチ画像]]></wp:meta_value>
-		</wp:postmeta>
-		<wp:postmeta>
-			<wp:meta_key><![CDATA[_yoast_wpseo_opengraph-image]]></wp:meta_key>
-			<wp:meta_value><![CDATA[{article['featured_image_url']}]]></wp:meta_value>
-		</wp:postmeta>
-		<wp:postmeta>
-			<wp:meta_key><![CDATA[_yoast_wpseo_twitter-image]]></wp:meta_key>
-			<wp:meta_value><![CDATA[{article['featured_image_url']}]]></wp:meta_value>
-		</wp:postmeta>
-		<wp:postmeta>
-			<wp:meta_key><![CDATA[_wp_attachment_image_alt]]></wp:meta_key>
-			<wp:meta_value><![CDATA[{title}のアイキャッチ画像]]></wp:meta_value>
-		</wp:postmeta>"""
-
-        xml_content += """
-	</item>"""
-
-    xml_content += """
-</channel>
-</rss>"""
-
-    return xml_content
-
-def escape_xml(text: str) -> str:
-    """XMLエスケープ"""
-    return (text.replace('&', '&amp;')
-                .replace('<', '&lt;')
-                .replace('>', '&gt;')
-                .replace('"', '&quot;')
-                .replace("'", '&apos;'))
-
-def create_slug(text: str) -> str:
-    """URLスラッグを生成"""
-    import re
-    slug = re.sub(r'[^\w\s-]', '', text.lower())
-    slug = re.sub(r'[-\s]+', '-', slug)
-    return slug[:50]
+    channel = wxr_channel('低山旅行 - Mixed Schedule Articles', 'Mountain Blog Generator - Adjusted Schedule Export')
+    
+    items = (
+        scheduled_item(article, i + 3000, schedule['schedule_time'], schedule['status'])
+        for i, (article, schedule) in enumerate(zip(articles_data, schedule_info))
+    )
+    return write_wxr(xml_filename, channel, items)
 
 def verify_schedule_xml(xml_filename):
     """生成されたXMLファイルの内容を検証"""
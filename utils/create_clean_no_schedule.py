@@ -4,7 +4,9 @@
 pubDate、wp:post_date等のスケジュール関連要素を全て除去または過去時刻に設定
 """
 import json
+import os
 from datetime import datetime, timedelta
+from wordpress_wxr_fixed import scheduled_item, simple_image_postmeta, wxr_channel, write_wxr
 
 def create_clean_no_schedule_xml():
     """予約投稿要素を完全除去したXMLを作成"""
@@ -40,121 +42,27 @@ def create_clean_no_schedule_xml():
     print(f"📅 ベース投稿時刻: {base_time.strftime('%Y-%m-%d %H:%M:%S')} (1週間前)")
     
     # XML生成
-    xml_content = generate_clean_wxr(articles_data, base_time)
-    
-    # ファイル保存
     timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
     xml_filename = f"clean_no_schedule_articles_{timestamp}.xml"
-    
-    with open(xml_filename, 'w', encoding='utf-8') as f:
-        f.write(xml_content)
+    generate_clean_wxr(articles_data, base_time, xml_filename)
     
     print(f"\n✅ 完全クリーンXMLファイル作成: {xml_filename}")
-    print(f"   ファイルサイズ: {len(xml_content) / 1024:.1f} KB")
+    print(f"   ファイルサイズ: {os.path.getsize(xml_filename) / 1024:.1f} KB")
     
     return xml_filename
 
-def generate_clean_wxr(articles_data, base_time):
-    """スケジュール要素を完全除去したWXR生成"""
+def generate_clean_wxr(articles_data, base_time, xml_filename):
+    """スケジュール要素を完全除去したWXRを1記事ずつファイルへ書き込む"""
     
     # チャンネル部分も過去時刻に設定
-    xml_content = """<?xml version="1.0" encoding="UTF-8"?>
-<rss version="2.0"
-	xmlns:excerpt="http://wordpress.org/export/1.2/excerpt/"
-	xmlns:content="http://purl.org/rss/1.0/modules/content/"
-	xmlns:wfw="http://wellformedweb.org/CommentAPI/"
-	xmlns:dc="http://purl.org/dc/elements/1.1/"
-	xmlns:wp="http://wordpress.org/export/1.2/"
->
-
-<channel>
-	<title>低山旅行 - クリーン投稿</title>
-	<link>https://teizan.abg.ooo</link>
-	<description>Mountain Blog Generator - Clean Posts (No Schedule)</description>
-	<pubDate>""" + base_time.strftime('%a, %d %b %Y %H:%M:%S +0000') + """</pubDate>
-	<language>ja</language>
-	<wp:wxr_version>1.2</wp:wxr_version>
-	<wp:base_site_url>https://teizan.abg.ooo</wp:base_site_url>
-	<wp:base_blog_url>https://teizan.abg.ooo</wp:base_blog_url>
-
-	<wp:author>
-		<wp:author_id>1</wp:author_id>
-		<wp:author_login><![CDATA[aime]]></wp:author_login>
-		<wp:author_email><![CDATA[aime@example.com]]></wp:author_email>
-		<wp:author_display_name><![CDATA[aime]]></wp:author_display_name>
-		<wp:author_first_name><![CDATA[]]></wp:author_first_name>
-		<wp:author_last_name><![CDATA[]]></wp:author_last_name>
-	</wp:author>
-
-	<wp:category>
-		<wp:term_id>1</wp:term_id>
-		<wp:category_nicename><![CDATA[area]]></wp:category_nicename>
-		<wp:category_parent><![CDATA[]]></wp:category_parent>
-		<wp:cat_name><![CDATA[エリア別]]></wp:cat_name>
-	</wp:category>
-
-"""
-
-    # 各記事を追加（全て過去時刻）
-    for i, article in enumerate(articles_data):
-        # 各記事を1時間ずつずらして過去時刻に設定
-        article_time = base_time - timedelta(hours=i)
-        
-        # 記事の内容をエスケープ
-        title = escape_xml(article['title'])
-        content = article['content']
-        excerpt = article['excerpt']
-        
-        xml_content += f"""
-	<item>
-		<title>{title}</title>
-		<link>https://teizan.abg.ooo/?p={i+6000}</link>
-		<pubDate>{article_time.strftime('%a, %d %b %Y %H:%M:%S +0000')}</pubDate>
-		<dc:creator><![CDATA[aime]]></dc:creator>
-		<guid isPermaLink="false">https://teizan.abg.ooo/?p={i+6000}</guid>
-		<description></description>
-		<content:encoded><![CDATA[{content}]]></content:encoded>
-		<excerpt:encoded><![CDATA[{excerpt}]]></excerpt:encoded>
-		<wp:post_id>{i+6000}</wp:post_id>
-		<wp:post_date><![CDATA[{article_time.strftime('%Y-%m-%d %H:%M:%S')}]]></wp:post_date>
-		<wp:post_date_gmt><![CDATA[{article_time.strftime('%Y-%m-%d %H:%M:%S')}]]></wp:post_date_gmt>
-		<wp:comment_status><![CDATA[open]]></wp:comment_status>
-		<wp:ping_status><![CDATA[open]]></wp:ping_status>
-		<wp:post_name><![CDATA[{create_slug(article['title'])}]]></wp:post_name>
-		<wp:status><![CDATA[publish]]></wp:status>
-		<wp:post_parent>0</wp:post_parent>
-		<wp:menu_order>0</wp:menu_order>
-		<wp:post_type><![CDATA[post]]></wp:post_type>
-		<wp:post_password><![CDATA[]]></wp:post_password>
-		<wp:is_sticky>0</wp:is_sticky>
-		<category domain="category" nicename="area"><![CDATA[エリア別]]></category>"""
-
-        # タグを追加
-        for tag in article.get('tags', []):
-            tag_slug = create_slug(tag)
-            xml_content += f"""
-		<category domain="post_tag" nicename="{tag_slug}"><![CDATA[{escape_xml(tag)}]]></category>"""
-
-        # アイキャッチ画像のメタデータ（必要最小限）
-        if article.get('featured_image_url'):
-            xml_content += f"""
-		<wp:postmeta>
-			<wp:meta_key><![CDATA[_thumbnail_url]]></wp:meta_key>
-			<wp:meta_value><![CDATA[{article['featured_image_url']}]]></wp:meta_value>
-		</wp:postmeta>
-		<wp:postmeta>
-			<wp:meta_key><![CDATA[fifu_image_url]]></wp:meta_key>
-			<wp:meta_value><![CDATA[{article['featured_image_url']}]]></wp:meta_value>
-		</wp:postmeta>"""
-
-        xml_content += """
-	</item>"""
-
-    xml_content += """
-</channel>
-</rss>"""
-
-    return xml_content
+    channel = wxr_channel('低山旅行 - クリーン投稿', 'Mountain Blog Generator - Clean Posts (No Schedule)', base_time)
+    
+    # 各記事を1時間ずつずらして過去時刻に設定（アイキャッチ画像のメタデータは必要最小限）
+    items = (
+        scheduled_item(article, i + 6000, base_time - timedelta(hours=i), 'publish', simple_image_postmeta(article))
+        for i, article in enumerate(articles_data)
+    )
+    return write_wxr(xml_filename, channel, items)
 
 def create_ultra_minimal_xml():
     """最小限のテスト用XML（日付要素を最小化）"""
@@ -202,21 +110,6 @@ def create_ultra_minimal_xml():
     
     return test_filename
 
-def escape_xml(text: str) -> str:
-    """XMLエスケープ"""
-    return (text.replace('&', '&amp;')
-                .replace('<', '&lt;')
-                .replace('>', '&gt;')
-                .replace('"', '&quot;')
-                .replace("'", '&apos;'))
-
-def create_slug(text: str) -> str:
-    """URLスラッグを生成"""
-    import re
-    slug = re.sub(r'[^\w\s-]', '', text.lower())
-    slug = re.sub(r'[-\s]+', '-', slug)
-    return slug[:50]
-
 def verify_clean_xml(xml_filename):
     """クリーンXMLファイルの検証"""
     print(f"\n🔍 クリーンXMLファイル検証: {xml_filename}")
@@ -4,15 +4,14 @@ WordPress スケジュール投稿対応XMLエクスポーター
 1時間ごとの自動公開とカバー画像対応
 """
 import json
-import xml.etree.ElementTree as ET
+import os
 from datetime import datetime, timedelta
-from html import escape
-import re
 import requests
 from typing import List, Dict, Any
 
 from src.application.services import MountainArticleService
 from src.infrastructure.repositories import RepositoryFactory
+from src.infrastructure.wxr_writer import WXRChannel, WXRItem, WXRWriter, wxr_to_string
 from config.settings import get_settings
 from config.logging_config import get_logger
 
@@ -26,6 +25,37 @@ class WordPressScheduledExporter:
         self.mountain_repo = RepositoryFactory.get_mountain_repository()
         self.logger = get_logger("scheduled_exporter")
     
+    def _channel(self):
+        """チャンネル情報"""
+        return WXRChannel(
+            title='低山旅行 - Scheduled Articles',
+            link=self.settings.WP_URL,
+            description='Mountain Blog Generator - Scheduled Export',
+            pub_date=datetime.now(),
+            generator='https://wordpress.org/?v=6.3'
+        )
+    
+    def _item(self, index, article, scheduled_time):
+        """記事データ → WXRの記事（予約投稿として登録）"""
+        postmeta = []
+        if article.get('featured_image_url'):
+            # カバー画像（アイキャッチ画像）のURLと代替テキスト
+            postmeta = [
+                ('_thumbnail_url', article['featured_image_url']),
+                ('_thumbnail_alt', f"{article['title']}のアイキャッチ画像")
+            ]
+        return WXRItem(
+            post_id=index + 2000,
+            title=article['title'],
+            content=article['content'],
+            excerpt=article['excerpt'],
+            post_date=scheduled_time,
+            status='future',  # 予約投稿
+            creator='aime',
+            tags=article.get('tags', []),
+            postmeta=postmeta
+        )
+    
     def generate_scheduled_xml(self, articles_data: List[Dict[str, Any]], start_time: datetime = None, interval_hours: int = 1):
         """
         スケジュール投稿対応のXMLを生成
@@ -39,128 +69,10 @@ class WordPressScheduledExporter:
             # デフォルトは現在時刻の1時間後から開始
             start_time = datetime.now() + timedelta(hours=1)
         
-        # ルート要素 - 正しいWordPress名前空間を使用
-        rss = ET.Element('rss')
-        rss.set('version', '2.0')
-        rss.set('xmlns:excerpt', 'http://wordpress.org/export/1.2/excerpt/')
-        rss.set('xmlns:content', 'http://purl.org/rss/1.0/modules/content/')
-        rss.set('xmlns:wfw', 'http://wellformedweb.org/CommentAPI/')
-        rss.set('xmlns:dc', 'http://purl.org/dc/elements/1.1/')
-        rss.set('xmlns:wp', 'http://wordpress.org/export/1.2/')
-        
-        channel = ET.SubElement(rss, 'channel')
-        
-        # チャンネル情報
-        ET.SubElement(channel, 'title').text = '低山旅行 - Scheduled Articles'
-        ET.SubElement(channel, 'link').text = self.settings.WP_URL
-        ET.SubElement(channel, 'description').text = 'Mountain Blog Generator - Scheduled Export'
-        ET.SubElement(channel, 'pubDate').text = datetime.now().strftime('%a, %d %b %Y %H:%M:%S +0000')
-        ET.SubElement(channel, 'language').text = 'ja'
-        ET.SubElement(channel, '{http://wordpress.org/export/1.2/}wxr_version').text = '1.2'
-        ET.SubElement(channel, 'generator').text = 'https://wordpress.org/?v=6.3'
-        
-        # 必要なサイト情報を追加
-        ET.SubElement(channel, '{http://wordpress.org/export/1.2/}base_site_url').text = self.settings.WP_URL
-        ET.SubElement(channel, '{http://wordpress.org/export/1.2/}base_blog_url').text = self.settings.WP_URL
-        
-        # 記事を追加
-        for i, article in enumerate(articles_data):
-            item = ET.SubElement(channel, 'item')
-            
-            # スケジュール時刻を計算
-            scheduled_time = start_time + timedelta(hours=interval_hours * i)
-            
-            # 基本情報
-            ET.SubElement(item, 'title').text = article['title']
-            ET.SubElement(item, 'link').text = f"{self.settings.WP_URL}/?p={i+2000}"
-            ET.SubElement(item, 'pubDate').text = scheduled_time.strftime('%a, %d %b %Y %H:%M:%S +0000')
-            
-            creator = ET.SubElement(item, '{http://purl.org/dc/elements/1.1/}creator')
-            creator.text = 'aime'
-            
-            ET.SubElement(item, 'guid', isPermaLink='false').text = f"{self.settings.WP_URL}/?p={i+2000}"
-            ET.SubElement(item, 'description').text = ''
-            
-            # コンテンツ（CDATAセクションとして）
-            content = ET.SubElement(item, '{http://purl.org/rss/1.0/modules/content/}encoded')
-            content.text = article['content']
-            
-            # 抜粋
-            excerpt = ET.SubElement(item, '{http://wordpress.org/export/1.2/excerpt/}encoded')
-            excerpt.text = article['excerpt']
-            
-            # WordPress固有の要素
-            ET.SubElement(item, '{http://wordpress.org/export/1.2/}post_id').text = str(i+2000)
-            ET.SubElement(item, '{http://wordpress.org/export/1.2/}post_date').text = scheduled_time.strftime('%Y-%m-%d %H:%M:%S')
-            ET.SubElement(item, '{http://wordpress.org/export/1.2/}post_date_gmt').text = scheduled_time.strftime('%Y-%m-%d %H:%M:%S')
-            ET.SubElement(item, '{http://wordpress.org/export/1.2/}comment_status').text = 'open'
-            ET.SubElement(item, '{http://wordpress.org/export/1.2/}ping_status').text = 'open'
-            ET.SubElement(item, '{http://wordpress.org/export/1.2/}post_name').text = self._create_slug(article['title'])
-            ET.SubElement(item, '{http://wordpress.org/export/1.2/}status').text = 'future'  # 予約投稿
-            ET.SubElement(item, '{http://wordpress.org/export/1.2/}post_parent').text = '0'
-            ET.SubElement(item, '{http://wordpress.org/export/1.2/}menu_order').text = '0'
-            ET.SubElement(item, '{http://wordpress.org/export/1.2/}post_type').text = 'post'
-            ET.SubElement(item, '{http://wordpress.org/export/1.2/}post_password').text = ''
-            ET.SubElement(item, '{http://wordpress.org/export/1.2/}is_sticky').text = '0'
-            
-            # カテゴリとタグ
-            category = ET.SubElement(item, 'category', domain='category', nicename='area')
-            category.text = 'エリア別'
-            
-            # タグを追加
-            for tag in article.get('tags', []):
-                tag_elem = ET.SubElement(item, 'category', domain='post_tag', nicename=self._create_slug(tag))
-                tag_elem.text = tag
-            
-            # カバー画像（アイキャッチ画像）の添付
-            if article.get('featured_image_url'):
-                self._add_featured_image(item, article['featured_image_url'], article['title'])
-        
-        # XMLを文字列に変換
-        xml_str = ET.tostring(rss, encoding='unicode', method='xml')
-        
-        # 整形とCDATAセクションの追加
-        xml_str = self._format_xml_with_cdata(xml_str)
-        
-        return xml_str
-    
-    def _add_featured_image(self, item, image_url, title):
-        """アイキャッチ画像の情報を追加"""
-        # WordPressのポストメタデータとして画像URLを追加
-        postmeta = ET.SubElement(item, '{http://wordpress.org/export/1.2/}postmeta')
-        ET.SubElement(postmeta, '{http://wordpress.org/export/1.2/}meta_key').text = '_thumbnail_url'
-        ET.SubElement(postmeta, '{http://wordpress.org/export/1.2/}meta_value').text = image_url
-        
-        # 画像の代替テキスト
-        postmeta_alt = ET.SubElement(item, '{http://wordpress.org/export/1.2/}postmeta')
-        ET.SubElement(postmeta_alt, '{http://wordpress.org/export/1.2/}meta_key').text = '_thumbnail_alt'
-        ET.SubElement(postmeta_alt, '{http://wordpress.org/export/1.2/}meta_value').text = f"{title}のアイキャッチ画像"
-    
-    def _create_slug(self, text):
-        """URLスラッグを生成"""
-        slug = re.sub(r'[^\w\s-]', '', text.lower())
-        slug = re.sub(r'[-\s]+', '-', slug)
-        return slug[:50]
-    
-    def _format_xml_with_cdata(self, xml_str):
-        """XMLを整形し、CDATAセクションを適切に追加"""
-        xml_str = re.sub(
-            r'<content:encoded>(.*?)</content:encoded>',
-            lambda m: f'<content:encoded><![CDATA[{m.group(1)}]]></content:encoded>',
-            xml_str,
-            flags=re.DOTALL
-        )
-        
-        xml_str = re.sub(
-            r'<excerpt:encoded>(.*?)</excerpt:encoded>',
-            lambda m: f'<excerpt:encoded><![CDATA[{m.group(1)}]]></excerpt:encoded>',
-            xml_str,
-            flags=re.DOTALL
-        )
-        
-        xml_declaration = '<?xml version="1.0" encoding="UTF-8" ?>\n'
-        
-        return xml_declaration + xml_str
+        return wxr_to_string(self._channel(), (
+            self._item(i, article, start_time + timedelta(hours=interval_hours * i))
+            for i, article in enumerate(articles_data)
+        ))
     
     def export_scheduled_articles(self, count=10, start_time=None, interval_hours=1):
         """
@@ -195,68 +107,62 @@ class WordPressScheduledExporter:
             "温泉付き登山プラン"
         ]
         
-        articles_data = []
+        if start_time is None:
+            start_time = datetime.now() + timedelta(hours=1)
+        
+        filename = f"wordpress_scheduled_{datetime.now().strftime('%Y%m%d_%H%M%S')}.xml"
+        schedule = []
         
+        # 記事は生成するたびにXMLファイルへ書き込む
         print("\n📝 記事生成中...")
-        for i, mountain in enumerate(mountains):
-            theme = themes[i % len(themes)]
-            print(f"{i+1}. {mountain.name} - {theme}", end="")
-            
-            try:
-                result = self.service.create_and_publish_article(
-                    mountain_id=mountain.id,
-                    theme=theme,
-                    publish=False
-                )
+        with WXRWriter(filename, self._channel()) as writer:
+            for i, mountain in enumerate(mountains):
+                theme = themes[i % len(themes)]
+                print(f"{i+1}. {mountain.name} - {theme}", end="")
                 
-                if result.success:
-                    # カバー画像URL（Unsplashのサンプル画像）
-                    featured_image_url = None
-                    if hasattr(result.article.content, 'featured_image') and result.article.content.featured_image:
-                        featured_image_url = result.article.content.featured_image.url
+                try:
+                    result = self.service.create_and_publish_article(
+                        mountain_id=mountain.id,
+                        theme=theme,
+                        publish=False
+                    )
                     
-                    article_data = {
-                        "title": result.article.content.title,
-                        "content": result.article.content.content,
-                        "excerpt": result.article.content.excerpt,
-                        "tags": result.article.content.tags,
-                        "featured_image_url": featured_image_url,
-                        "mountain_name": mountain.name,
-                        "theme": theme
-                    }
-                    articles_data.append(article_data)
-                    print(f" ✅ ({len(result.article.content.content)}文字)")
-                else:
-                    print(f" ❌ 失敗: {result.error_message}")
-                    
-            except Exception as e:
-                print(f" ❌ エラー: {e}")
+                    if result.success:
+                        # カバー画像URL（Unsplashのサンプル画像）
+                        featured_image_url = None
+                        if hasattr(result.article.content, 'featured_image') and result.article.content.featured_image:
+                            featured_image_url = result.article.content.featured_image.url
+                        
+                        article_data = {
+                            "title": result.article.content.title,
+                            "content": result.article.content.content,
+                            "excerpt": result.article.content.excerpt,
+                            "tags": result.article.content.tags,
+                            "featured_image_url": featured_image_url
+                        }
+                        position = writer.items_written
+                        scheduled_time = start_time + timedelta(hours=interval_hours * position)
+                        writer.write_item(self._item(position, article_data, scheduled_time))
+                        schedule.append((scheduled_time, article_data['title']))
+                        print(f" ✅ ({len(result.article.content.content)}文字)")
+                    else:
+                        print(f" ❌ 失敗: {result.error_message}")
+                        
+                except Exception as e:
+                    print(f" ❌ エラー: {e}")
         
         # スケジュール情報を表示
-        if start_time is None:
-            start_time = datetime.now() + timedelta(hours=1)
-        
         print(f"\n📅 公開スケジュール:")
-        for i in range(len(articles_data)):
-            scheduled_time = start_time + timedelta(hours=interval_hours * i)
-            print(f"   {i+1}. {scheduled_time.strftime('%Y-%m-%d %H:%M')} - {articles_data[i]['title'][:30]}...")
-        
-        # XML生成
-        print(f"\n📄 XML生成中...")
-        xml_content = self.generate_scheduled_xml(articles_data, start_time, interval_hours)
-        
-        # ファイル保存
-        filename = f"wordpress_scheduled_{datetime.now().strftime('%Y%m%d_%H%M%S')}.xml"
-        with open(filename, 'w', encoding='utf-8') as f:
-            f.write(xml_content)
+        for i, (scheduled_time, title) in enumerate(schedule):
+            print(f"   {i+1}. {scheduled_time.strftime('%Y-%m-%d %H:%M')} - {title[:30]}...")
         
         print(f"\n✅ XMLファイル作成完了: {filename}")
-        print(f"   記事数: {len(articles_data)}記事")
-        print(f"   ファイルサイズ: {len(xml_content) / 1024:.1f} KB")
+        print(f"   記事数: {writer.items_written}記事")
+        print(f"   ファイルサイズ: {os.path.getsize(filename) / 1024:.1f} KB")
         
         self._print_import_instructions()
         
-        return filename, len(articles_data)
+        return filename, writer.items_written
     
     def _print_import_instructions(self):
         """インポート手順を表示"""
@@ -4,13 +4,13 @@ WordPress XML形式での記事エクスポート
 最も確実なWordPress投稿方法
 """
 import json
-import xml.etree.ElementTree as ET
+import os
 from datetime import datetime
-from html import escape
-import re
 
 from src.application.services import MountainArticleService
+from src.domain.entities import GenerationRequest
 from src.infrastructure.repositories import RepositoryFactory
+from src.infrastructure.wxr_writer import WXRChannel, WXRItem, WXRWriter, write_wxr, wxr_to_string
 from config.settings import get_settings
 
 
@@ -22,103 +22,69 @@ class WordPressXMLExporter:
         self.service = MountainArticleService()
         self.mountain_repo = RepositoryFactory.get_mountain_repository()
     
-    def generate_wordpress_xml(self, articles_data):
-        """WordPress形式のXMLを生成"""
-        
-        # ルート要素
-        rss = ET.Element('rss', version='2.0')
-        rss.set('xmlns:excerpt', 'http://wordpress.org/export/1.2/excerpt/')
-        rss.set('xmlns:content', 'http://purl.org/rss/1.0/modules/content/')
-        rss.set('xmlns:wfw', 'http://wellformedweb.org/CommentAPI/')
-        rss.set('xmlns:dc', 'http://purl.org/dc/elements/1.1/')
-        rss.set('xmlns:wp', 'http://wordpress.org/export/1.2/')
-        
-        channel = ET.SubElement(rss, 'channel')
-        
-        # チャンネル情報
-        ET.SubElement(channel, 'title').text = '低山旅行 - Mountain Blog Articles'
-        ET.SubElement(channel, 'link').text = self.settings.WP_URL
-        ET.SubElement(channel, 'description').text = 'Mountain Blog Generator Export'
-        ET.SubElement(channel, 'language').text = 'ja'
-        ET.SubElement(channel, '{http://wordpress.org/export/1.2/}wxr_version').text = '1.2'
-        ET.SubElement(channel, 'generator').text = 'Mountain Blog Generator'
-        
-        # 記事を追加
-        for i, article in enumerate(articles_data):
-            item = ET.SubElement(channel, 'item')
-            
-            # 基本情報
-            ET.SubElement(item, 'title').text = article['title']
-            ET.SubElement(item, 'link').text = f"{self.settings.WP_URL}/?p={i+1000}"
-            ET.SubElement(item, 'pubDate').text = datetime.now().strftime('%a, %d %b %Y %H:%M:%S +0000')
-            
-            creator = ET.SubElement(item, '{http://purl.org/dc/elements/1.1/}creator')
-            creator.text = 'admin'
-            
-            ET.SubElement(item, 'description').text = ''
-            
-            # コンテンツ（CDATAセクションとして）
-            content = ET.SubElement(item, '{http://purl.org/rss/1.0/modules/content/}encoded')
-            content.text = article['content']
-            
-            # 抜粋
-            excerpt = ET.SubElement(item, '{http://wordpress.org/export/1.2/excerpt/}encoded')
-            excerpt.text = article['excerpt']
-            
-            # WordPress固有の要素
-            ET.SubElement(item, '{http://wordpress.org/export/1.2/}post_date').text = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
-            ET.SubElement(item, '{http://wordpress.org/export/1.2/}post_type').text = 'post'
-            ET.SubElement(item, '{http://wordpress.org/export/1.2/}status').text = 'draft'
-            ET.SubElement(item, '{http://wordpress.org/export/1.2/}post_name').text = self._create_slug(article['title'])
-            
-            # カテゴリとタグ
-            category = ET.SubElement(item, 'category', domain='category', nicename='area')
-            category.text = 'エリア別'
-            
-            # タグを追加
-            for tag in article.get('tags', []):
-                tag_elem = ET.SubElement(item, 'category', domain='post_tag', nicename=self._create_slug(tag))
-                tag_elem.text = tag
-        
-        # XMLを文字列に変換
-        xml_str = ET.tostring(rss, encoding='unicode', method='xml')
-        
-        # 整形とCDATAセクションの追加
-        xml_str = self._format_xml_with_cdata(xml_str)
-        
-        return xml_str
+    def _channel(self):
+        """チャンネル情報"""
+        return WXRChannel(
+            title='低山旅行 - Mountain Blog Articles',
+            link=self.settings.WP_URL,
+            description='Mountain Blog Generator Export',
+            generator='Mountain Blog Generator'
+        )
     
-    def _create_slug(self, text):
-        """URLスラッグを生成"""
-        # 日本語文字を削除し、英数字とハイフンのみにする
-        slug = re.sub(r'[^\w\s-]', '', text.lower())
-        slug = re.sub(r'[-\s]+', '-', slug)
-        return slug[:50]  # 長さ制限
+    def _item(self, index, article):
+        """記事データ → WXRの記事（下書きとして登録）"""
+        return WXRItem(
+            post_id=index + 1000,
+            title=article['title'],
+            content=article['content'],
+            excerpt=article['excerpt'],
+            post_date=datetime.now(),
+            status='draft',
+            creator='admin',
+            tags=article.get('tags', [])
+        )
+    
+    @staticmethod
+    def _serialize(result):
+        """生成結果 → 記事データ（ジャーナルに記録する）"""
+        content = result.article.content
+        return {
+            "title": content.title,
+            "content": content.content,
+            "excerpt": content.excerpt,
+            "tags": content.tags
+        }
     
-    def _format_xml_with_cdata(self, xml_str):
-        """XMLを整形し、CDATAセクションを適切に追加"""
-        # content:encodedとexcerpt:encodedの内容をCDATAで囲む
-        xml_str = re.sub(
-            r'<content:encoded>(.*?)</content:encoded>',
-            lambda m: f'<content:encoded><![CDATA[{m.group(1)}]]></content:encoded>',
-            xml_str,
-            flags=re.DOTALL
+    def generate_wordpress_xml(self, articles_data):
+        """WordPress形式のXMLを文字列として生成"""
+        return wxr_to_string(
+            self._channel(),
+            (self._item(i, article) for i, article in enumerate(articles_data))
         )
-        
-        xml_str = re.sub(
-            r'<excerpt:encoded>(.*?)</excerpt:encoded>',
-            lambda m: f'<excerpt:encoded><![CDATA[{m.group(1)}]]></excerpt:encoded>',
-            xml_str,
-            flags=re.DOTALL
+    
+    def write_wordpress_xml(self, articles_data, filename, compress=None):
+        """WordPress形式のXMLを1記事ずつファイルへ書き込み、記事数を返す"""
+        return write_wxr(
+            filename,
+            self._channel(),
+            (self._item(i, article) for i, article in enumerate(articles_data)),
+            compress=compress
         )
-        
-        # XML宣言を追加
-        xml_declaration = '<?xml version="1.0" encoding="UTF-8" ?>\n'
-        
-        return xml_declaration + xml_str
     
-    def export_all_articles(self, limit=None):
-        """すべての山の記事を生成してXML出力"""
+    def export_all_articles(self, limit=None, max_workers=None, compress=False, resume=True):
+        """
+        すべての山の記事を生成してXML出力
+        
+        記事は生成し終えた順に1件ずつXMLファイルへ書き込み、ジャーナルにも記録する。
+        途中で中断した場合は、同じ条件で再実行すると生成済みの記事をジャーナルから復元し、
+        残りの記事だけを生成する。
+        
+        Args:
+            limit: 対象の山の数（Noneの場合は全件）
+            max_workers: 同時実行数
+            compress: gzip圧縮した .xml.gz として出力するか
+            resume: Falseの場合は中断したジョブを再開せずに最初から生成する
+        """
         print("🏔️ WordPress XML形式での記事エクスポート")
         print("="*60)
         
@@ -138,49 +104,50 @@ class WordPressXMLExporter:
             "日帰り登山プラン"
         ]
         
-        articles_data = []
+        requests = [
+            GenerationRequest(mountain_id=mountain.id, theme=themes[i % len(themes)])
+            for i, mountain in enumerate(mountains)
+        ]
+        
+        extension = '.xml.gz' if compress else '.xml'
+        filename = f"wordpress_import_{datetime.now().strftime('%Y%m%d_%H%M%S')}{extension}"
         
-        print("\n📝 記事生成中...")
-        for i, mountain in enumerate(mountains):
-            theme = themes[i % len(themes)]
-            print(f"{i+1}. {mountain.name} - {theme}", end="")
+        with WXRWriter(filename, self._channel()) as writer:
+            def on_record(index, record):
+                writer.write_item(self._item(index, record))
             
-            try:
-                result = self.service.create_and_publish_article(
-                    mountain_id=mountain.id,
-                    theme=theme,
-                    publish=False
-                )
-                
+            def on_result(index, result, progress):
+                mountain = mountains[index]
+                label = f"{progress.format()} {index+1}. {mountain.name} - {requests[index].theme}"
                 if result.success:
-                    article_data = {
-                        "title": result.article.content.title,
-                        "content": result.article.content.content,
-                        "excerpt": result.article.content.excerpt,
-                        "tags": result.article.content.tags,
-                        "mountain_name": mountain.name,
-                        "theme": theme
-                    }
-                    articles_data.append(article_data)
-                    print(f" ✅ ({len(result.article.content.content)}文字)")
+                    print(f"{label} ✅ ({len(result.article.content.content)}文字)")
                 else:
-                    print(f" ❌ 失敗: {result.error_message}")
-                    
-            except Exception as e:
-                print(f" ❌ エラー: {e}")
-        
-        # XML生成
-        print(f"\n📄 XML生成中...")
-        xml_content = self.generate_wordpress_xml(articles_data)
-        
-        # ファイル保存
-        filename = f"wordpress_import_{datetime.now().strftime('%Y%m%d_%H%M%S')}.xml"
-        with open(filename, 'w', encoding='utf-8') as f:
-            f.write(xml_content)
+                    print(f"{label} ❌ 失敗: {result.error_message}")
+            
+            print(f"\n📝 記事生成中...（同時実行数: {max_workers or self.settings.BATCH_MAX_WORKERS}）")
+            print(f"📄 出力先: {filename}")
+            batch = self.service.create_articles_resumable(
+                requests,
+                job_name='wordpress_export',
+                serialize=self._serialize,
+                max_workers=max_workers,
+                resume=resume,
+                on_record=on_record,
+                on_result=on_result
+            )
+        
+        summary = batch.summary
+        if summary.resumed:
+            print(f"\n♻️ 前回までに生成済み: {summary.resumed}記事（ジャーナルから復元）")
+        print(f"\n⏱️ 生成時間: {summary.wall_time:.1f}秒 "
+              f"({summary.throughput_per_minute:.1f}記事/分, p95 {summary.latency_p95:.1f}秒)")
+        if summary.failed:
+            print(f"⚠️ 失敗: {summary.failed}記事（再実行すると失敗した記事だけを生成します）")
+            print(f"   ジャーナル: {batch.journal_path}")
         
         print(f"\n✅ XMLファイル作成完了: {filename}")
-        print(f"   記事数: {len(articles_data)}記事")
-        print(f"   ファイルサイズ: {len(xml_content) / 1024:.1f} KB")
+        print(f"   記事数: {writer.items_written}記事")
+        print(f"   ファイルサイズ: {os.path.getsize(filename) / 1024:.1f} KB")
         
         print("\n📋 WordPressへのインポート手順:")
         print("1. WordPress管理画面にログイン")
@@ -191,7 +158,7 @@ class WordPressXMLExporter:
         print("6. 「添付ファイルをダウンロードしてインポートする」のチェックを外す")
         print("7. 実行")
         
-        return filename, len(articles_data)
+        return filename, writer.items_written
 
 
 def main():
@@ -212,14 +179,11 @@ def main():
         with open(latest_json, 'r', encoding='utf-8') as f:
             articles_data = json.load(f)
         
-        xml_content = exporter.generate_wordpress_xml(articles_data)
-        
         filename = f"wordpress_import_from_json_{datetime.now().strftime('%Y%m%d_%H%M%S')}.xml"
-        with open(filename, 'w', encoding='utf-8') as f:
-            f.write(xml_content)
+        count = exporter.write_wordpress_xml(articles_data, filename)
         
         print(f"✅ XMLファイル作成: {filename}")
-        print(f"   記事数: {len(articles_data)}記事")
+        print(f"   記事数: {count}記事")
     else:
         # 新規生成
         print("新規記事生成モード")